@@ -7,8 +7,13 @@ from pathlib import Path
 
 from ivan.game import run
 from ivan.net import run_server
+from ivan.physics.local_collision import COLLISION_WORLD_ENV, COLLISION_WORLD_MODES
 from ivan.replays.compare import compare_latest_replays
-from ivan.replays.determinism_verify import verify_latest_replay_determinism, verify_replay_determinism
+from ivan.replays.determinism_verify import (
+    check_replay_hashes,
+    verify_latest_replay_determinism,
+    verify_replay_determinism,
+)
 from ivan.replays.telemetry import export_latest_replay_telemetry
 
 
@@ -84,6 +89,18 @@ def main(argv: list[str] | None = None) -> None:
         action="store_true",
         help="Run as dedicated multiplayer server.",
     )
+    parser.add_argument(
+        "--server-sim-workers",
+        type=int,
+        default=None,
+        help="Server mode: step player movement in N worker processes (0 = in-process, default from env).",
+    )
+    parser.add_argument(
+        "--collision-world",
+        choices=COLLISION_WORLD_MODES,
+        default=None,
+        help=f"Player collision: full map mesh or per-player nearby triangles (default from {COLLISION_WORLD_ENV}).",
+    )
     parser.add_argument(
         "--host",
         default="0.0.0.0",
@@ -135,6 +152,11 @@ def main(argv: list[str] | None = None) -> None:
         default=None,
         help="Replay a specific demo input N times in offline sim and report determinism stability, then exit.",
     )
+    parser.add_argument(
+        "--check-replay-hashes",
+        default=None,
+        help="Re-simulate a demo once and compare per-tick state hashes with the recorded ones, then exit.",
+    )
     parser.add_argument(
         "--determinism-runs",
         type=int,
@@ -166,13 +188,23 @@ def main(argv: list[str] | None = None) -> None:
         result = verify_latest_replay_determinism(runs=int(args.determinism_runs), out_dir=out_dir)
         print(f"source: {result.source_demo}")
         print(f"report: {result.report_path}")
-        print(f"runs: {result.runs} ticks: {result.tick_count}")
+        print(f"runs: {result.runs} ticks: {result.tick_count} collision: {result.collision}")
         print(
             f"stable: {result.stable} divergence_runs: {result.divergence_runs} "
             f"recorded_hash_mismatches: {result.recorded_hash_mismatches}/{result.recorded_hash_checked}"
         )
         return
 
+    if args.check_replay_hashes:
+        check = check_replay_hashes(replay_path=Path(args.check_replay_hashes))
+        print(f"source: {check.source_demo}")
+        print(f"ticks: {check.simulated_ticks}/{check.tick_count} collision: {check.collision}")
+        print(
+            f"matched: {check.matched} mismatches: {check.mismatches}/{check.checked} "
+            f"first_mismatch_tick: {check.first_mismatch_tick} deterministic_mode: {check.deterministic_mode}"
+        )
+        return
+
     if args.verify_replay_determinism:
         out_dir = Path(args.replay_telemetry_out) if args.replay_telemetry_out else None
         result = verify_replay_determinism(
@@ -182,7 +214,7 @@ def main(argv: list[str] | None = None) -> None:
         )
         print(f"source: {result.source_demo}")
         print(f"report: {result.report_path}")
-        print(f"runs: {result.runs} ticks: {result.tick_count}")
+        print(f"runs: {result.runs} ticks: {result.tick_count} collision: {result.collision}")
         print(
             f"stable: {result.stable} divergence_runs: {result.divergence_runs} "
             f"recorded_hash_mismatches: {result.recorded_hash_mismatches}/{result.recorded_hash_checked}"
@@ -195,9 +227,14 @@ def main(argv: list[str] | None = None) -> None:
             tcp_port=int(args.port),
             udp_port=int(args.port) + 1,
             map_json=args.map_json,
+            sim_workers=args.server_sim_workers,
+            collision_world=args.collision_world,
         )
         return
 
+    if args.collision_world is not None:
+        os.environ[COLLISION_WORLD_ENV] = str(args.collision_world)
+
     map_json = args.map_json
     run(
         smoke=args.smoke,
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import math
+import operator
 from dataclasses import dataclass
 
 from panda3d.core import LVector3f
@@ -10,3 +12,78 @@ class AABB:
     minimum: LVector3f
     maximum: LVector3f
 
+
+class AABBGrid:
+    """
+    Uniform grid over a fixed list of AABBs, answering "which boxes may overlap this box" by list index.
+
+    Boxes covering many cells (floors, long walls) are kept in a short always-tested list instead. Candidates come
+    back in ascending index order, so callers that resolve overlaps in list order see the same sequence as a
+    linear scan.
+    """
+
+    __slots__ = ("cell_size", "_boxes", "_bounds", "_cells", "_large")
+
+    _MAX_CELLS_PER_BOX = 64
+    # Padding on queries so float rounding can never drop a box the caller's exact test would accept.
+    _QUERY_PAD = 1e-3
+
+    def __init__(self, boxes: list[AABB], *, cell_size: float = 4.0) -> None:
+        self.cell_size = max(0.25, float(cell_size))
+        self._boxes = list(boxes)
+        self._bounds: list[tuple[float, float, float, float, float, float]] = []
+        self._cells: dict[tuple[int, int, int], list[int]] = {}
+        self._large: list[int] = []
+        for i, box in enumerate(self._boxes):
+            b = (
+                float(box.minimum.x),
+                float(box.minimum.y),
+                float(box.minimum.z),
+                float(box.maximum.x),
+                float(box.maximum.y),
+                float(box.maximum.z),
+            )
+            self._bounds.append(b)
+            c0 = self._cell(b[0], b[1], b[2])
+            c1 = self._cell(b[3], b[4], b[5])
+            if (c1[0] - c0[0] + 1) * (c1[1] - c0[1] + 1) * (c1[2] - c0[2] + 1) > self._MAX_CELLS_PER_BOX:
+                self._large.append(i)
+                continue
+            for cx in range(c0[0], c1[0] + 1):
+                for cy in range(c0[1], c1[1] + 1):
+                    for cz in range(c0[2], c1[2] + 1):
+                        self._cells.setdefault((cx, cy, cz), []).append(i)
+
+    def __len__(self) -> int:
+        return len(self._boxes)
+
+    def _cell(self, x: float, y: float, z: float) -> tuple[int, int, int]:
+        s = self.cell_size
+        return (math.floor(x / s), math.floor(y / s), math.floor(z / s))
+
+    def matches(self, boxes: list[AABB]) -> bool:
+        """True while `boxes` still holds exactly the indexed box objects (entries get replaced, not mutated)."""
+        return len(boxes) == len(self._boxes) and all(map(operator.is_, boxes, self._boxes))
+
+    def query(self, minimum: LVector3f, maximum: LVector3f, *, after: int = -1) -> list[int]:
+        """Ascending indices (> `after`) of boxes whose bounds touch the padded query box."""
+        pad = self._QUERY_PAD
+        lo = (float(minimum.x) - pad, float(minimum.y) - pad, float(minimum.z) - pad)
+        hi = (float(maximum.x) + pad, float(maximum.y) + pad, float(maximum.z) + pad)
+        c0 = self._cell(*lo)
+        c1 = self._cell(*hi)
+        found = {i for i in self._large if i > after}
+        cells = self._cells
+        for cx in range(c0[0], c1[0] + 1):
+            for cy in range(c0[1], c1[1] + 1):
+                for cz in range(c0[2], c1[2] + 1):
+                    ids = cells.get((cx, cy, cz))
+                    if ids:
+                        found.update(i for i in ids if i > after)
+        bounds = self._bounds
+        out: list[int] = []
+        for i in sorted(found):
+            b = bounds[i]
+            if b[0] <= hi[0] and b[3] >= lo[0] and b[1] <= hi[1] and b[4] >= lo[1] and b[2] <= hi[2] and b[5] >= lo[2]:
+                out.append(i)
+        return out
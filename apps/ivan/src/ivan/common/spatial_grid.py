@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import math
+from typing import Iterable
+
+
+class SpatialGrid:
+    """
+    Uniform grid over point positions keyed by integer id, rebuilt wholesale (typically once per server tick).
+
+    Box queries return ids in insertion order, so callers that break ties by iteration order keep the same
+    answers they had when scanning every point.
+    """
+
+    __slots__ = ("cell_size", "_inv", "_cells", "_points", "_order")
+
+    def __init__(self, *, cell_size: float = 8.0) -> None:
+        self.cell_size = max(1e-3, float(cell_size))
+        self._inv = 1.0 / self.cell_size
+        self._cells: dict[tuple[int, int, int], list[int]] = {}
+        self._points: dict[int, tuple[float, float, float]] = {}
+        self._order: dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._points)
+
+    def __contains__(self, key: int) -> bool:
+        return int(key) in self._points
+
+    def cell_key(self, x: float, y: float, z: float) -> tuple[int, int, int]:
+        inv = self._inv
+        return (math.floor(float(x) * inv), math.floor(float(y) * inv), math.floor(float(z) * inv))
+
+    def rebuild(self, points: Iterable[tuple[int, float, float, float]]) -> None:
+        cells: dict[tuple[int, int, int], list[int]] = {}
+        pts: dict[int, tuple[float, float, float]] = {}
+        order: dict[int, int] = {}
+        for key, x, y, z in points:
+            k = int(key)
+            p = (float(x), float(y), float(z))
+            pts[k] = p
+            order[k] = len(order)
+            cells.setdefault(self.cell_key(*p), []).append(k)
+        self._cells = cells
+        self._points = pts
+        self._order = order
+
+    def point(self, key: int) -> tuple[float, float, float] | None:
+        return self._points.get(int(key))
+
+    def cell_of(self, key: int) -> tuple[int, int, int] | None:
+        p = self._points.get(int(key))
+        return self.cell_key(*p) if p is not None else None
+
+    def query_box(
+        self,
+        min_xyz: tuple[float, float, float],
+        max_xyz: tuple[float, float, float],
+    ) -> list[int]:
+        """Ids whose point lies inside the closed box, in insertion order."""
+        min_x, min_y, min_z = (float(v) for v in min_xyz)
+        max_x, max_y, max_z = (float(v) for v in max_xyz)
+        if min_x > max_x or min_y > max_y or min_z > max_z or not self._cells:
+            return []
+        c0 = self.cell_key(min_x, min_y, min_z)
+        c1 = self.cell_key(max_x, max_y, max_z)
+        span = (c1[0] - c0[0] + 1) * (c1[1] - c0[1] + 1) * (c1[2] - c0[2] + 1)
+        buckets: list[list[int]] = []
+        if span > len(self._cells):
+            # Large boxes: walk occupied cells instead of the (mostly empty) covered range.
+            for (cx, cy, cz), ids in self._cells.items():
+                if c0[0] <= cx <= c1[0] and c0[1] <= cy <= c1[1] and c0[2] <= cz <= c1[2]:
+                    buckets.append(ids)
+        else:
+            cells = self._cells
+            for cx in range(c0[0], c1[0] + 1):
+                for cy in range(c0[1], c1[1] + 1):
+                    for cz in range(c0[2], c1[2] + 1):
+                        ids = cells.get((cx, cy, cz))
+                        if ids:
+                            buckets.append(ids)
+        out: list[int] = []
+        pts = self._points
+        for ids in buckets:
+            for k in ids:
+                x, y, z = pts[k]
+                if min_x <= x <= max_x and min_y <= y <= max_y and min_z <= z <= max_z:
+                    out.append(k)
+        if len(buckets) > 1:
+            out.sort(key=self._order.__getitem__)
+        return out
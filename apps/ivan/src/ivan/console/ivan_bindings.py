@@ -131,6 +131,9 @@ def build_client_console(runner: Any) -> Console:
         runner._on_disconnect_server_from_menu()  # noqa: SLF001
         return ["disconnect"]
 
+    def _cmd_map_reload(_ctx: CommandContext, _argv: list[str]) -> list[str]:
+        return runner._on_map_reload()  # noqa: SLF001
+
     def _cmd_replay_export_latest(_ctx: CommandContext, argv: list[str]) -> list[str]:
         out_dir = Path(str(argv[0])) if argv else None
         try:
@@ -800,6 +803,11 @@ def build_client_console(runner: Any) -> Console:
     con.register_command(name="exec", help="Execute a .cfg-like script file.", handler=_cmd_exec)
     con.register_command(name="connect", help="Connect to a multiplayer server.", handler=_cmd_connect)
     con.register_command(name="disconnect", help="Disconnect from multiplayer.", handler=_cmd_disconnect)
+    con.register_command(
+        name="map_reload",
+        help="Re-convert the running .map and rebuild only changed geometry (testmap --watch).",
+        handler=_cmd_map_reload,
+    )
     con.register_command(
         name="replay_export_latest",
         help="Export telemetry (CSV + JSON summary) for latest replay.",
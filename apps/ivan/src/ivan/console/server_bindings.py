@@ -50,9 +50,56 @@ def build_server_console(server: Any) -> Console:
             out.extend(con.execute_line(ctx=CommandContext(role="server", origin="exec"), line=ln))
         return out
 
+    def _cmd_tick_stats(_ctx: CommandContext, argv: list[str]) -> list[str]:
+        metrics = getattr(server, "tick_metrics", None)
+        if metrics is None:
+            return ["tick_stats: unavailable"]
+        if argv and argv[0] == "reset":
+            try:
+                window = int(argv[1]) if len(argv) > 1 else None
+            except ValueError:
+                return ["usage: tick_stats [reset [window_ticks]]"]
+            metrics.reset(window_ticks=window)
+            return ["tick_stats: reset"]
+        return [" ".join(f"{k}={v}" for k, v in metrics.summary().items())]
+
+    def _cmd_ctrl_stats(_ctx: CommandContext, argv: list[str]) -> list[str]:
+        if not hasattr(server, "set_controller_profiling"):
+            return ["ctrl_stats: unavailable"]
+        if argv and argv[0] in ("on", "off"):
+            server.set_controller_profiling(argv[0] == "on")
+            return [f"ctrl_stats: profiling {argv[0]}"]
+        profile = getattr(server, "controller_profile", None)
+        if profile is None:
+            return ["ctrl_stats: profiling off (ctrl_stats on)"]
+        if argv and argv[0] == "reset":
+            profile.reset()
+            return ["ctrl_stats: reset"]
+        if argv:
+            return ["usage: ctrl_stats [on|off|reset]"]
+        summary = profile.summary()
+        out = [" ".join(f"{k}={v}" for k, v in summary.items() if not isinstance(v, dict))]
+        if summary.get("phase_mean_ms"):
+            out.append("phase_ms " + " ".join(f"{k}={v}" for k, v in summary["phase_mean_ms"].items()))
+        for state, row in summary.get("by_state", {}).items():
+            out.append(f"state {state} " + " ".join(f"{k}={v}" for k, v in row.items()))
+        if getattr(server, "_sim_shards", None) is not None:
+            out.append("note: sim workers paused while profiling; player steps run in-process")
+        return out
+
     con.register_command(name="help", help="List commands and cvars.", handler=_cmd_help)
     con.register_command(name="echo", help="Print text.", handler=_cmd_echo)
     con.register_command(name="exec", help="Execute a .cfg-like script file.", handler=_cmd_exec)
+    con.register_command(
+        name="tick_stats",
+        help="Server tick timing (p99, overruns, late ticks) and snapshot encode cost. Usage: tick_stats [reset [window]]",
+        handler=_cmd_tick_stats,
+    )
+    con.register_command(
+        name="ctrl_stats",
+        help="Player controller step cost by phase, sweeps/rays per step and motion state. Usage: ctrl_stats [on|off|reset]",
+        handler=_cmd_ctrl_stats,
+    )
 
     for field, anno in PhysicsTuning.__annotations__.items():
         if not isinstance(field, str) or not field:
@@ -19,6 +19,9 @@ class AABBVolume:
         (maxx, maxy, maxz) = self.max_xyz
         return (minx <= x <= maxx) and (miny <= y <= maxy) and (minz <= z <= maxz)
 
+    def bounds(self) -> tuple[tuple[float, float, float], tuple[float, float, float]]:
+        return (self.min_xyz, self.max_xyz)
+
 
 @dataclass(frozen=True)
 class CylinderVolume:
@@ -38,6 +41,12 @@ class CylinderVolume:
         dy = float(y) - float(cy)
         return (dx * dx) + (dy * dy) <= float(self.radius) * float(self.radius)
 
+    def bounds(self) -> tuple[tuple[float, float, float], tuple[float, float, float]]:
+        cx, cy, cz = (float(v) for v in self.center_xyz)
+        r = float(self.radius)
+        hz = float(self.half_z)
+        return ((cx - r, cy - r, cz - hz), (cx + r, cy + r, cz + hz))
+
 
 def aabb_centered(*, cx: float, cy: float, cz: float, half_xy: float, half_z: float) -> AABBVolume:
     return AABBVolume(
@@ -40,6 +40,7 @@ from ivan.modes.base import ModeContext
 from ivan.modes.loader import load_mode
 from ivan.net import EmbeddedHostServer, MultiplayerClient
 from ivan.physics.collision_world import CollisionWorld
+from ivan.physics.controller_profile import ControllerProfiler, controller_profile_enabled
 from ivan.physics.motion.intent import MotionIntent
 from ivan.physics.player_controller import PlayerController
 from ivan.physics.tuning import PhysicsTuning
@@ -56,6 +57,7 @@ from ivan.games import (
 from ivan.course.time_trial import make_marker_cylinder
 from ivan.replays import (
     DemoFrame,
+    DemoKeyframe,
     DemoRecording,
     append_frame,
     compare_latest_replays,
@@ -93,8 +95,10 @@ from . import combat_fx as _combat_fx
 from . import audio_system as _audio
 from . import grapple_rope as _grapple_rope
 from . import input_system as _input
+from . import map_hot_reload as _map_reload
 from . import menu_flow as _menu
 from . import netcode as _net
+from . import replay_playback as _replay
 from . import time_trial_markers as _tt_markers
 from . import tuning_profiles as _profiles
 from .animation_observer import AnimationObserver
@@ -198,6 +202,9 @@ class RunnerDemo(ShowBase):
         self._playback_frames: list[DemoFrame] | None = None
         self._playback_index: int = 0
         self._playback_active: bool = False
+        self._playback_keyframes: list[DemoKeyframe] = []
+        self._playback_speed: float = 1.0
+        self._playback_seeking: bool = False
         self._net_client: MultiplayerClient | None = None
         self._net_connected: bool = False
         self._net_player_id: int = 0
@@ -212,6 +219,8 @@ class RunnerDemo(ShowBase):
         self._net_interact_pending: bool = False
         self._net_last_snapshot_local_time: float = 0.0
         self._net_interp_delay_ticks: float = 6.0
+        # Server tick remote players were last rendered at; sent with inputs so shots rewind to what was seen.
+        self._net_remote_view_tick: float = 0.0
         # GoldSrc/Source-style dead reckoning when snapshots stall (short clamp to avoid runaway).
         self._net_remote_extrapolate_max_ticks: float = 8.0
         self._net_can_configure: bool = False
@@ -723,6 +732,9 @@ class RunnerDemo(ShowBase):
         if self._console_open:
             self.console_ui.history_prev()
             return
+        if self._replay_scrub_available():
+            _replay.change_speed(self, step=1)
+            return
         self._menu_nav_press(-1)
 
     def _on_arrow_down(self) -> None:
@@ -732,6 +744,9 @@ class RunnerDemo(ShowBase):
         if self._console_open:
             self.console_ui.history_next()
             return
+        if self._replay_scrub_available():
+            _replay.change_speed(self, step=-1)
+            return
         self._menu_nav_press(1)
 
     def _on_console_autocomplete(self) -> None:
@@ -1580,8 +1595,10 @@ class RunnerDemo(ShowBase):
         if rec.metadata.tuning:
             self._apply_profile_snapshot(dict(rec.metadata.tuning), persist=False)
         self._playback_frames = list(rec.frames)
+        self._playback_keyframes = list(rec.keyframes)
         self._playback_index = 0
         self._playback_active = True
+        self._playback_speed = 1.0
         self._playback_look_scale = max(1, int(rec.metadata.look_scale))
         self._playback_last_frame = None
         self._playback_det_checked = 0
@@ -1605,12 +1622,16 @@ class RunnerDemo(ShowBase):
                 self._start_game(map_json=rec.metadata.map_json, lighting=None)
                 return
         self._do_respawn(from_mode=True)
+        _replay.restore_start(self)
+        _replay.update_timeline(self)
 
     def _stop_replay_playback(self, *, reason: str) -> None:
         was_active = bool(self._playback_active)
         self._playback_active = False
         self._playback_frames = None
+        self._playback_keyframes = []
         self._playback_index = 0
+        self._playback_speed = 1.0
         self._playback_look_scale = self._look_input_scale
         self._playback_last_frame = None
         self._mouse_dx_accum = 0.0
@@ -1639,6 +1660,7 @@ class RunnerDemo(ShowBase):
             map_json=self._current_map_json,
             tuning=snapshot,
         )
+        _replay.record_keyframe_if_due(self)
         self.ui.set_status(f"Recording demo: {self._active_recording.metadata.demo_name}")
 
     def _save_current_demo(self) -> Path | None:
@@ -1689,8 +1711,24 @@ class RunnerDemo(ShowBase):
         _menu.menu_nav_release(self, dir01)
 
     def _menu_page(self, dir01: int) -> None:
+        if self._replay_scrub_available():
+            _replay.seek_page(self, dir01=dir01)
+            return
         _menu.menu_page(self, dir01)
 
+    def _replay_scrub_available(self) -> bool:
+        return (
+            self._mode == "game"
+            and self._playback_active
+            and not (
+                self._pause_menu_open
+                or self._debug_menu_open
+                or self._replay_browser_open
+                or self._console_open
+                or self._feel_capture_open
+            )
+        )
+
     def _menu_select(self) -> None:
         if self._mode == "game" and self.game_mode_picker_ui.is_visible():
             self.game_mode_picker_ui.on_enter()
@@ -1803,6 +1841,8 @@ class RunnerDemo(ShowBase):
             self._active_run_cfg = cfg
             self.ui.set_pixelated_textures_enabled(bool(self._pixelated_textures_runtime))
             _mark_stage("resolve_run_config")
+            if self.scene is not None:
+                self.scene.close()
             self.scene = WorldScene()
             self.scene.build(cfg=cfg, loader=self.loader, render=self.world_root, camera=self.camera)
             self._load_report_emitted_for_scene_id = None
@@ -1828,22 +1868,15 @@ class RunnerDemo(ShowBase):
             self._yaw = float(self.scene.spawn_yaw)
             _mark_stage("post_scene_setup")
 
-            self.collision = CollisionWorld(
-                aabbs=self.scene.aabbs,
-                triangles=self.scene.triangles,
-                triangle_collision_mode=self.scene.triangle_collision_mode,
-                player_radius=float(self.tuning.player_radius),
-                player_half_height=float(self.tuning.player_half_height),
-                render=self.world_root,
-            )
-            self.scene.set_collision_updater(self.collision.update_graybox_block)
-
+            player_collision = _map_reload.build_collision(self)
             self.player = PlayerController(
                 tuning=self.tuning,
                 spawn_point=self.scene.spawn_point,
                 aabbs=self.scene.aabbs,
-                collision=self.collision,
+                collision=player_collision,
             )
+            if controller_profile_enabled():
+                self.player.profiler = ControllerProfiler()
             self._local_hp = 100
             self._camera_tilt_observer.reset()
             self._camera_height_observer.reset()
@@ -1865,6 +1898,9 @@ class RunnerDemo(ShowBase):
             _combat_fx.reset_runtime(self, keep_weapon_slot=True)
             if not self._playback_active:
                 self._start_new_demo_recording()
+            else:
+                _replay.restore_start(self)
+                _replay.update_timeline(self)
             if self._runtime_connect_host or self._open_to_network:
                 if self._open_to_network and not self._runtime_connect_host:
                     # Local host mode: restart to ensure server runs on the selected map.
@@ -2322,6 +2358,7 @@ class RunnerDemo(ShowBase):
             self._net_pending_inputs.clear()
             self._net_predicted_states.clear()
             self._net_last_server_tick = 0
+            self._net_remote_view_tick = 0.0
             self._net_last_acked_seq = 0
             self._net_local_respawn_seq = 0
             self._net_interact_pending = False
@@ -2470,6 +2507,9 @@ class RunnerDemo(ShowBase):
     def _on_disconnect_server_from_menu(self) -> None:
         _net.on_disconnect_server_from_menu(self)
 
+    def _on_map_reload(self) -> list[str]:
+        return _map_reload.reload_map(self)
+
     def _clear_remote_players(self) -> None:
         _net.clear_remote_players(self)
 
@@ -2631,7 +2671,7 @@ class RunnerDemo(ShowBase):
 
         self._handle_kill_plane()
         fire_event = _combat.tick(self, cmd=cmd, dt=float(self._sim_fixed_dt))
-        if fire_event is not None:
+        if fire_event is not None and not self._playback_seeking:
             _combat_fx.on_fire(self, event=fire_event)
             _audio.on_weapon_fire(self, slot=int(fire_event.slot))
             _audio.on_weapon_impact(
@@ -2684,6 +2724,7 @@ class RunnerDemo(ShowBase):
             inp_jp=bool(cmd.jump_pressed),
             inp_jh=bool(cmd.jump_held),
             inp_sp=bool(cmd.slide_pressed),
+            controller_profile=self.player.profiler.last if self.player.profiler is not None else None,
         )
         tick_hash = deterministic_state_hash(
             pos=LVector3f(self.player.pos),
@@ -2700,7 +2741,7 @@ class RunnerDemo(ShowBase):
         self._tick_race_runtime(now=now_tick)
         if self._playback_active and self._playback_last_frame is not None:
             tm = self._playback_last_frame.telemetry if isinstance(self._playback_last_frame.telemetry, dict) else None
-            exp_hash = str(tm.get("det_h") or "") if tm else ""
+            exp_hash = str(self._playback_last_frame.state_hash or (tm.get("det_h") if tm else "") or "")
             if exp_hash:
                 self._playback_det_checked += 1
                 if exp_hash != tick_hash:
@@ -2712,8 +2753,12 @@ class RunnerDemo(ShowBase):
         if record_demo and self._active_recording is not None and not self._playback_active:
             append_frame(
                 self._active_recording,
-                cmd.to_demo_frame_with_telemetry(telemetry=self._capture_demo_telemetry(cmd=cmd)),
+                cmd.to_demo_frame_with_telemetry(
+                    telemetry=self._capture_demo_telemetry(cmd=cmd),
+                    state_hash=tick_hash,
+                ),
             )
+            _replay.record_keyframe_if_due(self)
         if network_send and self._net_connected and self._net_client is not None and not self._playback_active:
             self._net_seq_counter += 1
             seq = int(self._net_seq_counter)
@@ -2724,6 +2769,11 @@ class RunnerDemo(ShowBase):
             self._net_client.send_input(
                 seq=seq,
                 server_tick_hint=int(self._net_last_server_tick),
+                view_delay_ticks=(
+                    max(0.0, float(self._net_last_server_tick) - float(self._net_remote_view_tick))
+                    if self._net_remote_view_tick > 0.0
+                    else 0.0
+                ),
                 cmd={
                     "dx": int(cmd.look_dx),
                     "dy": int(cmd.look_dy),
@@ -3183,12 +3233,22 @@ class RunnerDemo(ShowBase):
                 except Exception:
                     pass
                 net_diag = self._net_perf_text if self._net_perf_text else "net | waiting for samples..."
+                ctrl_diag = "ctrl  | profile off"
+                ctrl_prof = self._feel_diag.controller_profile_summary()
+                if ctrl_prof is not None:
+                    top = sorted(ctrl_prof["phase_mean_ms"].items(), key=lambda kv: -kv[1])[:3]
+                    ctrl_diag = (
+                        f"ctrl  | mean={ctrl_prof['step_mean_ms']:.3f}ms p99={ctrl_prof['step_p99_ms']:.3f}ms "
+                        f"sweeps={ctrl_prof['sweeps_per_step']:.1f} rays={ctrl_prof['rays_per_step']:.1f} "
+                        + " ".join(f"{k}={v:.3f}" for k, v in top)
+                    )
                 if len(net_diag) > 120:
                     net_diag = f"{net_diag[:117]}..."
                 self.input_debug.set_text(
                     "input debug (F2)\n"
                     f"sim   | mode={self._mode} lock={self._pointer_locked} dt={frame_dt:.3f} has_mouse={has_mouse} mouse=({mx:+.2f},{my:+.2f})\n"
                     f"perf  | fps={1.0/max(1e-6,float(frame_dt)):.1f} p95={self._feel_diag.frame_p95_ms():.2f}ms sim={self._sim_tick_rate_hz}hz steps={self._physics_steps_this_frame}\n"
+                    f"{ctrl_diag}\n"
                     f"det   | hash={self._det_trace_hash[:12]} samples={self._det_trace.sample_count()} replay_det={self._playback_det_checked}/{self._playback_det_mismatch}\n"
                     f"input | raw_wasd={int(raw_w)}{int(raw_a)}{int(raw_s)}{int(raw_d)} ascii_wasd={int(asc_w)}{int(asc_a)}{int(asc_s)}{int(asc_d)} age={last_input_age:.3f}s jump_buf={jump_buf:.3f}s coyote={coyote:.3f}s\n"
                     f"move  | state={state_name} wish=({wish_dbg.x:+.2f},{wish_dbg.y:+.2f}) pos=({pos.x:+.2f},{pos.y:+.2f},{pos.z:+.2f}) vel=({vel.x:+.2f},{vel.y:+.2f},{vel.z:+.2f})\n"
@@ -3203,7 +3263,9 @@ class RunnerDemo(ShowBase):
                 self._input_debug_until = 0.0
                 self.input_debug.hide()
 
-            self._sim_accumulator = min(0.25, self._sim_accumulator + frame_dt)
+            # Replay fast-forward/slow-motion scales sim time; the catch-up cap scales with it.
+            sim_speed = float(self._playback_speed) if self._playback_active else 1.0
+            self._sim_accumulator = min(0.25 * sim_speed, self._sim_accumulator + frame_dt * sim_speed)
             self._poll_network_snapshot()
             steps = 0
             while self._sim_accumulator >= self._sim_fixed_dt:
@@ -3216,6 +3278,8 @@ class RunnerDemo(ShowBase):
                 self._sim_accumulator -= self._sim_fixed_dt
                 steps += 1
             self._physics_steps_this_frame = int(steps)
+            if self._playback_active:
+                _replay.update_timeline(self)
             if self._net_connected:
                 decay = math.exp(-max(0.0, float(self._net_reconcile_decay_hz)) * max(0.0, float(frame_dt)))
                 self._net_reconcile_pos_offset *= float(decay)
@@ -3325,6 +3389,8 @@ class RunnerDemo(ShowBase):
                 self.race_ui_feedback.destroy()
             except Exception:
                 pass
+            if self.scene is not None:
+                self.scene.close()
         finally:
             super().userExit(*args, **kwargs)
 
@@ -6,7 +6,9 @@ from pathlib import Path
 from typing import Any
 
 from ivan.physics.tuning import PhysicsTuning
+from ivan.replays.batch_sim import simulate_replay_batch
 from ivan.replays.compare import ReplayTelemetryComparison, compare_latest_route_exports
+from ivan.replays.demo import load_replay
 from ivan.replays.telemetry import telemetry_export_dir
 
 from .feel_feedback import TuningAdjustment
@@ -83,6 +85,17 @@ class AutotuneEvaluation:
     checks: list[GuardrailCheck]
 
 
+@dataclass(frozen=True)
+class TuningSweepCandidate:
+    label: str
+    tuning_overrides: dict[str, float]
+    passed: bool
+    score: float
+    trace_hash: str
+    checks: list[GuardrailCheck]
+    summary: dict[str, Any]
+
+
 def normalize_route_tag(tag: str | None) -> str:
     out = str(tag or "").strip().upper()
     if out not in _ROUTE_TAGS:
@@ -466,11 +479,11 @@ def _check_max_ratio(
     return GuardrailCheck(name=name, passed=bool(passed), latest=lat, reference=ref, detail=detail)
 
 
-def evaluate_route_guardrails(*, route_tag: str, out_dir: Path | None = None) -> AutotuneEvaluation:
-    tag = normalize_route_tag(route_tag)
-    comp = compare_latest_route_exports(route_tag=tag, out_dir=out_dir)
-    latest = _load_summary(comp.latest_export.summary_path)
-    reference = _load_summary(comp.reference_export.summary_path)
+def _guardrail_checks(
+    latest: dict[str, Any],
+    reference: dict[str, Any],
+) -> tuple[list[GuardrailCheck], list[tuple[float, float]]]:
+    """Guardrail checks plus weighted (weight, score) components for one summary against a reference."""
 
     jump_latest = _metric(latest, "metrics.jump_takeoff.success_rate")
     jump_ref = _metric(reference, "metrics.jump_takeoff.success_rate")
@@ -526,8 +539,6 @@ def evaluate_route_guardrails(*, route_tag: str, out_dir: Path | None = None) ->
             unit="",
         ),
     ]
-    pass_checks = all(ch.passed for ch in checks)
-
     components: list[tuple[float, float]] = [
         (3.0, _score_higher(jump_latest, jump_ref, 0.05)),
         (2.0, _score_higher(speed_latest, speed_ref, 1.0)),
@@ -536,11 +547,27 @@ def evaluate_route_guardrails(*, route_tag: str, out_dir: Path | None = None) ->
         (1.0, _score_lower(cam_lin_latest, cam_lin_ref, 20.0)),
         (1.0, _score_lower(cam_ang_latest, cam_ang_ref, 120.0)),
     ]
+    return checks, components
+
+
+def _weighted_score(components: list[tuple[float, float]]) -> float:
+    denom = sum(w for w, _v in components)
+    return float(sum(w * v for w, v in components) / max(1e-6, denom))
+
+
+def evaluate_route_guardrails(*, route_tag: str, out_dir: Path | None = None) -> AutotuneEvaluation:
+    tag = normalize_route_tag(route_tag)
+    comp = compare_latest_route_exports(route_tag=tag, out_dir=out_dir)
+    latest = _load_summary(comp.latest_export.summary_path)
+    reference = _load_summary(comp.reference_export.summary_path)
+
+    checks, components = _guardrail_checks(latest, reference)
+    pass_checks = all(ch.passed for ch in checks)
+
     compare_total = max(1, int(comp.improved_count + comp.regressed_count + comp.equal_count))
     compare_balance = (float(comp.improved_count) - float(comp.regressed_count)) / float(compare_total)
     components.append((1.5, max(-1.0, min(1.0, compare_balance))))
-    denom = sum(w for w, _v in components)
-    score = float(sum(w * v for w, v in components) / max(1e-6, denom))
+    score = _weighted_score(components)
 
     return AutotuneEvaluation(
         route_tag=tag,
@@ -555,12 +582,63 @@ def evaluate_route_guardrails(*, route_tag: str, out_dir: Path | None = None) ->
     )
 
 
+def sweep_tuning_variants(
+    *,
+    replay_path: Path,
+    variants: list[dict[str, float]],
+    workers: int = 0,
+    map_json: str | None = None,
+) -> list[TuningSweepCandidate]:
+    """
+    Re-simulate a route replay headlessly once with its recorded tuning and once per invariant variant.
+
+    Variant values are clamped to the invariant bounds. Each variant is scored against the recorded-tuning run with
+    the same guardrails and weights as `evaluate_route_guardrails` (minus the export comparison balance).
+    Candidates come back best first: passing before failing, then by score.
+    """
+
+    clamped: list[dict[str, float]] = []
+    for variant in variants:
+        unknown = sorted(k for k in variant if k not in _ALLOWED_FIELDS)
+        if unknown:
+            raise ValueError(f"Not an autotune invariant: {', '.join(unknown)}")
+        clamped.append({k: _clamp(k, float(v)) for k, v in sorted(variant.items())})
+    rec = load_replay(Path(replay_path).expanduser().resolve())
+    results = simulate_replay_batch(
+        rec=rec,
+        variants=[{}, *clamped],
+        labels=["baseline", *(f"variant-{i}" for i in range(len(clamped)))],
+        map_json=map_json,
+        workers=workers,
+    )
+    baseline = results[0].summary
+    out: list[TuningSweepCandidate] = []
+    for res in results[1:]:
+        checks, components = _guardrail_checks(res.summary, baseline)
+        score = _weighted_score(components)
+        out.append(
+            TuningSweepCandidate(
+                label=res.label,
+                tuning_overrides=dict(res.tuning_overrides),
+                passed=bool(all(ch.passed for ch in checks) and score >= -0.05),
+                score=float(score),
+                trace_hash=res.trace_hash,
+                checks=checks,
+                summary=res.summary,
+            )
+        )
+    out.sort(key=lambda c: (not c.passed, -c.score))
+    return out
+
+
 __all__ = [
     "AutotuneEvaluation",
     "GuardrailCheck",
     "RouteContext",
+    "TuningSweepCandidate",
     "evaluate_route_guardrails",
     "load_route_context",
     "normalize_route_tag",
     "suggest_invariant_adjustments",
+    "sweep_tuning_variants",
 ]
@@ -81,6 +81,37 @@ def reset_runtime(host, *, keep_active_slot: bool = True) -> None:
     st.combo_boost_left = 0.0
 
 
+def snapshot_runtime(host) -> dict:
+    """JSON-ready copy of the combat runtime (replay keyframes)."""
+
+    st = _state(host)
+    return {
+        "active_slot": int(st.active_slot),
+        "cooldowns": {str(k): float(v) for k, v in st.cooldown_by_slot.items()},
+        "recent_event": str(st.recent_event),
+        "recent_event_left": float(st.recent_event_left),
+        "combo_stacks": int(st.combo_stacks),
+        "combo_left": float(st.combo_left),
+        "combo_boost_left": float(st.combo_boost_left),
+    }
+
+
+def restore_runtime(host, snapshot: dict | None) -> None:
+    if not isinstance(snapshot, dict):
+        reset_runtime(host, keep_active_slot=True)
+        return
+    st = _state(host)
+    slot = int(snapshot.get("active_slot") or 1)
+    st.active_slot = slot if slot in WEAPON_SPECS else 1
+    cooldowns = snapshot.get("cooldowns") if isinstance(snapshot.get("cooldowns"), dict) else {}
+    st.cooldown_by_slot = {slot_id: float(cooldowns.get(str(slot_id), 0.0)) for slot_id in WEAPON_SPECS}
+    st.recent_event = str(snapshot.get("recent_event") or "")
+    st.recent_event_left = float(snapshot.get("recent_event_left") or 0.0)
+    st.combo_stacks = int(snapshot.get("combo_stacks") or 0)
+    st.combo_left = float(snapshot.get("combo_left") or 0.0)
+    st.combo_boost_left = float(snapshot.get("combo_boost_left") or 0.0)
+
+
 def _cooldowns_tick(*, st: CombatRuntimeState, dt: float) -> None:
     dt_s = max(0.0, float(dt))
     for slot in tuple(st.cooldown_by_slot.keys()):
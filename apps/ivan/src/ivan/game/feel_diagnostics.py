@@ -7,6 +7,8 @@ from pathlib import Path
 
 from panda3d.core import LVector3f
 
+from ivan.physics.controller_profile import ControllerProfileWindow, ControllerStepProfile
+
 
 @dataclass
 class FeelTickSample:
@@ -37,6 +39,10 @@ class FeelTickSample:
     inp_jp: bool
     inp_jh: bool
     inp_sp: bool
+    # Controller profile for the tick (zero unless a `ControllerProfiler` is attached to the player).
+    ctrl_ms: float = 0.0
+    ctrl_sweeps: int = 0
+    ctrl_rays: int = 0
 
 
 class RollingFeelDiagnostics:
@@ -45,6 +51,7 @@ class RollingFeelDiagnostics:
     def __init__(self, *, tick_rate_hz: int, seconds: float = 5.0) -> None:
         self._frame_ms = deque(maxlen=1024)
         self._samples = deque(maxlen=max(1, int(float(tick_rate_hz) * max(2.0, min(5.0, float(seconds))))))
+        self._controller = ControllerProfileWindow(window_steps=int(self._samples.maxlen or 1))
 
     def record_frame_dt(self, *, dt_s: float) -> None:
         self._frame_ms.append(max(0.0, float(dt_s)) * 1000.0)
@@ -87,8 +94,11 @@ class RollingFeelDiagnostics:
         inp_jp: bool,
         inp_jh: bool,
         inp_sp: bool,
+        controller_profile: ControllerStepProfile | None = None,
     ) -> None:
         speed = float((LVector3f(vel)).length())
+        if controller_profile is not None:
+            self._controller.record(controller_profile)
         self._samples.append(
             FeelTickSample(
                 t=float(t),
@@ -118,9 +128,18 @@ class RollingFeelDiagnostics:
                 inp_jp=bool(inp_jp),
                 inp_jh=bool(inp_jh),
                 inp_sp=bool(inp_sp),
+                ctrl_ms=float(controller_profile.total_s * 1000.0) if controller_profile is not None else 0.0,
+                ctrl_sweeps=int(controller_profile.sweeps) if controller_profile is not None else 0,
+                ctrl_rays=int(controller_profile.rays) if controller_profile is not None else 0,
             )
         )
 
+    def controller_profile_summary(self) -> dict | None:
+        """Rolling controller step cost over the sample window; None when no profiled ticks were recorded."""
+        if not len(self._controller):
+            return None
+        return self._controller.summary()
+
     def dump_json(self, *, out_path: Path) -> None:
         out_path.parent.mkdir(parents=True, exist_ok=True)
         payload = {
@@ -128,4 +147,7 @@ class RollingFeelDiagnostics:
             "frame_p95_ms": float(self.frame_p95_ms()),
             "samples": [asdict(s) for s in self._samples],
         }
+        controller = self.controller_profile_summary()
+        if controller is not None:
+            payload["controller_profile"] = controller
         out_path.write_text(json.dumps(payload, ensure_ascii=True, sort_keys=True, indent=2) + "\n", encoding="utf-8")
@@ -114,7 +114,12 @@ class _InputCommand:
     def to_demo_frame(self) -> DemoFrame:
         return self.to_demo_frame_with_telemetry(telemetry=None)
 
-    def to_demo_frame_with_telemetry(self, *, telemetry: dict[str, float | int | bool] | None) -> DemoFrame:
+    def to_demo_frame_with_telemetry(
+        self,
+        *,
+        telemetry: dict[str, float | int | bool] | None,
+        state_hash: str = "",
+    ) -> DemoFrame:
         return DemoFrame(
             look_dx=self.look_dx,
             look_dy=self.look_dy,
@@ -142,6 +147,7 @@ class _InputCommand:
             raw_arrows_available=self.raw_arrows_available,
             raw_mouse_buttons_available=self.raw_mouse_buttons_available,
             telemetry=(dict(telemetry) if isinstance(telemetry, dict) else None),
+            state_hash=str(state_hash),
         )
 
     @classmethod
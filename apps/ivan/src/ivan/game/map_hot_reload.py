@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import time
+from pathlib import Path
+
+from ivan.physics.collision_world import CollisionWorld
+from ivan.physics.local_collision import LocalCollisionWorld, TriangleGrid, collision_world_mode
+
+_STATIC_MESH_NODE = "static-triangle-mesh"
+
+
+def build_collision(host):
+    """(Re)build `host.collision` from the scene; returns the collision world the local player should use."""
+
+    host.collision = CollisionWorld(
+        aabbs=host.scene.aabbs,
+        triangles=host.scene.triangles,
+        triangle_collision_mode=host.scene.triangle_collision_mode,
+        player_radius=float(host.tuning.player_radius),
+        player_half_height=float(host.tuning.player_half_height),
+        render=host.world_root,
+    )
+    host.scene.set_collision_updater(host.collision.update_graybox_block)
+
+    player_collision: CollisionWorld = host.collision
+    if host.scene.triangle_collision_mode and host.scene.triangles and collision_world_mode() == "local":
+        player_collision = LocalCollisionWorld(
+            source=host.collision,
+            index=TriangleGrid(host.scene.triangles),
+            player_radius=float(host.tuning.player_radius),
+            player_half_height=float(host.tuning.player_half_height),
+        )
+    return player_collision
+
+
+def reload_map(host) -> list[str]:
+    """
+    `map_reload` console command: re-convert the running direct `.map` and apply only what changed.
+
+    Render groups are swapped per material; collision is rebuilt only when the collision triangles changed.
+    The player keeps position and velocity. Offline only: a server owns collision for connected clients.
+    """
+
+    scene = host.scene
+    map_ref = host._current_map_json
+    if scene is None or host.player is None or not map_ref or str(map_ref).lower()[-4:] != ".map":
+        return ["error: map_reload needs a running direct .map session"]
+    if host._net_connected:
+        return ["error: map_reload is offline-only"]
+
+    t0 = time.perf_counter()
+    report = scene.reload_map_file(map_file=Path(map_ref), loader=host.loader, render=host.world_root)
+    if report is None:
+        return ["error: map_reload conversion failed (previous geometry kept)"]
+    if report["collision_changed"]:
+        for np in host.world_root.findAllMatches(f"**/{_STATIC_MESH_NODE}"):
+            np.removeNode()
+        player = host.player
+        player.collision = build_collision(host)
+        player.collision.update_player_sweep_shape(
+            player_radius=float(host.tuning.player_radius),
+            player_half_height=float(player.player_half.z),
+        )
+    elapsed_ms = (time.perf_counter() - t0) * 1000.0
+    return [
+        f"map_reload: {report['groups_rebuilt']} group(s) rebuilt, {report['groups_kept']} kept, "
+        f"{report['groups_removed']} removed; brushes {report['brush_cache_hits']} cached, "
+        f"{report['brush_cache_misses']} converted; collision "
+        f"{'rebuilt' if report['collision_changed'] else 'unchanged'} ({elapsed_ms:.0f} ms)"
+    ]
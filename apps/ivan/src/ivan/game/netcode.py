@@ -7,6 +7,7 @@ from dataclasses import dataclass, field
 
 from panda3d.core import LVector3f
 
+from ivan.physics.controller_snapshot import ControllerState
 from ivan.physics.tuning import PhysicsTuning
 from ivan.state import update_state
 
@@ -38,6 +39,8 @@ class _PredictedState:
     vel: LVector3f
     yaw: float
     pitch: float
+    # Full controller state after this input, so rollback resumes with the matching timers and contacts.
+    ctrl: ControllerState | None = None
 
 
 @dataclass
@@ -76,6 +79,7 @@ def append_predicted_state(host, *, seq: int) -> None:
             vel=LVector3f(host.player.vel),
             yaw=float(host._yaw),
             pitch=float(host._pitch),
+            ctrl=host.player.capture_state(),
         )
     )
     if len(host._net_predicted_states) > 256:
@@ -139,6 +143,10 @@ def reconcile_local_from_server(
 
     if ack_advanced:
         pre_reconcile_pos = LVector3f(host.player.pos)
+        ack_ctrl = getattr(ack_state, "ctrl", None)
+        if ack_ctrl is not None:
+            # Roll back to the predicted state at the acked input, then take the server's position/velocity.
+            host.player.restore_state(ack_ctrl)
         host.player.pos = LVector3f(server_pos)
         host.player.vel = LVector3f(server_vel)
         host._yaw = float(yaw)
@@ -508,6 +516,7 @@ def render_remote_players(host, *, alpha: float) -> None:
     else:
         est_server_tick = float(host._net_last_server_tick)
     target_tick = est_server_tick - float(host._net_interp_delay_ticks)
+    host._net_remote_view_tick = float(target_tick)
     for rp in host._remote_players.values():
         if not rp.sample_ticks:
             continue
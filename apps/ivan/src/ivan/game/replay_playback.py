@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+from direct.showbase.ShowBaseGlobal import globalClock
+from panda3d.core import KeyboardButton, LVector3f
+
+from ivan.replays import DemoKeyframe, append_keyframe, keyframe_due, nearest_keyframe
+
+from . import combat_system as _combat
+
+# Replay scrubbing: Left/Right seek by SEEK_STEP_S (Shift: SEEK_STEP_LONG_S), Up/Down change playback speed.
+PLAYBACK_SPEEDS: tuple[float, ...] = (0.25, 0.5, 1.0, 2.0, 4.0, 8.0)
+SEEK_STEP_S = 5.0
+SEEK_STEP_LONG_S = 30.0
+
+
+def capture_keyframe(host, *, tick: int) -> DemoKeyframe:
+    """Full local simulation state after `tick` recorded frames: controller, view angles, hp, combat, race."""
+
+    extra: dict = {
+        "hp": int(host._local_hp),
+        "noclip": bool(host.tuning.noclip_enabled),
+        "combat": _combat.snapshot_runtime(host),
+    }
+    race = host._race_runtime
+    if race.has_course():
+        # Race timers run on the frame clock; keep the start time relative so a restore lines up with "now".
+        extra["race"] = race.export_state_payload()
+        extra["race_started_ago"] = float(globalClock.getFrameTime()) - float(race.race_started_at)
+    return DemoKeyframe(
+        tick=int(tick),
+        yaw=float(host._yaw),
+        pitch=float(host._pitch),
+        controller=host.player.capture_state(),
+        extra=extra,
+    )
+
+
+def restore_keyframe(host, keyframe: DemoKeyframe) -> None:
+    extra = keyframe.extra
+    host.player.restore_state(keyframe.controller)
+    host._yaw = float(keyframe.yaw)
+    host._pitch = float(keyframe.pitch)
+    host._local_hp = int(extra.get("hp", 100))
+    host.tuning.noclip_enabled = bool(extra.get("noclip", False))
+    _combat.restore_runtime(host, extra.get("combat"))
+    race = host._race_runtime
+    if isinstance(extra.get("race"), dict) and race.has_course():
+        payload = dict(extra["race"])
+        payload["race_started_at"] = float(globalClock.getFrameTime()) - float(extra.get("race_started_ago") or 0.0)
+        race.apply_authoritative_state_payload(payload)
+        host._sync_race_markers()
+    host._last_sim_vel = LVector3f(host.player.vel)
+    host._camera_tilt_observer.reset()
+    host._camera_height_observer.reset()
+    host._camera_feedback_observer.reset()
+
+
+def record_keyframe_if_due(host) -> None:
+    """Called at recording start and after each recorded frame; appends a keyframe every interval."""
+
+    rec = host._active_recording
+    if rec is None or host.player is None or host._playback_active:
+        return
+    if keyframe_due(rec):
+        append_keyframe(rec, capture_keyframe(host, tick=len(rec.frames)))
+
+
+def restore_start(host) -> None:
+    """Start playback from the recorded tick-0 state when the demo has one (spawn otherwise)."""
+
+    keyframes = host._playback_keyframes
+    if host.player is not None and keyframes and keyframes[0].tick == 0:
+        restore_keyframe(host, keyframes[0])
+        _settle(host)
+
+
+def seek(host, *, tick: int) -> int:
+    """
+    Move playback so the next simulated frame is `frames[tick]`.
+
+    Restores the nearest keyframe at or before `tick` (or respawns when there is none and the target is behind
+    playback) and re-simulates the frames in between without network sends, recording or render snapshots.
+    """
+
+    frames = host._playback_frames
+    if not host._playback_active or not frames or host.player is None:
+        return int(host._playback_index)
+    target = max(0, min(len(frames), int(tick)))
+    current = int(host._playback_index)
+    kf = nearest_keyframe(host._playback_keyframes, target)
+    if target < current or (kf is not None and kf.tick > current):
+        if kf is not None:
+            restore_keyframe(host, kf)
+            host._playback_index = int(kf.tick)
+        else:
+            host._do_respawn(from_mode=True)
+            host._playback_index = 0
+    host._playback_seeking = True
+    try:
+        while host._playback_index < target:
+            host._simulate_input_tick(
+                cmd=host._sample_replay_input_command(),
+                menu_open=False,
+                network_send=False,
+                record_demo=False,
+                capture_snapshot=False,
+            )
+    finally:
+        host._playback_seeking = False
+    _settle(host)
+    return int(host._playback_index)
+
+
+def seek_page(host, *, dir01: int) -> None:
+    step_s = SEEK_STEP_LONG_S if _shift_down(host) else SEEK_STEP_S
+    ticks = int(round(step_s * float(host._sim_tick_rate_hz)))
+    seek(host, tick=int(host._playback_index) + (ticks if dir01 > 0 else -ticks))
+    update_timeline(host)
+
+
+def change_speed(host, *, step: int) -> None:
+    speeds = PLAYBACK_SPEEDS
+    i = min(range(len(speeds)), key=lambda k: abs(speeds[k] - float(host._playback_speed)))
+    host._playback_speed = speeds[max(0, min(len(speeds) - 1, i + (1 if step > 0 else -1)))]
+    update_timeline(host)
+
+
+def timeline_text(*, tick: int, total_ticks: int, tick_rate: int, speed: float, keyframes: int) -> str:
+    rate = float(max(1, int(tick_rate)))
+    return (
+        f"{_clock(tick / rate)} / {_clock(total_ticks / rate)}  x{speed:g}  kf {int(keyframes)}"
+        "  |  Left/Right: seek  Up/Down: speed"
+    )
+
+
+def update_timeline(host) -> None:
+    frames = host._playback_frames or []
+    host.replay_input_ui.set_timeline(
+        timeline_text(
+            tick=int(host._playback_index),
+            total_ticks=len(frames),
+            tick_rate=int(host._sim_tick_rate_hz),
+            speed=float(host._playback_speed),
+            keyframes=len(host._playback_keyframes),
+        )
+    )
+
+
+def _settle(host) -> None:
+    host._sim_accumulator = 0.0
+    host._sim_state_ready = False
+    host._push_sim_snapshot()
+    host._render_interpolated_state(alpha=1.0)
+
+
+def _clock(seconds: float) -> str:
+    s = max(0.0, float(seconds))
+    return f"{int(s // 60):02d}:{s % 60.0:04.1f}"
+
+
+def _shift_down(host) -> bool:
+    try:
+        return host.mouseWatcherNode is not None and bool(host.mouseWatcherNode.isButtonDown(KeyboardButton.shift()))
+    except Exception:
+        return False
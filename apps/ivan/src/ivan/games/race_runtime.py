@@ -5,6 +5,7 @@ from typing import Any
 
 from panda3d.core import LVector3f
 
+from ivan.common.spatial_grid import SpatialGrid
 from ivan.course.volumes import CylinderVolume, cylinder_from_json, cylinder_to_json
 
 
@@ -334,7 +335,17 @@ class RaceRuntime:
         out.append(RaceEvent(kind="race_intro"))
         return out
 
-    def tick(self, *, now: float, player_positions: dict[int, LVector3f]) -> list[RaceEvent]:
+    def tick(
+        self,
+        *,
+        now: float,
+        player_positions: dict[int, LVector3f],
+        player_index: SpatialGrid | None = None,
+    ) -> list[RaceEvent]:
+        """
+        Advance race state. `player_index` (a grid over the same positions) lets marker checks skip players
+        nowhere near a marker; results are identical with or without it.
+        """
         if not self.has_course():
             return []
         out: list[RaceEvent] = []
@@ -368,6 +379,25 @@ class RaceRuntime:
         if finish is None:
             return out
 
+        near_by_marker: dict[int, set[int]] = {}
+
+        def _inside(marker: CylinderVolume, pid: int, pos: LVector3f) -> bool:
+            if player_index is not None and int(pid) in player_index:
+                near = near_by_marker.get(id(marker))
+                if near is None:
+                    # Padded so rounding at the marker surface can never exclude a point contains_point accepts.
+                    lo, hi = marker.bounds()
+                    near = set(
+                        player_index.query_box(
+                            (lo[0] - 1e-4, lo[1] - 1e-4, lo[2] - 1e-4),
+                            (hi[0] + 1e-4, hi[1] + 1e-4, hi[2] + 1e-4),
+                        )
+                    )
+                    near_by_marker[id(marker)] = near
+                if int(pid) not in near:
+                    return False
+            return bool(marker.contains_point(x=float(pos.x), y=float(pos.y), z=float(pos.z)))
+
         for pid in sorted(self.participants):
             player = self.players.get(int(pid))
             pos = player_positions.get(int(pid))
@@ -376,7 +406,7 @@ class RaceRuntime:
             cp_idx = int(player.next_checkpoint_index)
             if cp_idx < len(checkpoints):
                 marker = checkpoints[cp_idx]
-                inside = bool(marker.contains_point(x=float(pos.x), y=float(pos.y), z=float(pos.z)))
+                inside = _inside(marker, int(pid), pos)
                 inside_set = self._inside_cp.setdefault(int(pid), set())
                 if inside and cp_idx not in inside_set:
                     player.next_checkpoint_index = cp_idx + 1
@@ -392,7 +422,7 @@ class RaceRuntime:
                     inside_set.remove(cp_idx)
                 continue
 
-            inside_finish = bool(finish.contains_point(x=float(pos.x), y=float(pos.y), z=float(pos.z)))
+            inside_finish = _inside(finish, int(pid), pos)
             was_inside = bool(self._inside_finish.get(int(pid), False))
             if inside_finish and not was_inside:
                 elapsed = max(0.0, now_f - float(self.race_started_at))
@@ -0,0 +1,180 @@
+"""Batch brush conversion, optionally fanned out over a process pool.
+
+Brushes are independent until Phong smoothing, so :class:`BrushBatchConverter` converts a list of brushes into
+per-brush ``(render triangles, collision triangles)`` pairs, in input order.  With ``workers > 1`` the brushes
+that still need clipping (per-brush cache misses) are split into contiguous chunks and converted on a spawn-context
+``ProcessPoolExecutor``; chunk results are placed back by index, so the output is identical to the serial path.
+
+Workers run the same :func:`~ivan.maps.brush_geometry.brush_to_render_and_collision` code and ship results back
+as the compact tuple rows the per-brush cache stores.  The pool starts on the first batch large enough to be worth it and is reused
+for later batches (worldspawn, then every brush entity) until :meth:`BrushBatchConverter.close`.  If the pool cannot
+start or a worker dies, the batch is converted in-process and the converter stays serial from then on.
+"""
+
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import os
+from collections.abc import Sequence
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from ivan.maps.brush_cache import (
+    BrushGeometryCache,
+    BrushOutputRows,
+    brush_cache_key,
+    pack_brush_output,
+    unpack_brush_output,
+)
+from ivan.maps.brush_geometry import Triangle, brush_to_render_and_collision, brush_to_triangles
+from ivan.maps.map_parser import Brush
+
+logger = logging.getLogger(__name__)
+
+MAP_WORKERS_ENV = "IRUN_IVAN_MAP_WORKERS"
+# Below this many brushes to clip, pool start-up and pickling cost more than they save.
+PARALLEL_MIN_BRUSHES = 256
+# Brushes per pool task: large enough to amortise pickling, small enough to balance uneven brushes.
+CHUNK_BRUSHES = 64
+
+BrushOutput = tuple[list[Triangle], list[list[float]]]
+
+# Per-process conversion settings for pool workers (sent once through the initializer).
+_WORKER_SCALE = 0.03
+_WORKER_TEXTURE_SIZES: dict[str, tuple[int, int]] = {}
+_WORKER_COLLISION = True
+
+
+def resolve_map_workers(workers: int | None) -> int:
+    """Worker count for brush conversion: explicit value, else `IRUN_IVAN_MAP_WORKERS`, else 0 (serial)."""
+
+    if workers is None:
+        try:
+            workers = int(os.environ.get(MAP_WORKERS_ENV, "0"))
+        except ValueError:
+            workers = 0
+    return max(0, int(workers))
+
+
+def _worker_init(scale: float, texture_sizes: dict[str, tuple[int, int]], collision: bool) -> None:
+    global _WORKER_SCALE, _WORKER_TEXTURE_SIZES, _WORKER_COLLISION
+    _WORKER_SCALE = float(scale)
+    _WORKER_TEXTURE_SIZES = dict(texture_sizes)
+    _WORKER_COLLISION = bool(collision)
+
+
+def _convert_brush(
+    brush: Brush, scale: float, texture_sizes: dict[str, tuple[int, int]], collision: bool
+) -> BrushOutput:
+    if collision:
+        return brush_to_render_and_collision(brush, scale=scale, texture_sizes=texture_sizes)
+    return brush_to_triangles(brush, scale=scale, texture_sizes=texture_sizes), []
+
+
+def _worker_convert_chunk(brushes: list[Brush]) -> list[BrushOutputRows]:
+    return [
+        pack_brush_output(*_convert_brush(b, _WORKER_SCALE, _WORKER_TEXTURE_SIZES, _WORKER_COLLISION))
+        for b in brushes
+    ]
+
+
+class BrushBatchConverter:
+    """
+    Converts brush lists with fixed settings, serially or on a lazily started process pool.
+
+    `workers` <= 1 never starts a pool. `collision=False` skips collision triangles (empty lists) and cannot be
+    combined with a brush cache, whose entries always hold both.
+    """
+
+    def __init__(
+        self,
+        *,
+        scale: float = 0.03,
+        texture_sizes: dict[str, tuple[int, int]] | None = None,
+        workers: int = 0,
+        brush_cache: BrushGeometryCache | None = None,
+        collision: bool = True,
+        min_parallel_brushes: int | None = None,
+        chunk_brushes: int | None = None,
+    ) -> None:
+        if brush_cache is not None and not collision:
+            raise ValueError("brush cache entries need collision triangles")
+        self.scale = float(scale)
+        self.texture_sizes = dict(texture_sizes or {})
+        self.workers = max(0, int(workers))
+        self.brush_cache = brush_cache
+        self.collision = bool(collision)
+        # None: module defaults, read at construction time.
+        self.min_parallel_brushes = max(1, int(min_parallel_brushes or PARALLEL_MIN_BRUSHES))
+        self.chunk_brushes = max(1, int(chunk_brushes or CHUNK_BRUSHES))
+        self._pool: ProcessPoolExecutor | None = None
+        # Brushes clipped in worker processes (diagnostics).
+        self.parallel_brushes = 0
+
+    def __enter__(self) -> BrushBatchConverter:
+        return self
+
+    def __exit__(self, *_exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
+    def convert(self, brushes: Sequence[Brush]) -> list[BrushOutput]:
+        """Per-brush `(render, collision)` lists in input order; fresh lists, safe to modify."""
+
+        cache = self.brush_cache
+        rows: list[BrushOutputRows | None] = [None] * len(brushes)
+        out: list[BrushOutput | None] = [None] * len(brushes)
+        keys: list[str | None] = [None] * len(brushes)
+        todo: list[int] = []
+        for i, brush in enumerate(brushes):
+            if cache is not None:
+                keys[i] = brush_cache_key(brush, scale=self.scale, texture_sizes=self.texture_sizes)
+                rows[i] = cache.lookup(keys[i])
+                if rows[i] is not None:
+                    continue
+            todo.append(i)
+
+        pooled = self.workers > 1 and len(todo) >= self.min_parallel_brushes
+        if not (pooled and self._convert_parallel(brushes, todo, rows)):
+            for i in todo:
+                tris, coll = _convert_brush(brushes[i], self.scale, self.texture_sizes, self.collision)
+                out[i] = (tris, coll)
+                if cache is not None:
+                    rows[i] = pack_brush_output(tris, coll)
+        if cache is not None:
+            for i in todo:
+                cache.store(keys[i], rows[i])
+        return [o if o is not None else unpack_brush_output(r) for o, r in zip(out, rows)]
+
+    def _convert_parallel(self, brushes: Sequence[Brush], todo: list[int], rows: list) -> bool:
+        """Clip `todo` on the pool into `rows`; False (nothing written) when the pool failed."""
+
+        step = self.chunk_brushes
+        chunks = [todo[k : k + step] for k in range(0, len(todo), step)]
+        try:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_worker_init,
+                    initargs=(self.scale, self.texture_sizes, self.collision),
+                )
+            results = list(self._pool.map(_worker_convert_chunk, [[brushes[i] for i in chunk] for chunk in chunks]))
+        except (BrokenProcessPool, OSError) as e:
+            # A crashed or unspawnable worker must not fail the map load: finish in-process, stay serial.
+            logger.warning("Brush conversion pool failed (%s); converting in-process", e)
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+            self.workers = 0
+            return False
+        for chunk, chunk_rows in zip(chunks, results):
+            for i, r in zip(chunk, chunk_rows):
+                rows[i] = r
+        self.parallel_brushes += len(todo)
+        return True
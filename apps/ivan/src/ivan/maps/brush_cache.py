@@ -0,0 +1,156 @@
+"""Per-brush conversion cache for direct ``.map`` loading.
+
+Clipping every brush is the dominant cost of :func:`~ivan.maps.map_converter.convert_map_file`, yet an editor
+save usually touches a handful of brushes.  :class:`BrushGeometryCache` stores the clipped render triangles
+(flat normals, before Phong) and collision triangles of each brush under a content hash of everything the
+clipper reads: face plane points, texture name and projection, the world scale and the size of each face
+texture.  Unchanged brushes reuse their cached output; only edited brushes go through the clipper again.
+
+The cache lives next to the WAD texture cache as ``.brush_geometry_cache.pkl``.  It is best-effort: a missing,
+stale or unreadable file simply means a cold conversion.  Entries not used by the latest conversion are dropped
+on save, so the file tracks the current map instead of growing with every edit.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import pickle
+from pathlib import Path
+
+from ivan.maps.brush_geometry import Triangle
+from ivan.maps.map_parser import Brush
+
+BRUSH_CACHE_FILENAME = ".brush_geometry_cache.pkl"
+# Bump whenever `brush_geometry` output for the same brush changes.
+BRUSH_CACHE_SCHEMA = "ivan.map_brush_cache.v1"
+
+# (positions, normals, uvs, material) per render triangle; 9-float tuples per collision triangle.
+_RenderRow = tuple[tuple[float, ...], tuple[float, ...], tuple[float, ...], str]
+BrushOutputRows = tuple[tuple[_RenderRow, ...], tuple[tuple[float, ...], ...]]
+
+# Cache of the map converted last in this process, so repeated conversions (hot reload) skip unpickling.
+# Only one map is kept: opening another map's cache drops it (entries are already saved after each run).
+_OPEN_CACHES: dict[Path, BrushGeometryCache] = {}
+
+
+def brush_cache_key(brush: Brush, *, scale: float, texture_sizes: dict[str, tuple[int, int]] | None) -> str:
+    """Content hash of one brush as the clipper sees it (``repr`` keeps floats exact)."""
+
+    sizes = texture_sizes or {}
+    h = hashlib.blake2b(repr(float(scale)).encode("ascii"), digest_size=16)
+    for f in brush.faces:
+        p0, p1, p2 = f.plane_points
+        row = (
+            (p0.x, p0.y, p0.z, p1.x, p1.y, p1.z, p2.x, p2.y, p2.z),
+            f.texture,
+            (f.u_axis.x, f.u_axis.y, f.u_axis.z, f.u_offset),
+            (f.v_axis.x, f.v_axis.y, f.v_axis.z, f.v_offset),
+            (f.rotation, f.scale_x, f.scale_y),
+            sizes.get(f.texture.lower()),
+        )
+        h.update(repr(row).encode("utf-8", errors="surrogatepass"))
+    return h.hexdigest()
+
+
+def pack_brush_output(tris: list[Triangle], collision: list[list[float]]) -> BrushOutputRows:
+    """Compact immutable rows for one brush's output (cache entries and pool results)."""
+
+    return (
+        tuple((tuple(t.positions), tuple(t.normals), tuple(t.uvs), t.material) for t in tris),
+        tuple(tuple(c) for c in collision),
+    )
+
+
+def unpack_brush_output(rows: BrushOutputRows) -> tuple[list[Triangle], list[list[float]]]:
+    render_rows, collision_rows = rows
+    return (
+        [Triangle(positions=list(p), normals=list(n), uvs=list(uv), material=m) for p, n, uv, m in render_rows],
+        [list(c) for c in collision_rows],
+    )
+
+
+class BrushGeometryCache:
+    """Content-addressed store of per-brush clipper output.
+
+    ``hits`` / ``misses`` count lookups since the last :meth:`begin_run`.
+    """
+
+    def __init__(self, path: Path | None = None) -> None:
+        self.path = Path(path) if path is not None else None
+        self._entries: dict[str, BrushOutputRows] = {}
+        self._used: set[str] = set()
+        self._dirty = False
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @classmethod
+    def load(cls, path: Path) -> BrushGeometryCache:
+        cache = cls(path)
+        try:
+            with open(path, "rb") as fh:
+                raw = pickle.load(fh)
+        except Exception:
+            return cache
+        if isinstance(raw, dict) and raw.get("schema") == BRUSH_CACHE_SCHEMA and isinstance(raw.get("entries"), dict):
+            cache._entries = raw["entries"]
+        return cache
+
+    def begin_run(self) -> None:
+        self._used = set()
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, key: str) -> BrushOutputRows | None:
+        """Cached rows for a :func:`brush_cache_key` (counts a hit or miss and marks the key as used)."""
+
+        self._used.add(key)
+        rows = self._entries.get(key)
+        if rows is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return rows
+
+    def store(self, key: str, rows: BrushOutputRows) -> None:
+        self._used.add(key)
+        self._entries[key] = rows
+        self._dirty = True
+
+    def save(self) -> None:
+        """Persist the entries used since :meth:`begin_run` (no-op when nothing changed)."""
+
+        stale = len(self._entries) != len(self._used)
+        if stale:
+            self._entries = {k: v for k, v in self._entries.items() if k in self._used}
+        if self.path is None or not (self._dirty or stale):
+            return
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp, "wb") as fh:
+                pickle.dump(
+                    {"schema": BRUSH_CACHE_SCHEMA, "entries": self._entries},
+                    fh,
+                    protocol=pickle.HIGHEST_PROTOCOL,
+                )
+            os.replace(tmp, self.path)
+            self._dirty = False
+        except Exception:
+            # Cache persistence is best-effort, conversion output is already complete.
+            pass
+
+
+def open_brush_cache(cache_dir: Path) -> BrushGeometryCache:
+    """Brush cache stored in *cache_dir* (the map's texture cache dir), reused while the same map is converted."""
+
+    path = (Path(cache_dir) / BRUSH_CACHE_FILENAME).resolve()
+    cache = _OPEN_CACHES.get(path)
+    if cache is None:
+        cache = BrushGeometryCache.load(path)
+        _OPEN_CACHES.clear()
+        _OPEN_CACHES[path] = cache
+    return cache
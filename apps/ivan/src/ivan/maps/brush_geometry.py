@@ -27,10 +27,13 @@ from __future__ import annotations
 
 import math
 from dataclasses import dataclass, field
-from typing import Sequence
+from typing import TYPE_CHECKING, Sequence
 
 from ivan.maps.map_parser import Brush, BrushFace, Vec3
 
+if TYPE_CHECKING:
+    from ivan.maps.brush_cache import BrushGeometryCache
+
 
 # ---------------------------------------------------------------------------
 # Constants
@@ -172,16 +175,6 @@ def _plane_from_points(
     return _Plane(normal=normal, dist=dist)
 
 
-def _plane_point_distance(plane: _Plane,
-                          point: tuple[float, float, float]) -> float:
-    """Signed distance from *point* to *plane*.
-
-    Positive means *point* is on the front (outside) side.
-    """
-
-    return _dot(plane.normal, point) - plane.dist
-
-
 # ---------------------------------------------------------------------------
 # Initial polygon generation
 # ---------------------------------------------------------------------------
@@ -235,84 +228,53 @@ def _clip_polygon_by_plane(
 ) -> list[tuple[float, float, float]]:
     """Clip *polygon* against *plane*, keeping the back (inside) half.
 
-    Points with ``plane_point_distance <= 0`` are considered *inside*.
+    Points with signed distance ``<= 0`` (within ``_EPS``) are considered
+    *inside*.
+    Each vertex distance is computed once; polygons entirely on one side
+    are returned without walking their edges.
     """
 
     if not polygon:
         return []
 
+    nx, ny, nz = plane.normal
+    pd = plane.dist
+    dists = [nx * p[0] + ny * p[1] + nz * p[2] - pd for p in polygon]
+    if max(dists) <= _EPS:
+        return polygon
+    if min(dists) > _EPS:
+        return []
+
     out: list[tuple[float, float, float]] = []
     count = len(polygon)
 
     for i in range(count):
-        current = polygon[i]
-        nxt = polygon[(i + 1) % count]
-
-        d_cur = _plane_point_distance(plane, current)
-        d_nxt = _plane_point_distance(plane, nxt)
-
+        j = i + 1 if i + 1 < count else 0
+        d_cur = dists[i]
+        d_nxt = dists[j]
         cur_inside = d_cur <= _EPS
-        nxt_inside = d_nxt <= _EPS
 
         if cur_inside:
-            out.append(current)
-            if not nxt_inside:
-                # Exiting: compute intersection.
-                out.append(_intersect_edge(current, nxt, d_cur, d_nxt))
-        elif nxt_inside:
-            # Entering: compute intersection.
-            out.append(_intersect_edge(current, nxt, d_cur, d_nxt))
+            out.append(polygon[i])
+        if cur_inside != (d_nxt <= _EPS):
+            # Exiting or entering: the point where edge ``i -> j`` crosses
+            # the plane.
+            a = polygon[i]
+            denom = d_cur - d_nxt
+            if abs(denom) < _EPS:
+                out.append(a)
+                continue
+            b = polygon[j]
+            t = d_cur / denom
+            out.append((
+                a[0] + t * (b[0] - a[0]),
+                a[1] + t * (b[1] - a[1]),
+                a[2] + t * (b[2] - a[2]),
+            ))
 
     return out
 
 
-def _intersect_edge(
-    a: tuple[float, float, float],
-    b: tuple[float, float, float],
-    da: float,
-    db: float,
-) -> tuple[float, float, float]:
-    """Compute the point where edge ``a -> b`` crosses the plane.
-
-    *da* and *db* are the signed distances of *a* and *b* to the plane.
-    """
-
-    denom = da - db
-    if abs(denom) < _EPS:
-        return a
-    t = da / denom
-    return (
-        a[0] + t * (b[0] - a[0]),
-        a[1] + t * (b[1] - a[1]),
-        a[2] + t * (b[2] - a[2]),
-    )
-
-
-# ---------------------------------------------------------------------------
-# Fan triangulation
-# ---------------------------------------------------------------------------
-
-def _fan_triangulate(
-    polygon: list[tuple[float, float, float]],
-) -> list[tuple[
-    tuple[float, float, float],
-    tuple[float, float, float],
-    tuple[float, float, float],
-]]:
-    """Fan-triangulate a convex polygon.
-
-    Returns a list of ``(v0, v1, v2)`` triangles.
-    """
-
-    if len(polygon) < 3:
-        return []
-    tris = []
-    v0 = polygon[0]
-    for i in range(1, len(polygon) - 1):
-        tris.append((v0, polygon[i], polygon[i + 1]))
-    return tris
-
-
 # ---------------------------------------------------------------------------
 # UV computation (Valve 220)
 # ---------------------------------------------------------------------------
@@ -356,57 +318,31 @@ def _compute_uv(
 # Core: brush -> triangles
 # ---------------------------------------------------------------------------
 
-def brush_to_triangles(
-    brush: Brush,
-    *,
-    scale: float = 0.03,
-    texture_sizes: dict[str, tuple[int, int]] | None = None,
-) -> list[Triangle]:
-    """Convert a single :class:`Brush` into a list of renderable triangles.
+def _brush_windings(brush: Brush) -> list[tuple[_Plane, list[tuple[float, float, float]]] | None]:
+    """Clip every face of *brush* once, in map space.
 
-    Parameters
-    ----------
-    brush:
-        The brush to convert.
-    scale:
-        Uniform scale multiplier applied to all vertex positions.
-        Default ``0.03`` matches the GoldSrc-to-game-unit convention.
-    texture_sizes:
-        Optional mapping from texture name to ``(width, height)`` in pixels.
-        If a texture is not found (or the dict is *None*), UVs are computed
-        with ``(1, 1)`` so that the raw pixel offset is preserved and
-        division by texture size can happen at render time.
-
-    Returns
-    -------
-    list[Triangle]
-        Renderable triangles with positions already scaled.  Triangles whose
-        texture matches one of the :data:`SKIP_RENDER_TEXTURES` are excluded.
+    Returns one entry per face: ``(plane, winding)`` with at least three
+    vertices, or ``None`` for faces that produce no geometry (clipped away,
+    or tool textures that generate neither render nor collision output).
+    Render and collision triangles are both cut from these windings.
     """
 
-    if not brush.faces:
-        return []
-
-    tex_sizes = texture_sizes or {}
-
-    # 1. Build planes from face definitions. ---------------------------------
     planes: list[_Plane] = []
     for face in brush.faces:
         pp = face.plane_points
-        p0 = (pp[0].x, pp[0].y, pp[0].z)
-        p1 = (pp[1].x, pp[1].y, pp[1].z)
-        p2 = (pp[2].x, pp[2].y, pp[2].z)
-        planes.append(_plane_from_points(p0, p1, p2))
-
-    triangles: list[Triangle] = []
+        planes.append(_plane_from_points(
+            (pp[0].x, pp[0].y, pp[0].z),
+            (pp[1].x, pp[1].y, pp[1].z),
+            (pp[2].x, pp[2].y, pp[2].z),
+        ))
 
-    # 2. For each face, clip a large polygon against all other planes. -------
+    windings: list[tuple[_Plane, list[tuple[float, float, float]]] | None] = []
     for fi, face in enumerate(brush.faces):
         tex_lower = face.texture.lower()
 
-        # Skip tool textures entirely (no render, no collision from here;
-        # collision for clip is handled by the caller via a separate pass).
+        # Skip tool textures entirely (no render, no collision).
         if tex_lower in SKIP_RENDER_TEXTURES and tex_lower not in COLLISION_ONLY_TEXTURES:
+            windings.append(None)
             continue
 
         plane = planes[fi]
@@ -420,53 +356,98 @@ def brush_to_triangles(
             if not polygon:
                 break
 
-        if len(polygon) < 3:
-            continue
+        windings.append((plane, polygon) if len(polygon) >= 3 else None)
+    return windings
+
 
-        # Skip invisible tool textures from render output (but they are still
-        # clipped above so collision callers can reuse the windings).
-        if tex_lower in SKIP_RENDER_TEXTURES:
+def _render_triangles(
+    brush: Brush,
+    windings: list[tuple[_Plane, list[tuple[float, float, float]]] | None],
+    scale: float,
+    tex_sizes: dict[str, tuple[int, int]],
+) -> list[Triangle]:
+    triangles: list[Triangle] = []
+    for face, wound in zip(brush.faces, windings):
+        # Invisible tool textures (``clip``) only feed collision.
+        if wound is None or face.texture.lower() in SKIP_RENDER_TEXTURES:
             continue
+        plane, polygon = wound
 
-        # 3. Compute face normal for flat shading. --------------------------
-        face_normal = plane.normal
+        # Flat shading: the face normal on every vertex.
+        fnx, fny, fnz = plane.normal
+        normals = [fnx, fny, fnz] * 3
 
-        # 4. Texture dimensions for UV computation. -------------------------
         # GoldSrc texture names are case-insensitive; texture_sizes keys
         # are lowercased by the extractor.
         tw, th = tex_sizes.get(face.texture.lower(), (1, 1))
 
-        # 5. Fan-triangulate and emit. --------------------------------------
-        tris = _fan_triangulate(polygon)
-        for v0, v1, v2 in tris:
-            # Scale positions.
-            sv0 = _scale(v0, scale)
-            sv1 = _scale(v1, scale)
-            sv2 = _scale(v2, scale)
-
-            # UVs are computed in *map-space* (before scale).
-            uv0 = _compute_uv(v0, face, tw, th)
-            uv1 = _compute_uv(v1, face, tw, th)
-            uv2 = _compute_uv(v2, face, tw, th)
-
+        # Scale positions and compute UVs (in *map-space*, before scale) once
+        # per winding vertex, then fan-triangulate.
+        pos = [(x * scale, y * scale, z * scale) for x, y, z in polygon]
+        uvs = [_compute_uv(v, face, tw, th) for v in polygon]
+        p0 = pos[0]
+        uv0 = uvs[0]
+        for i in range(1, len(polygon) - 1):
+            p1, p2 = pos[i], pos[i + 1]
+            uv1, uv2 = uvs[i], uvs[i + 1]
             triangles.append(Triangle(
-                positions=[
-                    sv0[0], sv0[1], sv0[2],
-                    sv1[0], sv1[1], sv1[2],
-                    sv2[0], sv2[1], sv2[2],
-                ],
-                normals=[
-                    face_normal[0], face_normal[1], face_normal[2],
-                    face_normal[0], face_normal[1], face_normal[2],
-                    face_normal[0], face_normal[1], face_normal[2],
-                ],
+                positions=[p0[0], p0[1], p0[2], p1[0], p1[1], p1[2], p2[0], p2[1], p2[2]],
+                normals=list(normals),
                 uvs=[uv0[0], uv0[1], uv1[0], uv1[1], uv2[0], uv2[1]],
                 material=face.texture,
             ))
-
     return triangles
 
 
+def _collision_triangles(
+    windings: list[tuple[_Plane, list[tuple[float, float, float]]] | None],
+    scale: float,
+) -> list[list[float]]:
+    collision: list[list[float]] = []
+    for wound in windings:
+        if wound is None:
+            continue
+        pos = [(x * scale, y * scale, z * scale) for x, y, z in wound[1]]
+        p0 = pos[0]
+        for i in range(1, len(pos) - 1):
+            p1, p2 = pos[i], pos[i + 1]
+            collision.append([p0[0], p0[1], p0[2], p1[0], p1[1], p1[2], p2[0], p2[1], p2[2]])
+    return collision
+
+
+def brush_to_triangles(
+    brush: Brush,
+    *,
+    scale: float = 0.03,
+    texture_sizes: dict[str, tuple[int, int]] | None = None,
+) -> list[Triangle]:
+    """Convert a single :class:`Brush` into a list of renderable triangles.
+
+    Parameters
+    ----------
+    brush:
+        The brush to convert.
+    scale:
+        Uniform scale multiplier applied to all vertex positions.
+        Default ``0.03`` matches the GoldSrc-to-game-unit convention.
+    texture_sizes:
+        Optional mapping from texture name to ``(width, height)`` in pixels.
+        If a texture is not found (or the dict is *None*), UVs are computed
+        with ``(1, 1)`` so that the raw pixel offset is preserved and
+        division by texture size can happen at render time.
+
+    Returns
+    -------
+    list[Triangle]
+        Renderable triangles with positions already scaled.  Triangles whose
+        texture matches one of the :data:`SKIP_RENDER_TEXTURES` are excluded.
+    """
+
+    if not brush.faces:
+        return []
+    return _render_triangles(brush, _brush_windings(brush), scale, texture_sizes or {})
+
+
 def brush_to_collision_triangles(
     brush: Brush,
     *,
@@ -486,48 +467,21 @@ def brush_to_collision_triangles(
 
     if not brush.faces:
         return []
+    return _collision_triangles(_brush_windings(brush), scale)
 
-    planes: list[_Plane] = []
-    for face in brush.faces:
-        pp = face.plane_points
-        planes.append(_plane_from_points(
-            (pp[0].x, pp[0].y, pp[0].z),
-            (pp[1].x, pp[1].y, pp[1].z),
-            (pp[2].x, pp[2].y, pp[2].z),
-        ))
-
-    collision: list[list[float]] = []
-
-    for fi, face in enumerate(brush.faces):
-        tex_lower = face.texture.lower()
-
-        # Skip textures that generate neither render nor collision geometry.
-        if tex_lower in SKIP_RENDER_TEXTURES and tex_lower not in COLLISION_ONLY_TEXTURES:
-            continue
-
-        polygon = _make_base_polygon(planes[fi])
-        for pi, clip_plane in enumerate(planes):
-            if pi == fi:
-                continue
-            polygon = _clip_polygon_by_plane(polygon, clip_plane)
-            if not polygon:
-                break
 
-        if len(polygon) < 3:
-            continue
-
-        tris = _fan_triangulate(polygon)
-        for v0, v1, v2 in tris:
-            sv0 = _scale(v0, scale)
-            sv1 = _scale(v1, scale)
-            sv2 = _scale(v2, scale)
-            collision.append([
-                sv0[0], sv0[1], sv0[2],
-                sv1[0], sv1[1], sv1[2],
-                sv2[0], sv2[1], sv2[2],
-            ])
+def brush_to_render_and_collision(
+    brush: Brush,
+    *,
+    scale: float = 0.03,
+    texture_sizes: dict[str, tuple[int, int]] | None = None,
+) -> tuple[list[Triangle], list[list[float]]]:
+    """:func:`brush_to_triangles` and :func:`brush_to_collision_triangles` from one clipping pass."""
 
-    return collision
+    if not brush.faces:
+        return [], []
+    windings = _brush_windings(brush)
+    return _render_triangles(brush, windings, scale, texture_sizes or {}), _collision_triangles(windings, scale)
 
 
 # ---------------------------------------------------------------------------
@@ -565,51 +519,62 @@ def apply_phong_normals(
         return triangles
 
     cos_threshold = math.cos(math.radians(phong_angle))
-
-    # Build a spatial index: vertex position (rounded) -> list of
-    # (triangle index, vertex-within-triangle index, face normal).
+    # Dot products are clamped to [-1, 1]: only a threshold at -1 accepts
+    # every normal pair; any other threshold compares the same unclamped.
+    accept_all = cos_threshold <= -1.0
+
+    # Build a spatial index: vertex position (rounded) -> face normal ->
+    # list of (triangle index, vertex-within-triangle index).  Grouping by
+    # distinct normal keeps the per-bucket work at O(normals²) instead of
+    # O(vertices²): many coplanar triangles usually meet at one vertex.
     _BUCKET_EPS = 0.01
     _INV_EPS = 1.0 / _BUCKET_EPS
+    floor = math.floor
 
-    VertexInfo = tuple[int, int, tuple[float, float, float]]
-    buckets: dict[tuple[int, int, int], list[VertexInfo]] = {}
+    buckets: dict[tuple[int, int, int], dict[tuple[float, float, float], list[tuple[int, int]]]] = {}
 
     for ti, tri in enumerate(triangles):
         # Extract face normal from the first vertex (flat-shaded input).
-        fn = (tri.normals[0], tri.normals[1], tri.normals[2])
+        n = tri.normals
+        fn = (n[0], n[1], n[2])
+        p = tri.positions
         for vi in range(3):
-            px = tri.positions[vi * 3]
-            py = tri.positions[vi * 3 + 1]
-            pz = tri.positions[vi * 3 + 2]
             key = (
-                int(math.floor(px * _INV_EPS + 0.5)),
-                int(math.floor(py * _INV_EPS + 0.5)),
-                int(math.floor(pz * _INV_EPS + 0.5)),
+                floor(p[vi * 3] * _INV_EPS + 0.5),
+                floor(p[vi * 3 + 1] * _INV_EPS + 0.5),
+                floor(p[vi * 3 + 2] * _INV_EPS + 0.5),
             )
-            buckets.setdefault(key, []).append((ti, vi, fn))
-
-    # For each bucket, average normals of faces whose angle is within
-    # the threshold.
-    for entries in buckets.values():
-        if len(entries) <= 1:
-            continue
-
-        # For each vertex in this bucket, compute its smoothed normal
-        # by averaging all compatible face normals.
-        for i, (ti_a, vi_a, fn_a) in enumerate(entries):
+            groups = buckets.get(key)
+            if groups is None:
+                buckets[key] = {fn: [(ti, vi)]}
+            else:
+                refs = groups.get(fn)
+                if refs is None:
+                    groups[fn] = [(ti, vi)]
+                else:
+                    refs.append((ti, vi))
+
+    # For each bucket, every vertex gets the normalised sum of all face
+    # normals (one per coincident vertex) within the threshold of its own.
+    for groups in buckets.values():
+        if len(groups) == 1:
+            refs = next(iter(groups.values()))
+            if len(refs) <= 1:
+                continue
+        weighted = [(fn, float(len(refs))) for fn, refs in groups.items()]
+        for (ax, ay, az), refs_a in groups.items():
             nx, ny, nz = 0.0, 0.0, 0.0
-            for _j, (ti_b, vi_b, fn_b) in enumerate(entries):
-                d = _dot(fn_a, fn_b)
-                # Clamp for numerical safety.
-                d = max(-1.0, min(1.0, d))
-                if d >= cos_threshold:
-                    nx += fn_b[0]
-                    ny += fn_b[1]
-                    nz += fn_b[2]
+            for (bx, by, bz), w in weighted:
+                if accept_all or ax * bx + ay * by + az * bz >= cos_threshold:
+                    nx += bx * w
+                    ny += by * w
+                    nz += bz * w
             smooth = _normalise((nx, ny, nz))
-            triangles[ti_a].normals[vi_a * 3] = smooth[0]
-            triangles[ti_a].normals[vi_a * 3 + 1] = smooth[1]
-            triangles[ti_a].normals[vi_a * 3 + 2] = smooth[2]
+            for ti, vi in refs_a:
+                normals = triangles[ti].normals
+                normals[vi * 3] = smooth[0]
+                normals[vi * 3 + 1] = smooth[1]
+                normals[vi * 3 + 2] = smooth[2]
 
     return triangles
 
@@ -625,6 +590,8 @@ def convert_entity_brushes(
     texture_sizes: dict[str, tuple[int, int]] | None = None,
     phong: bool = False,
     phong_angle: float = 89.0,
+    brush_cache: BrushGeometryCache | None = None,
+    workers: int = 0,
 ) -> ConvertedBrushResult:
     """Convert all brushes in an entity to a :class:`ConvertedBrushResult`.
 
@@ -646,21 +613,55 @@ def convert_entity_brushes(
         Whether to apply Phong smooth normals.
     phong_angle:
         Maximum angle (degrees) for Phong smoothing.
+    brush_cache:
+        Optional per-brush cache; unchanged brushes skip clipping.  Phong
+        couples neighbouring brushes, so it always runs on the merged result.
+    workers:
+        Clip brushes on a process pool of this size (``<= 1``: in-process).
+        See :mod:`ivan.maps.brush_batch`; output is identical either way.
 
     Returns
     -------
     ConvertedBrushResult
     """
 
+    if brush_cache is not None or workers > 1:
+        # Lazy import: brush_batch builds on this module.
+        from ivan.maps.brush_batch import BrushBatchConverter
+
+        with BrushBatchConverter(
+            scale=scale,
+            texture_sizes=texture_sizes,
+            workers=workers,
+            brush_cache=brush_cache,
+        ) as converter:
+            return merge_brush_outputs(converter.convert(brushes), phong=phong, phong_angle=phong_angle)
+
     result = ConvertedBrushResult()
 
     for brush in brushes:
-        result.triangles.extend(
-            brush_to_triangles(brush, scale=scale, texture_sizes=texture_sizes),
-        )
-        result.collision_triangles.extend(
-            brush_to_collision_triangles(brush, scale=scale),
-        )
+        tris, collision = brush_to_render_and_collision(brush, scale=scale, texture_sizes=texture_sizes)
+        result.triangles.extend(tris)
+        result.collision_triangles.extend(collision)
+
+    if phong and result.triangles:
+        apply_phong_normals(result.triangles, phong_angle=phong_angle)
+
+    return result
+
+
+def merge_brush_outputs(
+    outputs: Sequence[tuple[list[Triangle], list[list[float]]]],
+    *,
+    phong: bool = False,
+    phong_angle: float = 89.0,
+) -> ConvertedBrushResult:
+    """Concatenate per-brush ``(render, collision)`` outputs of one entity, then apply optional Phong."""
+
+    result = ConvertedBrushResult()
+    for tris, collision in outputs:
+        result.triangles.extend(tris)
+        result.collision_triangles.extend(collision)
 
     if phong and result.triangles:
         apply_phong_normals(result.triangles, phong_angle=phong_angle)
@@ -7,6 +7,13 @@ import zipfile
 from dataclasses import dataclass
 from pathlib import Path
 
+from ivan.maps.geometry_blob import (
+    GEOMETRY_BLOB_FILENAME,
+    GEOMETRY_BLOB_FORMAT,
+    GeometryBlob,
+    GeometryBlobError,
+    write_geometry_blob,
+)
 from ivan.state import resolve_map_json as _resolve_map_json
 from ivan.state import state_dir
 
@@ -14,6 +21,10 @@ from ivan.state import state_dir
 PACKED_BUNDLE_EXT = ".irunmap"
 _CACHE_VERSION = 1
 
+GEOMETRY_FORMAT_BIN = "bin"
+GEOMETRY_FORMAT_JSON = "json"
+GEOMETRY_FORMATS = (GEOMETRY_FORMAT_BIN, GEOMETRY_FORMAT_JSON)
+
 
 @dataclass(frozen=True)
 class BundleHandle:
@@ -194,6 +205,68 @@ def pack_bundle_dir_to_irunmap(*, bundle_dir: Path, out_path: Path, compressleve
     tmp.replace(out_path)
 
 
+def write_bundle_map_json(
+    *,
+    bundle_dir: Path,
+    payload: dict,
+    triangles: list[dict],
+    collision_triangles: list[list[float]],
+    geometry_format: str = GEOMETRY_FORMAT_BIN,
+) -> Path:
+    """
+    Write `<bundle_dir>/map.json` plus its geometry payload.
+
+    - `bin`: triangles/collision go to a columnar `geometry.bin` sidecar referenced by
+      `payload["geometry"]`; map.json keeps only metadata.
+    - `json`: legacy format-v2 inline `triangles` / `collision_triangles` lists.
+    """
+
+    bundle_dir = Path(bundle_dir)
+    fmt = str(geometry_format or GEOMETRY_FORMAT_BIN).strip().lower()
+    if fmt not in GEOMETRY_FORMATS:
+        raise ValueError(f"geometry_format must be one of {GEOMETRY_FORMATS}: {geometry_format!r}")
+    bundle_dir.mkdir(parents=True, exist_ok=True)
+    out = dict(payload)
+    if fmt == GEOMETRY_FORMAT_BIN:
+        out["geometry"] = write_geometry_blob(
+            bundle_dir / GEOMETRY_BLOB_FILENAME,
+            triangles=triangles,
+            collision_triangles=collision_triangles,
+        )
+        out.pop("triangles", None)
+        out.pop("collision_triangles", None)
+    else:
+        out["collision_triangles"] = collision_triangles
+        out["triangles"] = triangles
+    map_json = bundle_dir / "map.json"
+    map_json.write_text(json.dumps(out, separators=(",", ":")), encoding="utf-8")
+    return map_json
+
+
+def open_bundle_geometry(*, map_json: Path, payload: dict) -> GeometryBlob | None:
+    """
+    Open the binary geometry payload referenced by a map.json, if any.
+
+    Returns None when the bundle uses inline (legacy JSON) triangles or the blob is
+    unreadable, so callers can fall back to `payload["triangles"]`.
+    """
+
+    geo = payload.get("geometry") if isinstance(payload, dict) else None
+    if not isinstance(geo, dict) or geo.get("format") != GEOMETRY_BLOB_FORMAT:
+        return None
+    rel = geo.get("path")
+    if not isinstance(rel, str) or not rel.strip():
+        return None
+    rel_p = Path(rel.strip())
+    if rel_p.is_absolute() or ".." in rel_p.parts:
+        return None
+    try:
+        return GeometryBlob(Path(map_json).parent / rel_p)
+    except GeometryBlobError as e:
+        print(f"[IVAN] Geometry blob unreadable, falling back to map.json triangles: {e}")
+        return None
+
+
 def _default_wad_search_dirs(map_file: Path) -> list[Path]:
     """Default WAD search dirs: map's parent, assets/textures/."""
     from ivan.paths import app_root as ivan_app_root
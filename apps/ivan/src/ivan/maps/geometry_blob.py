@@ -0,0 +1,286 @@
+"""Binary columnar geometry payload (``geometry.bin``) for map bundles.
+
+Format-v2 ``map.json`` stores one dict per triangle, which makes load time and
+peak memory scale with the number of boxed floats. This module stores the same
+data as contiguous little-endian arrays next to ``map.json``:
+
+    header   <8sIIII  magic, version, triangle_count, collision_count, materials_len
+    materials         utf-8 JSON list of material names (padded to 4 bytes)
+    positions         float32[triangle_count * 9]
+    normals           float32[triangle_count * 9]
+    uvs               float32[triangle_count * 6]
+    lightmap_uvs      float32[triangle_count * 6]
+    colors            float32[triangle_count * 12]
+    material_ids      uint32[triangle_count]   (index into materials)
+    lightmap_ids      int32[triangle_count]    (-1 = no lightmap)
+    collision         float32[collision_count * 9]
+
+``map.json`` references the blob via a ``geometry`` descriptor; the legacy
+``triangles`` / ``collision_triangles`` lists remain a supported fallback.
+"""
+
+from __future__ import annotations
+
+import json
+import mmap
+import struct
+import sys
+from array import array
+from collections.abc import Iterable, Iterator, Sequence
+from pathlib import Path
+
+GEOMETRY_BLOB_FILENAME = "geometry.bin"
+GEOMETRY_BLOB_FORMAT = "ivan.geometry_bin.v1"
+
+_MAGIC = b"IRUNGEO\0"
+_VERSION = 1
+_HEADER = struct.Struct("<8sIIII")
+_LITTLE_ENDIAN = sys.byteorder == "little"
+
+# (name, typecode, components per triangle) in on-disk order.
+_TRIANGLE_COLUMNS: tuple[tuple[str, str, int], ...] = (
+    ("positions", "f", 9),
+    ("normals", "f", 9),
+    ("uvs", "f", 6),
+    ("lightmap_uvs", "f", 6),
+    ("colors", "f", 12),
+    ("material_ids", "I", 1),
+    ("lightmap_ids", "i", 1),
+)
+
+_DEFAULT_COLOR = [1.0] * 12
+_ZERO_NORMALS = [0.0] * 9
+_ZERO_UVS = [0.0] * 6
+
+
+class GeometryBlobError(Exception):
+    """Raised when a geometry blob is missing, truncated, or has an unknown layout."""
+
+
+def _pad4(n: int) -> int:
+    return (4 - (int(n) % 4)) % 4
+
+
+def _float_list(raw: object, count: int, default: list[float]) -> list[float]:
+    if isinstance(raw, (list, tuple)) and len(raw) == count:
+        try:
+            return [float(x) for x in raw]
+        except (TypeError, ValueError):
+            pass
+    return default
+
+
+class TriangleRows(Sequence):
+    """Read-only sequence of 9-float triangle rows backed by a flat float buffer.
+
+    Rows are zero-copy ``memoryview`` slices, so consumers that index ``tri[0..8]``
+    (Bullet mesh building, server collision) work without materialising lists.
+    """
+
+    __slots__ = ("_flat", "_count")
+
+    def __init__(self, flat: Sequence[float], count: int) -> None:
+        self._flat = flat
+        self._count = int(count)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index):  # type: ignore[override]
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._count))]
+        i = int(index)
+        if i < 0:
+            i += self._count
+        if i < 0 or i >= self._count:
+            raise IndexError(index)
+        return self._flat[i * 9 : i * 9 + 9]
+
+
+class GeometryBlob:
+    """Mapped view of a ``geometry.bin`` payload.
+
+    Column attributes are flat typed views (``memoryview`` over an ``mmap`` on
+    little-endian hosts, byte-swapped ``array`` copies otherwise).
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self._file = None
+        self._mmap: mmap.mmap | None = None
+        try:
+            self._file = open(self.path, "rb")
+        except OSError as e:
+            raise GeometryBlobError(f"Cannot open geometry blob: {self.path}: {e}") from e
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            buf = memoryview(self._mmap)
+        except (OSError, ValueError):
+            # Zero-length files cannot be mapped; fall through to header validation.
+            buf = memoryview(self._file.read())
+        try:
+            self._parse(buf)
+        except Exception:
+            self.close()
+            raise
+
+    def _parse(self, buf: memoryview) -> None:
+        if len(buf) < _HEADER.size:
+            raise GeometryBlobError(f"Geometry blob truncated (no header): {self.path}")
+        magic, version, tri_count, coll_count, mat_len = _HEADER.unpack_from(buf, 0)
+        if magic != _MAGIC or int(version) != _VERSION:
+            raise GeometryBlobError(f"Unsupported geometry blob layout: {self.path}")
+        off = _HEADER.size
+        try:
+            names = json.loads(bytes(buf[off : off + mat_len]).decode("utf-8"))
+        except Exception as e:
+            raise GeometryBlobError(f"Geometry blob material table is corrupt: {self.path}") from e
+        if not isinstance(names, list):
+            raise GeometryBlobError(f"Geometry blob material table is corrupt: {self.path}")
+        off += int(mat_len) + _pad4(mat_len)
+
+        self.triangle_count = int(tri_count)
+        self.collision_triangle_count = int(coll_count)
+        self.materials: tuple[str, ...] = tuple(str(n) for n in names)
+
+        for name, code, comps in _TRIANGLE_COLUMNS:
+            view, off = self._column(buf, off, code, self.triangle_count * comps)
+            setattr(self, name, view)
+        self.collision, off = self._column(buf, off, "f", self.collision_triangle_count * 9)
+
+    def _column(self, buf: memoryview, off: int, code: str, count: int):
+        size = int(count) * 4
+        end = off + size
+        if end > len(buf):
+            raise GeometryBlobError(f"Geometry blob truncated: {self.path}")
+        raw = buf[off:end]
+        if _LITTLE_ENDIAN:
+            return raw.cast(code), end
+        arr = array(code)
+        arr.frombytes(raw)
+        arr.byteswap()
+        return arr, end
+
+    def close(self) -> None:
+        """Release the mapping. Column views must not be used afterwards."""
+        for name, _code, _comps in _TRIANGLE_COLUMNS:
+            view = self.__dict__.pop(name, None)
+            if isinstance(view, memoryview):
+                view.release()
+        coll = self.__dict__.pop("collision", None)
+        if isinstance(coll, memoryview):
+            coll.release()
+        if self._mmap is not None:
+            try:
+                self._mmap.close()
+            except BufferError:
+                # Outstanding row views still reference the map; let GC reclaim it.
+                pass
+            self._mmap = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def render_rows(self) -> TriangleRows:
+        """Render triangle positions as 9-float rows."""
+        return TriangleRows(self.positions, self.triangle_count)
+
+    def collision_rows(self) -> TriangleRows:
+        """Collision rows; falls back to render positions when no explicit collision set exists."""
+        if self.collision_triangle_count > 0:
+            return TriangleRows(self.collision, self.collision_triangle_count)
+        return self.render_rows()
+
+    def material_name(self, tri_index: int) -> str:
+        return self.materials[int(self.material_ids[int(tri_index)])]
+
+    def lightmap_id(self, tri_index: int) -> int | None:
+        lmi = int(self.lightmap_ids[int(tri_index)])
+        return lmi if lmi >= 0 else None
+
+    def iter_triangle_dicts(self) -> Iterator[dict]:
+        """Yield legacy format-v2 triangle dicts (compatibility path for per-triangle consumers)."""
+        pos = self.positions
+        nrm = self.normals
+        uv = self.uvs
+        lm = self.lightmap_uvs
+        col = self.colors
+        for i in range(self.triangle_count):
+            yield {
+                "m": self.material_name(i),
+                "lmi": self.lightmap_id(i),
+                "p": pos[i * 9 : i * 9 + 9].tolist(),
+                "n": nrm[i * 9 : i * 9 + 9].tolist(),
+                "uv": uv[i * 6 : i * 6 + 6].tolist(),
+                "lm": lm[i * 6 : i * 6 + 6].tolist(),
+                "c": col[i * 12 : i * 12 + 12].tolist(),
+            }
+
+
+def write_geometry_blob(
+    path: Path,
+    *,
+    triangles: Iterable[dict],
+    collision_triangles: Iterable[Sequence[float]] | None = None,
+) -> dict:
+    """Write format-v2 triangle dicts (+ optional collision rows) as a geometry blob.
+
+    Triangles without a valid 9-float ``p`` are dropped. Missing normals/UVs default to
+    zero and missing colours to opaque white. Returns the ``geometry`` descriptor to embed
+    in ``map.json`` (``path`` is relative to the bundle root when written next to it).
+    """
+
+    columns: dict[str, array] = {name: array(code) for name, code, _comps in _TRIANGLE_COLUMNS}
+    material_index: dict[str, int] = {}
+    for t in triangles:
+        if not isinstance(t, dict):
+            continue
+        p = _float_list(t.get("p"), 9, [])
+        if not p:
+            continue
+        m = t.get("m")
+        mat = m if isinstance(m, str) else ""
+        mid = material_index.setdefault(mat, len(material_index))
+        lmi = t.get("lmi")
+        columns["positions"].extend(p)
+        columns["normals"].extend(_float_list(t.get("n"), 9, _ZERO_NORMALS))
+        columns["uvs"].extend(_float_list(t.get("uv"), 6, _ZERO_UVS))
+        columns["lightmap_uvs"].extend(_float_list(t.get("lm"), 6, _ZERO_UVS))
+        columns["colors"].extend(_float_list(t.get("c"), 12, _DEFAULT_COLOR))
+        columns["material_ids"].append(int(mid))
+        columns["lightmap_ids"].append(int(lmi) if isinstance(lmi, int) and lmi >= 0 else -1)
+
+    coll = array("f")
+    for row in collision_triangles or ():
+        vals = _float_list(row, 9, [])
+        if vals:
+            coll.extend(vals)
+
+    tri_count = len(columns["material_ids"])
+    coll_count = len(coll) // 9
+    names = json.dumps(list(material_index.keys()), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(_HEADER.pack(_MAGIC, _VERSION, tri_count, coll_count, len(names)))
+        f.write(names)
+        f.write(b"\0" * _pad4(len(names)))
+        for name, _code, _comps in _TRIANGLE_COLUMNS:
+            col = columns[name]
+            if not _LITTLE_ENDIAN:
+                col.byteswap()
+            col.tofile(f)
+        if not _LITTLE_ENDIAN:
+            coll.byteswap()
+        coll.tofile(f)
+    tmp.replace(path)
+
+    return {
+        "format": GEOMETRY_BLOB_FORMAT,
+        "path": path.name,
+        "triangle_count": int(tri_count),
+        "collision_triangle_count": int(coll_count),
+        "materials_total": int(len(material_index)),
+    }
@@ -0,0 +1,218 @@
+"""Lightmap atlas packing for importer bundles.
+
+Importers used to write one PNG per face and light style slot, which turns into thousands of
+tiny textures and draw calls at runtime. `LightmapAtlas` packs per-face RGBA lightmaps into a
+few large pages instead. Every face keeps the same rectangle on all four style-slot layers of
+its page, so a single lightmap UV set addresses all slots.
+
+Face-local lightmap UVs follow the Panda convention used by the per-face PNGs (u grows with the
+image column, v = 1 at the top image row); `remap_uv` converts them to page coordinates.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+
+LIGHTMAP_ATLAS_FORMAT = "ivan.lightmap_atlas.v1"
+DEFAULT_ATLAS_PAGE_SIZE = 1024
+DEFAULT_ATLAS_PADDING = 1
+LIGHTMAP_SLOTS = 4
+
+
+@dataclass(frozen=True)
+class AtlasRect:
+    """Placement of one face lightmap (content rect, padding excluded)."""
+
+    page: int
+    x: int
+    y: int
+    w: int
+    h: int
+
+
+def _next_pow2(n: int) -> int:
+    n = max(1, int(n))
+    return 1 << (n - 1).bit_length()
+
+
+class LightmapAtlas:
+    """
+    Shelf-packs face lightmaps into power-of-two pages, one RGBA layer per style slot.
+
+    Usage: `add_face` for every face, `pack()`, then `remap_uv` / `write_pages`. Packing is
+    deterministic (sorted by height, width, then face key) so re-imports produce stable bundles.
+    """
+
+    def __init__(self, *, page_size: int = DEFAULT_ATLAS_PAGE_SIZE, padding: int = DEFAULT_ATLAS_PADDING) -> None:
+        self.page_size = _next_pow2(max(16, int(page_size)))
+        self.padding = max(0, int(padding))
+        self._faces: dict[int, tuple[int, int, list[bytes | None]]] = {}
+        self._rects: dict[int, AtlasRect] = {}
+        self._pages: list[tuple[int, int]] = []
+
+    def add_face(self, key: int, *, width: int, height: int, slots: list[bytes | None]) -> None:
+        """Register RGBA8 slot images (row 0 = top) for a face; missing slots stay black."""
+        w = int(width)
+        h = int(height)
+        if w <= 0 or h <= 0:
+            return
+        need = w * h * 4
+        layers: list[bytes | None] = [None] * LIGHTMAP_SLOTS
+        for i, raw in enumerate(list(slots)[:LIGHTMAP_SLOTS]):
+            if isinstance(raw, (bytes, bytearray)) and len(raw) == need:
+                layers[i] = bytes(raw)
+        if not any(layer is not None for layer in layers):
+            return
+        self._faces[int(key)] = (w, h, layers)
+        self._rects = {}
+        self._pages = []
+
+    def __len__(self) -> int:
+        return len(self._faces)
+
+    @property
+    def pages(self) -> list[tuple[int, int]]:
+        return list(self._pages)
+
+    def pack(self) -> None:
+        pad = self.padding
+        order = sorted(self._faces.items(), key=lambda it: (-it[1][1], -it[1][0], it[0]))
+        rects: dict[int, AtlasRect] = {}
+        pages: list[list[int]] = []  # [width, used_height]
+        # Shelf state for the current page.
+        cur = -1
+        shelf_x = shelf_y = shelf_h = 0
+        for key, (w, h, _layers) in order:
+            pw = w + 2 * pad
+            ph = h + 2 * pad
+            if pw > self.page_size or ph > self.page_size:
+                # Oversized lightmaps get a dedicated page sized to fit.
+                pages.append([_next_pow2(pw), ph])
+                rects[key] = AtlasRect(page=len(pages) - 1, x=pad, y=pad, w=w, h=h)
+                cur = -1
+                continue
+            if cur < 0 or shelf_x + pw > self.page_size:
+                if cur >= 0 and shelf_y + shelf_h + ph <= self.page_size:
+                    shelf_y += shelf_h
+                else:
+                    pages.append([self.page_size, 0])
+                    cur = len(pages) - 1
+                    shelf_y = 0
+                shelf_x = 0
+                shelf_h = 0
+            rects[key] = AtlasRect(page=cur, x=shelf_x + pad, y=shelf_y + pad, w=w, h=h)
+            shelf_x += pw
+            shelf_h = max(shelf_h, ph)
+            pages[cur][1] = max(pages[cur][1], shelf_y + shelf_h)
+        self._rects = rects
+        self._pages = [(int(pw), _next_pow2(ph)) for pw, ph in pages]
+
+    def rect(self, key: int) -> AtlasRect | None:
+        return self._rects.get(int(key))
+
+    def face_slots(self, key: int) -> list[bool]:
+        ent = self._faces.get(int(key))
+        if ent is None:
+            return [False] * LIGHTMAP_SLOTS
+        return [layer is not None for layer in ent[2]]
+
+    def remap_uv(self, key: int, u: float, v: float) -> tuple[float, float]:
+        """Map a face-local lightmap UV to atlas page coordinates."""
+        r = self._rects.get(int(key))
+        if r is None:
+            return float(u), float(v)
+        pw, ph = self._pages[r.page]
+        uu = (float(r.x) + float(u) * float(r.w)) / float(pw)
+        vv = 1.0 - (float(r.y) + (1.0 - float(v)) * float(r.h)) / float(ph)
+        return uu, vv
+
+    def remap_uvs(self, key: int, lm: list[float]) -> list[float]:
+        out: list[float] = []
+        for i in range(0, len(lm) - 1, 2):
+            out.extend(self.remap_uv(key, lm[i], lm[i + 1]))
+        return out
+
+    def page_layers(self) -> list[list[bytearray | None]]:
+        """Compose RGBA8 page layers (row 0 = top); slots no face on the page uses are None."""
+        pad = self.padding
+        layers: list[list[bytearray | None]] = [[None] * LIGHTMAP_SLOTS for _ in self._pages]
+        for key, (w, h, face_layers) in self._faces.items():
+            r = self._rects.get(key)
+            if r is None:
+                continue
+            pw, ph = self._pages[r.page]
+            stride = pw * 4
+            for slot, raw in enumerate(face_layers):
+                if raw is None:
+                    continue
+                buf = layers[r.page][slot]
+                if buf is None:
+                    buf = bytearray(stride * ph)
+                    layers[r.page][slot] = buf
+                # Replicate edge texels into the padding so bilinear filtering never pulls in neighbours.
+                rows: list[bytes] = []
+                for y in range(h):
+                    row = raw[y * w * 4 : (y + 1) * w * 4]
+                    rows.append(row[:4] * pad + row + row[-4:] * pad)
+                rows = [rows[0]] * pad + rows + [rows[-1]] * pad
+                x0 = (r.x - pad) * 4
+                y0 = r.y - pad
+                for i, row in enumerate(rows):
+                    off = (y0 + i) * stride + x0
+                    buf[off : off + len(row)] = row
+        return layers
+
+    def write_pages(
+        self,
+        out_dir: Path,
+        *,
+        save_rgba: Callable[[Path, int, int, bytes], None],
+        rel_root: str = "lightmaps",
+        stem: str = "atlas",
+    ) -> list[dict]:
+        """
+        Write page layers via `save_rgba(path, width, height, rgba)` and return page descriptors
+        (`{"w", "h", "paths"}` with bundle-relative paths, None for unused slots).
+        """
+        out_dir = Path(out_dir)
+        out_dir.mkdir(parents=True, exist_ok=True)
+        pages: list[dict] = []
+        for page_idx, layers in enumerate(self.page_layers()):
+            pw, ph = self._pages[page_idx]
+            paths: list[str | None] = [None] * LIGHTMAP_SLOTS
+            for slot, buf in enumerate(layers):
+                if buf is None:
+                    continue
+                dst = out_dir / f"{stem}{page_idx}_lm{slot}.png"
+                save_rgba(dst, pw, ph, bytes(buf))
+                paths[slot] = f"{rel_root}/{dst.name}" if rel_root else dst.name
+            pages.append({"w": int(pw), "h": int(ph), "paths": paths})
+        return pages
+
+    def face_entry(self, key: int, *, pages: list[dict], styles: list[int | None]) -> dict | None:
+        """Bundle `lightmaps.faces` entry pointing at the face's atlas page layers."""
+        r = self._rects.get(int(key))
+        if r is None or r.page >= len(pages):
+            return None
+        page_paths = pages[r.page].get("paths") or [None] * LIGHTMAP_SLOTS
+        has = self.face_slots(key)
+        paths = [page_paths[i] if has[i] else None for i in range(LIGHTMAP_SLOTS)]
+        if not any(p is not None for p in paths):
+            return None
+        return {
+            "styles": [styles[i] if has[i] else None for i in range(LIGHTMAP_SLOTS)],
+            "paths": paths,
+            "w": int(r.w),
+            "h": int(r.h),
+            "page": int(r.page),
+            "rect": [int(r.x), int(r.y), int(r.w), int(r.h)],
+        }
+
+    def descriptor(self, *, pages: list[dict]) -> dict:
+        return {
+            "format": LIGHTMAP_ATLAS_FORMAT,
+            "padding": int(self.padding),
+            "pages": list(pages),
+        }
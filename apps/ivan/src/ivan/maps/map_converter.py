@@ -26,13 +26,15 @@ from typing import Any
 
 from PIL import Image
 
+from ivan.maps.brush_batch import BrushBatchConverter, resolve_map_workers
+from ivan.maps.brush_cache import BrushGeometryCache, open_brush_cache
 from ivan.maps.brush_geometry import (
     SKIP_RENDER_TEXTURES,
     ConvertedBrushResult,
     Triangle,
-    convert_entity_brushes,
+    merge_brush_outputs,
 )
-from ivan.maps.map_parser import MapEntity, parse_map
+from ivan.maps.map_parser import MapEntity, parse_map_file
 from ivan.maps.material_defs import MaterialDef, MaterialResolver
 from ivan.paths import app_root as ivan_app_root
 
@@ -261,9 +263,14 @@ def _extract_wad_textures(
     wad_paths: list[Path],
     *,
     cache_dir: Path,
+    workers: int = 0,
 ) -> tuple[dict[str, Path], dict[str, tuple[int, int]], str]:
     """Extract all textures from a list of WAD files.
 
+    Textures are decoded in order (first WAD wins; a later WAD's copy is used
+    only if the earlier PNG fails to save).  PNG encoding runs on *workers*
+    processes when there are enough textures (``<= 1``: in-process).
+
     Returns
     -------
     materials : dict[str, Path]
@@ -289,6 +296,9 @@ def _extract_wad_textures(
     # Cache miss or invalidated signature: remove stale PNGs/manifest before rebuild.
     _clear_texture_cache_dir(cache_dir)
     goldsrc_wad = _import_goldsrc_wad()
+    queued: set[str] = set()
+    pending: list[tuple[str, Path, Any, Path]] = []
+    later: dict[str, list[tuple[Path, Any]]] = {}
 
     for wad_path in wad_paths:
         logger.info("Loading WAD: %s", wad_path)
@@ -305,22 +315,33 @@ def _extract_wad_textures(
             key = tex.name.lower()
 
             # Skip if we already have this texture from a previous WAD
-            # (first WAD wins, matching GoldSrc engine behaviour).
-            if key in materials:
+            # (first WAD wins, matching GoldSrc engine behaviour), but keep
+            # the copy in case the earlier one fails to save.
+            if key in queued:
+                later.setdefault(key, []).append((wad_path, tex))
                 continue
 
-            texture_sizes[key] = (tex.width, tex.height)
+            queued.add(key)
+            pending.append((key, wad_path, tex, cache_dir / f"{key}.png"))
 
-            out_path = cache_dir / f"{key}.png"
-            try:
-                img = Image.frombytes("RGBA", (tex.width, tex.height), tex.rgba)
-                img.save(out_path)
+    while pending:
+        errors = goldsrc_wad.save_textures_png([(tex, out) for _k, _w, tex, out in pending], workers=workers)
+        retry: list[tuple[str, Path, Any, Path]] = []
+        for (key, wad_path, tex, out_path), err in zip(pending, errors):
+            if err is None:
                 materials[key] = out_path
-            except Exception as exc:
-                logger.warning(
-                    "Failed to save texture %s from %s: %s",
-                    tex.name, wad_path.name, exc,
-                )
+                texture_sizes[key] = (tex.width, tex.height)
+                continue
+            logger.warning(
+                "Failed to save texture %s from %s: %s",
+                tex.name, wad_path.name, err,
+            )
+            if later.get(key):
+                next_wad, next_tex = later[key].pop(0)
+                retry.append((key, next_wad, next_tex, out_path))
+            else:
+                texture_sizes[key] = (tex.width, tex.height)
+        pending = retry
 
     # ── Fallback: recover sizes from cached PNGs ──────────────────────
     # If WAD loading failed or was incomplete, we may still have PNGs in
@@ -644,6 +665,8 @@ def convert_map_file(
     wad_search_dirs: list[Path] | None = None,
     materials_dirs: list[Path] | None = None,
     texture_cache_dir: Path | None = None,
+    brush_cache: bool = True,
+    workers: int | None = None,
 ) -> MapConvertResult:
     """Convert a ``.map`` file to the internal IVAN format.
 
@@ -660,9 +683,18 @@ def convert_map_file(
     texture_cache_dir:
         Directory to write extracted WAD textures as PNGs.
         Uses a temporary directory when *None*.
+    brush_cache:
+        Reuse clipped brush geometry from the per-brush cache stored in
+        *texture_cache_dir* (see :mod:`ivan.maps.brush_cache`).  Ignored
+        without a persistent *texture_cache_dir*.
+    workers:
+        Process-pool size for brush clipping and WAD texture PNG encoding
+        (``<= 1``: in-process).  *None* reads ``IRUN_IVAN_MAP_WORKERS``
+        (default serial).  Output is identical for every worker count.
     """
 
     perf_stages_ms: dict[str, float] = {}
+    map_workers = resolve_map_workers(workers)
     perf_total_t0 = time.perf_counter()
 
     def _mark_stage(stage: str, t0: float) -> None:
@@ -676,8 +708,8 @@ def convert_map_file(
     # ── 1. Read and parse ──────────────────────────────────────────────
     logger.info("Parsing map: %s", map_path)
     t0 = time.perf_counter()
-    map_text = map_path.read_text(encoding="utf-8", errors="replace")
-    entities = parse_map(map_text)
+    # Streamed: the file text is never held in memory as a whole.
+    entities = parse_map_file(map_path)
     _mark_stage("read_parse_map", t0)
 
     if not entities:
@@ -741,6 +773,7 @@ def convert_map_file(
         tex_materials, texture_sizes, texture_cache_status = _extract_wad_textures(
             wad_files,
             cache_dir=cache_dir,
+            workers=map_workers,
         )
         logger.info(
             "Extracted %d textures (%d with size info)",
@@ -805,73 +838,89 @@ def convert_map_file(
     all_collision: list[list[float]] = []
 
     t0 = time.perf_counter()
-    if worldspawn.brushes:
-        ws_result: ConvertedBrushResult = convert_entity_brushes(
-            worldspawn.brushes,
-            scale=scale,
-            texture_sizes=texture_sizes,
-            phong=ws_phong,
-            phong_angle=ws_phong_angle,
-        )
-        for tri in ws_result.triangles:
-            all_tri_dicts.append(_triangle_to_dict(tri))
-        all_collision.extend(ws_result.collision_triangles)
-        logger.info(
-            "Worldspawn: %d render tris, %d collision tris",
-            len(ws_result.triangles),
-            len(ws_result.collision_triangles),
-        )
-    _mark_stage("convert_worldspawn_brushes", t0)
+    geo_cache: BrushGeometryCache | None = None
+    if brush_cache and texture_cache_dir is not None:
+        geo_cache = open_brush_cache(cache_dir)
+        geo_cache.begin_run()
+    _mark_stage("open_brush_cache", t0)
+    converter = BrushBatchConverter(
+        scale=scale,
+        texture_sizes=texture_sizes,
+        workers=map_workers,
+        brush_cache=geo_cache,
+    )
+    try:
+        t0 = time.perf_counter()
+        if worldspawn.brushes:
+            ws_result: ConvertedBrushResult = merge_brush_outputs(
+                converter.convert(worldspawn.brushes),
+                phong=ws_phong,
+                phong_angle=ws_phong_angle,
+            )
+            for tri in ws_result.triangles:
+                all_tri_dicts.append(_triangle_to_dict(tri))
+            all_collision.extend(ws_result.collision_triangles)
+            logger.info(
+                "Worldspawn: %d render tris, %d collision tris",
+                len(ws_result.triangles),
+                len(ws_result.collision_triangles),
+            )
+        _mark_stage("convert_worldspawn_brushes", t0)
 
-    # ── 7. Process brush entities ──────────────────────────────────────
-    t0 = time.perf_counter()
-    for ent in entities:
-        classname = ent.properties.get("classname", "").lower()
+        # ── 7. Process brush entities ──────────────────────────────────
+        t0 = time.perf_counter()
+        for ent in entities:
+            classname = ent.properties.get("classname", "").lower()
 
-        # worldspawn already handled above.
-        if classname == "worldspawn":
-            continue
+            # worldspawn already handled above.
+            if classname == "worldspawn":
+                continue
 
-        # Point entities (no brushes) are processed separately (spawn, etc.).
-        if not ent.brushes:
-            continue
+            # Point entities (no brushes) are processed separately (spawn, etc.).
+            if not ent.brushes:
+                continue
 
-        category = _entity_category(classname)
+            category = _entity_category(classname)
 
-        if category == "skip":
-            logger.debug("Skipping trigger entity: %s", classname)
-            continue
+            if category == "skip":
+                logger.debug("Skipping trigger entity: %s", classname)
+                continue
 
-        # Per-entity phong settings.
-        ent_phong = ent.properties.get("_phong", "0").strip() == "1"
-        try:
-            ent_phong_angle = float(ent.properties.get("_phong_angle", "89"))
-        except ValueError:
-            ent_phong_angle = 89.0
-
-        result: ConvertedBrushResult = convert_entity_brushes(
-            ent.brushes,
-            scale=scale,
-            texture_sizes=texture_sizes,
-            phong=ent_phong,
-            phong_angle=ent_phong_angle,
-        )
+            # Per-entity phong settings.
+            ent_phong = ent.properties.get("_phong", "0").strip() == "1"
+            try:
+                ent_phong_angle = float(ent.properties.get("_phong_angle", "89"))
+            except ValueError:
+                ent_phong_angle = 89.0
 
-        for tri in result.triangles:
-            all_tri_dicts.append(_triangle_to_dict(tri))
+            result: ConvertedBrushResult = merge_brush_outputs(
+                converter.convert(ent.brushes),
+                phong=ent_phong,
+                phong_angle=ent_phong_angle,
+            )
 
-        if category == "render_collide":
-            all_collision.extend(result.collision_triangles)
+            for tri in result.triangles:
+                all_tri_dicts.append(_triangle_to_dict(tri))
 
-        logger.debug(
-            "Entity %s (%s): %d render, %d collision",
-            classname,
-            category,
-            len(result.triangles),
-            len(result.collision_triangles) if category == "render_collide" else 0,
-        )
+            if category == "render_collide":
+                all_collision.extend(result.collision_triangles)
+
+            logger.debug(
+                "Entity %s (%s): %d render, %d collision",
+                classname,
+                category,
+                len(result.triangles),
+                len(result.collision_triangles) if category == "render_collide" else 0,
+            )
+    finally:
+        converter.close()
     _mark_stage("convert_entity_brushes", t0)
 
+    t0 = time.perf_counter()
+    if geo_cache is not None:
+        geo_cache.save()
+    _mark_stage("save_brush_cache", t0)
+
     # ── 8. Find spawn point ────────────────────────────────────────────
     t0 = time.perf_counter()
     spawn_pos, spawn_yaw = _find_spawn(entities, scale=scale)
@@ -1088,6 +1137,10 @@ def convert_map_file(
         "textures_with_albedo": int(len(tex_materials)),
         "textures_with_size": int(len(texture_sizes)),
         "texture_cache_hit": int(1 if texture_cache_status == "hit" else 0),
+        "brush_cache_hits": int(geo_cache.hits if geo_cache is not None else 0),
+        "brush_cache_misses": int(geo_cache.misses if geo_cache is not None else 0),
+        "brush_workers": int(converter.workers),
+        "brushes_converted_parallel": int(converter.parallel_brushes),
         "unique_textures_referenced": int(len(all_tex_names)),
         "render_triangles": int(len(all_tri_dicts)),
         "collision_triangles": int(len(all_collision)),
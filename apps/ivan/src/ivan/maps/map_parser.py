@@ -12,21 +12,24 @@ References
 
 Usage::
 
-    from ivan.maps.map_parser import parse_map, MapEntity
+    from ivan.maps.map_parser import iter_map_file, MapEntity
 
-    with open("mymap.map", encoding="utf-8", errors="replace") as fh:
-        entities = parse_map(fh.read())
-
-    for ent in entities:
+    for ent in iter_map_file("mymap.map"):
         print(ent.properties.get("classname", "<no classname>"))
         print(f"  {len(ent.brushes)} brush(es)")
+
+:func:`iter_map_file` reads the file in chunks and yields each entity as
+soon as its closing brace is parsed, so neither the full text nor a line list
+is held in memory.  :func:`parse_map` parses text already in memory; both
+produce identical entities.
 """
 
 from __future__ import annotations
 
 import re
 from dataclasses import dataclass, field
-from typing import Iterator
+from pathlib import Path
+from typing import Iterable, Iterator, Sequence, TextIO
 
 
 # ---------------------------------------------------------------------------
@@ -115,14 +118,20 @@ _STD_FACE_RE = re.compile(
     rf"\s+{_FLOAT}\s+{_FLOAT}\s+{_FLOAT}\s+{_FLOAT}\s+{_FLOAT}"
 )
 
+# Single face scanner: Valve 220 first (most common with TrenchBroom), then
+# Standard.  Alternation tries the branches in order, exactly like matching
+# the two patterns one after the other.  Valve groups are 1-21, Standard
+# groups 22-36.
+_FACE_RE = re.compile(f"(?:{_VALVE_FACE_RE.pattern})|(?:{_STD_FACE_RE.pattern})")
+_VALVE_GROUPS = 21
+
 
-def _parse_valve_face(m: re.Match[str]) -> BrushFace:
-    """Build a :class:`BrushFace` from a Valve 220 regex match."""
+def _parse_valve_face(g: Sequence[str]) -> BrushFace:
+    """Build a :class:`BrushFace` from the 21 Valve 220 match groups."""
 
-    g = [m.group(i) for i in range(1, 22)]
-    f = [float(v) for v in g[:9]]  # plane points
+    f = list(map(float, g[:9]))  # plane points
     texture = g[9]
-    uv = [float(v) for v in g[10:]]
+    uv = list(map(float, g[10:]))
 
     return BrushFace(
         plane_points=(
@@ -141,8 +150,8 @@ def _parse_valve_face(m: re.Match[str]) -> BrushFace:
     )
 
 
-def _parse_standard_face(m: re.Match[str]) -> BrushFace:
-    """Build a :class:`BrushFace` from a Standard-format regex match.
+def _parse_standard_face(g: Sequence[str]) -> BrushFace:
+    """Build a :class:`BrushFace` from the 15 Standard-format match groups.
 
     The Standard format does not carry explicit UV axes; we synthesise
     trivial axes from the face normal so that downstream code can still
@@ -150,7 +159,6 @@ def _parse_standard_face(m: re.Match[str]) -> BrushFace:
     but this keeps the pipeline running).
     """
 
-    g = [m.group(i) for i in range(1, 15)]
     f = [float(v) for v in g[:9]]
     texture = g[9]
     rest = [float(v) for v in g[10:]]
@@ -222,10 +230,10 @@ _KV_RE = re.compile(r'"([^"]*?)"\s+"([^"]*?)"')
 # Line iteration helpers
 # ---------------------------------------------------------------------------
 
-def _strip_comments(text: str) -> Iterator[str]:
-    """Yield non-empty, non-comment lines from *text*."""
+def _strip_comments(lines: Iterable[str]) -> Iterator[str]:
+    """Yield non-empty, non-comment lines from *lines* (already split)."""
 
-    for raw_line in text.splitlines():
+    for raw_line in lines:
         line = raw_line.strip()
         if not line or line.startswith("//"):
             continue
@@ -240,107 +248,124 @@ def _strip_comments(text: str) -> Iterator[str]:
             yield line
 
 
+# Every character ``str.splitlines`` breaks on.
+_LINE_BREAKS = "\n\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029"
+_READ_CHUNK = 1 << 20
+
+
+def _read_lines(fh: TextIO) -> Iterator[str]:
+    """Yield the lines ``fh.read().splitlines()`` would, reading in chunks."""
+
+    carry = ""
+    while True:
+        chunk = fh.read(_READ_CHUNK)
+        if not chunk:
+            break
+        text = carry + chunk
+        lines = text.splitlines()
+        # A chunk usually ends mid-line: keep the tail for the next read.
+        carry = lines.pop() if lines and text[-1] not in _LINE_BREAKS else ""
+        yield from lines
+    if carry:
+        yield carry
+
+
 # ---------------------------------------------------------------------------
 # Public parser
 # ---------------------------------------------------------------------------
 
-def parse_map(text: str) -> list[MapEntity]:
-    """Parse a Valve 220 / Standard ``.map`` file and return entities.
+def iter_map_entities(lines: Iterable[str]) -> Iterator[MapEntity]:
+    """Parse ``.map`` lines incrementally, yielding each entity once closed.
 
     Parameters
     ----------
-    text:
-        The full text content of the ``.map`` file.
-
-    Returns
-    -------
-    list[MapEntity]
-        A flat list of parsed entities, each with its properties and brushes.
-        The first entity is typically ``worldspawn``.
+    lines:
+        Lines of a Valve 220 / Standard ``.map`` file without line
+        terminators (e.g. ``text.splitlines()``).  Consumed lazily.
+
+    Yields
+    ------
+    MapEntity
+        Entities in file order.  An entity left open at the end of input is
+        still yielded (with any unterminated brush), matching
+        :func:`parse_map`.
     """
 
-    entities: list[MapEntity] = []
-    lines = list(_strip_comments(text))
-    pos = 0
-    total = len(lines)
-
-    while pos < total:
-        line = lines[pos]
-
-        if line == "{":
-            entity, pos = _parse_entity(lines, pos + 1)
-            entities.append(entity)
-        else:
-            # Skip unexpected tokens outside entity blocks.
-            pos += 1
-
-    return entities
+    ent: MapEntity | None = None
+    brush: Brush | None = None
+    face_match = _FACE_RE.match
+    kv_match = _KV_RE.match
+
+    for line in _strip_comments(lines):
+        if brush is not None:
+            if line == "}":
+                ent.brushes.append(brush)  # type: ignore[union-attr]
+                brush = None
+            elif line[0] == "(":
+                m = face_match(line)
+                if m:
+                    g = m.groups()
+                    if g[_VALVE_GROUPS - 1] is not None:
+                        brush.faces.append(_parse_valve_face(g[:_VALVE_GROUPS]))
+                    else:
+                        brush.faces.append(_parse_standard_face(g[_VALVE_GROUPS:]))
+            # Unrecognised face line – skip gracefully.
+        elif ent is not None:
+            if line == "}":
+                yield ent
+                ent = None
+            elif line == "{":
+                # Start of a brush definition.
+                brush = Brush()
+            elif line[0] == '"':
+                kv = kv_match(line)
+                if kv:
+                    ent.properties[kv.group(1)] = kv.group(2)
+            # Unknown line inside entity – skip.
+        elif line == "{":
+            ent = MapEntity()
+        # Skip unexpected tokens outside entity blocks.
+
+    if ent is not None:
+        if brush is not None:
+            ent.brushes.append(brush)
+        yield ent
 
 
-def _parse_entity(lines: list[str], pos: int) -> tuple[MapEntity, int]:
-    """Parse a single entity block (already past the opening ``{``).
+def iter_map_file(
+    path: str | Path,
+    *,
+    encoding: str = "utf-8",
+    errors: str = "replace",
+) -> Iterator[MapEntity]:
+    """Stream entities from a ``.map`` file, reading it in chunks.
 
-    Returns the entity and the index of the line *after* the closing ``}``.
+    The file stays open until the iterator is exhausted or closed.
     """
 
-    ent = MapEntity()
-    total = len(lines)
-
-    while pos < total:
-        line = lines[pos]
+    with open(path, encoding=encoding, errors=errors) as fh:
+        yield from iter_map_entities(_read_lines(fh))
 
-        if line == "}":
-            return ent, pos + 1
 
-        if line == "{":
-            # Start of a brush definition.
-            brush, pos = _parse_brush(lines, pos + 1)
-            ent.brushes.append(brush)
-            continue
-
-        # Try key-value pair.
-        kv = _KV_RE.match(line)
-        if kv:
-            ent.properties[kv.group(1)] = kv.group(2)
-            pos += 1
-            continue
+def parse_map_file(path: str | Path, *, encoding: str = "utf-8", errors: str = "replace") -> list[MapEntity]:
+    """Parse a ``.map`` file into a list of entities (see :func:`iter_map_file`)."""
 
-        # Unknown line inside entity – skip.
-        pos += 1
+    return list(iter_map_file(path, encoding=encoding, errors=errors))
 
-    return ent, pos
 
+def parse_map(text: str) -> list[MapEntity]:
+    """Parse a Valve 220 / Standard ``.map`` file and return entities.
 
-def _parse_brush(lines: list[str], pos: int) -> tuple[Brush, int]:
-    """Parse a single brush block (already past the opening ``{``).
+    Parameters
+    ----------
+    text:
+        The full text content of the ``.map`` file.
 
-    Returns the brush and the index of the line *after* the closing ``}``.
+    Returns
+    -------
+    list[MapEntity]
+        A flat list of parsed entities, each with its properties and brushes.
+        The first entity is typically ``worldspawn``.
     """
 
-    brush = Brush()
-    total = len(lines)
-
-    while pos < total:
-        line = lines[pos]
-
-        if line == "}":
-            return brush, pos + 1
-
-        # Try Valve 220 format first (most common with TrenchBroom).
-        m = _VALVE_FACE_RE.match(line)
-        if m:
-            brush.faces.append(_parse_valve_face(m))
-            pos += 1
-            continue
-
-        # Fall back to Standard format.
-        m = _STD_FACE_RE.match(line)
-        if m:
-            brush.faces.append(_parse_standard_face(m))
-            pos += 1
-            continue
-
-        # Unrecognised face line – skip gracefully.
-        pos += 1
-
-    return brush, pos
+    return list(iter_map_entities(text.splitlines()))
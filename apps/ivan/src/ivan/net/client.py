@@ -1,10 +1,27 @@
 from __future__ import annotations
 
 import json
+import select
 import socket
+from collections import deque
 from dataclasses import dataclass
 
-from ivan.net.protocol import PROTOCOL_VERSION, encode_json
+from ivan.net.protocol import (
+    INPUT_REDUNDANCY,
+    PROTOCOL_VERSION,
+    PROTOCOL_VERSION_JSON,
+    InputCommand,
+    PlayerSnapshotRecord,
+    decode_json_line,
+    decode_snapshot_packet_v3,
+    encode_input_packet_v3,
+    encode_json,
+    is_binary_snapshot,
+    player_record_to_row,
+)
+
+# Decoded v3 snapshots kept as delta baselines; matches the server-side history depth.
+_SNAPSHOT_BASELINE_HISTORY = 32
 
 
 @dataclass(frozen=True)
@@ -34,25 +51,33 @@ class MultiplayerClient:
         self.server_tuning: dict[str, float | bool] | None = None
         self.server_games_version: int = 0
         self.server_games: dict | None = None
+        self.server_game_state: dict | None = None
+        self.protocol_version: int = PROTOCOL_VERSION_JSON
 
         self._tcp = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         self._tcp.settimeout(5.0)
         self._tcp.connect((self.host, self.tcp_port))
         self._tcp.sendall(encode_json({"t": "hello", "v": PROTOCOL_VERSION, "name": self.name}))
-        line = b""
-        while not line.endswith(b"\n"):
+        buf = b""
+        while b"\n" not in buf:
             chunk = self._tcp.recv(4096)
             if not chunk:
                 raise RuntimeError("Server closed during handshake")
-            line += chunk
-            if len(line) > 1_000_000:
+            buf += chunk
+            if len(buf) > 1_000_000:
                 raise RuntimeError("Handshake payload too large")
+        line, self._tcp_buf = buf.split(b"\n", 1)
         obj = json.loads(line.decode("utf-8", errors="ignore").strip())
         if not isinstance(obj, dict) or obj.get("t") != "welcome":
             raise RuntimeError("Invalid welcome packet")
 
+        # Older servers answer with v2 and keep sending JSON snapshots.
+        welcome_v = int(obj.get("v") or 0)
+        self.protocol_version = PROTOCOL_VERSION if welcome_v >= PROTOCOL_VERSION else PROTOCOL_VERSION_JSON
+
         self.player_id = int(obj.get("player_id") or 0)
         self.token = str(obj.get("token") or "")
+        self.session_id = int(obj.get("sid") or 0)
         self.tick_rate = int(obj.get("tick_rate") or 60)
         map_json_val = obj.get("map_json")
         if isinstance(map_json_val, str):
@@ -74,15 +99,7 @@ class MultiplayerClient:
         self.server_tuning_version = int(obj.get("cfg_v") or 0)
         tuning_val = obj.get("tuning")
         if isinstance(tuning_val, dict):
-            out: dict[str, float | bool] = {}
-            for k, v in tuning_val.items():
-                if not isinstance(k, str):
-                    continue
-                if isinstance(v, bool):
-                    out[k] = bool(v)
-                elif isinstance(v, (int, float)):
-                    out[k] = float(v)
-            self.server_tuning = out
+            self.server_tuning = self._normalize_tuning(tuning_val)
         self.server_games_version = int(obj.get("games_v") or 0)
         games_val = obj.get("games")
         if isinstance(games_val, dict):
@@ -95,6 +112,27 @@ class MultiplayerClient:
         self._udp = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
         self._udp.setblocking(False)
         self._latest_snapshot: dict | None = None
+        self._snapshot_baselines: dict[int, dict[int, PlayerSnapshotRecord]] = {}
+        self._snapshot_ack: int = 0
+        self._snapshot_players: list[dict] = []
+        self._game_events: deque[dict] = deque(maxlen=48)
+        self._input_history: deque[InputCommand] = deque(maxlen=INPUT_REDUNDANCY)
+        self._tcp_closed = False
+        # Payload bytes on both channels after the handshake (net stats / load benchmarks).
+        self.bytes_sent = 0
+        self.bytes_received = 0
+
+    @staticmethod
+    def _normalize_tuning(values: dict) -> dict[str, float | bool]:
+        out: dict[str, float | bool] = {}
+        for k, v in values.items():
+            if not isinstance(k, str):
+                continue
+            if isinstance(v, bool):
+                out[k] = bool(v)
+            elif isinstance(v, (int, float)):
+                out[k] = float(v)
+        return out
 
     def close(self) -> None:
         try:
@@ -106,35 +144,70 @@ class MultiplayerClient:
         except Exception:
             pass
 
-    def send_input(self, *, seq: int, server_tick_hint: int, cmd: dict) -> None:
+    def send_input(self, *, seq: int, server_tick_hint: int, cmd: dict, view_delay_ticks: float = 0.0) -> None:
         if not self.server_udp_addr:
             return
-        pkt = {
-            "t": "in",
-            "v": PROTOCOL_VERSION,
-            "token": self.token,
-            "seq": int(seq),
-            "st": max(0, int(server_tick_hint)),
-            "dx": int(cmd.get("dx") or 0),
-            "dy": int(cmd.get("dy") or 0),
-            "ls": max(1, int(cmd.get("ls") or 1)),
-            "mf": max(-1, min(1, int(cmd.get("mf") or 0))),
-            "mr": max(-1, min(1, int(cmd.get("mr") or 0))),
-            "jp": bool(cmd.get("jp")),
-            "jh": bool(cmd.get("jh")),
-            "sp": bool(cmd.get("sp")) or bool(cmd.get("dp")),
-            # Backward-compatible alias used by older servers.
-            "dp": bool(cmd.get("sp")) or bool(cmd.get("dp")),
-            "gp": bool(cmd.get("gp")),
-            "ip": bool(cmd.get("ip")),
-        }
-        payload = json.dumps(pkt, separators=(",", ":"), ensure_ascii=True).encode("utf-8")
+        if self.protocol_version >= PROTOCOL_VERSION and self.session_id > 0:
+            payload = self._encode_input_v3(
+                seq=seq, server_tick_hint=server_tick_hint, cmd=cmd, view_delay_ticks=view_delay_ticks
+            )
+        else:
+            pkt = {
+                "t": "in",
+                "v": int(self.protocol_version),
+                "token": self.token,
+                "seq": int(seq),
+                "st": max(0, int(server_tick_hint)),
+                "vd": max(0.0, float(view_delay_ticks)),
+                "dx": int(cmd.get("dx") or 0),
+                "dy": int(cmd.get("dy") or 0),
+                "ls": max(1, int(cmd.get("ls") or 1)),
+                "mf": max(-1, min(1, int(cmd.get("mf") or 0))),
+                "mr": max(-1, min(1, int(cmd.get("mr") or 0))),
+                "jp": bool(cmd.get("jp")),
+                "jh": bool(cmd.get("jh")),
+                "sp": bool(cmd.get("sp")) or bool(cmd.get("dp")),
+                # Backward-compatible alias used by older servers.
+                "dp": bool(cmd.get("sp")) or bool(cmd.get("dp")),
+                "gp": bool(cmd.get("gp")),
+                "ip": bool(cmd.get("ip")),
+            }
+            payload = json.dumps(pkt, separators=(",", ":"), ensure_ascii=True).encode("utf-8")
         try:
             self._udp.sendto(payload, self.server_udp_addr)
+            self.bytes_sent += len(payload)
         except Exception:
             pass
 
+    def _encode_input_v3(self, *, seq: int, server_tick_hint: int, cmd: dict, view_delay_ticks: float = 0.0) -> bytes:
+        command = InputCommand(
+            seq=int(seq),
+            server_tick_hint=max(0, int(server_tick_hint)),
+            look_dx=int(cmd.get("dx") or 0),
+            look_dy=int(cmd.get("dy") or 0),
+            look_scale=max(1, int(cmd.get("ls") or 1)),
+            move_forward=max(-1, min(1, int(cmd.get("mf") or 0))),
+            move_right=max(-1, min(1, int(cmd.get("mr") or 0))),
+            jump_pressed=bool(cmd.get("jp")),
+            jump_held=bool(cmd.get("jh")),
+            slide_pressed=bool(cmd.get("sp")) or bool(cmd.get("dp")),
+            grapple_pressed=bool(cmd.get("gp")),
+            interact_pressed=bool(cmd.get("ip")),
+            view_delay_ticks=max(0.0, float(view_delay_ticks)),
+        )
+        # Redundant history must stay consecutive (seqs are implied by the packet layout).
+        if self._input_history and int(self._input_history[-1].seq) + 1 != int(seq):
+            self._input_history.clear()
+        self._input_history.append(command)
+        return encode_input_packet_v3(
+            session_id=int(self.session_id),
+            snapshot_ack=int(self._snapshot_ack),
+            commands=list(self._input_history),
+        )
+
     def poll(self) -> dict | None:
+        if self.protocol_version >= PROTOCOL_VERSION:
+            return self._poll_v3()
         while True:
             try:
                 payload, _addr = self._udp.recvfrom(65535)
@@ -142,6 +215,7 @@ class MultiplayerClient:
                 break
             except Exception:
                 break
+            self.bytes_received += len(payload)
             try:
                 obj = json.loads(payload.decode("utf-8", errors="ignore"))
             except Exception:
@@ -151,6 +225,107 @@ class MultiplayerClient:
             self._latest_snapshot = obj
         return self._latest_snapshot
 
+    def _poll_v3(self) -> dict | None:
+        changed = self._poll_reliable()
+        while True:
+            try:
+                payload, _addr = self._udp.recvfrom(65535)
+            except BlockingIOError:
+                break
+            except Exception:
+                break
+            self.bytes_received += len(payload)
+            if not is_binary_snapshot(payload):
+                continue
+            decoded = decode_snapshot_packet_v3(payload, baselines=self._snapshot_baselines)
+            if decoded is None:
+                # Delta against a baseline we already dropped: wait for a newer ack to reach the
+                # server (or for the baseline to age out of its history and a full snapshot to arrive).
+                continue
+            tick, _baseline_tick, records = decoded
+            self._snapshot_baselines[int(tick)] = {int(rec.id): rec for rec in records}
+            while len(self._snapshot_baselines) > _SNAPSHOT_BASELINE_HISTORY:
+                del self._snapshot_baselines[min(self._snapshot_baselines)]
+            if int(tick) <= int(self._snapshot_ack):
+                continue
+            self._snapshot_ack = int(tick)
+            self._snapshot_players = [player_record_to_row(rec) for rec in records]
+            changed = True
+        if changed and self._snapshot_ack > 0:
+            # Same shape as v2 snapshots so netcode stays protocol-agnostic.
+            self._latest_snapshot = {
+                "t": "snap",
+                "v": PROTOCOL_VERSION,
+                "tick": int(self._snapshot_ack),
+                "players": list(self._snapshot_players),
+                "cfg_v": int(self.server_tuning_version),
+                "tuning": self.server_tuning,
+                "games_v": int(self.server_games_version),
+                "games": self.server_games,
+                "game_state": self.server_game_state,
+                "game_events": list(self._game_events),
+            }
+        return self._latest_snapshot
+
+    def _poll_reliable(self) -> bool:
+        """Drain pushed tuning/games/race state lines from the TCP channel (v3)."""
+        while not self._tcp_closed:
+            try:
+                ready, _w, _x = select.select([self._tcp], [], [], 0.0)
+            except Exception:
+                break
+            if not ready:
+                break
+            try:
+                data = self._tcp.recv(65536)
+            except (BlockingIOError, socket.timeout):
+                break
+            except Exception:
+                self._tcp_closed = True
+                break
+            if not data:
+                self._tcp_closed = True
+                break
+            self.bytes_received += len(data)
+            self._tcp_buf += data
+        changed = False
+        while b"\n" in self._tcp_buf:
+            line, self._tcp_buf = self._tcp_buf.split(b"\n", 1)
+            obj = decode_json_line(line)
+            if obj and self._apply_reliable_message(obj):
+                changed = True
+        return changed
+
+    def _apply_reliable_message(self, obj: dict) -> bool:
+        t = str(obj.get("t") or "")
+        if t == "cfg_push":
+            tuning_val = obj.get("tuning")
+            if not isinstance(tuning_val, dict):
+                return False
+            self.server_tuning = self._normalize_tuning(tuning_val)
+            self.server_tuning_version = int(obj.get("cfg_v") or 0)
+            return True
+        if t == "games_push":
+            games_val = obj.get("games")
+            self.server_games = games_val if isinstance(games_val, dict) else None
+            self.server_games_version = int(obj.get("games_v") or 0)
+            self.server_game_state = None
+            self._game_events.clear()
+            return True
+        if t == "state":
+            state_val = obj.get("game_state")
+            if not isinstance(state_val, dict):
+                return False
+            self.server_game_state = state_val
+            return True
+        if t == "events":
+            events_val = obj.get("events")
+            if not isinstance(events_val, list):
+                return False
+            self._game_events.extend(row for row in events_val if isinstance(row, dict))
+            return True
+        return False
+
     def send_tuning(self, tuning: dict[str, float | bool]) -> None:
         payload: dict[str, float | bool] = {}
         for k, v in tuning.items():
@@ -1,9 +1,59 @@
 from __future__ import annotations
 
 import json
+import struct
 from dataclasses import dataclass
 
-PROTOCOL_VERSION = 2
+# v3: binary delta snapshots on UDP, tuning/games/race state pushed over TCP.
+# v2 (JSON snapshots) stays available for negotiation and old peers.
+PROTOCOL_VERSION = 3
+PROTOCOL_VERSION_JSON = 2
+
+SNAPSHOT_V3_KIND = 0xB3
+SNAPSHOT_POS_SCALE = 4096.0
+SNAPSHOT_VEL_SCALE = 1024.0
+SNAPSHOT_ANGLE_SCALE = 100.0
+
+# kind, version, tick, baseline tick (0 = full snapshot), player count.
+_SNAP_HEADER = struct.Struct("<BBIIH")
+# player id, changed-field mask.
+_SNAP_PLAYER = struct.Struct("<IB")
+_SNAP_VEC3 = struct.Struct("<iii")
+_SNAP_ANGLES = struct.Struct("<ih")
+_SNAP_U32 = struct.Struct("<I")
+_SNAP_I16 = struct.Struct("<h")
+_SNAP_U8 = struct.Struct("<B")
+
+_F_POS = 1 << 0
+_F_VEL = 1 << 1
+_F_ANG = 1 << 2
+_F_ACK = 1 << 3
+_F_HP = 1 << 4
+_F_RS = 1 << 5
+_F_NAME = 1 << 6
+_F_ALL = _F_POS | _F_VEL | _F_ANG | _F_ACK | _F_HP | _F_RS | _F_NAME
+
+_I32_MIN = -(1 << 31)
+_I32_MAX = (1 << 31) - 1
+_I16_MIN = -(1 << 15)
+_I16_MAX = (1 << 15) - 1
+_U32_MAX = (1 << 32) - 1
+
+INPUT_V3_KIND = 0xA3
+# Commands bundled per input packet so a dropped datagram does not lose press edges.
+INPUT_REDUNDANCY = 4
+
+# kind, version, session id, newest seq, server tick hint, snapshot ack, view delay (1/256 tick), command count.
+_INPUT_HEADER = struct.Struct("<BBIIIIHB")
+_VIEW_DELAY_SCALE = 256.0
+# look dx/dy, look scale, move forward/right, button flags. Seqs are implied (newest - index).
+_INPUT_CMD = struct.Struct("<iiHbbB")
+
+_B_JUMP_PRESSED = 1 << 0
+_B_JUMP_HELD = 1 << 1
+_B_SLIDE = 1 << 2
+_B_GRAPPLE = 1 << 3
+_B_INTERACT = 1 << 4
 
 
 @dataclass(frozen=True)
@@ -20,6 +70,30 @@ class InputCommand:
     slide_pressed: bool
     grapple_pressed: bool
     interact_pressed: bool = False
+    # Latest v3 snapshot tick the client decoded; baseline for the next delta.
+    snapshot_ack: int = 0
+    # How far (in ticks) behind `server_tick_hint` the client rendered remote players; the server rewinds
+    # shot targets to `server_tick_hint - view_delay_ticks`.
+    view_delay_ticks: float = 0.0
+
+
+@dataclass(frozen=True)
+class PlayerSnapshotRecord:
+    """Quantised fixed-layout player row carried by v3 snapshots."""
+
+    id: int
+    x: int
+    y: int
+    z: int
+    vx: int
+    vy: int
+    vz: int
+    yaw: int
+    pitch: int
+    ack: int
+    hp: int
+    rs: int
+    name: str = ""
 
 
 def encode_json(obj: dict) -> bytes:
@@ -62,10 +136,107 @@ def decode_input_packet(payload: bytes) -> tuple[str, InputCommand] | None:
         slide_pressed=bool(obj.get("sp")) or bool(obj.get("dp")),
         grapple_pressed=bool(obj.get("gp")),
         interact_pressed=bool(obj.get("ip")),
+        snapshot_ack=max(0, int(obj.get("sa") or 0)),
+        view_delay_ticks=max(0.0, float(obj.get("vd") or 0.0)),
     )
     return (token, cmd)
 
 
+def is_binary_input(payload: bytes) -> bool:
+    return len(payload) >= _INPUT_HEADER.size and payload[0] == INPUT_V3_KIND
+
+
+def encode_input_packet_v3(*, session_id: int, snapshot_ack: int, commands: list[InputCommand]) -> bytes:
+    """
+    Encode the newest commands (consecutive seqs, oldest first) into one binary input datagram.
+
+    The server tick hint and view delay are taken from the newest command, the snapshot ack from the argument.
+    """
+
+    cmds = list(commands)[-255:]
+    if not cmds:
+        raise ValueError("encode_input_packet_v3 requires at least one command")
+    newest = cmds[-1]
+    parts: list[bytes] = [
+        _INPUT_HEADER.pack(
+            INPUT_V3_KIND,
+            PROTOCOL_VERSION,
+            int(session_id) & _U32_MAX,
+            int(newest.seq) & _U32_MAX,
+            max(0, int(newest.server_tick_hint)) & _U32_MAX,
+            max(0, int(snapshot_ack)) & _U32_MAX,
+            max(0, min(0xFFFF, int(round(float(newest.view_delay_ticks) * _VIEW_DELAY_SCALE)))),
+            len(cmds),
+        )
+    ]
+    for cmd in reversed(cmds):
+        flags = 0
+        if cmd.jump_pressed:
+            flags |= _B_JUMP_PRESSED
+        if cmd.jump_held:
+            flags |= _B_JUMP_HELD
+        if cmd.slide_pressed:
+            flags |= _B_SLIDE
+        if cmd.grapple_pressed:
+            flags |= _B_GRAPPLE
+        if cmd.interact_pressed:
+            flags |= _B_INTERACT
+        parts.append(
+            _INPUT_CMD.pack(
+                max(_I32_MIN, min(_I32_MAX, int(cmd.look_dx))),
+                max(_I32_MIN, min(_I32_MAX, int(cmd.look_dy))),
+                max(1, min(0xFFFF, int(cmd.look_scale))),
+                max(-1, min(1, int(cmd.move_forward))),
+                max(-1, min(1, int(cmd.move_right))),
+                flags,
+            )
+        )
+    return b"".join(parts)
+
+
+def decode_input_packet_v3(payload: bytes) -> tuple[int, list[InputCommand]] | None:
+    """Decode a binary input datagram into `(session_id, commands)`, commands oldest first."""
+
+    try:
+        kind, version, session_id, newest_seq, tick_hint, snapshot_ack, view_delay, count = _INPUT_HEADER.unpack_from(
+            payload, 0
+        )
+    except struct.error:
+        return None
+    if kind != INPUT_V3_KIND or version != PROTOCOL_VERSION or count <= 0:
+        return None
+    if len(payload) != _INPUT_HEADER.size + int(count) * _INPUT_CMD.size:
+        return None
+    out: list[InputCommand] = []
+    off = _INPUT_HEADER.size
+    for i in range(int(count)):
+        dx, dy, ls, mf, mr, flags = _INPUT_CMD.unpack_from(payload, off)
+        off += _INPUT_CMD.size
+        seq = int(newest_seq) - i
+        if seq <= 0:
+            break
+        out.append(
+            InputCommand(
+                seq=seq,
+                server_tick_hint=int(tick_hint),
+                look_dx=int(dx),
+                look_dy=int(dy),
+                look_scale=max(1, int(ls)),
+                move_forward=max(-1, min(1, int(mf))),
+                move_right=max(-1, min(1, int(mr))),
+                jump_pressed=bool(flags & _B_JUMP_PRESSED),
+                jump_held=bool(flags & _B_JUMP_HELD),
+                slide_pressed=bool(flags & _B_SLIDE),
+                grapple_pressed=bool(flags & _B_GRAPPLE),
+                interact_pressed=bool(flags & _B_INTERACT),
+                snapshot_ack=int(snapshot_ack),
+                view_delay_ticks=float(view_delay) / _VIEW_DELAY_SCALE,
+            )
+        )
+    out.reverse()
+    return (int(session_id), out)
+
+
 def encode_snapshot_packet(
     *,
     tick: int,
@@ -79,7 +250,7 @@ def encode_snapshot_packet(
 ) -> bytes:
     obj = {
         "t": "snap",
-        "v": PROTOCOL_VERSION,
+        "v": PROTOCOL_VERSION_JSON,
         "tick": int(tick),
         "players": players,
     }
@@ -96,3 +267,208 @@ def encode_snapshot_packet(
     if isinstance(game_events, list):
         obj["game_events"] = game_events
     return json.dumps(obj, separators=(",", ":"), ensure_ascii=True).encode("utf-8")
+
+
+def _q(value: float, scale: float, lo: int, hi: int) -> int:
+    v = int(round(float(value) * scale))
+    return lo if v < lo else hi if v > hi else v
+
+
+def quantize_player_row(row: dict) -> PlayerSnapshotRecord:
+    """Quantise a v2-style player row (`id`, `n`, `x`..`rs`) into a v3 record."""
+
+    return PlayerSnapshotRecord(
+        id=max(0, min(_U32_MAX, int(row.get("id") or 0))),
+        x=_q(row.get("x") or 0.0, SNAPSHOT_POS_SCALE, _I32_MIN, _I32_MAX),
+        y=_q(row.get("y") or 0.0, SNAPSHOT_POS_SCALE, _I32_MIN, _I32_MAX),
+        z=_q(row.get("z") or 0.0, SNAPSHOT_POS_SCALE, _I32_MIN, _I32_MAX),
+        vx=_q(row.get("vx") or 0.0, SNAPSHOT_VEL_SCALE, _I32_MIN, _I32_MAX),
+        vy=_q(row.get("vy") or 0.0, SNAPSHOT_VEL_SCALE, _I32_MIN, _I32_MAX),
+        vz=_q(row.get("vz") or 0.0, SNAPSHOT_VEL_SCALE, _I32_MIN, _I32_MAX),
+        yaw=_q(row.get("yaw") or 0.0, SNAPSHOT_ANGLE_SCALE, _I32_MIN, _I32_MAX),
+        pitch=_q(row.get("pitch") or 0.0, SNAPSHOT_ANGLE_SCALE, _I16_MIN, _I16_MAX),
+        ack=max(0, min(_U32_MAX, int(row.get("ack") or 0))),
+        hp=max(_I16_MIN, min(_I16_MAX, int(row.get("hp") or 0))),
+        rs=max(0, min(_U32_MAX, int(row.get("rs") or 0))),
+        name=str(row.get("n") or "").encode("utf-8")[:255].decode("utf-8", errors="ignore"),
+    )
+
+
+def player_record_to_row(rec: PlayerSnapshotRecord) -> dict:
+    """Expand a v3 record into the v2 row dict shape consumed by netcode."""
+
+    return {
+        "id": int(rec.id),
+        "n": rec.name,
+        "x": float(rec.x) / SNAPSHOT_POS_SCALE,
+        "y": float(rec.y) / SNAPSHOT_POS_SCALE,
+        "z": float(rec.z) / SNAPSHOT_POS_SCALE,
+        "yaw": float(rec.yaw) / SNAPSHOT_ANGLE_SCALE,
+        "pitch": float(rec.pitch) / SNAPSHOT_ANGLE_SCALE,
+        "vx": float(rec.vx) / SNAPSHOT_VEL_SCALE,
+        "vy": float(rec.vy) / SNAPSHOT_VEL_SCALE,
+        "vz": float(rec.vz) / SNAPSHOT_VEL_SCALE,
+        "ack": int(rec.ack),
+        "hp": int(rec.hp),
+        "rs": int(rec.rs),
+    }
+
+
+def is_binary_snapshot(payload: bytes) -> bool:
+    return len(payload) >= _SNAP_HEADER.size and payload[0] == SNAPSHOT_V3_KIND
+
+
+def encode_snapshot_packet_v3(
+    *,
+    tick: int,
+    records: list[PlayerSnapshotRecord],
+    baseline_tick: int = 0,
+    baseline: dict[int, PlayerSnapshotRecord] | None = None,
+) -> bytes:
+    """
+    Encode a binary snapshot. With a baseline (a snapshot the client acked), each player only carries
+    the field groups that changed; players missing from the baseline are sent in full.
+    """
+
+    base = baseline if (baseline is not None and int(baseline_tick) > 0) else None
+    parts: list[bytes] = [
+        _SNAP_HEADER.pack(
+            SNAPSHOT_V3_KIND,
+            PROTOCOL_VERSION,
+            int(tick),
+            int(baseline_tick) if base is not None else 0,
+            len(records),
+        )
+    ]
+    for rec in records:
+        prev = base.get(int(rec.id)) if base is not None else None
+        if prev is None:
+            mask = _F_ALL
+        else:
+            mask = 0
+            if (rec.x, rec.y, rec.z) != (prev.x, prev.y, prev.z):
+                mask |= _F_POS
+            if (rec.vx, rec.vy, rec.vz) != (prev.vx, prev.vy, prev.vz):
+                mask |= _F_VEL
+            if (rec.yaw, rec.pitch) != (prev.yaw, prev.pitch):
+                mask |= _F_ANG
+            if rec.ack != prev.ack:
+                mask |= _F_ACK
+            if rec.hp != prev.hp:
+                mask |= _F_HP
+            if rec.rs != prev.rs:
+                mask |= _F_RS
+            if rec.name != prev.name:
+                mask |= _F_NAME
+        parts.append(_SNAP_PLAYER.pack(int(rec.id), mask))
+        if mask & _F_POS:
+            parts.append(_SNAP_VEC3.pack(rec.x, rec.y, rec.z))
+        if mask & _F_VEL:
+            parts.append(_SNAP_VEC3.pack(rec.vx, rec.vy, rec.vz))
+        if mask & _F_ANG:
+            parts.append(_SNAP_ANGLES.pack(rec.yaw, rec.pitch))
+        if mask & _F_ACK:
+            parts.append(_SNAP_U32.pack(rec.ack))
+        if mask & _F_HP:
+            parts.append(_SNAP_I16.pack(rec.hp))
+        if mask & _F_RS:
+            parts.append(_SNAP_U32.pack(rec.rs))
+        if mask & _F_NAME:
+            raw = rec.name.encode("utf-8")[:255]
+            parts.append(_SNAP_U8.pack(len(raw)))
+            parts.append(raw)
+    return b"".join(parts)
+
+
+def decode_snapshot_packet_v3(
+    payload: bytes,
+    *,
+    baselines: dict[int, dict[int, PlayerSnapshotRecord]],
+) -> tuple[int, int, list[PlayerSnapshotRecord]] | None:
+    """
+    Decode a binary snapshot into `(tick, baseline_tick, records)`.
+
+    Returns None for malformed packets and for deltas whose baseline the client no longer holds.
+    """
+
+    try:
+        kind, version, tick, baseline_tick, count = _SNAP_HEADER.unpack_from(payload, 0)
+    except struct.error:
+        return None
+    if kind != SNAPSHOT_V3_KIND or version != PROTOCOL_VERSION:
+        return None
+    base: dict[int, PlayerSnapshotRecord] = {}
+    if baseline_tick:
+        got = baselines.get(int(baseline_tick))
+        if got is None:
+            return None
+        base = got
+    off = _SNAP_HEADER.size
+    out: list[PlayerSnapshotRecord] = []
+    try:
+        for _ in range(int(count)):
+            pid, mask = _SNAP_PLAYER.unpack_from(payload, off)
+            off += _SNAP_PLAYER.size
+            prev = base.get(int(pid))
+            if prev is None and (mask & _F_ALL) != _F_ALL:
+                return None
+            if mask & _F_POS:
+                x, y, z = _SNAP_VEC3.unpack_from(payload, off)
+                off += _SNAP_VEC3.size
+            else:
+                x, y, z = prev.x, prev.y, prev.z
+            if mask & _F_VEL:
+                vx, vy, vz = _SNAP_VEC3.unpack_from(payload, off)
+                off += _SNAP_VEC3.size
+            else:
+                vx, vy, vz = prev.vx, prev.vy, prev.vz
+            if mask & _F_ANG:
+                yaw, pitch = _SNAP_ANGLES.unpack_from(payload, off)
+                off += _SNAP_ANGLES.size
+            else:
+                yaw, pitch = prev.yaw, prev.pitch
+            if mask & _F_ACK:
+                (ack,) = _SNAP_U32.unpack_from(payload, off)
+                off += _SNAP_U32.size
+            else:
+                ack = prev.ack
+            if mask & _F_HP:
+                (hp,) = _SNAP_I16.unpack_from(payload, off)
+                off += _SNAP_I16.size
+            else:
+                hp = prev.hp
+            if mask & _F_RS:
+                (rs,) = _SNAP_U32.unpack_from(payload, off)
+                off += _SNAP_U32.size
+            else:
+                rs = prev.rs
+            if mask & _F_NAME:
+                (n,) = _SNAP_U8.unpack_from(payload, off)
+                off += _SNAP_U8.size
+                raw = payload[off : off + n]
+                if len(raw) != n:
+                    return None
+                off += n
+                name = bytes(raw).decode("utf-8", errors="ignore")
+            else:
+                name = prev.name
+            out.append(
+                PlayerSnapshotRecord(
+                    id=int(pid),
+                    x=x,
+                    y=y,
+                    z=z,
+                    vx=vx,
+                    vy=vy,
+                    vz=vz,
+                    yaw=yaw,
+                    pitch=pitch,
+                    ack=ack,
+                    hp=hp,
+                    rs=rs,
+                    name=name,
+                )
+            )
+    except struct.error:
+        return None
+    return (int(tick), int(baseline_tick), out)
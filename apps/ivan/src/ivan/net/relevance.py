@@ -5,6 +5,7 @@ from pathlib import Path
 
 from panda3d.core import LVector3f
 
+from ivan.common.spatial_grid import SpatialGrid
 from ivan.world.goldsrc_visibility import (
     GoldSrcBspVis,
     decode_pvs_row,
@@ -76,7 +77,10 @@ class GoldSrcPvsRelevance:
         viewer_leaf: int | None,
         target_leaf: int | None,
     ) -> bool:
-        dist_sq = float((LVector3f(target_pos) - LVector3f(viewer_pos)).lengthSquared())
+        dx = float(target_pos.x) - float(viewer_pos.x)
+        dy = float(target_pos.y) - float(viewer_pos.y)
+        dz = float(target_pos.z) - float(viewer_pos.z)
+        dist_sq = dx * dx + dy * dy + dz * dz
         fallback = max(0.0, float(self.distance_fallback))
         if dist_sq <= (fallback * fallback):
             return True
@@ -110,8 +114,8 @@ class GoldSrcPvsRelevance:
                 continue
             target_leaf = leaves_by_player_id.get(pid_i)
             if self.should_replicate(
-                viewer_pos=LVector3f(viewer_pos),
-                target_pos=LVector3f(target_pos),
+                viewer_pos=viewer_pos,
+                target_pos=target_pos,
                 viewer_leaf=viewer_leaf,
                 target_leaf=target_leaf,
             ):
@@ -120,6 +124,87 @@ class GoldSrcPvsRelevance:
             out.insert(0, viewer_id)
         return out
 
+    def relevant_player_ids_by_viewer(
+        self,
+        *,
+        ordered_player_ids: list[int],
+        positions_by_player_id: dict[int, LVector3f],
+        leaves_by_player_id: dict[int, int | None],
+        grid: SpatialGrid | None = None,
+    ) -> dict[int, list[int]]:
+        """
+        `relevant_player_ids` for every player at once, with identical results.
+
+        PVS membership is resolved once per viewer leaf, and short-range fallback candidates
+        once per (viewer leaf, grid cell) bucket; only those candidates get a per-viewer
+        distance test on the grid's raw float coordinates. Pass the tick's player grid to skip
+        building one; it must hold exactly the positions in `positions_by_player_id`.
+        """
+        ordered = [int(pid) for pid in ordered_player_ids]
+        if grid is None:
+            grid = SpatialGrid(cell_size=max(1.0, float(self.distance_fallback)))
+            grid.rebuild(
+                (pid, float(p.x), float(p.y), float(p.z))
+                for pid in ordered
+                if (p := positions_by_player_id.get(pid)) is not None
+            )
+        order_index = {pid: i for i, pid in enumerate(ordered)}
+        targets_by_leaf: dict[int | None, list[int]] = {}
+        for pid in ordered:
+            if pid in grid:
+                targets_by_leaf.setdefault(leaves_by_player_id.get(pid), []).append(pid)
+        fallback = max(0.0, float(self.distance_fallback))
+        fallback_sq = fallback * fallback
+        # Tiny slack keeps the cell-box query conservative against rounding in its bounds.
+        reach = fallback * (1.0 + 1e-9) + 1e-9
+        cell = grid.cell_size
+        point = grid.point
+
+        pvs_by_leaf: dict[int, tuple[list[int], set[int]]] = {}
+        near_by_bucket: dict[tuple[int, tuple[int, int, int]], list[int]] = {}
+        out: dict[int, list[int]] = {}
+        for viewer_id in ordered:
+            viewer_pos = positions_by_player_id.get(viewer_id)
+            viewer_leaf = leaves_by_player_id.get(viewer_id)
+            if viewer_pos is None or viewer_leaf is None:
+                out[viewer_id] = list(ordered) if viewer_pos is None else [pid for pid in ordered if pid in grid]
+                continue
+            leaf = int(viewer_leaf)
+            pvs = pvs_by_leaf.get(leaf)
+            if pvs is None:
+                visible = self.visible_leaves_for_leaf(leaf=leaf)
+                ids = list(targets_by_leaf.get(None, ()))
+                for target_leaf, pids in targets_by_leaf.items():
+                    if target_leaf is not None and int(target_leaf) in visible:
+                        ids.extend(pids)
+                ids.sort(key=order_index.__getitem__)
+                pvs = (ids, set(ids))
+                pvs_by_leaf[leaf] = pvs
+            base_ids, base_set = pvs
+            vx, vy, vz = float(viewer_pos.x), float(viewer_pos.y), float(viewer_pos.z)
+            ckey = grid.cell_key(vx, vy, vz)
+            bucket = (leaf, ckey)
+            near = near_by_bucket.get(bucket)
+            if near is None:
+                lo = (ckey[0] * cell - reach, ckey[1] * cell - reach, ckey[2] * cell - reach)
+                hi = ((ckey[0] + 1) * cell + reach, (ckey[1] + 1) * cell + reach, (ckey[2] + 1) * cell + reach)
+                near = [pid for pid in grid.query_box(lo, hi) if pid not in base_set]
+                near_by_bucket[bucket] = near
+            extra: list[int] = []
+            for pid in near:
+                tx, ty, tz = point(pid)
+                dx, dy, dz = tx - vx, ty - vy, tz - vz
+                if dx * dx + dy * dy + dz * dz <= fallback_sq:
+                    extra.append(pid)
+            ids = list(base_ids)
+            if viewer_id not in base_set:
+                extra.append(viewer_id)
+            if extra:
+                ids.extend(pid for pid in extra if pid not in base_set)
+                ids = sorted(set(ids), key=order_index.__getitem__)
+            out[viewer_id] = ids
+        return out
+
 
 def build_goldsrc_pvs_relevance_from_map(
     *,
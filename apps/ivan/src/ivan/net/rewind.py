@@ -0,0 +1,105 @@
+"""Tick-indexed position history for server-side lag compensation.
+
+Each player keeps a fixed ring of positions indexed by `tick % capacity`, stored in flat float arrays, so
+recording a tick allocates nothing and rewinding to a tick is O(1) instead of a scan over the whole history.
+Respawns and teleports mark a discontinuity so rewinds never interpolate between the old and new position.
+"""
+
+from __future__ import annotations
+
+import math
+from array import array
+
+DEFAULT_REWIND_CAPACITY = 240
+
+
+class RewindHistory:
+    """Ring buffer of (tick -> x, y, z) samples covering the last `capacity` ticks."""
+
+    __slots__ = ("capacity", "_ticks", "_xyz", "_breaks", "_pending_break", "_latest", "_count")
+
+    def __init__(self, *, capacity: int = DEFAULT_REWIND_CAPACITY) -> None:
+        self.capacity = max(1, int(capacity))
+        self._ticks = array("q", [-1]) * self.capacity
+        self._xyz = array("d", [0.0]) * (self.capacity * 3)
+        # 1 where a sample starts a new segment (not continuous with the tick before it).
+        self._breaks = array("b", [0]) * self.capacity
+        self._pending_break = False
+        self._latest = -1
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def latest_tick(self) -> int:
+        return self._latest
+
+    def clear(self) -> None:
+        for i in range(self.capacity):
+            self._ticks[i] = -1
+            self._breaks[i] = 0
+        self._pending_break = False
+        self._latest = -1
+        self._count = 0
+
+    def mark_discontinuity(self) -> None:
+        """The next recorded sample starts a new segment (respawn/teleport); rewinds never interpolate across it."""
+        self._pending_break = True
+
+    def record(self, tick: int, x: float, y: float, z: float) -> None:
+        t = int(tick)
+        i = t % self.capacity
+        if self._ticks[i] != t:
+            self._count = min(self.capacity, self._count + 1)
+        self._ticks[i] = t
+        self._breaks[i] = 1 if self._pending_break else 0
+        self._pending_break = False
+        j = i * 3
+        self._xyz[j] = float(x)
+        self._xyz[j + 1] = float(y)
+        self._xyz[j + 2] = float(z)
+        if t > self._latest:
+            self._latest = t
+
+    def sample(self, tick: int) -> tuple[float, float, float] | None:
+        """Exact sample for `tick`, or None when that tick was never recorded or has been overwritten."""
+        t = int(tick)
+        if t < 0:
+            return None
+        i = t % self.capacity
+        if self._ticks[i] != t:
+            return None
+        j = i * 3
+        return (self._xyz[j], self._xyz[j + 1], self._xyz[j + 2])
+
+    def position_at(self, tick: float, *, max_rewind_ticks: int | None = None) -> tuple[float, float, float] | None:
+        """
+        Position at a (possibly fractional) tick, linearly interpolated between the bracketing samples.
+
+        The target is clamped to the newest sample and to at most `max_rewind_ticks` (and the ring capacity)
+        behind it. Missing bracketing samples fall back to whichever neighbour exists, then to the newest; across a
+        discontinuity the nearer sample is returned as-is.
+        """
+        latest = self._latest
+        if latest < 0:
+            return None
+        window = self.capacity - 1
+        if max_rewind_ticks is not None:
+            window = min(window, max(0, int(max_rewind_ticks)))
+        target = min(float(latest), max(float(latest - window), float(tick)))
+        t0 = int(math.floor(target))
+        frac = target - float(t0)
+        a = self.sample(t0)
+        if frac <= 0.0:
+            return a if a is not None else self.sample(latest)
+        b = self.sample(t0 + 1)
+        if a is None or b is None:
+            return a or b or self.sample(latest)
+        if self._breaks[(t0 + 1) % self.capacity]:
+            return a if frac < 0.5 else b
+        return (
+            a[0] + (b[0] - a[0]) * frac,
+            a[1] + (b[1] - a[1]) * frac,
+            a[2] + (b[2] - a[2]) * frac,
+        )
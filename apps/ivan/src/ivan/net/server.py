@@ -4,36 +4,59 @@ import json
 import math
 import os
 import secrets
+import selectors
 import socket
 import threading
 import time
 from collections import deque
-from dataclasses import dataclass
+from dataclasses import dataclass, field, replace
 from pathlib import Path
 
 from panda3d.core import LVector3f, NodePath, PandaNode
 
 from ivan.common.aabb import AABB
+from ivan.common.spatial_grid import SpatialGrid
 from ivan.console.control_server import ConsoleControlServer
 from ivan.console.server_bindings import build_server_console
 from ivan.console.line_bus import ThreadSafeLineBus
 from ivan.games import RaceCourse, RaceEvent, RaceRuntime
-from ivan.maps.bundle_io import resolve_bundle_handle
+from ivan.maps.bundle_io import open_bundle_geometry, resolve_bundle_handle
+from ivan.maps.geometry_blob import GeometryBlob, TriangleRows
 from ivan.maps.run_metadata import load_run_metadata
 from ivan.net.relevance import GoldSrcPvsRelevance, build_goldsrc_pvs_relevance_from_map
+from ivan.net.rewind import DEFAULT_REWIND_CAPACITY, RewindHistory
+from ivan.net.sim_shard import SIM_WORKERS_ENV, PlayerStepJob, ShardedPlayerSimulator
+from ivan.net.tick_metrics import ServerTickMetrics
 from ivan.physics.collision_world import CollisionWorld
-from ivan.physics.motion.intent import MotionIntent
+from ivan.physics.controller_profile import ControllerProfiler, ControllerProfileWindow, controller_profile_enabled
+from ivan.physics.local_collision import LocalCollisionWorld, TriangleGrid, collision_world_mode
 from ivan.physics.player_controller import PlayerController
+from ivan.physics.player_step import step_player
 from ivan.physics.tuning import PhysicsTuning
 from ivan.net.protocol import (
     InputCommand,
+    PlayerSnapshotRecord,
     PROTOCOL_VERSION,
+    PROTOCOL_VERSION_JSON,
     decode_input_packet,
+    decode_input_packet_v3,
     decode_json_line,
     encode_json,
     encode_snapshot_packet,
+    encode_snapshot_packet_v3,
+    is_binary_input,
+    quantize_player_row,
 )
 
+# Snapshots kept per v3 client as delta baselines (~1 s at the 30 Hz snapshot rate).
+_SNAPSHOT_BASELINE_HISTORY = 32
+# Cell edge for the per-tick player grid (matches the default relevance distance fallback).
+_PLAYER_GRID_CELL = 8.0
+# Queued-but-unsimulated input commands per client; older ones are dropped past this depth.
+_INPUT_QUEUE_MAX = 8
+# Unsent TCP bytes allowed per client before it is considered stuck and dropped.
+_TCP_OUT_MAX_BYTES = 4 * 1024 * 1024
+
 
 def _clamp(v: float, lo: float, hi: float) -> float:
     return lo if v < lo else hi if v > hi else v
@@ -52,9 +75,23 @@ class _ClientState:
     hp: int
     respawn_seq: int
     last_input: InputCommand
-    rewind_history: deque[tuple[int, LVector3f]]
+    rewind_history: RewindHistory
     last_interact_seq: int = 0
     void_stuck_s: float = 0.0
+    proto: int = PROTOCOL_VERSION_JSON
+    # Numeric id v3 clients put in binary input packets instead of the token.
+    session_id: int = 0
+    # Received commands waiting for simulation (one per tick) and the highest seq queued so far.
+    input_queue: deque[InputCommand] = field(default_factory=deque)
+    input_seq: int = 0
+    # v3 delta state: last acked snapshot tick and the records sent per snapshot tick.
+    snapshot_ack: int = 0
+    snapshot_history: dict[int, dict[int, PlayerSnapshotRecord]] = field(default_factory=dict)
+    # Versions/payloads already pushed over the reliable TCP channel (v3 only).
+    sent_cfg_v: int = 0
+    sent_games_v: int = 0
+    sent_event_seq: int = 0
+    sent_game_state: bytes = b""
 
 
 class MultiplayerServer:
@@ -69,6 +106,8 @@ class MultiplayerServer:
         initial_spawn: tuple[float, float, float] | None = None,
         initial_spawn_yaw: float | None = None,
         initial_race_course: RaceCourse | None = None,
+        sim_workers: int | None = None,
+        collision_world: str | None = None,
     ) -> None:
         self.host = str(host)
         self.tcp_port = int(tcp_port)
@@ -79,6 +118,14 @@ class MultiplayerServer:
         self.fixed_dt = 1.0 / float(self.tick_rate_hz)
         self.snapshot_rate_hz = 30
         self.snapshot_dt = 1.0 / float(self.snapshot_rate_hz)
+        # Lag compensation never rewinds other players further back than this (clients aiming at older ticks are
+        # clamped), and the per-player rewind ring always covers the window.
+        try:
+            max_rewind_ms = float(os.environ.get("IRUN_IVAN_SERVER_MAX_REWIND_MS", "1000"))
+        except Exception:
+            max_rewind_ms = 1000.0
+        self.max_rewind_ticks = max(0, int(round(max(0.0, max_rewind_ms) / 1000.0 * float(self.tick_rate_hz))))
+        self._rewind_capacity = max(DEFAULT_REWIND_CAPACITY, self.max_rewind_ticks + 2)
 
         self.tuning = PhysicsTuning()
         self.tuning.noclip_enabled = False
@@ -95,6 +142,8 @@ class MultiplayerServer:
 
         self.aabbs: list[AABB] = []
         self.collision_triangles: list[list[float]] | None = None
+        # Mapped geometry.bin backing `collision_triangles` on binary bundles; released in `close()`.
+        self._geometry_blob: GeometryBlob | None = None
         self._load_map_bundle()
         if isinstance(initial_spawn, tuple) and len(initial_spawn) == 3:
             try:
@@ -123,11 +172,52 @@ class MultiplayerServer:
             player_half_height=float(self.tuning.player_half_height),
             render=root_np,
         )
+        # `local`: every controller sweeps against its own small world of nearby map triangles.
+        self.collision_world_mode = collision_world_mode(collision_world)
+        self._triangle_index: TriangleGrid | None = None
+        if self.collision_world_mode == "local" and self.collision_triangles:
+            self._triangle_index = TriangleGrid(self.collision_triangles)
+            print(f"[ivan-server] Local collision worlds: {len(self._triangle_index)} triangles indexed")
+        if sim_workers is None:
+            try:
+                sim_workers = int(os.environ.get(SIM_WORKERS_ENV, "0"))
+            except Exception:
+                sim_workers = 0
+        self.sim_workers = max(0, int(sim_workers))
+        self._sim_shards: ShardedPlayerSimulator | None = None
+        # Workers are not instrumented, so steps run in-process while controller profiling is on.
+        self._sim_shards_paused = False
+        if self.sim_workers > 0:
+            try:
+                self._sim_shards = ShardedPlayerSimulator(
+                    workers=self.sim_workers,
+                    aabbs=self.aabbs,
+                    triangles=self.collision_triangles,
+                    tuning=self.tuning,
+                    collision_world=self.collision_world_mode,
+                )
+                print(f"[ivan-server] Sharded simulation: {self.sim_workers} worker process(es)")
+            except Exception as exc:
+                print(f"[ivan-server] Sharded simulation unavailable, stepping in-process: {exc}")
+                self._sim_shards = None
 
         self._next_player_id = 1
         self._clients_by_token: dict[str, _ClientState] = {}
+        self._clients_by_session: dict[int, _ClientState] = {}
         self._tcp_clients: dict[socket.socket, bytes] = {}
+        self._tcp_out: dict[socket.socket, bytearray] = {}
+        self._tcp_pending_drop: set[socket.socket] = set()
+        # Created by run_forever; tests drive the per-step methods directly without one.
+        self._selector: selectors.BaseSelector | None = None
+        self.tick_metrics = ServerTickMetrics(tick_rate_hz=self.tick_rate_hz)
+        # Per-player controller phase profiling (`ctrl_stats`); None keeps controllers uninstrumented.
+        self.controller_profile: ControllerProfileWindow | None = (
+            ControllerProfileWindow() if controller_profile_enabled() else None
+        )
         self._tick = 0
+        # Player positions indexed once per tick (race markers, relevance); rewound grids are cached per aim tick.
+        self._player_grid = SpatialGrid(cell_size=_PLAYER_GRID_CELL)
+        self._rewind_grids: dict[tuple[int, float], SpatialGrid] = {}
         self._config_owner_token: str | None = None
         self._tuning_version: int = 1
         self._games_version: int = 0
@@ -188,9 +278,9 @@ class MultiplayerServer:
         # Match IVAN runtime default profile (surf_bhop_c2) when no explicit host tuning is provided.
         base = PhysicsTuning()
         out: dict[str, float | bool] = {}
-        for field in PhysicsTuning.__annotations__.keys():
-            value = getattr(base, field)
-            out[field] = bool(value) if isinstance(value, bool) else float(value)
+        for name in PhysicsTuning.__annotations__.keys():
+            value = getattr(base, name)
+            out[name] = bool(value) if isinstance(value, bool) else float(value)
         out.update(
             {
                 "surf_enabled": True,
@@ -223,17 +313,17 @@ class MultiplayerServer:
 
     def _tuning_snapshot(self) -> dict[str, float | bool]:
         out: dict[str, float | bool] = {}
-        for field in PhysicsTuning.__annotations__.keys():
-            value = getattr(self.tuning, field)
-            out[field] = bool(value) if isinstance(value, bool) else float(value)
+        for name in PhysicsTuning.__annotations__.keys():
+            value = getattr(self.tuning, name)
+            out[name] = bool(value) if isinstance(value, bool) else float(value)
         return out
 
     def _apply_tuning_snapshot(self, values: dict[str, float | bool] | None) -> None:
         snap = self._normalize_tuning_snapshot(values)
         if not snap:
             return
-        for field, value in snap.items():
-            setattr(self.tuning, field, value)
+        for name, value in snap.items():
+            setattr(self.tuning, name, value)
         for st in getattr(self, "_clients_by_token", {}).values():
             try:
                 st.ctrl.apply_hull_settings()
@@ -283,17 +373,38 @@ class MultiplayerServer:
         if self._closed:
             return
         self._closed = True
+        if self._sim_shards is not None:
+            self._sim_shards.close()
+            self._sim_shards = None
         if getattr(self, "console_control", None) is not None:
             try:
                 self.console_control.close()
             except Exception:
                 pass
+        if self._selector is not None:
+            try:
+                self._selector.close()
+            except Exception:
+                pass
+            self._selector = None
         for cs in list(self._tcp_clients.keys()):
             self._safe_close_socket(cs)
         self._tcp_clients.clear()
+        self._tcp_out.clear()
+        self._tcp_pending_drop.clear()
         self._clients_by_token.clear()
         self._safe_close_socket(self._tcp_listener)
         self._safe_close_socket(self._udp_sock)
+        self._close_geometry_blob()
+
+    def _close_geometry_blob(self) -> None:
+        blob = self._geometry_blob
+        if blob is None:
+            return
+        self._geometry_blob = None
+        if isinstance(self.collision_triangles, TriangleRows):
+            self.collision_triangles = None
+        blob.close()
 
     def _load_map_bundle(self) -> None:
         self._relevance = None
@@ -347,6 +458,15 @@ class MultiplayerServer:
                     self._world_bounds_min = None
                     self._world_bounds_max = None
 
+        self._close_geometry_blob()
+        geometry = open_bundle_geometry(map_json=payload_path, payload=payload)
+        if geometry is not None:
+            self._geometry_blob = geometry
+            # Zero-copy rows over the mapped geometry.bin (Bullet copies them into its mesh).
+            rows = geometry.collision_rows()
+            self.collision_triangles = rows if len(rows) else None
+            return
+
         tris = payload.get("triangles")
         if not isinstance(tris, list) or not tris:
             return
@@ -631,6 +751,8 @@ class MultiplayerServer:
         target_spawn = self._spawn_point_for_player(player_id=int(st.player_id))
         st.ctrl.spawn_point = LVector3f(target_spawn)
         st.ctrl.respawn()
+        st.rewind_history.mark_discontinuity()
+        self._rewind_grids.clear()
         st.yaw = float(self._spawn_yaw_for_player(player_id=int(st.player_id)))
         st.pitch = 0.0
         st.hp = 100
@@ -639,11 +761,19 @@ class MultiplayerServer:
             st.void_stuck_s = 0.0
 
     def _make_controller(self, *, spawn_point: LVector3f | None = None) -> PlayerController:
+        collision: CollisionWorld = self.collision
+        if self._triangle_index is not None:
+            collision = LocalCollisionWorld(
+                source=self.collision,
+                index=self._triangle_index,
+                player_radius=float(self.tuning.player_radius),
+                player_half_height=float(self.tuning.player_half_height),
+            )
         return PlayerController(
             tuning=self.tuning,
             spawn_point=(LVector3f(spawn_point) if spawn_point is not None else self.spawn_point),
             aabbs=self.aabbs,
-            collision=self.collision,
+            collision=collision,
         )
 
     def _accept_tcp(self) -> None:
@@ -654,130 +784,216 @@ class MultiplayerServer:
                 return
             cs.setblocking(False)
             self._tcp_clients[cs] = b""
+            if self._selector is not None:
+                self._selector.register(cs, selectors.EVENT_READ, "tcp")
 
-    def _process_tcp(self) -> None:
-        dead: list[socket.socket] = []
-        for cs, buf in list(self._tcp_clients.items()):
+    def _send_tcp(self, cs: socket.socket, data: bytes) -> bool:
+        """
+        Queue bytes for a client without blocking the tick: send what the socket takes now and
+        flush the rest on write readiness. False means the client is gone or hopelessly behind.
+        """
+        if cs in self._tcp_pending_drop:
+            return False
+        out = self._tcp_out.get(cs)
+        if out:
+            out += data
+        else:
             try:
-                data = cs.recv(8192)
-            except BlockingIOError:
-                continue
+                sent = cs.send(data)
+            except (BlockingIOError, InterruptedError):
+                sent = 0
             except Exception:
+                self._tcp_pending_drop.add(cs)
+                return False
+            if sent >= len(data):
+                return True
+            out = bytearray(data[sent:])
+            self._tcp_out[cs] = out
+            self._set_tcp_events(cs, write=True)
+        if len(out) > _TCP_OUT_MAX_BYTES:
+            self._tcp_pending_drop.add(cs)
+            return False
+        return True
+
+    def _flush_tcp(self, cs: socket.socket) -> None:
+        out = self._tcp_out.get(cs)
+        if not out:
+            self._set_tcp_events(cs, write=False)
+            return
+        try:
+            sent = cs.send(out)
+        except (BlockingIOError, InterruptedError):
+            return
+        except Exception:
+            self._tcp_pending_drop.add(cs)
+            return
+        del out[:sent]
+        if not out:
+            self._tcp_out.pop(cs, None)
+            self._set_tcp_events(cs, write=False)
+
+    def _set_tcp_events(self, cs: socket.socket, *, write: bool) -> None:
+        if self._selector is None:
+            return
+        events = selectors.EVENT_READ | (selectors.EVENT_WRITE if write else 0)
+        try:
+            self._selector.modify(cs, events, "tcp")
+        except Exception:
+            pass
+
+    def _drop_pending_tcp(self) -> None:
+        if not self._tcp_pending_drop:
+            return
+        for cs in list(self._tcp_pending_drop):
+            self._drop_tcp_client(cs)
+        self._tcp_pending_drop.clear()
+
+    def _process_tcp(self) -> None:
+        """Read every connected TCP client (the selector loop only reads ready sockets)."""
+        dead: list[socket.socket] = []
+        for cs in list(self._tcp_clients.keys()):
+            if not self._read_tcp_client(cs):
                 dead.append(cs)
+        for cs in dead:
+            self._drop_tcp_client(cs)
+
+    def _read_tcp_client(self, cs: socket.socket) -> bool:
+        """Receive and handle pending control lines; False means the client should be dropped."""
+        buf = self._tcp_clients.get(cs, b"")
+        try:
+            data = cs.recv(8192)
+        except BlockingIOError:
+            return True
+        except Exception:
+            return False
+        if not data:
+            return False
+        buf += data
+        alive = True
+        while b"\n" in buf:
+            line, buf = buf.split(b"\n", 1)
+            obj = decode_json_line(line)
+            if not obj:
                 continue
-            if not data:
-                dead.append(cs)
-                continue
-            buf += data
-            while b"\n" in buf:
-                line, buf = buf.split(b"\n", 1)
-                obj = decode_json_line(line)
-                if not obj:
+            t = str(obj.get("t") or "")
+            if t == "cfg":
+                st = self._client_state_by_tcp(cs)
+                if st is None:
                     continue
-                t = str(obj.get("t") or "")
-                if t == "cfg":
-                    st = self._client_state_by_tcp(cs)
-                    if st is None:
-                        continue
-                    if self._config_owner_token is None or st.token != self._config_owner_token:
-                        continue
-                    tuning_val = obj.get("tuning")
-                    if isinstance(tuning_val, dict):
-                        self._apply_tuning_snapshot(tuning_val)
-                        self._tuning_version += 1
+                if self._config_owner_token is None or st.token != self._config_owner_token:
                     continue
-                if t == "respawn":
-                    st = self._client_state_by_tcp(cs)
-                    if st is None:
-                        continue
-                    self._respawn_player(st=st)
+                tuning_val = obj.get("tuning")
+                if isinstance(tuning_val, dict):
+                    self._apply_tuning_snapshot(tuning_val)
+                    self._tuning_version += 1
+                continue
+            if t == "respawn":
+                st = self._client_state_by_tcp(cs)
+                if st is None:
                     continue
-                if t == "interact":
-                    st = self._client_state_by_tcp(cs)
-                    if st is None:
-                        continue
-                    events = self._race_runtime.interact(
-                        player_id=int(st.player_id),
-                        pos=LVector3f(st.ctrl.pos),
-                        now=float(self._tick) * float(self.fixed_dt),
-                    )
-                    self._append_race_events(events)
+                self._respawn_player(st=st)
+                continue
+            if t == "interact":
+                st = self._client_state_by_tcp(cs)
+                if st is None:
                     continue
-                if t == "games_set":
-                    st = self._client_state_by_tcp(cs)
-                    if st is None:
-                        continue
-                    if self._config_owner_token is None or st.token != self._config_owner_token:
-                        continue
-                    payload = obj.get("games")
-                    if isinstance(payload, dict):
-                        self._set_race_games_payload(games=payload)
+                events = self._race_runtime.interact(
+                    player_id=int(st.player_id),
+                    pos=LVector3f(st.ctrl.pos),
+                    now=float(self._tick) * float(self.fixed_dt),
+                )
+                self._append_race_events(events)
+                continue
+            if t == "games_set":
+                st = self._client_state_by_tcp(cs)
+                if st is None:
                     continue
-                if t != "hello":
+                if self._config_owner_token is None or st.token != self._config_owner_token:
                     continue
-                name = str(obj.get("name") or "player")[:24]
-                pid = self._next_player_id
-                self._next_player_id += 1
-                token = secrets.token_hex(12)
-                player_spawn = self._spawn_point_for_player(player_id=int(pid))
-                ctrl = self._make_controller(spawn_point=player_spawn)
-                st = _ClientState(
-                    player_id=pid,
-                    token=token,
-                    name=name,
-                    tcp_sock=cs,
-                    udp_addr=None,
-                    ctrl=ctrl,
-                    yaw=float(self._spawn_yaw_for_player(player_id=int(pid))),
-                    pitch=0.0,
-                    hp=100,
-                    respawn_seq=0,
-                    last_input=InputCommand(
-                        seq=0,
-                        server_tick_hint=0,
-                        look_dx=0,
-                        look_dy=0,
-                        look_scale=1,
-                        move_forward=0,
-                        move_right=0,
-                        jump_pressed=False,
-                        jump_held=False,
-                        slide_pressed=False,
-                        grapple_pressed=False,
-                    ),
-                    last_interact_seq=0,
-                    rewind_history=deque(maxlen=240),
-                )
-                self._clients_by_token[token] = st
-                if self._config_owner_token is None:
-                    self._config_owner_token = token
-                resp = {
-                    "t": "welcome",
-                    "v": PROTOCOL_VERSION,
-                    "player_id": pid,
-                    "token": token,
-                    "tick_rate": self.tick_rate_hz,
-                    "udp_port": self.udp_port,
-                    "spawn": [float(player_spawn.x), float(player_spawn.y), float(player_spawn.z)],
-                    "spawn_yaw": float(self._spawn_yaw_for_player(player_id=int(pid))),
-                    "map_json": self.map_json,
-                    "can_configure": bool(token == self._config_owner_token),
-                    "cfg_v": int(self._tuning_version),
-                    "tuning": self._tuning_snapshot(),
-                    "games_v": int(self._games_version),
-                    "games": (self._race_runtime.games_payload() if self._race_runtime.has_course() else None),
-                }
-                try:
-                    cs.sendall(encode_json(resp))
-                except Exception:
-                    dead.append(cs)
-            self._tcp_clients[cs] = buf
-
-        for cs in dead:
-            self._drop_tcp_client(cs)
+                payload = obj.get("games")
+                if isinstance(payload, dict):
+                    self._set_race_games_payload(games=payload)
+                continue
+            if t != "hello":
+                continue
+            name = str(obj.get("name") or "player")[:24]
+            try:
+                client_v = int(obj.get("v") or PROTOCOL_VERSION_JSON)
+            except Exception:
+                client_v = PROTOCOL_VERSION_JSON
+            proto = PROTOCOL_VERSION if client_v >= PROTOCOL_VERSION else PROTOCOL_VERSION_JSON
+            pid = self._next_player_id
+            self._next_player_id += 1
+            token = secrets.token_hex(12)
+            session_id = self._new_session_id() if proto >= PROTOCOL_VERSION else 0
+            player_spawn = self._spawn_point_for_player(player_id=int(pid))
+            ctrl = self._make_controller(spawn_point=player_spawn)
+            st = _ClientState(
+                player_id=pid,
+                token=token,
+                name=name,
+                tcp_sock=cs,
+                udp_addr=None,
+                ctrl=ctrl,
+                yaw=float(self._spawn_yaw_for_player(player_id=int(pid))),
+                pitch=0.0,
+                hp=100,
+                respawn_seq=0,
+                last_input=InputCommand(
+                    seq=0,
+                    server_tick_hint=0,
+                    look_dx=0,
+                    look_dy=0,
+                    look_scale=1,
+                    move_forward=0,
+                    move_right=0,
+                    jump_pressed=False,
+                    jump_held=False,
+                    slide_pressed=False,
+                    grapple_pressed=False,
+                ),
+                last_interact_seq=0,
+                rewind_history=RewindHistory(capacity=self._rewind_capacity),
+                proto=int(proto),
+                session_id=int(session_id),
+                sent_cfg_v=int(self._tuning_version),
+                sent_games_v=int(self._games_version),
+            )
+            self._clients_by_token[token] = st
+            if session_id:
+                self._clients_by_session[int(session_id)] = st
+            if self._config_owner_token is None:
+                self._config_owner_token = token
+            resp = {
+                "t": "welcome",
+                "v": int(proto),
+                "player_id": pid,
+                "token": token,
+                "sid": int(session_id),
+                "tick_rate": self.tick_rate_hz,
+                "udp_port": self.udp_port,
+                "spawn": [float(player_spawn.x), float(player_spawn.y), float(player_spawn.z)],
+                "spawn_yaw": float(self._spawn_yaw_for_player(player_id=int(pid))),
+                "map_json": self.map_json,
+                "can_configure": bool(token == self._config_owner_token),
+                "cfg_v": int(self._tuning_version),
+                "tuning": self._tuning_snapshot(),
+                "games_v": int(self._games_version),
+                "games": (self._race_runtime.games_payload() if self._race_runtime.has_course() else None),
+            }
+            if not self._send_tcp(cs, encode_json(resp)):
+                alive = False
+        self._tcp_clients[cs] = buf
+        return alive
 
     def _drop_tcp_client(self, cs: socket.socket) -> None:
         self._tcp_clients.pop(cs, None)
+        self._tcp_out.pop(cs, None)
+        if self._selector is not None:
+            try:
+                self._selector.unregister(cs)
+            except Exception:
+                pass
         token_to_drop = None
         for token, st in self._clients_by_token.items():
             if st.tcp_sock is cs:
@@ -785,6 +1001,8 @@ class MultiplayerServer:
                 break
         if token_to_drop is not None:
             st = self._clients_by_token.pop(token_to_drop, None)
+            if st is not None and st.session_id:
+                self._clients_by_session.pop(int(st.session_id), None)
             if token_to_drop == self._config_owner_token:
                 self._config_owner_token = None
             if st is not None:
@@ -794,6 +1012,12 @@ class MultiplayerServer:
         except Exception:
             pass
 
+    def _new_session_id(self) -> int:
+        while True:
+            sid = secrets.randbits(32)
+            if sid and sid not in self._clients_by_session:
+                return int(sid)
+
     def _process_udp(self) -> None:
         while True:
             try:
@@ -802,16 +1026,48 @@ class MultiplayerServer:
                 return
             except Exception:
                 return
-            parsed = decode_input_packet(payload)
-            if not parsed:
-                continue
-            token, cmd = parsed
-            st = self._clients_by_token.get(token)
+            if is_binary_input(payload):
+                parsed_v3 = decode_input_packet_v3(payload)
+                if not parsed_v3:
+                    continue
+                session_id, cmds = parsed_v3
+                st = self._clients_by_session.get(int(session_id))
+            else:
+                parsed = decode_input_packet(payload)
+                if not parsed:
+                    continue
+                token, cmd = parsed
+                st = self._clients_by_token.get(token)
+                cmds = [cmd]
             if st is None:
                 continue
             st.udp_addr = addr
-            if int(cmd.seq) >= int(st.last_input.seq):
-                st.last_input = cmd
+            self._enqueue_inputs(st, cmds)
+
+    def _enqueue_inputs(self, st: _ClientState, cmds: list[InputCommand]) -> None:
+        """Queue commands not seen yet (redundant copies of older seqs are skipped)."""
+        for cmd in cmds:
+            if int(st.snapshot_ack) < int(cmd.snapshot_ack) <= int(self._tick):
+                st.snapshot_ack = int(cmd.snapshot_ack)
+            if int(cmd.seq) <= int(st.input_seq):
+                continue
+            st.input_seq = int(cmd.seq)
+            st.input_queue.append(cmd)
+        while len(st.input_queue) > _INPUT_QUEUE_MAX:
+            st.input_queue.popleft()
+
+    @staticmethod
+    def _next_input(st: _ClientState) -> InputCommand:
+        """
+        Pop the next queued command. When the queue ran dry, keep held buttons/axes from the last
+        command but drop its look delta and press edges so they are not applied twice.
+        """
+        if st.input_queue:
+            return st.input_queue.popleft()
+        last = st.last_input
+        if not (last.look_dx or last.look_dy or last.jump_pressed or last.grapple_pressed or last.interact_pressed):
+            return last
+        return replace(last, look_dx=0, look_dy=0, jump_pressed=False, grapple_pressed=False, interact_pressed=False)
 
     def _wish_from_axes(self, *, yaw_deg: float, move_forward: int, move_right: int) -> LVector3f:
         h = math.radians(float(yaw_deg))
@@ -861,17 +1117,24 @@ class MultiplayerServer:
             t = t1
         return t
 
-    def _history_pos_for_tick(self, target: _ClientState, *, tick: int) -> LVector3f:
-        if not target.rewind_history:
-            return LVector3f(target.ctrl.pos)
-        best = target.rewind_history[-1][1]
-        best_dt = abs(int(target.rewind_history[-1][0]) - int(tick))
-        for t, p in target.rewind_history:
-            d = abs(int(t) - int(tick))
-            if d < best_dt:
-                best_dt = d
-                best = p
-        return LVector3f(best)
+    def _history_pos_for_tick(self, target: _ClientState, *, tick: float) -> tuple[float, float, float]:
+        pos = target.rewind_history.position_at(tick, max_rewind_ticks=self.max_rewind_ticks)
+        if pos is None:
+            cur = target.ctrl.pos
+            return (float(cur.x), float(cur.y), float(cur.z))
+        return pos
+
+    def _rewound_player_grid(self, *, aim_tick: float) -> SpatialGrid:
+        key = (int(self._tick), float(aim_tick))
+        grid = self._rewind_grids.get(key)
+        if grid is None:
+            grid = SpatialGrid(cell_size=_PLAYER_GRID_CELL)
+            grid.rebuild(
+                (int(other.player_id), *self._history_pos_for_tick(other, tick=aim_tick))
+                for other in self._clients_by_token.values()
+            )
+            self._rewind_grids[key] = grid
+        return grid
 
     def _grapple_or_damage(self, st: _ClientState) -> None:
         if st.hp <= 0:
@@ -885,12 +1148,28 @@ class MultiplayerServer:
         nearest_player_t = None
         nearest_player: _ClientState | None = None
         hit_radius = float(self.tuning.player_radius) * 1.1
-        aim_tick = int(st.last_input.server_tick_hint) if int(st.last_input.server_tick_hint) > 0 else int(self._tick)
-        for other in self._clients_by_token.values():
-            if other is st:
+        center_dz = float(self.tuning.player_half_height) * 0.5
+        # Rewind to the (fractional) tick the shooter saw remote players at: its snapshot tick minus the
+        # interpolation delay it rendered with.
+        hint = int(st.last_input.server_tick_hint)
+        aim_tick = float(hint) - float(st.last_input.view_delay_ticks) if hint > 0 else float(self._tick)
+        # Broad phase: AABB of the shot segment grown by the hit radius (plus slack for float32 rounding in the
+        # exact test); only rewound centers inside it get the exact ray/sphere test.
+        ox, oy, oz = float(origin.x), float(origin.y), float(origin.z)
+        ex, ey, ez = ox + float(direction.x) * reach, oy + float(direction.y) * reach, oz + float(direction.z) * reach
+        pad = hit_radius + 1e-3
+        min_x, max_x = min(ox, ex) - pad, max(ox, ex) + pad
+        min_y, max_y = min(oy, ey) - pad, max(oy, ey) + pad
+        min_z, max_z = min(oz, ez) - pad, max(oz, ez) + pad
+        grid = self._rewound_player_grid(aim_tick=aim_tick)
+        clients_by_id = {int(other.player_id): other for other in self._clients_by_token.values()}
+        # Grid points are feet positions; shift the box instead of every point.
+        for pid in grid.query_box((min_x, min_y, min_z - center_dz), (max_x, max_y, max_z - center_dz)):
+            other = clients_by_id.get(pid)
+            if other is None or other is st:
                 continue
-            rewound = self._history_pos_for_tick(other, tick=aim_tick)
-            center = LVector3f(rewound.x, rewound.y, rewound.z + float(self.tuning.player_half_height) * 0.5)
+            rx, ry, rz = grid.point(pid)
+            center = LVector3f(rx, ry, rz + center_dz)
             t = self._ray_sphere_t(origin=origin, direction=direction, center=center, radius=hit_radius)
             if t is None:
                 continue
@@ -925,6 +1204,10 @@ class MultiplayerServer:
     def _simulate_tick(self) -> None:
         self._tick += 1
         now_s = float(self._tick) * float(self.fixed_dt)
+        self._rewind_grids.clear()
+
+        for st in self._clients_by_token.values():
+            st.last_input = self._next_input(st)
 
         for st in self._clients_by_token.values():
             cmd = st.last_input
@@ -949,8 +1232,13 @@ class MultiplayerServer:
             st.ctrl.pos = LVector3f(safe_tp)
             st.ctrl.spawn_point = LVector3f(safe_tp)
             st.ctrl.vel = LVector3f(0.0, 0.0, 0.0)
+            st.rewind_history.mark_discontinuity()
+            self._rewind_grids.clear()
         race_active = self._race_runtime.status in {"lobby", "intro", "countdown", "running"}
 
+        # Resolve look/intent/combat for everyone first, then step all movement (in-process or sharded),
+        # then run respawn/rewind bookkeeping. Both simulation modes share this order, so they match exactly.
+        step_jobs: list[tuple[_ClientState, PlayerStepJob]] = []
         for st in self._clients_by_token.values():
             cmd = st.last_input
             st.yaw -= (float(cmd.look_dx) / float(max(1, int(cmd.look_scale)))) * float(self.tuning.mouse_sensitivity)
@@ -978,16 +1266,23 @@ class MultiplayerServer:
                     move_forward=int(cmd.move_forward),
                     move_right=int(cmd.move_right),
                 )
-                st.ctrl.step_with_intent(
-                    dt=self.fixed_dt,
-                    intent=MotionIntent(
-                        wish_dir=LVector3f(wish),
-                        jump_requested=bool(jump_requested),
-                        slide_requested=bool(cmd.slide_pressed),
-                    ),
-                    yaw_deg=st.yaw,
-                    pitch_deg=st.pitch,
+                job = PlayerStepJob(
+                    player_id=int(st.player_id),
+                    state=None,
+                    wish=(float(wish.x), float(wish.y), float(wish.z)),
+                    jump_requested=bool(jump_requested),
+                    slide_requested=bool(cmd.slide_pressed),
+                    yaw_deg=float(st.yaw),
+                    pitch_deg=float(st.pitch),
                 )
+                step_jobs.append((st, job))
+        self._step_players(step_jobs)
+        self.tick_metrics.record_sweeps(
+            sweeps=sum(int(getattr(st.ctrl, "last_step_sweeps", 0)) for st, _ in step_jobs),
+            cache_hits=sum(int(getattr(st.ctrl, "last_step_sweep_hits", 0)) for st, _ in step_jobs),
+        )
+
+        for st in self._clients_by_token.values():
             if float(st.ctrl.pos.z) < float(self.kill_z):
                 self._respawn_player(st=st, reset_void_stuck=True)
             elif self._is_probably_void_stuck(st):
@@ -1000,13 +1295,68 @@ class MultiplayerServer:
                     self._respawn_player(st=st, reset_void_stuck=True)
             else:
                 st.void_stuck_s = 0.0
-            st.rewind_history.append((int(self._tick), LVector3f(st.ctrl.pos)))
-        events = self._race_runtime.tick(
-            now=float(now_s),
-            player_positions={int(st.player_id): LVector3f(st.ctrl.pos) for st in self._clients_by_token.values()},
-        )
+            pos = st.ctrl.pos
+            st.rewind_history.record(int(self._tick), pos.x, pos.y, pos.z)
+        positions = {int(st.player_id): LVector3f(st.ctrl.pos) for st in self._clients_by_token.values()}
+        self._player_grid.rebuild((pid, p.x, p.y, p.z) for pid, p in positions.items())
+        events = self._race_runtime.tick(now=float(now_s), player_positions=positions, player_index=self._player_grid)
         self._append_race_events(events)
 
+    def set_controller_profiling(self, enabled: bool) -> None:
+        if not enabled:
+            self.controller_profile = None
+            for st in self._clients_by_token.values():
+                st.ctrl.profiler = None
+        elif self.controller_profile is None:
+            self.controller_profile = ControllerProfileWindow()
+
+    def _step_players(self, jobs: list[tuple[_ClientState, PlayerStepJob]]) -> None:
+        profile = self.controller_profile
+        if profile is not None:
+            for st, _ in jobs:
+                if st.ctrl.profiler is None:
+                    st.ctrl.profiler = ControllerProfiler()
+        if self._sim_shards is not None and (profile is not None) != self._sim_shards_paused:
+            self._sim_shards_paused = profile is not None
+            if self._sim_shards_paused:
+                print("[ivan-server] Controller profiling on: stepping players in-process until ctrl_stats off")
+            else:
+                print(f"[ivan-server] Controller profiling off: sharded simulation resumed ({self.sim_workers} workers)")
+        if self._sim_shards is not None and not self._sim_shards_paused and jobs:
+            try:
+                self._sim_shards.sync_tuning(self.tuning)
+                states = self._sim_shards.step(
+                    dt=self.fixed_dt,
+                    jobs=[replace(job, state=st.ctrl.capture_state()) for st, job in jobs],
+                )
+                for st, job in jobs:
+                    st.ctrl.restore_state(states[int(job.player_id)])
+                return
+            except Exception as exc:
+                # Controllers are untouched until every worker answered, so stepping locally is still exact.
+                print(f"[ivan-server] Sharded simulation failed, falling back to in-process: {exc}")
+                self._sim_shards.close()
+                self._sim_shards = None
+        for st, job in jobs:
+            step_player(
+                st.ctrl,
+                dt=self.fixed_dt,
+                wish=LVector3f(*job.wish),
+                jump_requested=job.jump_requested,
+                slide_requested=job.slide_requested,
+                yaw_deg=job.yaw_deg,
+                pitch_deg=job.pitch_deg,
+            )
+            if profile is not None:
+                profile.record(st.ctrl.profiler.last)
+
+    def _current_player_grid(self, positions: dict[int, LVector3f]) -> SpatialGrid:
+        # Reuse the tick's player grid; joins/respawns between the tick and the snapshot force a refresh.
+        grid = self._player_grid
+        if len(grid) != len(positions) or any(grid.point(pid) != (p.x, p.y, p.z) for pid, p in positions.items()):
+            grid.rebuild((pid, p.x, p.y, p.z) for pid, p in positions.items())
+        return grid
+
     def _snapshot_players(self) -> tuple[list[int], dict[int, dict], dict[int, LVector3f], dict[int, int | None]]:
         ordered_ids: list[int] = []
         rows_by_id: dict[int, dict] = {}
@@ -1039,83 +1389,171 @@ class MultiplayerServer:
         ordered_ids.sort()
         return (ordered_ids, rows_by_id, positions_by_id, leaves_by_id)
 
+    def _push_reliable_state(self, st: _ClientState, *, games: dict | None, game_state: dict | None) -> None:
+        """Send tuning/games/race state to a v3 client over TCP, only when it changed since the last push."""
+        msgs: list[bytes] = []
+        if int(st.sent_cfg_v) != int(self._tuning_version):
+            msgs.append(
+                encode_json({"t": "cfg_push", "cfg_v": int(self._tuning_version), "tuning": self._tuning_snapshot()})
+            )
+            st.sent_cfg_v = int(self._tuning_version)
+        if int(st.sent_games_v) != int(self._games_version):
+            msgs.append(encode_json({"t": "games_push", "games_v": int(self._games_version), "games": games}))
+            st.sent_games_v = int(self._games_version)
+            # The event ring restarts with every games version.
+            st.sent_event_seq = 0
+            st.sent_game_state = b""
+        if isinstance(game_state, dict):
+            state_line = encode_json({"t": "state", "game_state": game_state})
+            if state_line != st.sent_game_state:
+                msgs.append(state_line)
+                st.sent_game_state = state_line
+        events = [ev for ev in self._race_event_ring if int(ev.get("seq") or 0) > int(st.sent_event_seq)][-48:]
+        if events:
+            msgs.append(encode_json({"t": "events", "events": events}))
+            st.sent_event_seq = int(events[-1].get("seq") or 0)
+        if msgs:
+            self._send_tcp(st.tcp_sock, b"".join(msgs))
+
+    def _encode_delta_snapshot(self, st: _ClientState, *, records: list[PlayerSnapshotRecord]) -> bytes:
+        history = st.snapshot_history
+        base_tick = int(st.snapshot_ack)
+        baseline = history.get(base_tick) if base_tick > 0 else None
+        pkt = encode_snapshot_packet_v3(
+            tick=self._tick,
+            records=records,
+            baseline_tick=(base_tick if baseline is not None else 0),
+            baseline=baseline,
+        )
+        history[int(self._tick)] = {int(rec.id): rec for rec in records}
+        for old_tick in [t for t in history if t < base_tick]:
+            del history[old_tick]
+        while len(history) > _SNAPSHOT_BASELINE_HISTORY:
+            del history[next(iter(history))]
+        return pkt
+
     def _broadcast_snapshot(self) -> None:
+        t0 = time.perf_counter()
         ordered_ids, rows_by_id, positions_by_id, leaves_by_id = self._snapshot_players()
         if not ordered_ids:
             return
+        send_s = 0.0
+        sent_bytes = 0
+        sent_packets = 0
 
-        all_players = [rows_by_id[int(pid)] for pid in ordered_ids if int(pid) in rows_by_id]
         games_payload = self._race_runtime.games_payload() if self._race_runtime.has_course() else None
         game_state_payload: dict | None = None
         if self._race_runtime.has_course():
             game_state_payload = {"race": self._race_runtime.export_state_payload()}
         game_events_payload = list(self._race_event_ring)[-48:] if self._race_event_ring else None
-        packet_cache: dict[tuple[int, ...], bytes] = {
-            tuple(int(pid) for pid in ordered_ids): encode_snapshot_packet(
-                tick=self._tick,
-                players=all_players,
-                cfg_v=int(self._tuning_version),
-                tuning=self._tuning_snapshot(),
-                games_v=int(self._games_version),
-                games=games_payload,
-                game_state=game_state_payload,
-                game_events=game_events_payload,
-            )
-        }
+        packet_cache: dict[tuple[int, ...], bytes] = {}
+        records_by_id: dict[int, PlayerSnapshotRecord] | None = None
+        relevant_by_viewer: dict[int, list[int]] | None = None
         for st in self._clients_by_token.values():
+            if int(st.proto) >= PROTOCOL_VERSION:
+                self._push_reliable_state(st, games=games_payload, game_state=game_state_payload)
             if st.udp_addr is None:
                 continue
             key_ids = tuple(int(pid) for pid in ordered_ids)
             if self._relevance is not None and len(ordered_ids) > 1:
-                visible_ids = self._relevance.relevant_player_ids(
-                    viewer_player_id=int(st.player_id),
-                    ordered_player_ids=list(ordered_ids),
-                    positions_by_player_id=positions_by_id,
-                    leaves_by_player_id=leaves_by_id,
-                )
-                key_ids = tuple(int(pid) for pid in visible_ids)
-            pkt = packet_cache.get(key_ids)
-            if pkt is None:
-                players = [rows_by_id[int(pid)] for pid in key_ids if int(pid) in rows_by_id]
-                pkt = encode_snapshot_packet(
-                    tick=self._tick,
-                    players=players,
-                    cfg_v=int(self._tuning_version),
-                    tuning=self._tuning_snapshot(),
-                    games_v=int(self._games_version),
-                    games=games_payload,
-                    game_state=game_state_payload,
-                    game_events=game_events_payload,
+                if relevant_by_viewer is None:
+                    relevant_by_viewer = self._relevance.relevant_player_ids_by_viewer(
+                        ordered_player_ids=list(ordered_ids),
+                        positions_by_player_id=positions_by_id,
+                        leaves_by_player_id=leaves_by_id,
+                        grid=self._current_player_grid(positions_by_id),
+                    )
+                key_ids = tuple(relevant_by_viewer.get(int(st.player_id), key_ids))
+            if int(st.proto) >= PROTOCOL_VERSION:
+                if records_by_id is None:
+                    records_by_id = {int(pid): quantize_player_row(row) for pid, row in rows_by_id.items()}
+                pkt = self._encode_delta_snapshot(
+                    st,
+                    records=[records_by_id[int(pid)] for pid in key_ids if int(pid) in records_by_id],
                 )
-                packet_cache[key_ids] = pkt
+            else:
+                pkt = packet_cache.get(key_ids)
+                if pkt is None:
+                    players = [rows_by_id[int(pid)] for pid in key_ids if int(pid) in rows_by_id]
+                    pkt = encode_snapshot_packet(
+                        tick=self._tick,
+                        players=players,
+                        cfg_v=int(self._tuning_version),
+                        tuning=self._tuning_snapshot(),
+                        games_v=int(self._games_version),
+                        games=games_payload,
+                        game_state=game_state_payload,
+                        game_events=game_events_payload,
+                    )
+                    packet_cache[key_ids] = pkt
+            t_send = time.perf_counter()
             try:
                 self._udp_sock.sendto(pkt, st.udp_addr)
+                sent_bytes += len(pkt)
+                sent_packets += 1
             except Exception:
                 pass
+            send_s += time.perf_counter() - t_send
+        self.tick_metrics.record_snapshot(
+            encode_s=time.perf_counter() - t0 - send_s,
+            bytes_sent=sent_bytes,
+            packets=sent_packets,
+        )
+
+    def _open_selector(self) -> selectors.BaseSelector:
+        sel = selectors.DefaultSelector()
+        sel.register(self._tcp_listener, selectors.EVENT_READ, "accept")
+        sel.register(self._udp_sock, selectors.EVENT_READ, "udp")
+        for cs in self._tcp_clients.keys():
+            events = selectors.EVENT_READ | (selectors.EVENT_WRITE if self._tcp_out.get(cs) else 0)
+            sel.register(cs, events, "tcp")
+        self._selector = sel
+        return sel
+
+    def _service_io(self, *, timeout_s: float) -> None:
+        """Wait up to `timeout_s` for socket readiness and handle only the sockets that are ready."""
+        sel = self._selector
+        if sel is None:
+            return
+        for key, mask in sel.select(timeout=max(0.0, float(timeout_s))):
+            kind = key.data
+            if kind == "udp":
+                self._process_udp()
+            elif kind == "accept":
+                self._accept_tcp()
+            elif kind == "tcp":
+                cs = key.fileobj
+                if mask & selectors.EVENT_READ and not self._read_tcp_client(cs):
+                    self._tcp_pending_drop.add(cs)
+                    continue
+                if mask & selectors.EVENT_WRITE:
+                    self._flush_tcp(cs)
+        self._drop_pending_tcp()
 
     def run_forever(self, *, stop_event: threading.Event | None = None) -> None:
         print(f"[ivan-server] TCP {self.host}:{self.tcp_port} | UDP {self.host}:{self.udp_port}")
+        self._open_selector()
         t_next_tick = time.monotonic()
         t_next_snap = time.monotonic()
         try:
             while True:
                 if stop_event is not None and stop_event.is_set():
                     break
-                self._accept_tcp()
-                self._process_tcp()
-                self._process_udp()
+                # Sleep in the selector until a socket is ready or the next tick/snapshot is due.
+                # The cap keeps stop_event responsive for embedded hosts.
+                wait_s = min(t_next_tick, t_next_snap) - time.monotonic()
+                self._service_io(timeout_s=min(0.05, wait_s))
 
                 now = time.monotonic()
                 while now >= t_next_tick:
+                    t0 = time.perf_counter()
                     self._simulate_tick()
+                    self.tick_metrics.record_tick(duration_s=time.perf_counter() - t0, late_s=now - t_next_tick)
                     t_next_tick += self.fixed_dt
                 if now >= t_next_snap:
                     self._broadcast_snapshot()
+                    self._drop_pending_tcp()
                     t_next_snap += self.snapshot_dt
-
-                sleep_for = min(t_next_tick, t_next_snap) - time.monotonic()
-                if sleep_for > 0.0:
-                    time.sleep(min(0.002, sleep_for))
         finally:
             self.close()
 
@@ -1132,6 +1570,8 @@ class EmbeddedHostServer:
         initial_spawn: tuple[float, float, float] | None = None,
         initial_spawn_yaw: float | None = None,
         initial_race_course: RaceCourse | None = None,
+        sim_workers: int | None = None,
+        collision_world: str | None = None,
     ) -> None:
         self._srv = MultiplayerServer(
             host=host,
@@ -1142,6 +1582,8 @@ class EmbeddedHostServer:
             initial_spawn=initial_spawn,
             initial_spawn_yaw=initial_spawn_yaw,
             initial_race_course=initial_race_course,
+            sim_workers=sim_workers,
+            collision_world=collision_world,
         )
         self._stop = threading.Event()
         self._thread = threading.Thread(
@@ -1151,6 +1593,10 @@ class EmbeddedHostServer:
             name="ivan-embedded-host",
         )
 
+    @property
+    def server(self) -> MultiplayerServer:
+        return self._srv
+
     def start(self) -> None:
         self._thread.start()
 
@@ -1170,6 +1616,8 @@ def run_server(
     initial_spawn: tuple[float, float, float] | None = None,
     initial_spawn_yaw: float | None = None,
     initial_race_course: RaceCourse | None = None,
+    sim_workers: int | None = None,
+    collision_world: str | None = None,
 ) -> None:
     srv = MultiplayerServer(
         host=host,
@@ -1180,5 +1628,7 @@ def run_server(
         initial_spawn=initial_spawn,
         initial_spawn_yaw=initial_spawn_yaw,
         initial_race_course=initial_race_course,
+        sim_workers=sim_workers,
+        collision_world=collision_world,
     )
     srv.run_forever()
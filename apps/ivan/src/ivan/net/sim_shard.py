@@ -0,0 +1,202 @@
+"""Optional multi-process player simulation for the dedicated server.
+
+With `sim_workers > 0` the server hands the movement step of each tick to worker processes. Every worker owns
+its own copy of the static `CollisionWorld` (built from the same map AABBs/triangles) plus one scratch
+`PlayerController`. Per tick the main process sends each worker a contiguous slice of step jobs (packed
+controller state + intent), the worker restores the state, steps it and sends the new state back.
+
+Workers hold no per-player state between ticks, so partitions can change freely when players join/leave, and
+stepping a restored controller is identical to stepping it in-process. The main process stays authoritative
+for everything else (race logic, combat, respawns, snapshots).
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+from collections.abc import Sequence
+from dataclasses import dataclass
+
+from panda3d.core import LVector3f, NodePath, PandaNode
+
+from ivan.common.aabb import AABB
+from ivan.physics.collision_world import CollisionWorld
+from ivan.physics.controller_snapshot import ControllerState
+from ivan.physics.local_collision import LocalCollisionWorld, TriangleGrid
+from ivan.physics.player_controller import PlayerController
+from ivan.physics.player_step import step_player
+from ivan.physics.tuning import PhysicsTuning
+
+SIM_WORKERS_ENV = "IRUN_IVAN_SERVER_SIM_WORKERS"
+
+
+@dataclass(frozen=True)
+class PlayerStepJob:
+    """One player's movement step for a tick: controller state going in plus the resolved intent."""
+
+    player_id: int
+    state: ControllerState | None
+    wish: tuple[float, float, float]
+    jump_requested: bool
+    slide_requested: bool
+    yaw_deg: float
+    pitch_deg: float
+
+
+def _tuning_values(tuning: PhysicsTuning) -> dict:
+    return {k: getattr(tuning, k) for k in PhysicsTuning.__annotations__}
+
+
+def _apply_tuning_values(tuning: PhysicsTuning, values: dict) -> None:
+    for k, v in values.items():
+        if k in PhysicsTuning.__annotations__:
+            setattr(tuning, k, v)
+
+
+def _worker_main(
+    conn,
+    aabbs: list[AABB],
+    triangles: list[list[float]] | None,
+    tuning_values: dict,
+    collision_world: str = "full",
+) -> None:
+    tuning = PhysicsTuning()
+    _apply_tuning_values(tuning, tuning_values)
+    collision = CollisionWorld(
+        aabbs=aabbs,
+        triangles=triangles,
+        triangle_collision_mode=bool(triangles),
+        player_radius=float(tuning.player_radius),
+        player_half_height=float(tuning.player_half_height),
+        render=NodePath(PandaNode("sim-shard-root")),
+    )
+    ctrl = PlayerController(tuning=tuning, spawn_point=LVector3f(0, 0, 0), aabbs=aabbs, collision=collision)
+    # Local collision worlds follow their player, so the worker keeps one per player it has stepped.
+    triangle_index = TriangleGrid(triangles) if collision_world == "local" and triangles else None
+    local_worlds: dict[int, LocalCollisionWorld] = {}
+    while True:
+        try:
+            msg = conn.recv()
+        except (EOFError, OSError):
+            return
+        kind = msg[0]
+        if kind == "close":
+            return
+        if kind == "tuning":
+            _apply_tuning_values(tuning, msg[1])
+            # Hull-derived caches (ground probe ring) are not shipped with player state; rebuild them here.
+            ctrl.apply_hull_settings()
+            continue
+        if kind != "step":
+            continue
+        dt = float(msg[1])
+        out: list[tuple[int, ControllerState]] = []
+        if len(local_worlds) > 2 * len(msg[2]) + 16:
+            # Drop worlds of players that left or moved to another worker.
+            active = {int(job.player_id) for job in msg[2]}
+            local_worlds = {pid: w for pid, w in local_worlds.items() if pid in active}
+        for job in msg[2]:
+            if triangle_index is not None:
+                local = local_worlds.get(int(job.player_id))
+                if local is None:
+                    local = LocalCollisionWorld(
+                        source=collision,
+                        index=triangle_index,
+                        player_radius=float(tuning.player_radius),
+                        player_half_height=float(tuning.player_half_height),
+                    )
+                    local_worlds[int(job.player_id)] = local
+                ctrl.collision = local
+            ctrl.restore_state(job.state)
+            step_player(
+                ctrl,
+                dt=dt,
+                wish=LVector3f(*job.wish),
+                jump_requested=job.jump_requested,
+                slide_requested=job.slide_requested,
+                yaw_deg=job.yaw_deg,
+                pitch_deg=job.pitch_deg,
+            )
+            out.append((int(job.player_id), ctrl.capture_state()))
+        conn.send(out)
+
+
+class ShardedPlayerSimulator:
+    """Pool of worker processes stepping partitions of players against private collision worlds."""
+
+    def __init__(
+        self,
+        *,
+        workers: int,
+        aabbs: list[AABB],
+        triangles: Sequence[Sequence[float]] | None,
+        tuning: PhysicsTuning,
+        collision_world: str = "full",
+    ) -> None:
+        self.workers = max(1, int(workers))
+        # geometry.bin rows are memoryviews over the server's mapping and cannot be pickled; ship float lists.
+        rows = [[float(x) for x in t] for t in triangles] if triangles else None
+        self._tuning_values = _tuning_values(tuning)
+        self._tuning_version = tuning.version
+        # Spawn keeps workers independent of the server's sockets/threads (and matches Windows behaviour).
+        ctx = multiprocessing.get_context("spawn")
+        self._conns = []
+        self._procs = []
+        for i in range(self.workers):
+            parent, child = ctx.Pipe()
+            proc = ctx.Process(
+                target=_worker_main,
+                args=(child, list(aabbs), rows, dict(self._tuning_values), str(collision_world)),
+                daemon=True,
+                name=f"ivan-sim-shard-{i}",
+            )
+            proc.start()
+            child.close()
+            self._conns.append(parent)
+            self._procs.append(proc)
+
+    def sync_tuning(self, tuning: PhysicsTuning) -> None:
+        if tuning.version == self._tuning_version:
+            return
+        self._tuning_version = tuning.version
+        values = _tuning_values(tuning)
+        if values == self._tuning_values:
+            return
+        self._tuning_values = values
+        for conn in self._conns:
+            conn.send(("tuning", values))
+
+    def step(self, *, dt: float, jobs: list[PlayerStepJob]) -> dict[int, ControllerState]:
+        """Step all jobs; contiguous slices go to workers in order. Returns the new controller state by player id."""
+
+        if not jobs:
+            return {}
+        n = min(self.workers, len(jobs))
+        per, extra = divmod(len(jobs), n)
+        start = 0
+        for i in range(n):
+            end = start + per + (1 if i < extra else 0)
+            self._conns[i].send(("step", float(dt), jobs[start:end]))
+            start = end
+        out: dict[int, ControllerState] = {}
+        for i in range(n):
+            for pid, state in self._conns[i].recv():
+                out[int(pid)] = state
+        return out
+
+    def close(self) -> None:
+        for conn in self._conns:
+            try:
+                conn.send(("close",))
+            except Exception:
+                pass
+        for proc in self._procs:
+            proc.join(timeout=1.0)
+            if proc.is_alive():
+                proc.terminate()
+        for conn in self._conns:
+            try:
+                conn.close()
+            except Exception:
+                pass
+        self._conns = []
+        self._procs = []
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+from collections import deque
+
+
+class ServerTickMetrics:
+    """
+    Rolling server tick timing: per-tick work duration, budget overruns and p99, plus snapshot encode cost and
+    player collision sweep counts.
+    """
+
+    def __init__(self, *, tick_rate_hz: int, window_ticks: int = 600) -> None:
+        self.budget_ms = 1000.0 / float(max(1, int(tick_rate_hz)))
+        self.reset(window_ticks=window_ticks)
+
+    def reset(self, *, window_ticks: int | None = None) -> None:
+        window = max(1, int(window_ticks)) if window_ticks is not None else self._tick_ms.maxlen
+        self._tick_ms: deque[float] = deque(maxlen=window)
+        self.ticks = 0
+        self.overruns = 0
+        self.late_ticks = 0
+        self.max_tick_ms = 0.0
+        self._snapshot_ms: deque[float] = deque(maxlen=window)
+        self.snapshots = 0
+        self.snapshot_bytes = 0
+        self.snapshot_packets = 0
+        self._sweeps: deque[int] = deque(maxlen=window)
+        self.sweeps = 0
+        self.sweep_cache_hits = 0
+
+    def record_tick(self, *, duration_s: float, late_s: float = 0.0) -> None:
+        ms = max(0.0, float(duration_s)) * 1000.0
+        self._tick_ms.append(ms)
+        self.ticks += 1
+        self.max_tick_ms = max(self.max_tick_ms, ms)
+        if ms > self.budget_ms:
+            self.overruns += 1
+        # Started more than a full tick behind schedule (loop stalled or catching up).
+        if float(late_s) * 1000.0 > self.budget_ms:
+            self.late_ticks += 1
+
+    def record_snapshot(self, *, encode_s: float, bytes_sent: int, packets: int) -> None:
+        """One snapshot broadcast: time spent building packets (socket sends excluded) and UDP payload sent."""
+        self._snapshot_ms.append(max(0.0, float(encode_s)) * 1000.0)
+        self.snapshots += 1
+        self.snapshot_bytes += max(0, int(bytes_sent))
+        self.snapshot_packets += max(0, int(packets))
+
+    def record_sweeps(self, *, sweeps: int, cache_hits: int) -> None:
+        """Collision sweeps issued by all player steps of one tick, and how many were answered from the memo."""
+        n = max(0, int(sweeps))
+        self._sweeps.append(n)
+        self.sweeps += n
+        self.sweep_cache_hits += max(0, int(cache_hits))
+
+    @staticmethod
+    def _percentile(samples: deque[float], q: float) -> float:
+        if not samples:
+            return 0.0
+        vals = sorted(samples)
+        idx = max(0, min(len(vals) - 1, int(round(float(q) * (len(vals) - 1)))))
+        return float(vals[idx])
+
+    def percentile_ms(self, q: float) -> float:
+        return self._percentile(self._tick_ms, q)
+
+    def snapshot_percentile_ms(self, q: float) -> float:
+        return self._percentile(self._snapshot_ms, q)
+
+    def p99_ms(self) -> float:
+        return self.percentile_ms(0.99)
+
+    def summary(self) -> dict[str, float | int]:
+        mean = (sum(self._tick_ms) / float(len(self._tick_ms))) if self._tick_ms else 0.0
+        return {
+            "ticks": int(self.ticks),
+            "budget_ms": round(float(self.budget_ms), 3),
+            "mean_ms": round(float(mean), 3),
+            "p50_ms": round(self.percentile_ms(0.50), 3),
+            "p99_ms": round(self.p99_ms(), 3),
+            "max_ms": round(float(self.max_tick_ms), 3),
+            "overruns": int(self.overruns),
+            "late_ticks": int(self.late_ticks),
+            "snapshots": int(self.snapshots),
+            "snapshot_p50_ms": round(self.snapshot_percentile_ms(0.50), 3),
+            "snapshot_p99_ms": round(self.snapshot_percentile_ms(0.99), 3),
+            "snapshot_bytes": int(self.snapshot_bytes),
+            "snapshot_packets": int(self.snapshot_packets),
+            "sweeps_per_tick": round(sum(self._sweeps) / float(len(self._sweeps)), 1) if self._sweeps else 0.0,
+            "sweep_cache_hit_rate": round(float(self.sweep_cache_hits) / float(self.sweeps), 3) if self.sweeps else 0.0,
+        }
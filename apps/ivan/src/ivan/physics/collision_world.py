@@ -13,8 +13,19 @@ from panda3d.core import BitMask32, LVector3f, Point3, TransformState
 from ivan.common.aabb import AABB
 
 
+# Default number of memoised player sweeps kept per world (the memo is dropped wholesale when full).
+SWEEP_CACHE_SIZE = 4096
+
+
 class CollisionWorld:
-    """Bullet world used for collision queries (convex sweeps) + static scene bodies."""
+    """
+    Bullet world used for collision queries (convex sweeps) + static scene bodies.
+
+    Player sweeps are memoised by exact (capsule dims, from, to) float32 values: a controller step re-issues many
+    identical sweeps (ground trace vs. centre ground probe, end-of-step traces repeated at the next step's start),
+    and a sweep against static geometry is a pure function of those values, so cached answers are bit-identical.
+    Moving a graybox body drops the memo.
+    """
 
     def __init__(
         self,
@@ -25,6 +36,7 @@ class CollisionWorld:
         player_radius: float,
         player_half_height: float,
         render,
+        sweep_cache_size: int = SWEEP_CACHE_SIZE,
     ) -> None:
         self._bworld = BulletWorld()
         # We integrate gravity ourselves (Quake-style tuning), so keep Bullet gravity neutral.
@@ -33,6 +45,12 @@ class CollisionWorld:
         self._static_bodies: list[BulletRigidBodyNode] = []
         self._graybox_nodes: list[object] = []
         self._player_sweep_shape = None
+        self._player_sweep_dims: tuple[float, float] | None = None
+        self.sweep_cache_size = max(0, int(sweep_cache_size))
+        self._sweep_cache: dict[tuple, object] = {}
+        # Cumulative counters; controllers diff them around a step for per-tick sweep metrics.
+        self.sweep_queries = 0
+        self.sweep_cache_hits = 0
         self.update_player_sweep_shape(player_radius=player_radius, player_half_height=player_half_height)
 
         if triangle_collision_mode and triangles:
@@ -72,10 +90,37 @@ class CollisionWorld:
         radius = float(player_radius)
         # Bullet capsule height is cylinder height (excluding hemispherical caps).
         cyl_h = max(0.01, float(player_half_height * 2.0 - radius * 2.0))
+        # Several controllers share one world and resync the shape before stepping; skip no-op rebuilds.
+        if self._player_sweep_dims == (radius, cyl_h):
+            return
+        self._player_sweep_dims = (radius, cyl_h)
         self._player_sweep_shape = BulletCapsuleShape(radius, cyl_h, 2)
 
     def sweep_closest(self, from_pos: LVector3f, to_pos: LVector3f):
         assert self._player_sweep_shape is not None
+        self.sweep_queries += 1
+        if self.sweep_cache_size <= 0:
+            return self._sweep_uncached(from_pos, to_pos)
+        key = (
+            self._player_sweep_dims,
+            float(from_pos[0]),
+            float(from_pos[1]),
+            float(from_pos[2]),
+            float(to_pos[0]),
+            float(to_pos[1]),
+            float(to_pos[2]),
+        )
+        hit = self._sweep_cache.get(key)
+        if hit is not None:
+            self.sweep_cache_hits += 1
+            return hit
+        hit = self._sweep_uncached(from_pos, to_pos)
+        if len(self._sweep_cache) >= self.sweep_cache_size:
+            self._sweep_cache.clear()
+        self._sweep_cache[key] = hit
+        return hit
+
+    def _sweep_uncached(self, from_pos: LVector3f, to_pos: LVector3f):
         return self._bworld.sweepTestClosest(
             self._player_sweep_shape,
             TransformState.makePos(from_pos),
@@ -84,6 +129,9 @@ class CollisionWorld:
             0.0,
         )
 
+    def clear_sweep_cache(self) -> None:
+        self._sweep_cache.clear()
+
     def ray_closest(self, from_pos: LVector3f, to_pos: LVector3f):
         return self._bworld.rayTestClosest(from_pos, to_pos, BitMask32.allOn())
 
@@ -95,6 +143,7 @@ class CollisionWorld:
             return
         half = (box.maximum - box.minimum) * 0.5
         center = box.minimum + half
+        self._sweep_cache.clear()
         try:
             self._graybox_nodes[i].setPos(float(center.x), float(center.y), float(center.z))
         except Exception:
@@ -0,0 +1,133 @@
+"""Opt-in per-step instrumentation for `PlayerController`.
+
+Attach a `ControllerProfiler` as `ctrl.profiler` to record, for every `step`, the Bullet sweeps and rays it
+issued, wall-clock time split by movement phase, and the motion state it ended in. With no profiler attached
+the controller only pays a `None` check per phase boundary and per collision query.
+
+Phases partition the step: each `mark(phase)` charges the time since the previous mark to `phase`, so the
+per-phase times of one step add up to its total. `ControllerProfileWindow` rolls profiles up for the client
+feel diagnostics and the server `ctrl_stats` command.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from collections import deque
+from dataclasses import dataclass, field
+
+CONTROLLER_PROFILE_ENV = "IRUN_IVAN_CONTROLLER_PROFILE"
+
+# Step phases in execution order; `solve` covers run/air/slide/jump logic, `vault_edge` the ledge search.
+CONTROLLER_PHASES = ("setup", "wall_probe", "ground_trace", "solve", "vault_edge", "move", "ground_snap", "finish")
+
+
+def controller_profile_enabled(value: str | None = None) -> bool:
+    """True when profiling is requested (`1`/`true`/`on`); None reads `IRUN_IVAN_CONTROLLER_PROFILE`."""
+
+    raw = os.environ.get(CONTROLLER_PROFILE_ENV, "") if value is None else value
+    return str(raw).strip().lower() in ("1", "true", "yes", "on")
+
+
+@dataclass(frozen=True)
+class ControllerStepProfile:
+    sweeps: int = 0
+    rays: int = 0
+    sweep_cache_hits: int = 0
+    total_s: float = 0.0
+    phase_s: dict[str, float] = field(default_factory=dict)
+    motion_state: str = ""
+
+    def phase_ms(self) -> dict[str, float]:
+        return {k: round(v * 1000.0, 4) for k, v in self.phase_s.items() if v > 0.0}
+
+
+class ControllerProfiler:
+    """Collects one `ControllerStepProfile` per controller step; `last` holds the most recent one."""
+
+    __slots__ = ("sweeps", "rays", "last", "_phase_s", "_t0", "_t_mark", "_clock")
+
+    def __init__(self, *, clock=time.perf_counter) -> None:
+        self._clock = clock
+        self.sweeps = 0
+        self.rays = 0
+        self.last = ControllerStepProfile()
+        self._phase_s: dict[str, float] = {}
+        self._t0 = 0.0
+        self._t_mark = 0.0
+
+    def begin_step(self) -> None:
+        self.sweeps = 0
+        self.rays = 0
+        self._phase_s = {}
+        self._t0 = self._t_mark = self._clock()
+
+    def mark(self, phase: str) -> None:
+        now = self._clock()
+        self._phase_s[phase] = self._phase_s.get(phase, 0.0) + (now - self._t_mark)
+        self._t_mark = now
+
+    def end_step(self, *, motion_state: str, sweep_cache_hits: int = 0) -> ControllerStepProfile:
+        self.mark("finish")
+        self.last = ControllerStepProfile(
+            sweeps=int(self.sweeps),
+            rays=int(self.rays),
+            sweep_cache_hits=int(sweep_cache_hits),
+            total_s=float(self._t_mark - self._t0),
+            phase_s=self._phase_s,
+            motion_state=str(motion_state),
+        )
+        return self.last
+
+
+class ControllerProfileWindow:
+    """Rolling aggregate of step profiles: step time percentiles, mean per-phase cost and query counts by state."""
+
+    def __init__(self, *, window_steps: int = 600) -> None:
+        self.reset(window_steps=window_steps)
+
+    def reset(self, *, window_steps: int | None = None) -> None:
+        window = max(1, int(window_steps)) if window_steps is not None else self._profiles.maxlen
+        self._profiles: deque[ControllerStepProfile] = deque(maxlen=window)
+        self.steps = 0
+
+    def record(self, profile: ControllerStepProfile) -> None:
+        self._profiles.append(profile)
+        self.steps += 1
+
+    def __len__(self) -> int:
+        return len(self._profiles)
+
+    def summary(self) -> dict:
+        profiles = list(self._profiles)
+        if not profiles:
+            return {"steps": int(self.steps), "window": 0}
+        n = float(len(profiles))
+        step_ms = sorted(p.total_s * 1000.0 for p in profiles)
+        phase_ms: dict[str, float] = {}
+        for p in profiles:
+            for k, v in p.phase_s.items():
+                phase_ms[k] = phase_ms.get(k, 0.0) + v * 1000.0
+        by_state: dict[str, dict[str, float]] = {}
+        for p in profiles:
+            row = by_state.setdefault(p.motion_state or "?", {"steps": 0, "ms": 0.0, "sweeps": 0})
+            row["steps"] += 1
+            row["ms"] += p.total_s * 1000.0
+            row["sweeps"] += p.sweeps
+        return {
+            "steps": int(self.steps),
+            "window": len(profiles),
+            "step_mean_ms": round(sum(step_ms) / n, 4),
+            "step_p99_ms": round(step_ms[max(0, min(len(step_ms) - 1, int(round(0.99 * (len(step_ms) - 1)))))], 4),
+            "sweeps_per_step": round(sum(p.sweeps for p in profiles) / n, 2),
+            "rays_per_step": round(sum(p.rays for p in profiles) / n, 2),
+            "phase_mean_ms": {k: round(phase_ms[k] / n, 4) for k in CONTROLLER_PHASES if k in phase_ms},
+            "by_state": {
+                k: {
+                    "steps": int(v["steps"]),
+                    "mean_ms": round(v["ms"] / v["steps"], 4),
+                    "sweeps_per_step": round(v["sweeps"] / v["steps"], 2),
+                }
+                for k, v in sorted(by_state.items())
+            },
+        }
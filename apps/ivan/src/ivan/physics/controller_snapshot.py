@@ -0,0 +1,182 @@
+"""Compact capture/restore of `PlayerController` per-player state.
+
+`ControllerState` is an immutable value snapshot of every per-player controller attribute (timers, contact
+normals, slide/vault/grapple state, hull size) in `CONTROLLER_STATE_FIELDS` order. Vectors are stored as float
+triples (exact for float32) and the vault assist queue as a tuple, so a snapshot shares nothing with the live
+controller and can be kept, restored any number of times, or pickled to a worker process.
+
+Used by client prediction rollback (`game/netcode.py`), sharded server stepping (`net/sim_shard.py`) and resumable
+headless runs (`replays/batch_sim.py`).
+"""
+
+from __future__ import annotations
+
+from operator import attrgetter
+
+from panda3d.core import LVector3f
+
+# Attributes that reference per-process shared objects or instrumentation, not per-player state.
+CONTROLLER_SHARED_ATTRS = frozenset({"tuning", "collision", "aabbs", "_aabb_grid", "_motion_solver", "profiler"})
+# Step scratch vectors and hull-derived caches (rebuilt by `apply_hull_settings`).
+CONTROLLER_SCRATCH_ATTRS = frozenset(
+    {
+        "_ground_probe_offsets_cache",
+        "_scratch_pre_step_vel",
+        "_scratch_wish",
+        "_scratch_ground_down",
+        "_scratch_ground_end",
+        "_scratch_probe_down",
+        "_scratch_probe_start",
+        "_scratch_probe_end",
+        "_scratch_wall_reach",
+    }
+)
+
+CONTROLLER_STATE_FIELDS = (
+    "spawn_point",
+    "pos",
+    "vel",
+    "player_half",
+    "_standing_half_height",
+    "grounded",
+    "crouched",
+    "_jump_buffer_timer",
+    "_jump_pressed",
+    "_coyote_timer",
+    "_slide_held",
+    "_slide_active",
+    "_slide_dir",
+    "_slide_ground_grace_timer",
+    "_contact_count",
+    "_wall_contact_timer",
+    "_wall_normal",
+    "_wall_contact_point",
+    "_wallrun_active",
+    "_wallrun_reacquire_block_timer",
+    "_surf_contact_timer",
+    "_surf_normal",
+    "_wall_jump_lock_timer",
+    "_vault_cooldown_timer",
+    "_vault_camera_timer",
+    "_vault_assist_timer",
+    "_vault_assist_vel",
+    "_vault_assist_queue",
+    "_vault_exit_airborne_pending",
+    "_vault_collision_pause_timer",
+    "_vault_collision_ignore_timer",
+    "_vault_collision_ignore_normal",
+    "_vault_collision_ignore_point",
+    "_vault_debug",
+    "_vault_debug_timer",
+    "_ground_normal",
+    "_hitstop_active",
+    "_knockback_active",
+    "_grapple_attached",
+    "_grapple_anchor",
+    "_grapple_length",
+    "_grapple_attach_shorten_left",
+    "_last_vel_write_source",
+    "_last_vel_write_reason",
+    "last_step_sweeps",
+    "last_step_sweep_hits",
+)
+
+CONTROLLER_VECTOR_FIELDS = frozenset(
+    {
+        "spawn_point",
+        "pos",
+        "vel",
+        "player_half",
+        "_slide_dir",
+        "_wall_normal",
+        "_wall_contact_point",
+        "_surf_normal",
+        "_vault_assist_vel",
+        "_vault_collision_ignore_normal",
+        "_vault_collision_ignore_point",
+        "_ground_normal",
+        "_grapple_anchor",
+    }
+)
+
+_QUEUE_FIELD = "_vault_assist_queue"
+_GET_FIELDS = attrgetter(*CONTROLLER_STATE_FIELDS)
+_VECTOR_INDEXES = tuple(i for i, k in enumerate(CONTROLLER_STATE_FIELDS) if k in CONTROLLER_VECTOR_FIELDS)
+_QUEUE_INDEX = CONTROLLER_STATE_FIELDS.index(_QUEUE_FIELD)
+_FIELD_INDEX = {k: i for i, k in enumerate(CONTROLLER_STATE_FIELDS)}
+
+
+class ControllerState:
+    """Immutable per-player controller snapshot; `values` follows `CONTROLLER_STATE_FIELDS`."""
+
+    __slots__ = ("values",)
+
+    def __init__(self, values: tuple) -> None:
+        self.values = values
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, ControllerState) and self.values == other.values
+
+    def __hash__(self) -> int:
+        return hash(self.values)
+
+    def __reduce__(self):
+        return (ControllerState, (self.values,))
+
+    def get(self, name: str):
+        """One field by attribute name; vectors come back as new `LVector3f`."""
+
+        v = self.values[_FIELD_INDEX[name]]
+        if name in CONTROLLER_VECTOR_FIELDS:
+            return LVector3f(*v)
+        if name == _QUEUE_FIELD:
+            return [(LVector3f(*p), t) for p, t in v]
+        return v
+
+    @property
+    def pos(self) -> LVector3f:
+        return self.get("pos")
+
+    @property
+    def vel(self) -> LVector3f:
+        return self.get("vel")
+
+
+def capture_controller_state(ctrl) -> ControllerState:
+    values = list(_GET_FIELDS(ctrl))
+    for i in _VECTOR_INDEXES:
+        v = values[i]
+        values[i] = (v[0], v[1], v[2])
+    values[_QUEUE_INDEX] = tuple(((p[0], p[1], p[2]), float(t)) for p, t in values[_QUEUE_INDEX])
+    return ControllerState(tuple(values))
+
+
+def restore_controller_state(ctrl, state: ControllerState) -> None:
+    # Vectors are rebuilt rather than written in place: callers may still hold the previous objects.
+    values = list(state.values)
+    for i in _VECTOR_INDEXES:
+        values[i] = LVector3f(*values[i])
+    values[_QUEUE_INDEX] = [(LVector3f(*p), t) for p, t in values[_QUEUE_INDEX]]
+    vars(ctrl).update(zip(CONTROLLER_STATE_FIELDS, values))
+
+
+def controller_state_to_json(state: ControllerState) -> dict:
+    """Field-name keyed JSON payload (vectors as `[x, y, z]`); floats round-trip exactly through `json`."""
+
+    return dict(zip(CONTROLLER_STATE_FIELDS, state.values))
+
+
+def controller_state_from_json(payload: object) -> ControllerState | None:
+    """Inverse of `controller_state_to_json`; None when the payload is malformed or misses a field."""
+
+    if not isinstance(payload, dict):
+        return None
+    try:
+        values = [payload[k] for k in CONTROLLER_STATE_FIELDS]
+        for i in _VECTOR_INDEXES:
+            x, y, z = values[i]
+            values[i] = (float(x), float(y), float(z))
+        values[_QUEUE_INDEX] = tuple(((float(p[0]), float(p[1]), float(p[2])), float(t)) for p, t in values[_QUEUE_INDEX])
+    except (KeyError, TypeError, ValueError, IndexError):
+        return None
+    return ControllerState(tuple(values))
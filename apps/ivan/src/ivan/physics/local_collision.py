@@ -0,0 +1,222 @@
+"""Per-player "nearby triangles" collision worlds for large triangle maps.
+
+`CollisionWorld` holds the whole map in one Bullet triangle mesh, so every player sweep pays for a broadphase
+walk over the full map BVH. In `local` mode the map triangles are bucketed once into a `TriangleGrid`, and each
+player controller gets a `LocalCollisionWorld`: a small Bullet world holding only the triangles around the
+player. It is rebuilt only when a query leaves the padded region it covers; queries too large for any local
+region go to the shared full world.
+"""
+
+from __future__ import annotations
+
+import math
+import os
+
+from panda3d.bullet import BulletRigidBodyNode, BulletTriangleMesh, BulletTriangleMeshShape
+from panda3d.core import BitMask32, LVector3f, NodePath, PandaNode, Point3, TransformState
+
+from ivan.physics.collision_world import SWEEP_CACHE_SIZE, CollisionWorld
+
+COLLISION_WORLD_ENV = "IRUN_IVAN_COLLISION_WORLD"
+COLLISION_WORLD_MODES = ("full", "local")
+
+
+def collision_world_mode(value: str | None = None) -> str:
+    """Normalise a collision world mode (`full` | `local`); None reads `IRUN_IVAN_COLLISION_WORLD`."""
+
+    raw = os.environ.get(COLLISION_WORLD_ENV, "full") if value is None else value
+    mode = str(raw or "").strip().lower()
+    return mode if mode in COLLISION_WORLD_MODES else "full"
+
+
+class TriangleGrid:
+    """Static map triangles bucketed by AABB into a uniform 3D grid (built once per map load)."""
+
+    # Triangles covering more cells than this (big floors/skybox walls) skip the grid and are AABB-tested.
+    _MAX_CELLS_PER_TRIANGLE = 64
+
+    def __init__(self, triangles: list[list[float]], *, cell_size: float = 8.0) -> None:
+        self.cell_size = max(0.5, float(cell_size))
+        self.triangles: list[list[float]] = [tri for tri in triangles if len(tri) == 9]
+        inv = 1.0 / self.cell_size
+        self._bounds: list[tuple[float, float, float, float, float, float]] = []
+        self._cells: dict[tuple[int, int, int], list[int]] = {}
+        self._large: list[int] = []
+        for i, tri in enumerate(self.triangles):
+            xs, ys, zs = tri[0::3], tri[1::3], tri[2::3]
+            b = (min(xs), min(ys), min(zs), max(xs), max(ys), max(zs))
+            self._bounds.append(b)
+            c0 = (math.floor(b[0] * inv), math.floor(b[1] * inv), math.floor(b[2] * inv))
+            c1 = (math.floor(b[3] * inv), math.floor(b[4] * inv), math.floor(b[5] * inv))
+            span = (c1[0] - c0[0] + 1) * (c1[1] - c0[1] + 1) * (c1[2] - c0[2] + 1)
+            if span > self._MAX_CELLS_PER_TRIANGLE:
+                self._large.append(i)
+                continue
+            for cx in range(c0[0], c1[0] + 1):
+                for cy in range(c0[1], c1[1] + 1):
+                    for cz in range(c0[2], c1[2] + 1):
+                        self._cells.setdefault((cx, cy, cz), []).append(i)
+
+    def __len__(self) -> int:
+        return len(self.triangles)
+
+    def query(self, lo: tuple[float, float, float], hi: tuple[float, float, float]) -> list[int]:
+        """Indices of triangles whose AABB overlaps the box, in map order."""
+
+        inv = 1.0 / self.cell_size
+        c0 = (math.floor(lo[0] * inv), math.floor(lo[1] * inv), math.floor(lo[2] * inv))
+        c1 = (math.floor(hi[0] * inv), math.floor(hi[1] * inv), math.floor(hi[2] * inv))
+        found: set[int] = set(self._large)
+        cells = self._cells
+        for cx in range(c0[0], c1[0] + 1):
+            for cy in range(c0[1], c1[1] + 1):
+                for cz in range(c0[2], c1[2] + 1):
+                    ids = cells.get((cx, cy, cz))
+                    if ids:
+                        found.update(ids)
+        bounds = self._bounds
+        return [
+            i
+            for i in sorted(found)
+            if bounds[i][0] <= hi[0]
+            and bounds[i][3] >= lo[0]
+            and bounds[i][1] <= hi[1]
+            and bounds[i][4] >= lo[1]
+            and bounds[i][2] <= hi[2]
+            and bounds[i][5] >= lo[2]
+        ]
+
+
+class LocalCollisionWorld(CollisionWorld):
+    """
+    One player's collision world: the map triangles inside a padded box around recent queries.
+
+    Same query API as `CollisionWorld` (sweeps, rays, sweep memo and counters). A sweep whose capsule-swept box is
+    not inside the current region rebuilds the region around it first; one larger than `max_extent` runs against
+    the shared full world instead.
+    """
+
+    # Extra room around the swept capsule so contact margins never reach past the loaded triangles.
+    _QUERY_MARGIN = 0.25
+
+    def __init__(
+        self,
+        *,
+        source: CollisionWorld,
+        index: TriangleGrid,
+        player_radius: float,
+        player_half_height: float,
+        pad: float = 6.0,
+        max_extent: float = 48.0,
+        sweep_cache_size: int = SWEEP_CACHE_SIZE,
+    ) -> None:
+        # Empty base world (Bullet world, sweep shape, memo, counters); region triangles are loaded on demand.
+        super().__init__(
+            aabbs=[],
+            triangles=None,
+            triangle_collision_mode=False,
+            player_radius=player_radius,
+            player_half_height=player_half_height,
+            render=None,
+            sweep_cache_size=sweep_cache_size,
+        )
+        self.source = source
+        self.index = index
+        self.pad = max(0.5, float(pad))
+        self.max_extent = max(self.pad, float(max_extent))
+        self._root = NodePath(PandaNode("local-collision-root"))
+        self._region: tuple[float, float, float, float, float, float] | None = None
+        self.region_triangles = 0
+        self.rebuilds = 0
+        self.fallback_queries = 0
+
+    def _query_box(
+        self,
+        from_pos: LVector3f,
+        to_pos: LVector3f,
+        *,
+        swept: bool,
+    ) -> tuple[float, float, float, float, float, float]:
+        fx, fy, fz = from_pos
+        tx, ty, tz = to_pos
+        ex = ez = self._QUERY_MARGIN
+        if swept and self._player_sweep_dims is not None:
+            radius, cyl_h = self._player_sweep_dims
+            ex += radius
+            ez += radius + cyl_h * 0.5
+        if fx > tx:
+            fx, tx = tx, fx
+        if fy > ty:
+            fy, ty = ty, fy
+        if fz > tz:
+            fz, tz = tz, fz
+        return (fx - ex, fy - ex, fz - ez, tx + ex, ty + ex, tz + ez)
+
+    def _ensure_region(self, box: tuple[float, float, float, float, float, float]) -> bool:
+        """Make sure the local world covers `box`; False when the box is too large for a local region."""
+
+        r = self._region
+        if (
+            r is not None
+            and r[0] <= box[0]
+            and r[1] <= box[1]
+            and r[2] <= box[2]
+            and r[3] >= box[3]
+            and r[4] >= box[4]
+            and r[5] >= box[5]
+        ):
+            return True
+        if max(box[3] - box[0], box[4] - box[1], box[5] - box[2]) > self.max_extent:
+            return False
+        pad = self.pad
+        region = (box[0] - pad, box[1] - pad, box[2] - pad, box[3] + pad, box[4] + pad, box[5] + pad)
+        for body in self._static_bodies:
+            self._bworld.removeRigidBody(body)
+        self._static_bodies = []
+        self._root.getChildren().detach()
+        ids = self.index.query(region[:3], region[3:])
+        if ids:
+            tri_mesh = BulletTriangleMesh()
+            tris = self.index.triangles
+            for i in ids:
+                tri = tris[i]
+                tri_mesh.addTriangle(
+                    Point3(float(tri[0]), float(tri[1]), float(tri[2])),
+                    Point3(float(tri[3]), float(tri[4]), float(tri[5])),
+                    Point3(float(tri[6]), float(tri[7]), float(tri[8])),
+                    False,
+                )
+            body = BulletRigidBodyNode("local-triangle-mesh")
+            body.setMass(0.0)
+            body.addShape(BulletTriangleMeshShape(tri_mesh, dynamic=False))
+            self._root.attachNewNode(body)
+            self._bworld.attachRigidBody(body)
+            self._static_bodies.append(body)
+        self._region = region
+        self.region_triangles = len(ids)
+        self.rebuilds += 1
+        return True
+
+    def _sweep_uncached(self, from_pos: LVector3f, to_pos: LVector3f):
+        world = self._bworld
+        if not self._ensure_region(self._query_box(from_pos, to_pos, swept=True)):
+            self.fallback_queries += 1
+            world = self.source._bworld
+        return world.sweepTestClosest(
+            self._player_sweep_shape,
+            TransformState.makePos(from_pos),
+            TransformState.makePos(to_pos),
+            BitMask32.allOn(),
+            0.0,
+        )
+
+    def ray_closest(self, from_pos: LVector3f, to_pos: LVector3f):
+        if not self._ensure_region(self._query_box(from_pos, to_pos, swept=False)):
+            self.fallback_queries += 1
+            return self.source.ray_closest(from_pos, to_pos)
+        return self._bworld.rayTestClosest(from_pos, to_pos, BitMask32.allOn())
+
+    def update_graybox_block(self, *, index: int, box) -> None:
+        # Local worlds only exist for triangle maps; graybox bodies live in the shared world.
+        self._sweep_cache.clear()
+        self.source.update_graybox_block(index=index, box=box)
@@ -1,6 +1,12 @@
 """Movement invariants, solver, and intent/state contracts."""
 
-from ivan.physics.motion.config import MotionConfig, MotionDerived, MotionInvariants, derive_motion_config
+from ivan.physics.motion.config import (
+    MotionConfig,
+    MotionDerived,
+    MotionInvariants,
+    derive_motion_config,
+    motion_config_for,
+)
 from ivan.physics.motion.intent import MotionIntent
 from ivan.physics.motion.solver import MotionSolver
 from ivan.physics.motion.state import MotionMode, MotionState, MotionWriteSource
@@ -15,4 +21,5 @@ __all__ = [
     "MotionState",
     "MotionWriteSource",
     "derive_motion_config",
+    "motion_config_for",
 ]
@@ -101,3 +101,21 @@ def derive_motion_config(*, tuning: PhysicsTuning) -> MotionConfig:
         slide_damp_k=max(0.0, float(slide_damp_k)),
     )
     return MotionConfig(invariants=invariants, derived=derived)
+
+
+def motion_config_for(tuning: PhysicsTuning) -> MotionConfig:
+    """
+    `derive_motion_config`, memoised on the tuning object until its `version` changes.
+
+    Every controller sharing one tuning object (all server players, replay/prediction controllers) shares one
+    derived config instead of re-deriving it each step.
+    """
+
+    version = getattr(tuning, "version", None)
+    cached = tuning.__dict__.get("_motion_config_cache") if version is not None else None
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    cfg = derive_motion_config(tuning=tuning)
+    if version is not None:
+        tuning.__dict__["_motion_config_cache"] = (version, cfg)
+    return cfg
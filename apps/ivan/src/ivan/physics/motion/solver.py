@@ -4,7 +4,7 @@ import math
 
 from panda3d.core import LVector3f
 
-from ivan.physics.motion.config import MotionConfig, derive_motion_config
+from ivan.physics.motion.config import MotionConfig, motion_config_for
 from ivan.physics.tuning import PhysicsTuning
 
 
@@ -16,14 +16,15 @@ class MotionSolver:
 
     @classmethod
     def from_tuning(cls, *, tuning: PhysicsTuning) -> "MotionSolver":
-        return cls(config=derive_motion_config(tuning=tuning))
+        return cls(config=motion_config_for(tuning))
 
     @property
     def config(self) -> MotionConfig:
         return self._config
 
     def sync_from_tuning(self, *, tuning: PhysicsTuning) -> None:
-        self._config = derive_motion_config(tuning=tuning)
+        # Cheap when the tuning is unchanged: the derived config is memoised per tuning version.
+        self._config = motion_config_for(tuning)
 
     def jump_takeoff_speed(self) -> float:
         return float(self._config.derived.jump_takeoff_speed)
@@ -4,8 +4,10 @@ import math
 
 from panda3d.core import LVector3f
 
-from ivan.common.aabb import AABB
+from ivan.common.aabb import AABB, AABBGrid
 from ivan.physics.collision_world import CollisionWorld
+from ivan.physics.controller_profile import ControllerProfiler
+from ivan.physics.controller_snapshot import ControllerState, capture_controller_state, restore_controller_state
 from ivan.physics.motion.intent import MotionIntent
 from ivan.physics.motion.solver import MotionSolver
 from ivan.physics.motion.state import MotionWriteSource
@@ -15,6 +17,7 @@ from ivan.physics.player_controller_kinematics import PlayerControllerKinematics
 from ivan.physics.player_controller_momentum import PlayerControllerMomentumMixin
 from ivan.physics.player_controller_state import PlayerControllerStateMixin
 from ivan.physics.player_controller_surf import PlayerControllerSurfMixin
+from ivan.physics.quantize import POSITION_QUANTUM, VELOCITY_QUANTUM, quantize_vec3
 from ivan.physics.tuning import PhysicsTuning
 
 
@@ -40,6 +43,8 @@ class PlayerController(
         self.spawn_point = LVector3f(spawn_point)
         self.aabbs = aabbs
         self.collision = collision
+        # Grid over `aabbs` for the no-Bullet fallback; rebuilt when the box list changes.
+        self._aabb_grid: AABBGrid | None = None
 
         self.pos = LVector3f(self.spawn_point)
         self.vel = LVector3f(0, 0, 0)
@@ -87,6 +92,21 @@ class PlayerController(
         self._motion_solver = MotionSolver.from_tuning(tuning=self.tuning)
         self._last_vel_write_source = MotionWriteSource.EXTERNAL.value
         self._last_vel_write_reason = "init"
+        # Collision sweeps issued by the last step (and how many the world answered from its memo).
+        self.last_step_sweeps = 0
+        self.last_step_sweep_hits = 0
+        # Opt-in per-step phase timing and query counts (`physics/controller_profile.py`); None costs a check.
+        self.profiler: ControllerProfiler | None = None
+        # Scratch vectors reused by the per-step hot path (overwritten before every use, never handed out).
+        self._scratch_pre_step_vel = LVector3f(0, 0, 0)
+        self._scratch_wish = LVector3f(0, 0, 0)
+        self._scratch_ground_down = LVector3f(0, 0, 0)
+        self._scratch_ground_end = LVector3f(0, 0, 0)
+        self._scratch_probe_down = LVector3f(0, 0, 0)
+        self._scratch_probe_start = LVector3f(0, 0, 0)
+        self._scratch_probe_end = LVector3f(0, 0, 0)
+        self._scratch_wall_reach = LVector3f(0, 0, 0)
+        self._ground_probe_offsets_cache: tuple[LVector3f, ...] = ()
 
         self.apply_hull_settings()
 
@@ -96,12 +116,26 @@ class PlayerController(
         self.player_half.x = float(self.tuning.player_radius)
         self.player_half.y = float(self.tuning.player_radius)
         self.player_half.z = self._current_target_half_height()
+        self._refresh_ground_probe_offsets()
         if self.collision is not None:
             self.collision.update_player_sweep_shape(
                 player_radius=float(self.tuning.player_radius),
                 player_half_height=float(self.player_half.z),
             )
 
+    def capture_state(self) -> ControllerState:
+        """Snapshot all per-player state (timers, contacts, slide/vault/grapple, hull) for rollback or seeking."""
+        return capture_controller_state(self)
+
+    def restore_state(self, state: ControllerState) -> None:
+        restore_controller_state(self, state)
+        if self.collision is not None:
+            # The restored hull may differ from the last stepped one (slide vs standing).
+            self.collision.update_player_sweep_shape(
+                player_radius=float(self.tuning.player_radius),
+                player_half_height=float(self.player_half.z),
+            )
+
     def respawn(self) -> None:
         self.pos = LVector3f(self.spawn_point)
         self._set_velocity(LVector3f(0, 0, 0), source=MotionWriteSource.EXTERNAL, reason="respawn")
@@ -356,7 +390,14 @@ class PlayerController(
     def step(self, *, dt: float, wish_dir: LVector3f, yaw_deg: float, pitch_deg: float = 0.0, crouching: bool = False) -> None:
         _ = crouching
         dt = float(dt)
-        pre_step_vel = LVector3f(self.vel)
+        collision = self.collision
+        sweeps0 = int(getattr(collision, "sweep_queries", 0))
+        hits0 = int(getattr(collision, "sweep_cache_hits", 0))
+        prof = self.profiler
+        if prof is not None:
+            prof.begin_step()
+        pre_step_vel = self._scratch_pre_step_vel
+        pre_step_vel.set(self.vel.x, self.vel.y, self.vel.z)
         was_wallrun = bool(self._wallrun_active)
         self._motion_solver.sync_from_tuning(tuning=self.tuning)
         self._contact_count = 0
@@ -373,14 +414,20 @@ class PlayerController(
         self._wallrun_reacquire_block_timer = max(0.0, float(self._wallrun_reacquire_block_timer) - dt)
         self._slide_ground_grace_timer = max(0.0, float(self._slide_ground_grace_timer) - dt)
         self._apply_vault_assist(dt=dt)
+        if prof is not None:
+            prof.mark("setup")
         if not self._is_vault_collision_paused():
             self._refresh_wall_contact_from_probe()
+        if prof is not None:
+            prof.mark("wall_probe")
 
         # Determine grounded state before applying friction/accel.
         if self.collision is not None and not self._is_vault_collision_paused():
             self._bullet_ground_trace()
         elif self._is_vault_collision_paused():
             self.grounded = False
+        if prof is not None:
+            prof.mark("ground_trace")
         was_sliding = bool(self._slide_active)
         if self.grounded:
             self._coyote_timer = float(self._motion_solver.coyote_time(horizontal_speed=self._horizontal_speed()))
@@ -411,7 +458,11 @@ class PlayerController(
         # While slide key is held, keyboard movement axes are ignored so slide remains inertia-driven.
         # This also prevents one-frame ground-contact flicker from reintroducing WASD influence.
         input_locked_for_slide = bool(self._slide_held)
-        effective_wish = LVector3f(0.0, 0.0, 0.0) if input_locked_for_slide else LVector3f(wish_dir)
+        effective_wish = self._scratch_wish
+        if input_locked_for_slide:
+            effective_wish.set(0.0, 0.0, 0.0)
+        else:
+            effective_wish.set(wish_dir.x, wish_dir.y, wish_dir.z)
         has_move_input = self._horizontal_unit(effective_wish).lengthSquared() > 1e-12
 
         if self._knockback_active:
@@ -439,7 +490,7 @@ class PlayerController(
             surf_active = self._has_recent_surf_contact_for_physics(dt)
             wallrun_active = self._has_wallrun_contact(wish_dir=effective_wish, was_wallrun=was_wallrun)
             self._wallrun_active = bool(wallrun_active)
-            air_wish = LVector3f(effective_wish)
+            air_wish = effective_wish
             air_accel = float(self._motion_solver.air_accel())
             air_speed = float(self._motion_solver.air_speed(speed_scale=1.0))
             if surf_active:
@@ -488,20 +539,34 @@ class PlayerController(
                     )
 
         self._apply_grapple_constraint(dt=dt)
+        if prof is not None:
+            prof.mark("solve")
 
         # Movement + collision resolution.
         if self.collision is not None:
             if self._is_vault_collision_paused():
                 self._vault_pause_translate(self.vel * dt)
                 self.grounded = False
+                if prof is not None:
+                    prof.mark("move")
             else:
                 self._bullet_step_slide_move(self.vel * dt)
+                if prof is not None:
+                    prof.mark("move")
                 self._bullet_ground_snap()
+                if prof is not None:
+                    prof.mark("ground_snap")
                 # Update grounded state after movement (e.g. walking off a ledge).
                 self._bullet_ground_trace()
+                if prof is not None:
+                    prof.mark("ground_trace")
                 self._refresh_wall_contact_from_probe()
+                if prof is not None:
+                    prof.mark("wall_probe")
         else:
             self._move_and_collide(self.vel * dt)
+            if prof is not None:
+                prof.mark("move")
 
         self._enforce_grapple_length()
 
@@ -511,6 +576,13 @@ class PlayerController(
             self._wallrun_active = False
 
         self._update_slide_hull_state(self.is_sliding())
+        if self.tuning.deterministic_quantize_enabled:
+            quantize_vec3(self.pos, POSITION_QUANTUM)
+            quantize_vec3(self.vel, VELOCITY_QUANTUM)
+        self.last_step_sweeps = int(getattr(collision, "sweep_queries", 0)) - sweeps0
+        self.last_step_sweep_hits = int(getattr(collision, "sweep_cache_hits", 0)) - hits0
+        if prof is not None:
+            prof.end_step(motion_state=self.motion_state_name(), sweep_cache_hits=self.last_step_sweep_hits)
 
     def step_with_intent(self, *, dt: float, intent: MotionIntent, yaw_deg: float, pitch_deg: float = 0.0) -> None:
         if bool(intent.jump_requested):
@@ -520,7 +592,7 @@ class PlayerController(
         )
         self.step(
             dt=dt,
-            wish_dir=LVector3f(intent.wish_dir),
+            wish_dir=intent.wish_dir,
             yaw_deg=yaw_deg,
             pitch_deg=pitch_deg,
             crouching=False,
@@ -142,7 +142,12 @@ class PlayerControllerActionsMixin:
             self._set_vault_debug("vault fail: not facing wall")
             return False
 
+        prof = self.profiler
+        if prof is not None:
+            prof.mark("solve")
         edge_z = self._find_vault_edge_height(yaw_deg=yaw_deg)
+        if prof is not None:
+            prof.mark("vault_edge")
         if edge_z is None:
             self._set_vault_debug("vault fail: no ledge top")
             return False
@@ -276,7 +281,7 @@ class PlayerControllerActionsMixin:
                     start = LVector3f(probe_xy.x, probe_xy.y, scan_top)
                     end = LVector3f(probe_xy.x, probe_xy.y, scan_bottom)
                     if hasattr(self.collision, "ray_closest"):
-                        hit = self.collision.ray_closest(start, end)
+                        hit = self._bullet_ray_closest(start, end)
                     else:
                         hit = self._bullet_sweep_closest(start, end)
                     if not hit.hasHit():
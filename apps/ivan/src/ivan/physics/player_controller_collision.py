@@ -4,8 +4,9 @@ import math
 
 from panda3d.core import LVector3f
 
-from ivan.common.aabb import AABB
+from ivan.common.aabb import AABB, AABBGrid
 from ivan.physics.motion.state import MotionWriteSource
+from ivan.physics.quantize import QuantizedHit
 
 
 class PlayerControllerCollisionMixin:
@@ -42,7 +43,7 @@ class PlayerControllerCollisionMixin:
         if not hasattr(hit, "getHitPos"):
             return True
         try:
-            p = LVector3f(hit.getHitPos())
+            p = hit.getHitPos()
         except Exception:
             return True
         dx = float(p.x - start_pos.x)
@@ -70,10 +71,11 @@ class PlayerControllerCollisionMixin:
             return False
         return True
 
-    def _ground_probe_offsets(self) -> tuple[LVector3f, ...]:
+    def _refresh_ground_probe_offsets(self) -> None:
+        # Probe ring depends only on the hull radius; rebuilt from `apply_hull_settings`, not per probe.
         r = max(0.02, float(self.player_half.x) * 0.48)
         d = r * 0.72
-        return (
+        self._ground_probe_offsets_cache = (
             LVector3f(0.0, 0.0, 0.0),
             LVector3f(r, 0.0, 0.0),
             LVector3f(-r, 0.0, 0.0),
@@ -85,6 +87,9 @@ class PlayerControllerCollisionMixin:
             LVector3f(-d, -d, 0.0),
         )
 
+    def _ground_probe_offsets(self) -> tuple[LVector3f, ...]:
+        return self._ground_probe_offsets_cache
+
     def _ground_probe_lift_distance(self) -> float:
         # Lifted re-probe avoids immediate step-face hits while preserving original depth budget.
         step_h = max(0.0, float(self.tuning.step_height))
@@ -101,19 +106,28 @@ class PlayerControllerCollisionMixin:
         best_normal: LVector3f | None = None
         best_drop: float | None = None
         base_drop_limit = max(1e-6, abs(float(down.z)))
+        # Sweep endpoints live in scratch vectors: the collision world copies them, nothing keeps a reference.
+        start = self._scratch_probe_start
+        end = self._scratch_probe_end
+        query_down = self._scratch_probe_down
+        pos = self.pos
         for lift in (0.0, float(self._ground_probe_lift_distance())):
-            query_down = LVector3f(float(down.x), float(down.y), float(down.z) - float(lift))
+            query_down.set(float(down.x), float(down.y), float(down.z) - float(lift))
             query_len = abs(float(query_down.z))
             if query_len <= 1e-8:
                 continue
-            for off in self._ground_probe_offsets():
-                start = LVector3f(self.pos + off)
+            for off in self._ground_probe_offsets_cache:
+                start.set(pos.x, pos.y, pos.z)
+                start += off
                 if lift > 0.0:
                     start.z += float(lift)
-                hit = self._bullet_sweep_closest(start, start + query_down)
+                end.set(start.x, start.y, start.z)
+                end += query_down
+                hit = self._bullet_sweep_closest(start, end)
                 if not hit.hasHit():
                     continue
-                n = LVector3f(hit.getHitNormal())
+                # Hit results hand out a fresh vector per call, so it can be normalised in place.
+                n = hit.getHitNormal()
                 if n.lengthSquared() > 1e-12:
                     n.normalize()
                 if not self._is_walkable_ground_normal(n, walkable_z=walkable_z):
@@ -126,10 +140,10 @@ class PlayerControllerCollisionMixin:
                     continue
                 if best_drop is None or drop < best_drop:
                     best_drop = float(drop)
-                    best_normal = LVector3f(n)
+                    best_normal = n
         if best_normal is None or best_drop is None:
             return None
-        return (LVector3f(best_normal), float(best_drop))
+        return (best_normal, float(best_drop))
 
     def _walkable_ground_threshold(self) -> float:
         threshold = self._walkable_threshold_z(float(self.tuning.max_ground_slope_deg))
@@ -200,22 +214,40 @@ class PlayerControllerCollisionMixin:
 
     def _bullet_sweep_closest(self, from_pos: LVector3f, to_pos: LVector3f):
         assert self.collision is not None
-        return self.collision.sweep_closest(from_pos, to_pos)
+        if self.profiler is not None:
+            self.profiler.sweeps += 1
+        hit = self.collision.sweep_closest(from_pos, to_pos)
+        if self.tuning.deterministic_quantize_enabled:
+            return QuantizedHit(hit)
+        return hit
+
+    def _bullet_ray_closest(self, from_pos: LVector3f, to_pos: LVector3f):
+        assert self.collision is not None
+        if self.profiler is not None:
+            self.profiler.rays += 1
+        hit = self.collision.ray_closest(from_pos, to_pos)
+        if self.tuning.deterministic_quantize_enabled:
+            return QuantizedHit(hit)
+        return hit
 
     def _bullet_ground_trace(self) -> None:
         walkable_z = self._walkable_ground_threshold()
-        down = LVector3f(0, 0, -float(self._ground_probe_distance(for_snap=False)))
-        hit = self._bullet_sweep_closest(self.pos, self.pos + down)
+        down = self._scratch_ground_down
+        down.set(0.0, 0.0, -float(self._ground_probe_distance(for_snap=False)))
+        end = self._scratch_ground_end
+        end.set(self.pos.x, self.pos.y, self.pos.z)
+        end += down
+        hit = self._bullet_sweep_closest(self.pos, end)
         if not hit.hasHit():
             alt = self._find_walkable_ground_contact(down=down, walkable_z=walkable_z)
             if alt is None:
                 self.grounded = False
                 return
-            self._ground_normal = LVector3f(alt[0])
+            self._ground_normal = alt[0]
             self.grounded = True
             return
 
-        n = LVector3f(hit.getHitNormal())
+        n = hit.getHitNormal()
         if n.lengthSquared() > 1e-12:
             n.normalize()
         if self._is_walkable_ground_normal(n, walkable_z=walkable_z) and self._is_ground_contact_point_valid(
@@ -229,7 +261,7 @@ class PlayerControllerCollisionMixin:
             self._set_surf_contact(n)
         alt = self._find_walkable_ground_contact(down=down, walkable_z=walkable_z)
         if alt is not None:
-            self._ground_normal = LVector3f(alt[0])
+            self._ground_normal = alt[0]
             self.grounded = True
             return
         if surf_contact:
@@ -243,8 +275,9 @@ class PlayerControllerCollisionMixin:
         if delta.lengthSquared() <= 1e-12:
             return
 
+        # `pos` and `remaining` are only ever rebound below, never mutated, so per-iteration aliases are safe.
         pos = LVector3f(self.pos)
-        remaining = LVector3f(delta)
+        remaining = delta
         planes: list[LVector3f] = []
 
         walkable_z = self._walkable_ground_threshold()
@@ -254,8 +287,8 @@ class PlayerControllerCollisionMixin:
             if remaining.lengthSquared() <= 1e-10:
                 break
 
-            sweep_from = LVector3f(pos)
-            move = LVector3f(remaining)
+            sweep_from = pos
+            move = remaining
             target = pos + move
             hit = self._bullet_sweep_closest(sweep_from, target)
             if not hit.hasHit():
@@ -267,7 +300,7 @@ class PlayerControllerCollisionMixin:
             # Move to contact (slightly before), then push out along normal (skin).
             pos = pos + move * max(0.0, hit_frac - 1e-4)
 
-            n = LVector3f(hit.getHitNormal())
+            n = hit.getHitNormal()
             if n.lengthSquared() > 1e-12:
                 n.normalize()
             planes.append(n)
@@ -332,14 +365,15 @@ class PlayerControllerCollisionMixin:
 
         # First attempt: plain slide.
         self._bullet_slide_move(delta)
-        pos1 = LVector3f(self.pos)
-        vel1 = LVector3f(self.vel)
+        # Snapshots alias the live vectors: both are rebound (not mutated) right after.
+        pos1 = self.pos
+        vel1 = self.vel
         grounded1 = bool(self.grounded)
 
         # Second attempt: step up, move horizontally, then step down.
         self.pos = LVector3f(start_pos)
         self._set_velocity(
-            LVector3f(start_vel),
+            start_vel,
             source=MotionWriteSource.COLLISION,
             reason="stepslide.reset_second_try",
         )
@@ -362,8 +396,8 @@ class PlayerControllerCollisionMixin:
                 frac = max(0.0, float(hit_down.getHitFraction()) - 1e-4)
                 self.pos = self.pos + step_down * frac
 
-        pos2 = LVector3f(self.pos)
-        vel2 = LVector3f(self.vel)
+        pos2 = self.pos
+        vel2 = self.vel
         grounded2 = bool(self.grounded)
 
         d1 = (pos1 - start_pos)
@@ -393,7 +427,7 @@ class PlayerControllerCollisionMixin:
         if choose_plain:
             self.pos = pos1
             self._set_velocity(
-                LVector3f(vel1),
+                vel1,
                 source=MotionWriteSource.COLLISION,
                 reason="stepslide.choose_plain",
             )
@@ -401,7 +435,7 @@ class PlayerControllerCollisionMixin:
         else:
             self.pos = pos2
             self._set_velocity(
-                LVector3f(vel2),
+                vel2,
                 source=MotionWriteSource.COLLISION,
                 reason="stepslide.choose_step",
             )
@@ -416,18 +450,22 @@ class PlayerControllerCollisionMixin:
         down_dist = float(self._ground_probe_distance(for_snap=True))
         if down_dist <= 0.0:
             return
-        down = LVector3f(0, 0, -down_dist)
-        hit = self._bullet_sweep_closest(self.pos, self.pos + down)
+        down = self._scratch_ground_down
+        down.set(0.0, 0.0, -down_dist)
+        end = self._scratch_ground_end
+        end.set(self.pos.x, self.pos.y, self.pos.z)
+        end += down
+        hit = self._bullet_sweep_closest(self.pos, end)
         chosen_normal: LVector3f | None = None
         chosen_drop: float | None = None
         if hit.hasHit():
-            n = LVector3f(hit.getHitNormal())
+            n = hit.getHitNormal()
             if n.lengthSquared() > 1e-12:
                 n.normalize()
             if self._is_walkable_ground_normal(n, walkable_z=walkable_z) and self._is_ground_contact_point_valid(
                 hit=hit, start_pos=self.pos
             ):
-                chosen_normal = LVector3f(n)
+                chosen_normal = n
                 frac = max(0.0, min(1.0, float(hit.getHitFraction())))
                 chosen_drop = max(0.0, float(down_dist) * float(frac))
         if chosen_normal is None or chosen_drop is None:
@@ -441,76 +479,106 @@ class PlayerControllerCollisionMixin:
         frac = float(move_drop) / max(1e-6, float(down_dist))
         self.pos = self.pos + down * frac
         self.grounded = True
-        self._ground_normal = LVector3f(chosen_normal)
+        self._ground_normal = chosen_normal
         if self.vel.z < 0.0:
             self._set_vertical_velocity(0.0, source=MotionWriteSource.COLLISION, reason="ground_snap")
 
+    # Below this many boxes a linear scan beats building/validating the grid index.
+    _AABB_GRID_MIN_BOXES = 32
+
+    def _sync_aabb_grid(self) -> AABBGrid | None:
+        if len(self.aabbs) < int(self._AABB_GRID_MIN_BOXES):
+            return None
+        grid = self._aabb_grid
+        if grid is None or not grid.matches(self.aabbs):
+            grid = AABBGrid(self.aabbs)
+            self._aabb_grid = grid
+        return grid
+
     def _move_and_collide(self, delta: LVector3f) -> None:
         self.grounded = False
         max_component = max(abs(delta.x), abs(delta.y), abs(delta.z))
         steps = max(1, int(math.ceil(max_component / 0.35)))
         step = delta / float(steps)
+        grid = self._sync_aabb_grid()
 
         for _ in range(steps):
             self.pos.x += step.x
-            self._resolve_axis("x", step.x)
+            self._resolve_axis("x", step.x, grid=grid)
 
             self.pos.y += step.y
-            self._resolve_axis("y", step.y)
+            self._resolve_axis("y", step.y, grid=grid)
 
             self.pos.z += step.z
-            self._resolve_axis("z", step.z)
+            self._resolve_axis("z", step.z, grid=grid)
 
-    def _resolve_axis(self, axis: str, delta: float) -> None:
+    def _resolve_axis(self, axis: str, delta: float, *, grid: AABBGrid | None = None) -> None:
         if abs(delta) < 1e-7:
             return
 
         paabb = self._player_aabb()
-        for box in self.aabbs:
-            if not self._overlap(paabb, box):
-                continue
-            self._contact_count += 1
+        if grid is None:
+            for box in self.aabbs:
+                if self._overlap(paabb, box) and self._resolve_box(axis, delta, paabb, box):
+                    paabb = self._player_aabb()
+            return
 
-            if axis in ("x", "y"):
-                z_overlap = min(paabb.maximum.z, box.maximum.z) - max(paabb.minimum.z, box.minimum.z)
-                # Ignore almost-flat contact so floor standing does not become side collision.
-                if z_overlap <= 0.08:
-                    continue
+        # Same visiting order as the linear scan: only boxes near the current player AABB, in list order, and
+        # after each push-out the remaining (higher-index) candidates are re-queried around the moved AABB.
+        candidates = grid.query(paabb.minimum, paabb.maximum)
+        k = 0
+        while k < len(candidates):
+            i = candidates[k]
+            k += 1
+            box = self.aabbs[i]
+            if self._overlap(paabb, box) and self._resolve_box(axis, delta, paabb, box):
+                paabb = self._player_aabb()
+                candidates = grid.query(paabb.minimum, paabb.maximum, after=i)
+                k = 0
+
+    def _resolve_box(self, axis: str, delta: float, paabb: AABB, box: AABB) -> bool:
+        """Push the player out of one overlapping box; False when the contact is ignored."""
+        self._contact_count += 1
+
+        if axis in ("x", "y"):
+            z_overlap = min(paabb.maximum.z, box.maximum.z) - max(paabb.minimum.z, box.minimum.z)
+            # Ignore almost-flat contact so floor standing does not become side collision.
+            if z_overlap <= 0.08:
+                return False
 
-            if axis == "x":
-                if delta > 0:
-                    self.pos.x = box.minimum.x - self.player_half.x
-                    self._wall_normal = LVector3f(-1, 0, 0)
-                else:
-                    self.pos.x = box.maximum.x + self.player_half.x
-                    self._wall_normal = LVector3f(1, 0, 0)
-                self._set_horizontal_velocity(
-                    x=0.0,
-                    y=float(self.vel.y),
-                    source=MotionWriteSource.COLLISION,
-                    reason="axis_resolve_x",
-                )
-                self._wall_contact_timer = 0.0
-            elif axis == "y":
-                if delta > 0:
-                    self.pos.y = box.minimum.y - self.player_half.y
-                    self._wall_normal = LVector3f(0, -1, 0)
-                else:
-                    self.pos.y = box.maximum.y + self.player_half.y
-                    self._wall_normal = LVector3f(0, 1, 0)
-                self._set_horizontal_velocity(
-                    x=float(self.vel.x),
-                    y=0.0,
-                    source=MotionWriteSource.COLLISION,
-                    reason="axis_resolve_y",
-                )
-                self._wall_contact_timer = 0.0
+        if axis == "x":
+            if delta > 0:
+                self.pos.x = box.minimum.x - self.player_half.x
+                self._wall_normal = LVector3f(-1, 0, 0)
+            else:
+                self.pos.x = box.maximum.x + self.player_half.x
+                self._wall_normal = LVector3f(1, 0, 0)
+            self._set_horizontal_velocity(
+                x=0.0,
+                y=float(self.vel.y),
+                source=MotionWriteSource.COLLISION,
+                reason="axis_resolve_x",
+            )
+            self._wall_contact_timer = 0.0
+        elif axis == "y":
+            if delta > 0:
+                self.pos.y = box.minimum.y - self.player_half.y
+                self._wall_normal = LVector3f(0, -1, 0)
             else:
-                if delta > 0:
-                    self.pos.z = box.minimum.z - self.player_half.z
-                else:
-                    self.pos.z = box.maximum.z + self.player_half.z
-                    self.grounded = True
-                self._set_vertical_velocity(0.0, source=MotionWriteSource.COLLISION, reason="axis_resolve_z")
-
-            paabb = self._player_aabb()
+                self.pos.y = box.maximum.y + self.player_half.y
+                self._wall_normal = LVector3f(0, 1, 0)
+            self._set_horizontal_velocity(
+                x=float(self.vel.x),
+                y=0.0,
+                source=MotionWriteSource.COLLISION,
+                reason="axis_resolve_y",
+            )
+            self._wall_contact_timer = 0.0
+        else:
+            if delta > 0:
+                self.pos.z = box.minimum.z - self.player_half.z
+            else:
+                self.pos.z = box.maximum.z + self.player_half.z
+                self.grounded = True
+            self._set_vertical_velocity(0.0, source=MotionWriteSource.COLLISION, reason="axis_resolve_z")
+        return True
@@ -7,6 +7,15 @@ from panda3d.core import LVector3f
 from ivan.physics.motion.state import MotionWriteSource
 
 
+# Axis-aligned horizontal directions swept by the nearby-wall probe.
+_WALL_PROBE_DIRECTIONS = (
+    LVector3f(1, 0, 0),
+    LVector3f(-1, 0, 0),
+    LVector3f(0, 1, 0),
+    LVector3f(0, -1, 0),
+)
+
+
 class PlayerControllerSurfMixin:
     def _accelerate(self, wish_dir: LVector3f, wish_speed: float, accel: float, dt: float) -> None:
         if wish_dir.lengthSquared() <= 0.0:
@@ -134,19 +143,19 @@ class PlayerControllerSurfMixin:
             return LVector3f(0, 0, 0), LVector3f(0, 0, 0)
 
         probe_dist = max(0.08, float(self.tuning.player_radius) + 0.06)
-        directions = (
-            LVector3f(1, 0, 0),
-            LVector3f(-1, 0, 0),
-            LVector3f(0, 1, 0),
-            LVector3f(0, -1, 0),
-        )
         walkable_z = self._walkable_threshold_z(float(self.tuning.max_ground_slope_deg))
-
-        for d in directions:
-            hit = self._bullet_sweep_closest(self.pos, self.pos + d * probe_dist)
+        reach = self._scratch_wall_reach
+        end = self._scratch_probe_end
+
+        for d in _WALL_PROBE_DIRECTIONS:
+            reach.set(d.x, d.y, d.z)
+            reach *= probe_dist
+            end.set(self.pos.x, self.pos.y, self.pos.z)
+            end += reach
+            hit = self._bullet_sweep_closest(self.pos, end)
             if not hit.hasHit():
                 continue
-            n = LVector3f(hit.getHitNormal())
+            n = hit.getHitNormal()
             if n.lengthSquared() > 1e-12:
                 n.normalize()
             # Treat near-vertical surfaces as walls.
@@ -154,10 +163,11 @@ class PlayerControllerSurfMixin:
                 wall_n = LVector3f(n.x, n.y, 0.0)
                 if wall_n.lengthSquared() > 1e-12:
                     wall_n.normalize()
-                    frac = max(0.0, min(1.0, float(hit.getHitFraction())))
-                    p = self.pos + d * (probe_dist * frac)
                     if hasattr(hit, "getHitPos"):
                         p = LVector3f(hit.getHitPos())
+                    else:
+                        frac = max(0.0, min(1.0, float(hit.getHitFraction())))
+                        p = self.pos + d * (probe_dist * frac)
                     if not self._is_valid_wall_contact(point=p):
                         continue
                     return wall_n, p
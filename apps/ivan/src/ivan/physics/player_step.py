@@ -0,0 +1,43 @@
+"""One `PlayerController` movement step from resolved intent inputs.
+
+Shared by the server (in-process and sharded simulation, `net/sim_shard.py`) and headless replay simulation
+(`replays/batch_sim.py`), so every path steps players the same way.
+"""
+
+from __future__ import annotations
+
+from panda3d.core import LVector3f
+
+from ivan.physics.motion.intent import MotionIntent
+from ivan.physics.player_controller import PlayerController
+
+
+def step_player(
+    ctrl: PlayerController,
+    *,
+    dt: float,
+    wish: LVector3f,
+    jump_requested: bool,
+    slide_requested: bool,
+    yaw_deg: float,
+    pitch_deg: float,
+) -> None:
+    """Single player movement step; shared by in-process, sharded and headless simulation."""
+
+    collision = getattr(ctrl, "collision", None)
+    if collision is not None:
+        # The sweep shape lives on the shared CollisionWorld; size it for this player before stepping.
+        collision.update_player_sweep_shape(
+            player_radius=float(ctrl.tuning.player_radius),
+            player_half_height=float(ctrl.player_half.z),
+        )
+    ctrl.step_with_intent(
+        dt=dt,
+        intent=MotionIntent(
+            wish_dir=LVector3f(wish),
+            jump_requested=bool(jump_requested),
+            slide_requested=bool(slide_requested),
+        ),
+        yaw_deg=yaw_deg,
+        pitch_deg=pitch_deg,
+    )
@@ -0,0 +1,63 @@
+"""Fixed-grid quantisation for the opt-in deterministic simulation mode (`deterministic_quantize_enabled`).
+
+With the mode on, `PlayerController` snaps position and velocity to a power-of-two grid at the end of every step
+and sees collision hits through `QuantizedHit` (snapped fraction, normal and point). Every grid value is exactly
+representable as a 32-bit float inside the playable range, so sub-quantum drift between machines (Bullet builds,
+FMA contraction, libm differences) is absorbed instead of compounding tick after tick.
+"""
+
+from __future__ import annotations
+
+import math
+
+from panda3d.core import LVector3f
+
+# 1/1024 units (~1 mm at default map scale); exact in float32 for |v| < 16384.
+POSITION_QUANTUM = 1.0 / 1024.0
+VELOCITY_QUANTUM = 1.0 / 1024.0
+NORMAL_QUANTUM = 1.0 / 4096.0
+HIT_FRACTION_QUANTUM = 1.0 / 65536.0
+
+
+def quantize_vec3(vec: LVector3f, quantum: float) -> LVector3f:
+    """Snap `vec` to the grid in place and return it."""
+    vec.set(
+        round(float(vec.x) / quantum) * quantum,
+        round(float(vec.y) / quantum) * quantum,
+        round(float(vec.z) / quantum) * quantum,
+    )
+    return vec
+
+
+class QuantizedHit:
+    """
+    Read-only view of a Bullet closest-hit result with grid-snapped values.
+
+    The hit fraction is floored, never rounded up, so a snapped sweep never moves further into geometry than
+    the raw one.
+    """
+
+    __slots__ = ("_has_hit", "_fraction", "_normal", "_pos")
+
+    def __init__(self, hit) -> None:
+        self._has_hit = bool(hit.hasHit())
+        if not self._has_hit:
+            self._fraction = 1.0
+            self._normal = LVector3f(0.0, 0.0, 0.0)
+            self._pos = LVector3f(0.0, 0.0, 0.0)
+            return
+        self._fraction = math.floor(float(hit.getHitFraction()) / HIT_FRACTION_QUANTUM) * HIT_FRACTION_QUANTUM
+        self._normal = quantize_vec3(LVector3f(hit.getHitNormal()), NORMAL_QUANTUM)
+        self._pos = quantize_vec3(LVector3f(hit.getHitPos()), POSITION_QUANTUM)
+
+    def hasHit(self) -> bool:
+        return self._has_hit
+
+    def getHitFraction(self) -> float:
+        return self._fraction
+
+    def getHitNormal(self) -> LVector3f:
+        return LVector3f(self._normal)
+
+    def getHitPos(self) -> LVector3f:
+        return LVector3f(self._pos)
@@ -5,6 +5,14 @@ from dataclasses import dataclass
 
 @dataclass
 class PhysicsTuning:
+    """
+    Persisted movement/feel tuning.
+
+    `version` increases whenever a field is assigned a different value (debug UI, console cvars, server tuning
+    snapshots, profiles, ...), so consumers can cache values derived from a tuning object and re-derive only when
+    it actually changed.
+    """
+
     # Invariant-driven movement core.
     # All primary run/jump/slide/ground-slowdown behavior derives from these timing/target values.
     run_t90: float = 0.240
@@ -82,5 +90,19 @@ class PhysicsTuning:
     course_marker_half_extent_xy: float = 2.5
     course_marker_half_extent_z: float = 2.0
 
+    # Opt-in cross-machine determinism: snap controller state and collision hits to a fixed grid every tick.
+    deterministic_quantize_enabled: bool = False
+
     # Rendering / visibility debugging (default OFF: avoid artifacts on GoldSrc PVS maps).
     vis_culling_enabled: bool = False
+
+    def __setattr__(self, name: str, value) -> None:
+        if name in PhysicsTuning.__dataclass_fields__:
+            d = self.__dict__
+            if name not in d or d[name] != value or type(d[name]) is not type(value):
+                d["_version"] = d.get("_version", 0) + 1
+        object.__setattr__(self, name, value)
+
+    @property
+    def version(self) -> int:
+        return int(self.__dict__.get("_version", 0))
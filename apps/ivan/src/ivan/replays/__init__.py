@@ -1,11 +1,15 @@
 from ivan.replays.demo import (
     DemoFrame,
+    DemoKeyframe,
     DemoMetadata,
     DemoRecording,
     append_frame,
+    append_keyframe,
     demo_dir,
+    keyframe_due,
     list_replays,
     load_replay,
+    nearest_keyframe,
     new_recording,
     save_recording,
 )
@@ -19,22 +23,34 @@ from ivan.replays.telemetry import (
     ReplayTelemetryExport,
     export_latest_replay_telemetry,
     export_replay_telemetry,
+    replay_summary,
     telemetry_export_dir,
 )
+from ivan.replays.batch_sim import (
+    HeadlessSimulator,
+    SimulationResult,
+    simulate_replay_batch,
+)
 from ivan.replays.determinism_verify import (
     ReplayDeterminismReport,
+    ReplayHashCheck,
+    check_replay_hashes,
     verify_latest_replay_determinism,
     verify_replay_determinism,
 )
 
 __all__ = [
     "DemoFrame",
+    "DemoKeyframe",
     "DemoMetadata",
     "DemoRecording",
     "append_frame",
+    "append_keyframe",
     "demo_dir",
+    "keyframe_due",
     "list_replays",
     "load_replay",
+    "nearest_keyframe",
     "new_recording",
     "save_recording",
     "ReplayTelemetryComparison",
@@ -44,8 +60,14 @@ __all__ = [
     "ReplayTelemetryExport",
     "export_latest_replay_telemetry",
     "export_replay_telemetry",
+    "replay_summary",
     "telemetry_export_dir",
+    "HeadlessSimulator",
+    "SimulationResult",
+    "simulate_replay_batch",
     "ReplayDeterminismReport",
+    "ReplayHashCheck",
+    "check_replay_hashes",
     "verify_latest_replay_determinism",
     "verify_replay_determinism",
 ]
@@ -0,0 +1,423 @@
+"""Headless batch physics simulation of recorded demos.
+
+A `HeadlessSimulator` loads a map bundle's collision once into one shared `CollisionWorld` and replays demo input
+through `PlayerController` (the same `step_player` the server uses), with the demo's tuning or any number of tuning
+variants. Each run returns per-tick determinism hashes and the telemetry summary `export_replay_telemetry` would
+produce for a recording of that run. `simulate_replay_batch` fans variants out over a spawn-context process pool
+where every worker builds its simulator (and collision world) once.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Any
+
+from panda3d.core import LVector3f, NodePath, PandaNode
+
+from ivan.game.determinism import DeterminismTrace, deterministic_state_hash
+from ivan.maps.bundle_io import open_bundle_geometry, resolve_bundle_handle
+from ivan.physics.collision_world import CollisionWorld
+from ivan.physics.controller_snapshot import ControllerState
+from ivan.physics.player_controller import PlayerController
+from ivan.physics.player_step import step_player
+from ivan.physics.tuning import PhysicsTuning
+from ivan.replays.demo import DemoFrame, DemoRecording, nearest_keyframe
+from ivan.replays.telemetry import replay_summary
+
+
+@dataclass(frozen=True)
+class SimulationResult:
+    label: str
+    tuning_overrides: dict[str, float | bool]
+    trace_hash: str
+    tick_hashes: list[str]
+    recorded_checked: int
+    recorded_mismatches: int
+    summary: dict[str, Any]
+    first_mismatch_tick: int | None = None
+    # Controller state and (yaw, pitch) after the last simulated frame; feed back into `run` to resume.
+    final_state: ControllerState | None = None
+    final_look: tuple[float, float] = (0.0, 0.0)
+
+
+def _clamp(v: float, lo: float, hi: float) -> float:
+    return lo if v < lo else hi if v > hi else v
+
+
+def _wish_direction_from_axes(*, yaw_deg: float, move_forward: int, move_right: int) -> LVector3f:
+    h_rad = math.radians(float(yaw_deg))
+    forward = LVector3f(-math.sin(h_rad), math.cos(h_rad), 0.0)
+    right = LVector3f(forward.y, -forward.x, 0.0)
+
+    move = LVector3f(0.0, 0.0, 0.0)
+    if int(move_forward) > 0:
+        move += forward
+    elif int(move_forward) < 0:
+        move -= forward
+    if int(move_right) > 0:
+        move += right
+    elif int(move_right) < 0:
+        move -= right
+
+    if move.lengthSquared() > 1e-12:
+        move.normalize()
+    return move
+
+
+def _apply_tuning_snapshot(tuning: PhysicsTuning, snap: dict[str, Any]) -> None:
+    fields = set(PhysicsTuning.__annotations__.keys())
+    for field, value in snap.items():
+        if field not in fields:
+            continue
+        if isinstance(value, bool):
+            setattr(tuning, field, bool(value))
+        elif isinstance(value, (int, float)):
+            setattr(tuning, field, float(value))
+
+
+def _tuning_from_metadata(rec: DemoRecording, overrides: dict[str, Any] | None = None) -> PhysicsTuning:
+    tuning = PhysicsTuning()
+    _apply_tuning_snapshot(tuning, dict(rec.metadata.tuning or {}))
+    if overrides:
+        _apply_tuning_snapshot(tuning, dict(overrides))
+    return tuning
+
+
+def _initial_state(rec: DemoRecording) -> tuple[LVector3f, float, float, LVector3f, bool]:
+    spawn = LVector3f(0.0, 0.0, 3.0)
+    yaw = 0.0
+    pitch = 0.0
+    vel = LVector3f(0.0, 0.0, 0.0)
+    grounded = False
+    if rec.frames:
+        tm = rec.frames[0].telemetry if isinstance(rec.frames[0].telemetry, dict) else {}
+        if isinstance(tm.get("x"), (int, float)) and isinstance(tm.get("y"), (int, float)) and isinstance(tm.get("z"), (int, float)):
+            spawn = LVector3f(float(tm["x"]), float(tm["y"]), float(tm["z"]))
+        if isinstance(tm.get("yaw"), (int, float)):
+            yaw = float(tm["yaw"])
+        if isinstance(tm.get("pitch"), (int, float)):
+            pitch = float(tm["pitch"])
+        if isinstance(tm.get("vx"), (int, float)) and isinstance(tm.get("vy"), (int, float)) and isinstance(tm.get("vz"), (int, float)):
+            vel = LVector3f(float(tm["vx"]), float(tm["vy"]), float(tm["vz"]))
+        if "grounded" in tm:
+            grounded = bool(tm.get("grounded"))
+    return spawn, yaw, pitch, vel, grounded
+
+
+def _float_rows(tris: list) -> list[list[float]]:
+    out: list[list[float]] = []
+    for t in tris:
+        if isinstance(t, list) and len(t) == 9:
+            try:
+                out.append([float(x) for x in t])
+            except Exception:
+                pass
+    return out
+
+
+def load_map_collision_triangles(map_json: str | None) -> list | None:
+    """
+    Collision triangles of a map bundle (binary geometry, or inline `collision_triangles`/`triangles`).
+
+    Returns None when there is no map reference, it does not resolve to a bundle (e.g. raw `.map` sources) or it
+    carries no triangles; the simulation then runs without map collision.
+    """
+
+    if not map_json:
+        return None
+    try:
+        handle = resolve_bundle_handle(str(map_json))
+    except Exception:
+        return None
+    if handle is None:
+        return None
+    try:
+        payload = json.loads(Path(handle.map_json).read_text(encoding="utf-8"))
+    except Exception:
+        return None
+    if not isinstance(payload, dict):
+        return None
+    geometry = open_bundle_geometry(map_json=Path(handle.map_json), payload=payload)
+    if geometry is not None:
+        # Copy rows out of the mapping so the blob can be closed here.
+        try:
+            rows = [row.tolist() for row in geometry.collision_rows()]
+        finally:
+            geometry.close()
+        return rows or None
+    tris = payload.get("triangles")
+    if not isinstance(tris, list) or not tris:
+        return None
+    if isinstance(tris[0], dict):
+        coll = payload.get("collision_triangles")
+        if isinstance(coll, list) and coll and isinstance(coll[0], list):
+            ctri = _float_rows(coll)
+            if ctri:
+                return ctri
+        return _float_rows([t.get("p") for t in tris if isinstance(t, dict)]) or None
+    return _float_rows(tris) or None
+
+
+class HeadlessSimulator:
+    """Replays demo input through `PlayerController` against one shared collision world (no rendering)."""
+
+    def __init__(self, *, triangles: list | None = None, map_json: str | None = None) -> None:
+        self.map_json = map_json
+        self.collision: CollisionWorld | None = None
+        if triangles is not None and len(triangles):
+            tuning = PhysicsTuning()
+            self.collision = CollisionWorld(
+                aabbs=[],
+                triangles=triangles,
+                triangle_collision_mode=True,
+                player_radius=float(tuning.player_radius),
+                player_half_height=float(tuning.player_half_height),
+                render=NodePath(PandaNode("headless-sim-root")),
+            )
+
+    @classmethod
+    def from_map(cls, map_json: str | None) -> HeadlessSimulator:
+        return cls(triangles=load_map_collision_triangles(map_json), map_json=map_json)
+
+    @property
+    def collision_source(self) -> str:
+        return "map" if self.collision is not None else "none"
+
+    def run(
+        self,
+        rec: DemoRecording,
+        *,
+        tuning_overrides: dict[str, Any] | None = None,
+        label: str = "",
+        stop_on_mismatch: bool = False,
+        start_frame: int = 0,
+        stop_frame: int | None = None,
+        initial_state: ControllerState | None = None,
+        initial_look: tuple[float, float] | None = None,
+    ) -> SimulationResult:
+        """
+        Simulate every frame of `rec` and hash the post-step state.
+
+        Recorded per-tick hashes (`DemoFrame.state_hash`, else telemetry `det_h`) are compared as the run goes;
+        `stop_on_mismatch` ends the run at the first differing tick.
+
+        To resume mid-demo pass `start_frame` with the controller state captured after frame `start_frame - 1`
+        (`initial_state`) and the `(yaw, pitch)` at that point; only frames from `start_frame` on are simulated.
+        `stop_frame` ends the run before that frame (the spawn seed still comes from the first recorded frame).
+        """
+        overrides = dict(tuning_overrides or {})
+        tuning = _tuning_from_metadata(rec, overrides)
+        spawn, yaw, pitch, vel, grounded = _initial_state(rec)
+        if self.collision is not None:
+            # Every run starts cold so repeated runs exercise Bullet again instead of replaying the sweep memo.
+            self.collision.clear_sweep_cache()
+        ctrl = PlayerController(
+            tuning=tuning,
+            spawn_point=spawn,
+            aabbs=[],
+            collision=self.collision,
+        )
+        stop = len(rec.frames) if stop_frame is None else max(0, min(len(rec.frames), int(stop_frame)))
+        start = max(0, min(stop, int(start_frame)))
+        if initial_state is not None:
+            ctrl.restore_state(initial_state)
+            if initial_look is not None:
+                yaw, pitch = float(initial_look[0]), float(initial_look[1])
+        else:
+            ctrl.pos = LVector3f(spawn)
+            ctrl.set_external_velocity(vel=LVector3f(vel), reason="determinism.seed")
+            ctrl.grounded = bool(grounded)
+
+        tick_rate = max(1, int(rec.metadata.tick_rate))
+        dt = 1.0 / float(tick_rate)
+        look_scale = max(1, int(rec.metadata.look_scale))
+        trace = DeterminismTrace(
+            tick_rate_hz=tick_rate,
+            seconds=max(2.0, min(30.0, len(rec.frames) / float(tick_rate) + 1.0)),
+        )
+        hashes: list[str] = []
+        frames: list[DemoFrame] = []
+        checked = 0
+        mismatches = 0
+        first_mismatch: int | None = None
+
+        for i, frame in enumerate(rec.frames[start:stop], start=start):
+            yaw -= (float(frame.look_dx) / float(look_scale)) * float(tuning.mouse_sensitivity)
+            pitch = _clamp(
+                pitch - (float(frame.look_dy) / float(look_scale)) * float(tuning.mouse_sensitivity),
+                -88.0,
+                88.0,
+            )
+            wish = _wish_direction_from_axes(
+                yaw_deg=float(yaw),
+                move_forward=int(frame.move_forward),
+                move_right=int(frame.move_right),
+            )
+            jump_requested = bool(frame.jump_pressed)
+            if bool(tuning.autojump_enabled) and bool(frame.jump_held) and bool(ctrl.grounded):
+                jump_requested = True
+
+            step_player(
+                ctrl,
+                dt=dt,
+                wish=wish,
+                jump_requested=jump_requested,
+                slide_requested=bool(frame.slide_pressed),
+                yaw_deg=float(yaw),
+                pitch_deg=float(pitch),
+            )
+
+            pos = ctrl.pos
+            v = ctrl.vel
+            tick_hash = deterministic_state_hash(
+                pos=LVector3f(pos),
+                vel=LVector3f(v),
+                yaw_deg=float(yaw),
+                pitch_deg=float(pitch),
+                grounded=bool(ctrl.grounded),
+                state=ctrl.motion_state_name(),
+                contact_count=ctrl.contact_count(),
+                jump_buffer_left=ctrl.jump_buffer_left(),
+                coyote_left=ctrl.coyote_left(),
+            )
+            trace.record(t=float(i + 1) * dt, tick_hash=tick_hash)
+            hashes.append(str(tick_hash))
+
+            tm = frame.telemetry if isinstance(frame.telemetry, dict) else None
+            exp_hash = str(frame.state_hash or (tm.get("det_h") if tm else "") or "")
+            mismatch = False
+            if exp_hash:
+                checked += 1
+                if exp_hash != tick_hash:
+                    mismatches += 1
+                    mismatch = True
+                    if first_mismatch is None:
+                        first_mismatch = i
+
+            hs = math.sqrt(float(v.x) * float(v.x) + float(v.y) * float(v.y))
+            frames.append(
+                replace(
+                    frame,
+                    telemetry={
+                        "t": float(i + 1) * dt,
+                        "x": float(pos.x),
+                        "y": float(pos.y),
+                        "z": float(pos.z),
+                        "vx": float(v.x),
+                        "vy": float(v.y),
+                        "vz": float(v.z),
+                        "hs": float(hs),
+                        "sp": math.sqrt(hs * hs + float(v.z) * float(v.z)),
+                        "yaw": float(yaw),
+                        "pitch": float(pitch),
+                        "det_h": str(tick_hash),
+                        "grounded": bool(ctrl.grounded),
+                        "sliding": bool(ctrl.is_sliding()),
+                    },
+                    state_hash=str(tick_hash),
+                )
+            )
+            if mismatch and stop_on_mismatch:
+                break
+
+        tuning_snapshot = {k: getattr(tuning, k) for k in PhysicsTuning.__annotations__}
+        simulated = DemoRecording(metadata=replace(rec.metadata, tuning=tuning_snapshot), frames=frames)
+        return SimulationResult(
+            label=str(label),
+            tuning_overrides=overrides,
+            trace_hash=str(trace.latest_trace_hash()),
+            tick_hashes=hashes,
+            recorded_checked=int(checked),
+            recorded_mismatches=int(mismatches),
+            summary=replay_summary(simulated),
+            first_mismatch_tick=first_mismatch,
+            final_state=ctrl.capture_state(),
+            final_look=(float(yaw), float(pitch)),
+        )
+
+    def state_at(self, rec: DemoRecording, *, tick: int) -> tuple[ControllerState, tuple[float, float]]:
+        """
+        Controller state and (yaw, pitch) before `rec.frames[tick]`.
+
+        Starts from the nearest recorded keyframe at or before `tick` and simulates only the frames in between;
+        demos without keyframes are simulated from the start.
+        """
+
+        tick = max(0, min(len(rec.frames), int(tick)))
+        kf = nearest_keyframe(rec.keyframes, tick)
+        if kf is None:
+            result = self.run(rec, stop_frame=tick)
+        else:
+            result = self.run(
+                rec,
+                start_frame=kf.tick,
+                stop_frame=tick,
+                initial_state=kf.controller,
+                initial_look=(float(kf.yaw), float(kf.pitch)),
+            )
+        if result.final_state is None:
+            raise RuntimeError(f"Replay simulation to tick {tick} produced no controller state")
+        return result.final_state, result.final_look
+
+
+# Per-process state for pool workers: the recording and a simulator whose collision world is built once.
+_WORKER_REC: DemoRecording | None = None
+_WORKER_SIM: HeadlessSimulator | None = None
+
+
+def _worker_init(rec: DemoRecording, map_json: str | None) -> None:
+    global _WORKER_REC, _WORKER_SIM
+    _WORKER_REC = rec
+    _WORKER_SIM = HeadlessSimulator.from_map(map_json)
+
+
+def _worker_run(task: tuple[str, dict[str, Any]]) -> SimulationResult:
+    label, overrides = task
+    if _WORKER_SIM is None or _WORKER_REC is None:
+        raise RuntimeError("Replay batch worker used before _worker_init")
+    return _WORKER_SIM.run(_WORKER_REC, tuning_overrides=overrides, label=label)
+
+
+def simulate_replay_batch(
+    *,
+    rec: DemoRecording,
+    variants: list[dict[str, Any]] | None = None,
+    labels: list[str] | None = None,
+    map_json: str | None = None,
+    workers: int = 0,
+) -> list[SimulationResult]:
+    """
+    Simulate `rec` once per tuning variant (default: one run with the recorded tuning), in variant order.
+
+    `map_json` defaults to the demo's own map. `workers` <= 1 runs in-process on one shared simulator; otherwise a
+    spawn-context process pool of up to `workers` processes runs the variants, each loading the map once.
+    """
+
+    tasks_overrides = [dict(v or {}) for v in (variants if variants is not None else [{}])]
+    names = [str(x) for x in (labels or [])]
+    tasks = [(names[i] if i < len(names) else f"variant-{i}", ov) for i, ov in enumerate(tasks_overrides)]
+    ref = map_json if map_json is not None else rec.metadata.map_json
+    pool_size = min(max(0, int(workers)), len(tasks))
+    if pool_size <= 1:
+        sim = HeadlessSimulator.from_map(ref)
+        return [sim.run(rec, tuning_overrides=ov, label=label) for label, ov in tasks]
+    with ProcessPoolExecutor(
+        max_workers=pool_size,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_worker_init,
+        initargs=(rec, ref),
+    ) as pool:
+        return list(pool.map(_worker_run, tasks))
+
+
+__all__ = [
+    "HeadlessSimulator",
+    "SimulationResult",
+    "load_map_collision_triangles",
+    "simulate_replay_batch",
+]
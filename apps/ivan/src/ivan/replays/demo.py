@@ -1,15 +1,20 @@
 from __future__ import annotations
 
+import bisect
 import json
 import time
 from dataclasses import dataclass, field
 from pathlib import Path
+from typing import Any
 
 from ivan.paths import app_root
+from ivan.physics.controller_snapshot import ControllerState, controller_state_from_json, controller_state_to_json
 
 
-DEMO_FORMAT_VERSION = 3
+DEMO_FORMAT_VERSION = 4
 DEMO_EXT = ".ivan_demo.json"
+# Full-state keyframe spacing while recording (5 s at 60 Hz); seeking re-simulates at most this many ticks.
+DEMO_KEYFRAME_INTERVAL_TICKS = 300
 
 
 @dataclass(frozen=True)
@@ -40,6 +45,8 @@ class DemoFrame:
     raw_arrows_available: bool = False
     raw_mouse_buttons_available: bool = False
     telemetry: dict[str, float | int | bool] | None = None
+    # Post-step `deterministic_state_hash` of the recorded tick ("" for older demos); checked by replay verifiers.
+    state_hash: str = ""
 
 
 @dataclass(frozen=True)
@@ -53,10 +60,27 @@ class DemoMetadata:
     tuning: dict[str, float | bool]
 
 
+@dataclass(frozen=True)
+class DemoKeyframe:
+    """
+    Full simulation state before `frames[tick]` (i.e. after `tick` frames were applied).
+
+    `extra` holds host-level state outside the controller (combat runtime, hp, race progress) as plain JSON.
+    """
+
+    tick: int
+    yaw: float
+    pitch: float
+    controller: ControllerState
+    extra: dict[str, Any] = field(default_factory=dict)
+
+
 @dataclass
 class DemoRecording:
     metadata: DemoMetadata
     frames: list[DemoFrame] = field(default_factory=list)
+    # Sorted by tick; empty for demos recorded before format v4.
+    keyframes: list[DemoKeyframe] = field(default_factory=list)
 
 
 def demo_dir() -> Path:
@@ -105,6 +129,28 @@ def append_frame(rec: DemoRecording, frame: DemoFrame) -> None:
     rec.frames.append(frame)
 
 
+def keyframe_due(rec: DemoRecording, *, interval_ticks: int = DEMO_KEYFRAME_INTERVAL_TICKS) -> bool:
+    """True when the recording sits on a keyframe boundary (tick 0 included) that has no keyframe yet."""
+
+    tick = len(rec.frames)
+    if interval_ticks <= 0 or tick % int(interval_ticks) != 0:
+        return False
+    return not rec.keyframes or rec.keyframes[-1].tick < tick
+
+
+def append_keyframe(rec: DemoRecording, keyframe: DemoKeyframe) -> None:
+    if rec.keyframes and rec.keyframes[-1].tick >= int(keyframe.tick):
+        raise ValueError(f"Keyframe tick {keyframe.tick} is not after {rec.keyframes[-1].tick}")
+    rec.keyframes.append(keyframe)
+
+
+def nearest_keyframe(keyframes: list[DemoKeyframe], tick: int) -> DemoKeyframe | None:
+    """Latest keyframe at or before `tick`, or None when the first keyframe is later (or there are none)."""
+
+    i = bisect.bisect_right([k.tick for k in keyframes], int(tick))
+    return keyframes[i - 1] if i > 0 else None
+
+
 def save_recording(rec: DemoRecording) -> Path:
     out = demo_dir() / f"{rec.metadata.demo_name}{DEMO_EXT}"
     payload = {
@@ -145,9 +191,20 @@ def save_recording(rec: DemoRecording) -> Path:
                 "m1": bool(f.mouse_left_held),
                 "m2": bool(f.mouse_right_held),
                 "tm": dict(f.telemetry) if isinstance(f.telemetry, dict) else None,
+                "h": str(f.state_hash),
             }
             for f in rec.frames
         ],
+        "keyframes": [
+            {
+                "t": int(k.tick),
+                "yaw": float(k.yaw),
+                "pitch": float(k.pitch),
+                "ctrl": controller_state_to_json(k.controller),
+                "x": dict(k.extra),
+            }
+            for k in rec.keyframes
+        ],
     }
     out.write_text(json.dumps(payload, ensure_ascii=True, sort_keys=True, separators=(",", ":")) + "\n", encoding="utf-8")
     return out
@@ -159,7 +216,7 @@ def load_replay(path: Path) -> DemoRecording:
         raise ValueError("Invalid replay payload")
     ver = raw.get("format_version")
     iver = int(ver)
-    if iver not in (1, 2, DEMO_FORMAT_VERSION):
+    if iver not in (1, 2, 3, DEMO_FORMAT_VERSION):
         raise ValueError(f"Unsupported replay format_version={ver}")
 
     meta = raw.get("metadata")
@@ -218,9 +275,38 @@ def load_replay(path: Path) -> DemoRecording:
                 raw_arrows_available=bool(has_raw_arrows),
                 raw_mouse_buttons_available=bool(has_raw_mouse_buttons),
                 telemetry=(dict(row.get("tm")) if isinstance(row.get("tm"), dict) else None),
+                state_hash=str(row.get("h") or ""),
+            )
+        )
+    keyframes = _load_keyframes(raw.get("keyframes"), n_frames=len(frames))
+    return DemoRecording(metadata=md, frames=frames, keyframes=keyframes)
+
+
+def _load_keyframes(rows: object, *, n_frames: int) -> list[DemoKeyframe]:
+    # Keyframes are an accelerator only: malformed or out-of-range rows (e.g. written by a controller with a
+    # different field set) are dropped and seeking falls back to re-simulating from an earlier point.
+    if not isinstance(rows, list):
+        return []
+    out: list[DemoKeyframe] = []
+    for row in rows:
+        if not isinstance(row, dict):
+            continue
+        ctrl = controller_state_from_json(row.get("ctrl"))
+        tick = row.get("t")
+        if ctrl is None or not isinstance(tick, int) or not (0 <= tick <= n_frames):
+            continue
+        if out and out[-1].tick >= tick:
+            continue
+        out.append(
+            DemoKeyframe(
+                tick=int(tick),
+                yaw=float(row.get("yaw") or 0.0),
+                pitch=float(row.get("pitch") or 0.0),
+                controller=ctrl,
+                extra=dict(row.get("x")) if isinstance(row.get("x"), dict) else {},
             )
         )
-    return DemoRecording(metadata=md, frames=frames)
+    return out
 
 
 def list_replays() -> list[Path]:
@@ -197,7 +197,8 @@ def _compute_camera_jerk(tm_frames: list[dict[str, Any]], *, tick_rate: int) ->
     }
 
 
-def _summary(rec: DemoRecording) -> dict[str, Any]:
+def replay_summary(rec: DemoRecording) -> dict[str, Any]:
+    """Telemetry summary metrics of a recording; shared by `export_replay_telemetry` and headless simulation."""
     frames = list(rec.frames)
     tm_frames = [dict(f.telemetry) for f in frames if isinstance(f.telemetry, dict)]
     tick_rate = max(1, int(rec.metadata.tick_rate))
@@ -345,7 +346,7 @@ def export_replay_telemetry(
         for row in rows:
             writer.writerow(row)
 
-    summary = _summary(rec)
+    summary = replay_summary(rec)
     now = float(time.time())
     tag = str(route_tag).strip().upper() if isinstance(route_tag, str) and str(route_tag).strip() else None
     route_label = str(route_name).strip() if isinstance(route_name, str) and str(route_name).strip() else None
@@ -137,6 +137,7 @@ class ReplayInputUI:
         self._mouse_rmb = self._box(x=mx + 0.12, y=my - 0.14, w=0.10, h=0.08, color=self._inactive, text="M2", text_scale=theme.small_scale)
         self._label(x=mx, y=self._move_origin_y + self._move_h + 0.03, text="Mouse", scale=theme.small_scale, fg=theme.text_muted)
 
+        self._timeline_text = ""
         self._root.hide()
         self._visible = False
 
@@ -203,6 +204,14 @@ class ReplayInputUI:
     def root(self):
         return self._root
 
+    def set_timeline(self, text: str) -> None:
+        """Playback position/speed readout, shown in the panel header next to the title."""
+
+        title = self._panel.title
+        if title is not None and text != self._timeline_text:
+            self._timeline_text = str(text)
+            title["text"] = f"REPLAY INPUT  |  {text}" if text else "REPLAY INPUT"
+
     def set_input(
         self,
         *,
@@ -116,6 +116,26 @@ class GoldSrcBspVis:
 
         return flags
 
+    def world_face_leaves(self) -> dict[int, int]:
+        """
+        Map each world face to the first leaf that lists it.
+
+        Faces sharing a leaf are shown/hidden together by PVS, so render batching can merge them.
+        """
+
+        out: dict[int, int] = {}
+        w0 = int(self.world_first_face)
+        w1 = int(self.world_face_end)
+        n_leaf_faces = len(self.leaf_faces)
+        for leaf_idx, (_, first, count) in enumerate(self.leaves):
+            if int(count) <= 0 or int(first) < 0:
+                continue
+            for i in range(int(first), min(int(first) + int(count), n_leaf_faces)):
+                face_idx = int(self.leaf_faces[i])
+                if w0 <= face_idx < w1 and face_idx not in out:
+                    out[face_idx] = int(leaf_idx)
+        return out
+
     def to_json(self) -> str:
         payload = {
             "format": "goldsrc_pvs_v1",
@@ -13,6 +13,7 @@ from panda3d.core import (
 )
 
 from ivan.common.aabb import AABB
+from ivan.maps.geometry_blob import GeometryBlob
 from ivan.world.scene_layers.assets import (
     build_material_texture_index,
     resolve_lightmaps,
@@ -34,6 +35,7 @@ from ivan.world.scene_layers.geometry import (
     attach_triangle_map_geometry,
     attach_triangle_map_geometry_v2,
     attach_triangle_map_geometry_v2_unlit,
+    geometry_bulk_enabled,
     setup_skybox,
 )
 from ivan.world.goldsrc_visibility import GoldSrcBspVis
@@ -50,6 +52,8 @@ from ivan.world.scene_layers.lighting import (
     lights_from_payload,
 )
 from ivan.world.scene_layers.loading import (
+    close_geometry_blob,
+    reload_map_file,
     try_load_external_map,
     try_load_map_file,
 )
@@ -132,6 +136,11 @@ class WorldScene:
         self._pending_map_fog: dict | None = None
         self._map_json_path: Path | None = None
         self._map_payload: dict | None = None
+        # Mapped geometry.bin payload (kept open: collision rows are views into it).
+        self._geometry_blob: GeometryBlob | None = None
+        self._geometry_build_report: dict[str, object] = {}
+        # Direct `.map` loads: material -> (triangle digest, NodePath) for incremental hot reload.
+        self._map_geometry_groups: dict[str, tuple[bytes, object]] = {}
         self._ambient_np = None
         self._sun_np = None
         self._moving_blocks: list[_MovingBlock] = []
@@ -152,6 +161,10 @@ class WorldScene:
     def set_collision_updater(self, updater) -> None:
         self._collision_updater = updater
 
+    def close(self) -> None:
+        """Release file-backed map resources (the mapped geometry.bin). Call before dropping the scene."""
+        close_geometry_blob(self)
+
     def build(self, *, cfg, loader, render, camera) -> None:
         self._begin_load_report(cfg=cfg)
         self._pixelated_textures = bool(getattr(cfg, "pixelated_textures", True))
@@ -196,10 +209,12 @@ class WorldScene:
             material_texture_cache=True,
             visibility_memory_cache=True,
             visibility_deferred_lightmaps=True,
+            geometry_bulk_vertex_upload=geometry_bulk_enabled(),
         )
         self._load_reporter.set_visibility_cache(enabled=False, result="not-requested")
         self._load_report_emitted = False
         self._visibility_cache_report = {}
+        self._geometry_build_report = {}
 
     def _time_load_stage(self, stage_name: str):
         fn = getattr(self._load_reporter, "stage", None)
@@ -457,8 +472,15 @@ class WorldScene:
     def _try_load_map_file(self, *, cfg, map_file: Path, loader, render, camera) -> bool:
         return try_load_map_file(self, map_file=map_file, loader=loader, render=render, camera=camera)
 
-    def _attach_triangle_map_geometry_v2_unlit(self, *, loader, render, triangles: list[dict]) -> None:
-        attach_triangle_map_geometry_v2_unlit(self, loader=loader, render=render, triangles=triangles)
+    def reload_map_file(self, *, map_file: Path, loader, render) -> dict[str, object] | None:
+        return reload_map_file(self, map_file=map_file, loader=loader, render=render)
+
+    def _attach_triangle_map_geometry_v2_unlit(
+        self, *, loader, render, triangles: list[dict] | GeometryBlob, track_groups: bool = False
+    ) -> None:
+        attach_triangle_map_geometry_v2_unlit(
+            self, loader=loader, render=render, triangles=triangles, track_groups=track_groups
+        )
 
     def _resolve_visibility(self, *, cfg, map_json: Path, payload: dict) -> GoldSrcBspVis | None:
         return resolve_visibility(self, cfg=cfg, map_json=map_json, payload=payload)
@@ -512,7 +534,7 @@ class WorldScene:
         setattr(WorldScene, "_LIGHTMAP_SHADER", sh)
         return sh
 
-    def _attach_triangle_map_geometry_v2(self, *, loader, render, triangles: list[dict]) -> None:
+    def _attach_triangle_map_geometry_v2(self, *, loader, render, triangles: list[dict] | GeometryBlob) -> None:
         attach_triangle_map_geometry_v2(self, loader=loader, render=render, triangles=triangles)
 
     def _setup_skybox(
@@ -558,6 +580,8 @@ class WorldScene:
             diag["visibility_cache"] = dict(self._visibility_cache_report)
         if isinstance(self._map_convert_report, dict) and self._map_convert_report:
             diag["map_convert"] = dict(self._map_convert_report)
+        if isinstance(self._geometry_build_report, dict) and self._geometry_build_report:
+            diag["geometry_build"] = dict(self._geometry_build_report)
         return diag
 
     def list_available_skyboxes(self) -> list[str]:
@@ -129,6 +129,10 @@ def resolve_lightmaps(*, map_json: Path, payload: dict) -> dict[int, dict] | Non
             if not any(isinstance(p, Path) for p in resolved):
                 continue
             out[idx] = {"paths": resolved, "styles": list(styles)}
+            # Atlas bundles: faces on the same page share textures and can be batched.
+            page = v.get("page")
+            if isinstance(page, int) and page >= 0:
+                out[idx]["page"] = int(page)
     return out or None
 
 
@@ -20,6 +20,9 @@ class SceneLayerContract(Protocol):
     _map_scale: float
     _map_json_path: Path | None
     _map_payload: dict | None
+    _geometry_blob: Any
+    _geometry_build_report: dict[str, object]
+    _map_geometry_groups: dict[str, tuple[bytes, Any]]
     _material_texture_index: dict[str, Path] | None
     _material_texture_root: Path | None
     _materials_meta: dict[str, dict] | None
@@ -73,8 +76,10 @@ class SceneLayerContract(Protocol):
     def _resolve_lightstyles(self, *, payload: dict, cfg: dict | None) -> tuple[dict[int, str], str]: ...
     def _resolve_visibility(self, *, cfg, map_json: Path, payload: dict): ...
     def _attach_triangle_map_geometry(self, *, render, triangles: list[list[float]]) -> None: ...
-    def _attach_triangle_map_geometry_v2(self, *, loader, render, triangles: list[dict]) -> None: ...
-    def _attach_triangle_map_geometry_v2_unlit(self, *, loader, render, triangles: list[dict]) -> None: ...
+    def _attach_triangle_map_geometry_v2(self, *, loader, render, triangles: Any) -> None: ...
+    def _attach_triangle_map_geometry_v2_unlit(
+        self, *, loader, render, triangles: Any, track_groups: bool = False
+    ) -> None: ...
     def _enhance_map_file_lighting(self, render, lights) -> None: ...
     def _setup_skybox(
         self,
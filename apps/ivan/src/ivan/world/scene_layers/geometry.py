@@ -1,5 +1,9 @@
 from __future__ import annotations
 
+import hashlib
+import os
+import time
+from array import array
 from pathlib import Path
 
 from panda3d.core import (
@@ -21,6 +25,7 @@ from panda3d.core import (
     TransparencyAttrib,
 )
 
+from ivan.maps.geometry_blob import GeometryBlob
 from ivan.world.scene_layers.contracts import SceneLayerContract
 
 
@@ -47,6 +52,238 @@ void main() {
 """
 
 
+# Set IRUN_IVAN_GEOMETRY_BULK=0 to force the per-vertex GeomVertexWriter path (A/B load timing).
+GEOMETRY_BULK_ENV = "IRUN_IVAN_GEOMETRY_BULK"
+
+# Canonical per-vertex record order used by the bulk builder; it must match the packed layout
+# of the target vertex format (checked by `_packed_float_layout`).
+_UNLIT_COLUMNS: tuple[tuple[str, int], ...] = (("vertex", 3), ("normal", 3), ("texcoord", 2))
+_LIT_COLUMNS: tuple[tuple[str, int], ...] = (
+    ("vertex", 3),
+    ("normal", 3),
+    ("color", 4),
+    ("texcoord", 2),
+    ("texcoord.1", 2),
+)
+_ZERO_LM = [0.0] * 6
+
+
+def geometry_bulk_enabled() -> bool:
+    raw = str(os.environ.get(GEOMETRY_BULK_ENV, "1")).strip().lower()
+    return raw not in ("0", "false", "off", "no")
+
+
+def _packed_float_layout(fmt: GeomVertexFormat, columns: tuple[tuple[str, int], ...]) -> bool:
+    """True when `fmt` is a single tightly packed float32 array with exactly `columns` in order."""
+    try:
+        if fmt.getNumArrays() != 1:
+            return False
+        arr = fmt.getArray(0)
+        if arr.getNumColumns() != len(columns):
+            return False
+        off = 0
+        for i, (name, comps) in enumerate(columns):
+            col = arr.getColumn(i)
+            if str(col.getName()) != name or col.getNumComponents() != comps:
+                return False
+            if col.getNumericType() != Geom.NT_float32 or col.getStart() != off:
+                return False
+            off += comps * 4
+        return arr.getStride() == off
+    except Exception:
+        return False
+
+
+def _group_triangles(triangles, *, lit: bool) -> dict[tuple[str, int | None], list[tuple]]:
+    """
+    Group v2 triangles by (material, lightmap id) in one pass.
+
+    Accepts format-v2 dicts or a `GeometryBlob`. Each entry is `(p, n, uv, lm, c)`; unlit
+    grouping ignores the lightmap id and leaves `lm`/`c` as None. Invalid dict triangles are
+    skipped with the same rules the per-vertex writer path always used.
+    """
+    groups: dict[tuple[str, int | None], list[tuple]] = {}
+    if isinstance(triangles, GeometryBlob):
+        names = triangles.materials
+        mids = triangles.material_ids
+        lids = triangles.lightmap_ids
+        pos = triangles.positions
+        nrm = triangles.normals
+        uvs = triangles.uvs
+        lms = triangles.lightmap_uvs
+        cols = triangles.colors
+        for i in range(triangles.triangle_count):
+            if lit:
+                lmi = int(lids[i])
+                key = (names[mids[i]], lmi if lmi >= 0 else None)
+                rec = (
+                    pos[i * 9 : i * 9 + 9].tolist(),
+                    nrm[i * 9 : i * 9 + 9].tolist(),
+                    uvs[i * 6 : i * 6 + 6].tolist(),
+                    lms[i * 6 : i * 6 + 6].tolist(),
+                    cols[i * 12 : i * 12 + 12].tolist(),
+                )
+            else:
+                key = (names[mids[i]], None)
+                rec = (
+                    pos[i * 9 : i * 9 + 9].tolist(),
+                    nrm[i * 9 : i * 9 + 9].tolist(),
+                    uvs[i * 6 : i * 6 + 6].tolist(),
+                    None,
+                    None,
+                )
+            groups.setdefault(key, []).append(rec)
+        return groups
+
+    for t in triangles:
+        m = t.get("m")
+        if not isinstance(m, str):
+            continue
+        p = t.get("p")
+        n = t.get("n")
+        uv = t.get("uv")
+        if not (isinstance(p, list) and len(p) == 9):
+            continue
+        if not (isinstance(n, list) and len(n) == 9):
+            continue
+        if not (isinstance(uv, list) and len(uv) == 6):
+            continue
+        if not lit:
+            groups.setdefault((m, None), []).append((p, n, uv, None, None))
+            continue
+        lm = t.get("lm")
+        c = t.get("c")
+        if not (isinstance(lm, list) and len(lm) == 6):
+            lm = _ZERO_LM
+        if not (isinstance(c, list) and len(c) == 12):
+            continue
+        lmi = t.get("lmi")
+        lmi_int = int(lmi) if isinstance(lmi, int) else None
+        groups.setdefault((m, lmi_int), []).append((p, n, uv, lm, c))
+    return groups
+
+
+def _build_geom_bulk(name: str, fmt: GeomVertexFormat, tris: list[tuple], *, lit: bool) -> tuple[Geom, int]:
+    """
+    Build an indexed Geom from grouped triangles with one buffer copy per array.
+
+    Identical vertices are shared; vertex rows and indices are packed into `array` buffers
+    and copied into the GeomVertexArrayData / index array through their writable memoryviews.
+    """
+    lookup: dict[tuple, int] = {}
+    verts = array("f")
+    idx = array("I")
+    for p, n, uv, lm, c in tris:
+        for vi in range(3):
+            a = vi * 3
+            b = vi * 2
+            if lit:
+                k = vi * 4
+                v = (
+                    p[a], p[a + 1], p[a + 2],
+                    n[a], n[a + 1], n[a + 2],
+                    c[k], c[k + 1], c[k + 2], c[k + 3],
+                    uv[b], uv[b + 1],
+                    lm[b], lm[b + 1],
+                )
+            else:
+                v = (p[a], p[a + 1], p[a + 2], n[a], n[a + 1], n[a + 2], uv[b], uv[b + 1])
+            i = lookup.get(v)
+            if i is None:
+                i = len(lookup)
+                lookup[v] = i
+                verts.extend(v)
+            idx.append(i)
+
+    rows = len(lookup)
+    vdata = GeomVertexData(name, fmt, Geom.UHStatic)
+    vdata.uncleanSetNumRows(rows)
+    if rows:
+        memoryview(vdata.modifyArray(0)).cast("B")[:] = memoryview(verts).cast("B")
+
+    prim = GeomTriangles(Geom.UHStatic)
+    if rows <= 0xFFFF:
+        prim.setIndexType(Geom.NT_uint16)
+        idx = array("H", idx)
+    else:
+        prim.setIndexType(Geom.NT_uint32)
+    if len(idx):
+        handle = prim.modifyVertices()
+        handle.uncleanSetNumRows(len(idx))
+        memoryview(handle).cast("B")[:] = memoryview(idx).cast("B")
+
+    geom = Geom(vdata)
+    geom.addPrimitive(prim)
+    return geom, rows
+
+
+def _build_geom_writer(name: str, fmt: GeomVertexFormat, tris: list[tuple], *, lit: bool) -> tuple[Geom, int]:
+    """Per-vertex GeomVertexWriter path (three fresh vertices per triangle)."""
+    vdata = GeomVertexData(name, fmt, Geom.UHStatic)
+    vw = GeomVertexWriter(vdata, "vertex")
+    nw = GeomVertexWriter(vdata, "normal")
+    tw0 = GeomVertexWriter(vdata, "texcoord")
+    cw = GeomVertexWriter(vdata, "color") if lit else None
+    tw1 = GeomVertexWriter(vdata, "texcoord.1") if lit else None
+    prim = GeomTriangles(Geom.UHStatic)
+
+    for p, n, uv, lm, c in tris:
+        base = vdata.getNumRows()
+        for vi in range(3):
+            vw.addData3f(float(p[vi * 3 + 0]), float(p[vi * 3 + 1]), float(p[vi * 3 + 2]))
+            nw.addData3f(float(n[vi * 3 + 0]), float(n[vi * 3 + 1]), float(n[vi * 3 + 2]))
+            tw0.addData2f(float(uv[vi * 2 + 0]), float(uv[vi * 2 + 1]))
+            if cw is not None and tw1 is not None:
+                tw1.addData2f(float(lm[vi * 2 + 0]), float(lm[vi * 2 + 1]))
+                cw.addData4f(
+                    float(c[vi * 4 + 0]),
+                    float(c[vi * 4 + 1]),
+                    float(c[vi * 4 + 2]),
+                    float(c[vi * 4 + 3]),
+                )
+        prim.addVertices(base, base + 1, base + 2)
+
+    geom = Geom(vdata)
+    geom.addPrimitive(prim)
+    return geom, vdata.getNumRows()
+
+
+class _GroupGeomBuilder:
+    """Picks the bulk or writer path for a vertex format and accumulates build stats for diagnostics."""
+
+    def __init__(self, fmt: GeomVertexFormat, *, lit: bool) -> None:
+        self.fmt = fmt
+        self.lit = bool(lit)
+        columns = _LIT_COLUMNS if lit else _UNLIT_COLUMNS
+        self.bulk = geometry_bulk_enabled() and _packed_float_layout(fmt, columns)
+        self.groups = 0
+        self.triangles = 0
+        self.vertices = 0
+        self.build_s = 0.0
+
+    def build(self, name: str, tris: list[tuple]) -> Geom:
+        t0 = time.perf_counter()
+        fn = _build_geom_bulk if self.bulk else _build_geom_writer
+        geom, rows = fn(name, self.fmt, tris, lit=self.lit)
+        self.build_s += time.perf_counter() - t0
+        self.groups += 1
+        self.triangles += len(tris)
+        self.vertices += int(rows)
+        return geom
+
+    def report(self, *, source: str, group_s: float) -> dict[str, object]:
+        return {
+            "mode": "bulk" if self.bulk else "writer",
+            "lit": bool(self.lit),
+            "source": str(source),
+            "groups": int(self.groups),
+            "triangles": int(self.triangles),
+            "vertices": int(self.vertices),
+            "group_ms": round(float(group_s) * 1000.0, 3),
+            "vertex_build_ms": round(float(self.build_s) * 1000.0, 3),
+        }
+
+
 def _configure_base_texture_sampling(tex: Texture, *, masked: bool, pixelated: bool) -> None:
     """
     Use stable sampling for map materials to reduce fine-angle aliasing artifacts.
@@ -190,101 +427,218 @@ def attach_triangle_map_geometry(scene: SceneLayerContract, *, render, triangles
 
 
 def attach_triangle_map_geometry_v2_unlit(
-    scene: SceneLayerContract, *, loader, render, triangles: list[dict]
+    scene: SceneLayerContract, *, loader, render, triangles: list[dict] | GeometryBlob, track_groups: bool = False
 ) -> None:
     """
     Attach v2-format triangle geometry without lightmap shader.
+
+    With `track_groups`, each material node is recorded in `scene._map_geometry_groups` together with a digest
+    of its triangles so `reattach_changed_map_geometry_v2_unlit` can later rebuild only the groups that changed.
     """
     # Batch by material only (no lightmap IDs) for runtime path.
-    tris_by_mat: dict[str, list[dict]] = {}
-    for t in triangles:
-        m = t.get("m")
-        if not isinstance(m, str):
-            continue
-        tris_by_mat.setdefault(m, []).append(t)
+    t0 = time.perf_counter()
+    tris_by_mat = _group_triangles(triangles, lit=False)
+    group_s = time.perf_counter() - t0
+    builder = _GroupGeomBuilder(GeomVertexFormat.getV3n3t2(), lit=False)
     tex_cache: dict[str, Texture | None] = {}
     missing_cache: set[str] = set()
+    scene._map_geometry_groups = {}
+
+    for (mat_name, _lmi), tris in tris_by_mat.items():
+        np = _attach_unlit_group(
+            scene,
+            loader=loader,
+            render=render,
+            builder=builder,
+            mat_name=mat_name,
+            tris=tris,
+            tex_cache=tex_cache,
+            missing_cache=missing_cache,
+        )
+        if track_groups:
+            scene._map_geometry_groups[mat_name] = (_group_digest(scene, mat_name, tris), np)
+
+    scene._geometry_build_report = builder.report(
+        source="blob" if isinstance(triangles, GeometryBlob) else "dicts", group_s=group_s
+    )
+
 
-    for mat_name, tris in tris_by_mat.items():
-        vdata = GeomVertexData(
-            f"{scene._map_id}-map-{mat_name}", GeomVertexFormat.getV3n3t2(), Geom.UHStatic
+def reattach_changed_map_geometry_v2_unlit(
+    scene: SceneLayerContract, *, loader, render, triangles: list[dict] | GeometryBlob
+) -> dict[str, int]:
+    """
+    Swap in new v2 triangles, rebuilding only material groups whose triangles differ from the tracked ones.
+
+    Expects geometry attached with `track_groups=True`; untracked groups are treated as changed.
+    """
+    t0 = time.perf_counter()
+    tris_by_mat = _group_triangles(triangles, lit=False)
+    group_s = time.perf_counter() - t0
+    builder = _GroupGeomBuilder(GeomVertexFormat.getV3n3t2(), lit=False)
+    tex_cache: dict[str, Texture | None] = {}
+    missing_cache: set[str] = set()
+    old_groups = scene._map_geometry_groups
+    new_groups: dict[str, tuple[bytes, object]] = {}
+    kept = 0
+
+    for (mat_name, _lmi), tris in tris_by_mat.items():
+        digest = _group_digest(scene, mat_name, tris)
+        old = old_groups.pop(mat_name, None)
+        if old is not None and old[0] == digest:
+            new_groups[mat_name] = old
+            kept += 1
+            continue
+        if old is not None:
+            old[1].removeNode()
+        np = _attach_unlit_group(
+            scene,
+            loader=loader,
+            render=render,
+            builder=builder,
+            mat_name=mat_name,
+            tris=tris,
+            tex_cache=tex_cache,
+            missing_cache=missing_cache,
+            reload_texture=True,
         )
-        vw = GeomVertexWriter(vdata, "vertex")
-        nw = GeomVertexWriter(vdata, "normal")
-        tw = GeomVertexWriter(vdata, "texcoord")
-        prim = GeomTriangles(Geom.UHStatic)
-
-        for tri in tris:
-            p = tri.get("p")
-            n = tri.get("n")
-            uv = tri.get("uv")
-            if not (isinstance(p, list) and len(p) == 9):
-                continue
-            if not (isinstance(n, list) and len(n) == 9):
-                continue
-            if not (isinstance(uv, list) and len(uv) == 6):
-                continue
-
-            base = vdata.getNumRows()
-            for vi in range(3):
-                px, py, pz = float(p[vi * 3]), float(p[vi * 3 + 1]), float(p[vi * 3 + 2])
-                nx, ny, nz = float(n[vi * 3]), float(n[vi * 3 + 1]), float(n[vi * 3 + 2])
-                tu, tv = float(uv[vi * 2]), float(uv[vi * 2 + 1])
-                vw.addData3f(px, py, pz)
-                nw.addData3f(nx, ny, nz)
-                tw.addData2f(tu, tv)
-            prim.addVertices(base, base + 1, base + 2)
-
-        geom = Geom(vdata)
-        geom.addPrimitive(prim)
-        geom_node = GeomNode(f"{scene._map_id}-geom-{mat_name}")
-        geom_node.addGeom(geom)
-        np = render.attachNewNode(geom_node)
-        np.setTwoSided(False)
+        new_groups[mat_name] = (digest, np)
+    removed = len(old_groups)
+    for _digest, np in old_groups.values():
+        np.removeNode()
+    scene._map_geometry_groups = new_groups
+
+    scene._geometry_build_report = builder.report(
+        source="blob" if isinstance(triangles, GeometryBlob) else "dicts", group_s=group_s
+    )
+    return {
+        "groups_kept": int(kept),
+        "groups_rebuilt": int(builder.groups),
+        "groups_removed": int(removed),
+        "triangles_rebuilt": int(builder.triangles),
+    }
+
+
+def _group_digest(scene: SceneLayerContract, mat_name: str, tris: list[tuple]) -> bytes:
+    # Exact (float64) content digest of one unlit group: positions, normals and UVs in group order, plus the
+    # resolved texture file and its mtime/size so a re-extracted texture rebuilds the group too.
+    buf = array("d")
+    for p, n, uv, _lm, _c in tris:
+        buf.extend(p)
+        buf.extend(n)
+        buf.extend(uv)
+    h = hashlib.blake2b(buf.tobytes(), digest_size=16)
+    tex_path = scene._resolve_material_texture_path(material_name=mat_name)
+    if tex_path is not None:
+        try:
+            st = tex_path.stat()
+            h.update(f"{tex_path}|{st.st_mtime_ns}|{st.st_size}".encode("utf-8", errors="surrogatepass"))
+        except OSError:
+            h.update(str(tex_path).encode("utf-8", errors="surrogatepass"))
+    return h.digest()
 
-        if mat_name.startswith("{"):
-            np.setTransparency(TransparencyAttrib.M_binary)
-            try:
-                np.setAttrib(DepthOffsetAttrib.make(1))
-            except Exception:
-                pass
 
-        tex: Texture | None = tex_cache.get(mat_name)
-        if mat_name in missing_cache:
-            tex = None
-        if tex is None and mat_name not in missing_cache:
-            tex_path = scene._resolve_material_texture_path(material_name=mat_name)
-            if tex_path and tex_path.exists():
-                tex = loader.loadTexture(Filename.fromOsSpecific(str(tex_path)))
-                if tex is not None:
-                    _configure_base_texture_sampling(
-                        tex,
-                        masked=mat_name.startswith("{"),
-                        pixelated=bool(scene._pixelated_textures),
-                    )
-                tex_cache[mat_name] = tex
-            else:
-                missing_cache.add(mat_name)
-        if tex is not None:
-            np.setTexture(tex, 1)
+def _attach_unlit_group(
+    scene: SceneLayerContract,
+    *,
+    loader,
+    render,
+    builder: _GroupGeomBuilder,
+    mat_name: str,
+    tris: list[tuple],
+    tex_cache: dict[str, Texture | None],
+    missing_cache: set[str],
+    reload_texture: bool = False,
+):
+    geom = builder.build(f"{scene._map_id}-map-{mat_name}", tris)
+    geom_node = GeomNode(f"{scene._map_id}-geom-{mat_name}")
+    geom_node.addGeom(geom)
+    np = render.attachNewNode(geom_node)
+    np.setTwoSided(False)
+
+    if mat_name.startswith("{"):
+        np.setTransparency(TransparencyAttrib.M_binary)
+        try:
+            np.setAttrib(DepthOffsetAttrib.make(1))
+        except Exception:
+            pass
+
+    tex: Texture | None = tex_cache.get(mat_name)
+    if mat_name in missing_cache:
+        tex = None
+    if tex is None and mat_name not in missing_cache:
+        tex_path = scene._resolve_material_texture_path(material_name=mat_name)
+        if tex_path and tex_path.exists():
+            tex = loader.loadTexture(Filename.fromOsSpecific(str(tex_path)))
+            if tex is not None:
+                if reload_texture:
+                    # The texture pool hands back the image loaded before the edit; re-read it from disk.
+                    tex.reload()
+                _configure_base_texture_sampling(
+                    tex,
+                    masked=mat_name.startswith("{"),
+                    pixelated=bool(scene._pixelated_textures),
+                )
+            tex_cache[mat_name] = tex
         else:
-            np.setTexture(scene._make_debug_checker_texture(), 1)
+            missing_cache.add(mat_name)
+    if tex is not None:
+        np.setTexture(tex, 1)
+    else:
+        np.setTexture(scene._make_debug_checker_texture(), 1)
 
-        # Runtime path: use setShaderAuto so geometry receives scene lights (no baked lightmap).
-        np.setShaderAuto()
+    # Runtime path: use setShaderAuto so geometry receives scene lights (no baked lightmap).
+    np.setShaderAuto()
+    return np
+
+
+def _atlas_page_batches(
+    scene: SceneLayerContract, groups: dict[tuple[str, int | None], list[tuple]]
+) -> list[tuple[str, int | None, list[tuple], int | None, list[int]]]:
+    """
+    Merge per-face groups whose lightmaps live on the same atlas page into one draw batch.
+
+    Faces batch together when they share material, page, style tuple and slot paths, so one
+    node binds the page textures and receives one `lm_scales` (lightstyle animation keeps
+    working). While GoldSrc PVS is active, faces additionally batch per BSP leaf: faces of one
+    leaf are shown/hidden together, so culling stays per leaf instead of per face.
+    Returns `(material, representative lmi, triangles, page or None, member faces)` entries.
+    """
+    batches: dict[tuple, list] = {}
+    lm_faces = scene._lightmap_faces or {}
+    face_leaves = scene._vis_goldsrc.world_face_leaves() if scene._vis_goldsrc is not None else None
+    for (mat_name, lmi), tris in groups.items():
+        ent = lm_faces.get(lmi) if lmi is not None else None
+        page = ent.get("page") if isinstance(ent, dict) else None
+        if isinstance(page, int):
+            key: tuple = (
+                mat_name,
+                "page",
+                int(page),
+                tuple(ent.get("styles") or ()),
+                tuple(str(p) for p in (ent.get("paths") or ())),
+                face_leaves.get(int(lmi), -1) if face_leaves is not None else None,
+            )
+        else:
+            key = (mat_name, lmi)
+            page = None
+        cur = batches.get(key)
+        if cur is None:
+            batches[key] = [mat_name, lmi, list(tris), page, [int(lmi)] if isinstance(lmi, int) else []]
+        else:
+            cur[2].extend(tris)
+            cur[4].append(int(lmi))
+    return [tuple(b) for b in batches.values()]  # type: ignore[misc]
 
 
-def attach_triangle_map_geometry_v2(scene: SceneLayerContract, *, loader, render, triangles: list[dict]) -> None:
+def attach_triangle_map_geometry_v2(
+    scene: SceneLayerContract, *, loader, render, triangles: list[dict] | GeometryBlob
+) -> None:
     # Build render geometry with materials + baked lighting (lightmaps, when present).
     # Group by (material, lightmap id) so each draw call can bind the correct lightmap texture.
-    tris_by_key: dict[tuple[str, int | None], list[dict]] = {}
-    for t in triangles:
-        m = t.get("m")
-        if not isinstance(m, str):
-            continue
-        lmi = t.get("lmi")
-        lmi_int = int(lmi) if isinstance(lmi, int) else None
-        tris_by_key.setdefault((m, lmi_int), []).append(t)
+    t0 = time.perf_counter()
+    tris_by_key = _group_triangles(triangles, lit=True)
+    group_s = time.perf_counter() - t0
+    builder = _GroupGeomBuilder(scene._vformat_v3n3c4t2t2(), lit=True)
 
     # Shader resources for baked lightmaps.
     cls = scene.__class__
@@ -311,55 +665,9 @@ def attach_triangle_map_geometry_v2(scene: SceneLayerContract, *, loader, render
     base_tex_cache: dict[str, Texture | None] = {}
     base_tex_missing: set[str] = set()
 
-    for (mat_name, lmi), tris in tris_by_key.items():
-        vdata = GeomVertexData(
-            f"{scene._map_id}-map-{mat_name}-{lmi}", scene._vformat_v3n3c4t2t2(), Geom.UHStatic
-        )
-        vw = GeomVertexWriter(vdata, "vertex")
-        nw = GeomVertexWriter(vdata, "normal")
-        cw = GeomVertexWriter(vdata, "color")
-        tw0 = GeomVertexWriter(vdata, "texcoord")
-        tw1 = GeomVertexWriter(vdata, "texcoord.1")
-        prim = GeomTriangles(Geom.UHStatic)
-
-        for tri in tris:
-            p = tri.get("p")
-            n = tri.get("n")
-            uv = tri.get("uv")
-            lm = tri.get("lm")
-            c = tri.get("c")
-            if not (isinstance(p, list) and len(p) == 9):
-                continue
-            if not (isinstance(n, list) and len(n) == 9):
-                continue
-            if not (isinstance(uv, list) and len(uv) == 6):
-                continue
-            if not (isinstance(lm, list) and len(lm) == 6):
-                lm = [0.0] * 6
-            if not (isinstance(c, list) and len(c) == 12):
-                continue
-
-            base = vdata.getNumRows()
-            for vi in range(3):
-                px, py, pz = float(p[vi * 3 + 0]), float(p[vi * 3 + 1]), float(p[vi * 3 + 2])
-                nx, ny, nz = float(n[vi * 3 + 0]), float(n[vi * 3 + 1]), float(n[vi * 3 + 2])
-                tu, tv = float(uv[vi * 2 + 0]), float(uv[vi * 2 + 1])
-                lu, lv = float(lm[vi * 2 + 0]), float(lm[vi * 2 + 1])
-                cr, cg, cb, ca = (
-                    float(c[vi * 4 + 0]),
-                    float(c[vi * 4 + 1]),
-                    float(c[vi * 4 + 2]),
-                    float(c[vi * 4 + 3]),
-                )
-                vw.addData3f(px, py, pz)
-                nw.addData3f(nx, ny, nz)
-                tw0.addData2f(tu, tv)
-                tw1.addData2f(lu, lv)
-                cw.addData4f(cr, cg, cb, ca)
-            prim.addVertices(base, base + 1, base + 2)
-
-        geom = Geom(vdata)
-        geom.addPrimitive(prim)
+    batches = _atlas_page_batches(scene, tris_by_key)
+    for mat_name, lmi, tris, page, faces in batches:
+        geom = builder.build(f"{scene._map_id}-map-{mat_name}-{lmi if page is None else f'page{page}'}", tris)
         geom_node = GeomNode(f"{scene._map_id}-geom-{mat_name}")
         geom_node.addGeom(geom)
         np = render.attachNewNode(geom_node)
@@ -367,8 +675,8 @@ def attach_triangle_map_geometry_v2(scene: SceneLayerContract, *, loader, render
         # Baked path: lightmaps supply lighting; block runtime lights to avoid double-lighting.
         # Runtime path (v2_unlit) never uses setLightOff so geometry receives scene lights via setShaderAuto.
         np.setLightOff(1)
-        if isinstance(lmi, int):
-            scene._vis_face_nodes.setdefault(int(lmi), []).append(np)
+        for face_idx in faces:
+            scene._vis_face_nodes.setdefault(face_idx, []).append(np)
 
         meta = scene._materials_meta.get(mat_name, {}) if scene._materials_meta else {}
 
@@ -437,16 +745,14 @@ def attach_triangle_map_geometry_v2(scene: SceneLayerContract, *, loader, render
             lm_texs: list[Texture] = [black, black, black, black]
             lm_scales = [0.0, 0.0, 0.0, 0.0]
 
+            # Defer lightmap loads only when every face of the batch starts hidden.
             defer = False
-            if (
-                scene._vis_goldsrc is not None
-                and scene._vis_initial_world_face_flags is not None
-                and isinstance(lmi, int)
-            ):
+            if scene._vis_goldsrc is not None and scene._vis_initial_world_face_flags is not None and faces:
                 w0 = int(scene._vis_goldsrc.world_first_face)
                 w1 = int(scene._vis_goldsrc.world_face_end)
-                if int(w0) <= int(lmi) < int(w1):
-                    defer = not bool(scene._vis_initial_world_face_flags[int(lmi - w0)])
+                defer = all(
+                    int(w0) <= f < int(w1) and not bool(scene._vis_initial_world_face_flags[f - w0]) for f in faces
+                )
 
             for i in range(4):
                 p = paths[i]
@@ -484,14 +790,20 @@ def attach_triangle_map_geometry_v2(scene: SceneLayerContract, *, loader, render
             except Exception:
                 pass
 
-            if defer and isinstance(lmi, int):
-                ent = scene._vis_deferred_lightmaps.get(int(lmi))
-                if not isinstance(ent, dict):
-                    ent = {"paths": list(paths), "nodepaths": [], "loader": loader}
-                    scene._vis_deferred_lightmaps[int(lmi)] = ent
-                nps = ent.get("nodepaths")
-                if isinstance(nps, list):
-                    nps.append(np)
+            if defer:
+                for face_idx in faces:
+                    ent = scene._vis_deferred_lightmaps.get(face_idx)
+                    if not isinstance(ent, dict):
+                        ent = {"paths": list(paths), "nodepaths": [], "loader": loader}
+                        scene._vis_deferred_lightmaps[face_idx] = ent
+                    nps = ent.get("nodepaths")
+                    if isinstance(nps, list):
+                        nps.append(np)
+
+    scene._geometry_build_report = builder.report(
+        source="blob" if isinstance(triangles, GeometryBlob) else "dicts", group_s=group_s
+    )
+    scene._geometry_build_report["atlas_page_batches"] = sum(1 for b in batches if b[3] is not None)
 
 
 def setup_skybox(
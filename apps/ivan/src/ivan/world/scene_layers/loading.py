@@ -7,6 +7,8 @@ from contextlib import nullcontext
 from panda3d.core import LVector3f
 
 from ivan.app_config import MAP_PROFILE_DEV_FAST
+from ivan.maps.bundle_io import open_bundle_geometry
+from ivan.maps.geometry_blob import TriangleRows
 from ivan.maps.resource_pack import MissingResourcePackAssetError, resolve_materials_from_resource_packs
 from ivan.world.loading_report import (
     LOAD_STAGE_GEOMETRY_BUILD_ATTACH,
@@ -16,6 +18,7 @@ from ivan.world.loading_report import (
 )
 from ivan.world.lightstyles import lightstyle_pattern_is_animated
 from ivan.world.scene_layers.contracts import SceneLayerContract
+from ivan.world.scene_layers.geometry import reattach_changed_map_geometry_v2_unlit
 
 DEFAULT_SKYBOX_PRESET = "default_horizon"
 
@@ -69,9 +72,21 @@ def _apply_skybox_baseline(
         scene._sky_source = "default-preset"
 
 
+def close_geometry_blob(scene: SceneLayerContract) -> None:
+    """Release the mapped geometry.bin of the current load (and the collision rows viewing it)."""
+    blob = scene._geometry_blob
+    if blob is None:
+        return
+    scene._geometry_blob = None
+    if isinstance(scene.triangles, TriangleRows):
+        scene.triangles = None
+    blob.close()
+
+
 def try_load_external_map(scene: SceneLayerContract, *, cfg, map_json: Path, loader, render, camera) -> bool:
     """Load `.map`/`map.json`/`.irunmap` into scene runtime state."""
     scene._map_convert_report = {}
+    close_geometry_blob(scene)
     map_json = scene._resolve_map_bundle_path(map_json)
     if not map_json:
         return False
@@ -86,12 +101,23 @@ def try_load_external_map(scene: SceneLayerContract, *, cfg, map_json: Path, loa
             payload = json.loads(map_json.read_text(encoding="utf-8"))
         except Exception:
             return False
+        if not isinstance(payload, dict):
+            return False
+        # Binary columnar payload (geometry.bin) when present; inline JSON triangles otherwise.
+        geometry = open_bundle_geometry(map_json=map_json, payload=payload)
     scene._map_json_path = Path(map_json)
-    scene._map_payload = dict(payload) if isinstance(payload, dict) else None
+    scene._map_payload = dict(payload)
+    scene._geometry_blob = geometry
 
-    triangles = payload.get("triangles")
-    if not isinstance(triangles, list) or not triangles:
-        return False
+    if geometry is not None:
+        if geometry.triangle_count <= 0:
+            close_geometry_blob(scene)
+            return False
+        triangles = None
+    else:
+        triangles = payload.get("triangles")
+        if not isinstance(triangles, list) or not triangles:
+            return False
 
     bounds = payload.get("bounds")
     if isinstance(bounds, dict):
@@ -139,11 +165,13 @@ def try_load_external_map(scene: SceneLayerContract, *, cfg, map_json: Path, loa
                     asset_bindings=asset_bindings,
                     map_json=map_json,
                 )
-                ref_materials = {
-                    str(t.get("m")).replace("\\", "/").casefold()
-                    for t in triangles
-                    if isinstance(t, dict) and isinstance(t.get("m"), str)
-                }
+                if geometry is not None:
+                    ref_names = [str(m) for m in geometry.materials]
+                else:
+                    ref_names = [
+                        str(t.get("m")) for t in triangles if isinstance(t, dict) and isinstance(t.get("m"), str)
+                    ]
+                ref_materials = {m.replace("\\", "/").casefold() for m in ref_names}
                 missing = ref_materials - set(scene._material_texture_index or ())
                 if missing:
                     raise MissingResourcePackAssetError(
@@ -152,6 +180,7 @@ def try_load_external_map(scene: SceneLayerContract, *, cfg, map_json: Path, loa
                     )
             except MissingResourcePackAssetError as e:
                 print(f"[IVAN] Map load failed: {e}")
+                close_geometry_blob(scene)
                 return False
         else:
             scene._material_texture_root = scene._resolve_material_root(map_json=map_json, payload=payload)
@@ -182,23 +211,34 @@ def try_load_external_map(scene: SceneLayerContract, *, cfg, map_json: Path, loa
 
     # Format v1: triangles is list[list[float]] (positions only)
     # Format v2: triangles is list[dict] with positions, normals, UVs, vertex colors, and material.
-    if isinstance(triangles[0], dict):
-        pos_tris: list[list[float]] = []
-        for t in triangles:
-            p = t.get("p")
-            if isinstance(p, list) and len(p) == 9:
-                pos_tris.append([float(x) for x in p])
-        if not pos_tris:
-            return False
-        # Collision can be filtered at import time (e.g. exclude triggers).
-        if isinstance(collision_override, list) and collision_override and isinstance(collision_override[0], list):
-            coll: list[list[float]] = []
-            for t in collision_override:
-                if isinstance(t, list) and len(t) == 9:
-                    coll.append([float(x) for x in t])
-            scene.triangles = coll or pos_tris
+    # geometry.bin: the v2 columns as packed arrays; collision rows are zero-copy views.
+    if geometry is not None or isinstance(triangles[0], dict):
+        if geometry is not None:
+            scene.triangles = geometry.collision_rows()
+            # The geometry layer reads blob columns directly (no per-triangle dicts).
+            render_triangles = geometry
         else:
-            scene.triangles = pos_tris
+            pos_tris: list[list[float]] = []
+            for t in triangles:
+                p = t.get("p")
+                if isinstance(p, list) and len(p) == 9:
+                    pos_tris.append([float(x) for x in p])
+            if not pos_tris:
+                return False
+            # Collision can be filtered at import time (e.g. exclude triggers).
+            if (
+                isinstance(collision_override, list)
+                and collision_override
+                and isinstance(collision_override[0], list)
+            ):
+                coll: list[list[float]] = []
+                for t in collision_override:
+                    if isinstance(t, list) and len(t) == 9:
+                        coll.append([float(x) for x in t])
+                scene.triangles = coll or pos_tris
+            else:
+                scene.triangles = pos_tris
+            render_triangles = triangles
         # Dev-fast: use runtime lighting when baked lightmaps absent (fast edit->run without rebake).
         # Prod-baked: always use lightmap path when available.
         # runtime_lighting=True overrides: force runtime path regardless of lightmaps.
@@ -216,12 +256,14 @@ def try_load_external_map(scene: SceneLayerContract, *, cfg, map_json: Path, loa
         )
         with _stage_timer(scene, LOAD_STAGE_GEOMETRY_BUILD_ATTACH):
             if use_unlit:
-                scene._attach_triangle_map_geometry_v2_unlit(loader=loader, render=render, triangles=triangles)
+                scene._attach_triangle_map_geometry_v2_unlit(
+                    loader=loader, render=render, triangles=render_triangles
+                )
                 if payload_lights:
                     scene._enhance_map_file_lighting(render, payload_lights)
             else:
                 scene._runtime_only_lighting = False
-                scene._attach_triangle_map_geometry_v2(loader=loader, render=render, triangles=triangles)
+                scene._attach_triangle_map_geometry_v2(loader=loader, render=render, triangles=render_triangles)
         with _stage_timer(scene, LOAD_STAGE_MATERIAL_SKY_FOG_RESOLVE):
             _apply_skybox_baseline(
                 scene,
@@ -249,44 +291,61 @@ def try_load_external_map(scene: SceneLayerContract, *, cfg, map_json: Path, loa
     return True
 
 
-def try_load_map_file(scene: SceneLayerContract, *, map_file: Path, loader, render, camera) -> bool:
-    """Load source `.map` directly for fast edit->run iteration (offline tooling).
-
-    WAD is used here only as optional offline tooling input. The runtime map loading
-    path (map.json/.irunmap) never reads WAD textures; it uses resource_packs.
-    """
+def _convert_direct_map(scene: SceneLayerContract, *, map_file: Path):
     from ivan.maps.bundle_io import _default_materials_dirs, _default_wad_search_dirs
     from ivan.maps.map_converter import convert_map_file
     from ivan.state import state_dir
 
     # Use a persistent texture cache so extracted WAD PNGs survive beyond
     # the convert_map_file() call. Without this the temporary dir is deleted too early.
+    # The per-brush geometry cache lives in the same directory.
     tex_cache = state_dir() / "cache" / "map_textures" / map_file.stem
     tex_cache.mkdir(parents=True, exist_ok=True)
 
-    with _stage_timer(scene, LOAD_STAGE_MAP_PARSE_IMPORT):
-        try:
-            result = convert_map_file(
-                map_file,
-                scale=0.03,
-                wad_search_dirs=_default_wad_search_dirs(map_file),
-                materials_dirs=_default_materials_dirs(map_file),
-                texture_cache_dir=tex_cache,
-            )
-        except Exception as e:
-            print(f"[IVAN] Failed to load .map file: {e}")
-            return False
+    try:
+        result = convert_map_file(
+            map_file,
+            scale=0.03,
+            wad_search_dirs=_default_wad_search_dirs(map_file),
+            materials_dirs=_default_materials_dirs(map_file),
+            texture_cache_dir=tex_cache,
+        )
+    except Exception as e:
+        print(f"[IVAN] Failed to load .map file: {e}")
+        return None
     scene._map_convert_report = {
         "stages_ms": dict(result.perf_stages_ms) if isinstance(result.perf_stages_ms, dict) else {},
         "counts": dict(result.perf_counts) if isinstance(result.perf_counts, dict) else {},
     }
+    return result
 
+
+def _apply_direct_map_state(scene: SceneLayerContract, result) -> None:
     if result.spawn_position:
         scene.spawn_point = LVector3f(*result.spawn_position)
         scene.spawn_point.setZ(scene.spawn_point.getZ() + 1.2)
     scene.spawn_yaw = result.spawn_yaw
-
     scene.kill_z = result.bounds_min[2] - 5.0
+
+    scene._material_texture_root = None
+    scene._material_texture_index = {}
+    for tex_name, tex_path in result.materials.items():
+        if tex_path and tex_path.exists():
+            key = tex_name.replace("\\", "/").casefold()
+            scene._material_texture_index[key] = tex_path
+
+
+def try_load_map_file(scene: SceneLayerContract, *, map_file: Path, loader, render, camera) -> bool:
+    """Load source `.map` directly for fast edit->run iteration (offline tooling).
+
+    WAD is used here only as optional offline tooling input. The runtime map loading
+    path (map.json/.irunmap) never reads WAD textures; it uses resource_packs.
+    """
+    with _stage_timer(scene, LOAD_STAGE_MAP_PARSE_IMPORT):
+        result = _convert_direct_map(scene, map_file=map_file)
+    if result is None:
+        return False
+
     scene._map_id = result.map_id
     # Synthetic payload keeps direct .map behavior aligned with map.json/.irunmap.
     payload: dict[str, object] = {}
@@ -299,27 +358,18 @@ def try_load_map_file(scene: SceneLayerContract, *, map_file: Path, loader, rend
     scene._map_scale = 0.03
 
     with _stage_timer(scene, LOAD_STAGE_MATERIAL_SKY_FOG_RESOLVE):
-        scene._material_texture_root = None
-        scene._material_texture_index = {}
-        for tex_name, tex_path in result.materials.items():
-            if tex_path and tex_path.exists():
-                key = tex_name.replace("\\", "/").casefold()
-                scene._material_texture_index[key] = tex_path
+        _apply_direct_map_state(scene, result)
 
     if result.triangles:
-        pos_tris: list[list[float]] = []
-        for t in result.triangles:
-            p = t.get("p")
-            if isinstance(p, list) and len(p) == 9:
-                pos_tris.append([float(x) for x in p])
-
-        if result.collision_triangles:
-            scene.triangles = result.collision_triangles
-        else:
-            scene.triangles = pos_tris
+        scene.triangles = _direct_map_collision(result)
 
         with _stage_timer(scene, LOAD_STAGE_GEOMETRY_BUILD_ATTACH):
-            scene._attach_triangle_map_geometry_v2_unlit(loader=loader, render=render, triangles=result.triangles)
+            scene._attach_triangle_map_geometry_v2_unlit(
+                loader=loader,
+                render=render,
+                triangles=result.triangles,
+                track_groups=True,
+            )
             scene._runtime_only_lighting = True  # .map files have no baked lightmaps
             scene._runtime_path_label = "runtime-lighting"
             scene._runtime_path_source = "direct-map-no-lightmaps"
@@ -335,3 +385,41 @@ def try_load_map_file(scene: SceneLayerContract, *, map_file: Path, loader, rend
         return True
     return False
 
+
+def reload_map_file(scene: SceneLayerContract, *, map_file: Path, loader, render) -> dict[str, object] | None:
+    """Re-convert a directly loaded `.map` after an edit and swap in only what changed.
+
+    Brush conversion goes through the per-brush cache, and only the material groups whose triangles changed
+    are rebuilt. Lights, fog and sky keep their load-time state. Returns a report (`collision_changed` tells
+    the caller whether the collision world needs rebuilding), or None when conversion failed or produced no
+    geometry, in which case the scene is left untouched.
+    """
+    result = _convert_direct_map(scene, map_file=map_file)
+    if result is None or not result.triangles:
+        return None
+    _apply_direct_map_state(scene, result)
+    collision = _direct_map_collision(result)
+    collision_changed = collision != scene.triangles
+    scene.triangles = collision
+    report: dict[str, object] = reattach_changed_map_geometry_v2_unlit(
+        scene,
+        loader=loader,
+        render=render,
+        triangles=result.triangles,
+    )
+    counts = scene._map_convert_report.get("counts", {})
+    report["collision_changed"] = bool(collision_changed)
+    report["brush_cache_hits"] = int(counts.get("brush_cache_hits", 0))
+    report["brush_cache_misses"] = int(counts.get("brush_cache_misses", 0))
+    return report
+
+
+def _direct_map_collision(result) -> list[list[float]]:
+    if result.collision_triangles:
+        return result.collision_triangles
+    pos_tris: list[list[float]] = []
+    for t in result.triangles:
+        p = t.get("p")
+        if isinstance(p, list) and len(p) == 9:
+            pos_tris.append([float(x) for x in p])
+    return pos_tris
@@ -34,24 +34,30 @@ def tick_visibility(scene: SceneLayerContract) -> None:
     flags = scene._vis_goldsrc.visible_world_face_flags_for_leaf(int(leaf))
     w0 = int(scene._vis_goldsrc.world_first_face)
     w1 = int(scene._vis_goldsrc.world_face_end)
+    # Atlas page batches register one node under every member face: show it if any face is visible.
+    node_show: dict[int, tuple[object, bool]] = {}
     for face_idx, nodes in scene._vis_face_nodes.items():
         show = True
         if int(w0) <= int(face_idx) < int(w1):
             show = bool(flags[int(face_idx - w0)])
         for np in nodes:
-            try:
-                if show:
-                    np.show()
-                else:
-                    np.hide()
-            except Exception:
-                pass
+            prev = node_show.get(id(np))
+            node_show[id(np)] = (np, show or (prev is not None and prev[1]))
 
         if show and int(w0) <= int(face_idx) < int(w1):
             # Runtime-only path: no lightmaps; skip deferred loading to avoid wasted work.
             if not scene._runtime_only_lighting:
                 ensure_deferred_lightmaps_loaded(scene, face_idx=int(face_idx))
 
+    for np, show in node_show.values():
+        try:
+            if show:
+                np.show()
+            else:
+                np.hide()
+        except Exception:
+            pass
+
 
 def best_effort_visibility_leaf(scene: SceneLayerContract, *, pos: LVector3f) -> int | None:
     """
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+from panda3d.core import LVector3f, NodePath, PandaNode
+
+from ivan.physics.collision_world import CollisionWorld
+from ivan.physics.player_controller import PlayerController
+from ivan.physics.tuning import PhysicsTuning
+
+# Flat 60x60 floor with a 6-unit wall across +Y: enough for ground, air, slide and wall contacts.
+FLOOR = [
+    [-30.0, -30.0, 0.0, 30.0, -30.0, 0.0, 30.0, 30.0, 0.0],
+    [-30.0, -30.0, 0.0, 30.0, 30.0, 0.0, -30.0, 30.0, 0.0],
+]
+WALL = [
+    [-30.0, 6.0, 0.0, 30.0, 6.0, 0.0, 30.0, 6.0, 6.0],
+    [-30.0, 6.0, 0.0, 30.0, 6.0, 6.0, -30.0, 6.0, 6.0],
+]
+
+
+def triangle_world(
+    triangles: list[list[float]] | None = None,
+    *,
+    sweep_cache_size: int = 0,
+) -> CollisionWorld:
+    tuning = PhysicsTuning()
+    return CollisionWorld(
+        aabbs=[],
+        triangles=FLOOR + WALL if triangles is None else triangles,
+        triangle_collision_mode=True,
+        player_radius=float(tuning.player_radius),
+        player_half_height=float(tuning.player_half_height),
+        render=NodePath(PandaNode("controller-test")),
+        sweep_cache_size=sweep_cache_size,
+    )
+
+
+def make_controller(
+    triangles: list[list[float]] | None = None,
+    *,
+    spawn: tuple[float, float, float] = (0.0, -6.0, 1.2),
+    sweep_cache_size: int = 0,
+) -> PlayerController:
+    return PlayerController(
+        tuning=PhysicsTuning(),
+        spawn_point=LVector3f(*spawn),
+        aabbs=[],
+        collision=triangle_world(triangles, sweep_cache_size=sweep_cache_size),
+    )
+
+
+def drive(ctrl: PlayerController, *, ticks: int, offset: int = 0, on_step=None) -> list[tuple]:
+    # Scripted strafe/jump/slide course; returns per-tick (pos, vel, grounded, motion state).
+    out = []
+    for i in range(offset, offset + ticks):
+        if i % 40 == 20:
+            ctrl.queue_jump()
+        ctrl.set_slide_held(held=60 <= i % 120 < 80)
+        wish = LVector3f(0.4 if (i // 30) % 2 else -0.4, 1.0, 0.0)
+        ctrl.step(dt=1.0 / 60.0, wish_dir=wish, yaw_deg=0.0)
+        if on_step is not None:
+            on_step(ctrl)
+        out.append((tuple(ctrl.pos), tuple(ctrl.vel), bool(ctrl.grounded), ctrl.motion_state_name()))
+    return out
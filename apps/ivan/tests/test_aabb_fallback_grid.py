@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import random
+
+from panda3d.core import LVector3f
+
+from ivan.common.aabb import AABB, AABBGrid
+from ivan.physics.player_controller import PlayerController
+from ivan.physics.tuning import PhysicsTuning
+
+
+def _course(n: int, seed: int = 2) -> list[AABB]:
+    """Procedural block course: a floor slab plus `n` scattered blocks, steps and pillars."""
+    rng = random.Random(seed)
+    boxes = [AABB(LVector3f(-80.0, -80.0, -1.0), LVector3f(80.0, 80.0, 0.0))]
+    for _ in range(n):
+        x, y = rng.uniform(-75.0, 75.0), rng.uniform(-75.0, 75.0)
+        w, d, h = rng.uniform(0.3, 2.5), rng.uniform(0.3, 2.5), rng.choice((0.2, 0.4, 1.0, 3.0))
+        boxes.append(AABB(LVector3f(x, y, 0.0), LVector3f(x + w, y + d, h)))
+    return boxes
+
+
+def test_aabb_grid_query_matches_brute_force_overlap() -> None:
+    boxes = _course(400)
+    grid = AABBGrid(boxes)
+    rng = random.Random(9)
+    for _ in range(200):
+        lo = LVector3f(rng.uniform(-80, 80), rng.uniform(-80, 80), rng.uniform(-1, 3))
+        hi = lo + LVector3f(rng.uniform(0, 3), rng.uniform(0, 3), rng.uniform(0, 2))
+        after = rng.choice((-1, 0, 150))
+        expected = [
+            i
+            for i, b in enumerate(boxes)
+            if i > after
+            and b.minimum.x <= hi.x + 1e-3 and b.maximum.x >= lo.x - 1e-3
+            and b.minimum.y <= hi.y + 1e-3 and b.maximum.y >= lo.y - 1e-3
+            and b.minimum.z <= hi.z + 1e-3 and b.maximum.z >= lo.z - 1e-3
+        ]
+        assert grid.query(lo, hi, after=after) == expected
+    assert grid.matches(boxes)
+    moved = list(boxes)
+    moved[3] = AABB(LVector3f(0, 0, 0), LVector3f(1, 1, 1))
+    assert not grid.matches(moved)
+
+
+def _trace(ctrl: PlayerController, steps: int) -> list[tuple]:
+    out = []
+    for i in range(steps):
+        if i % 40 == 5:
+            ctrl.queue_jump()
+        yaw = (i * 7) % 360
+        wish = LVector3f(1.0 if (i // 60) % 2 else -0.4, 1.0 if (i // 90) % 2 else -1.0, 0.0)
+        wish.normalize()
+        ctrl.step(dt=1.0 / 60.0, wish_dir=wish, yaw_deg=float(yaw))
+        out.append((tuple(ctrl.pos), tuple(ctrl.vel), bool(ctrl.grounded), ctrl.contact_count()))
+    return out
+
+
+def test_grid_fallback_collision_is_identical_to_linear_scan() -> None:
+    boxes = _course(2500)
+    spawn = LVector3f(0.0, 0.0, 1.5)
+    indexed = PlayerController(tuning=PhysicsTuning(), spawn_point=spawn, aabbs=boxes, collision=None)
+    linear = PlayerController(tuning=PhysicsTuning(), spawn_point=spawn, aabbs=boxes, collision=None)
+    linear._AABB_GRID_MIN_BOXES = 10**9
+
+    expected = _trace(linear, 240)
+    assert _trace(indexed, 240) == expected
+    assert linear._aabb_grid is None
+    assert indexed._aabb_grid is not None and len(indexed._aabb_grid) == len(boxes)
+    assert any(row[3] > 0 for row in expected)
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import math
+from pathlib import Path
+
+import pytest
+
+from ivan.maps.brush_geometry import (
+    COLLISION_ONLY_TEXTURES,
+    SKIP_RENDER_TEXTURES,
+    _compute_uv,
+    _make_base_polygon,
+    _normalise,
+    _plane_from_points,
+    apply_phong_normals,
+    brush_to_collision_triangles,
+    brush_to_render_and_collision,
+    brush_to_triangles,
+)
+from ivan.maps.map_parser import parse_map
+
+_MAPS_DIR = Path(__file__).resolve().parents[1] / "assets" / "maps"
+_MAPS = sorted(_MAPS_DIR.rglob("*.map"))
+_TEXTURE_SIZES = {"floor": (128, 64)}
+
+
+# Straightforward per-vertex reference versions of the clipper and Phong pass.
+
+def _ref_clip(polygon, plane, eps=1e-6):
+    out = []
+    for i, cur in enumerate(polygon):
+        nxt = polygon[(i + 1) % len(polygon)]
+        d_cur = sum(n * c for n, c in zip(plane.normal, cur)) - plane.dist
+        d_nxt = sum(n * c for n, c in zip(plane.normal, nxt)) - plane.dist
+        if d_cur <= eps:
+            out.append(cur)
+        if (d_cur <= eps) != (d_nxt <= eps):
+            denom = d_cur - d_nxt
+            t = d_cur / denom if abs(denom) >= eps else 0.0
+            out.append(tuple(a + t * (b - a) for a, b in zip(cur, nxt)))
+    return out
+
+
+def _ref_brush(brush, scale, texture_sizes):
+    planes = [_plane_from_points(*((p.x, p.y, p.z) for p in f.plane_points)) for f in brush.faces]
+    render, collision = [], []
+    for fi, face in enumerate(brush.faces):
+        tex = face.texture.lower()
+        if tex in SKIP_RENDER_TEXTURES and tex not in COLLISION_ONLY_TEXTURES:
+            continue
+        poly = _make_base_polygon(planes[fi])
+        for pi, plane in enumerate(planes):
+            if pi != fi and poly:
+                poly = _ref_clip(poly, plane)
+        for k in range(1, len(poly) - 1):
+            tri = (poly[0], poly[k], poly[k + 1])
+            pos = [c * scale for v in tri for c in v]
+            collision.append(pos)
+            if tex not in SKIP_RENDER_TEXTURES:
+                uvs = [c for v in tri for c in _compute_uv(v, face, *texture_sizes.get(tex, (1, 1)))]
+                render.append((pos, list(planes[fi].normal) * 3, uvs, face.texture))
+    return render, collision
+
+
+def _ref_phong(triangles, phong_angle=89.0):
+    cos_threshold = math.cos(math.radians(phong_angle))
+    buckets = {}
+    for ti, (pos, normals, _uvs, _mat) in enumerate(triangles):
+        for vi in range(3):
+            key = tuple(math.floor(c * 100.0 + 0.5) for c in pos[vi * 3 : vi * 3 + 3])
+            buckets.setdefault(key, []).append((ti, vi, tuple(normals[:3])))
+    out = [list(t[1]) for t in triangles]
+    for entries in buckets.values():
+        if len(entries) <= 1:
+            continue
+        for ti, vi, fn_a in entries:
+            acc = [0.0, 0.0, 0.0]
+            for _tj, _vj, fn_b in entries:
+                if max(-1.0, min(1.0, sum(a * b for a, b in zip(fn_a, fn_b)))) >= cos_threshold:
+                    acc = [s + b for s, b in zip(acc, fn_b)]
+            out[ti][vi * 3 : vi * 3 + 3] = _normalise(tuple(acc))
+    return out
+
+
+@pytest.mark.parametrize("map_path", _MAPS, ids=lambda p: p.stem)
+def test_brush_conversion_matches_reference(map_path: Path) -> None:
+    brushes = [b for ent in parse_map(map_path.read_text(encoding="utf-8")) for b in ent.brushes]
+    assert brushes
+    all_tris = []
+    ref_all = []
+    for brush in brushes:
+        ref_render, ref_collision = _ref_brush(brush, 0.03, _TEXTURE_SIZES)
+        tris, collision = brush_to_render_and_collision(brush, scale=0.03, texture_sizes=_TEXTURE_SIZES)
+        # Clipping is exact: same operations in the same order as the reference.
+        assert [(t.positions, t.normals, t.uvs, t.material) for t in tris] == ref_render
+        assert collision == ref_collision
+        assert brush_to_collision_triangles(brush, scale=0.03) == ref_collision
+        assert len(brush_to_triangles(brush, scale=0.03, texture_sizes=_TEXTURE_SIZES)) == len(tris)
+        all_tris.extend(tris)
+        ref_all.extend(ref_render)
+
+    # Phong sums per distinct normal, so it matches up to float rounding.
+    expected = _ref_phong(ref_all)
+    apply_phong_normals(all_tris)
+    for tri, ref_normals in zip(all_tris, expected):
+        assert tri.normals == pytest.approx(ref_normals, abs=1e-9)
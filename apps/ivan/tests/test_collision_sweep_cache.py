@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+from controller_world import make_controller
+from panda3d.core import LVector3f, NodePath, PandaNode
+
+from ivan.common.aabb import AABB
+from ivan.net.tick_metrics import ServerTickMetrics
+from ivan.physics.collision_world import CollisionWorld
+from ivan.physics.player_controller import PlayerController
+from ivan.physics.tuning import PhysicsTuning
+
+
+def _arena_triangles() -> list[list[float]]:
+    s = 30.0
+    tris = [
+        [-s, -s, 0.0, s, -s, 0.0, s, s, 0.0],
+        [-s, -s, 0.0, s, s, 0.0, -s, s, 0.0],
+        [-10.0, 5.0, 0.0, 10.0, 5.0, 0.0, 10.0, 15.0, 2.5],
+        [-10.0, 5.0, 0.0, 10.0, 15.0, 2.5, -10.0, 15.0, 2.5],
+    ]
+    # Wall across +Y so the run ends with wall contacts.
+    tris.append([-s, 20.0, 0.0, s, 20.0, 0.0, s, 20.0, 6.0])
+    tris.append([-s, 20.0, 0.0, s, 20.0, 6.0, -s, 20.0, 6.0])
+    return tris
+
+
+def _trace(ctrl: PlayerController) -> list[tuple]:
+    out = []
+    for i in range(240):
+        if i % 50 == 10:
+            ctrl.queue_jump()
+        ctrl.set_slide_held(held=120 <= i < 150)
+        wish = LVector3f(0.3 if (i // 40) % 2 else -0.2, 1.0, 0.0)
+        wish.normalize()
+        ctrl.step(dt=1.0 / 60.0, wish_dir=wish, yaw_deg=float(i % 30), pitch_deg=0.0)
+        out.append((tuple(ctrl.pos), tuple(ctrl.vel), bool(ctrl.grounded), ctrl.last_step_sweeps))
+    return out
+
+
+def test_sweep_cache_is_bit_identical_and_counts_sweeps() -> None:
+    plain = make_controller(_arena_triangles(), spawn=(0.0, -10.0, 1.2), sweep_cache_size=0)
+    cached = make_controller(_arena_triangles(), spawn=(0.0, -10.0, 1.2), sweep_cache_size=4096)
+    assert _trace(cached) == _trace(plain)
+
+    assert plain.collision.sweep_cache_hits == 0
+    assert cached.collision.sweep_queries == plain.collision.sweep_queries > 0
+    assert cached.collision.sweep_cache_hits > 0
+    assert cached.last_step_sweeps > 0
+    assert 0 <= cached.last_step_sweep_hits <= cached.last_step_sweeps
+
+
+def test_sweep_cache_is_dropped_when_full_or_geometry_moves() -> None:
+    tuning = PhysicsTuning()
+    box = AABB(LVector3f(-1.0, 2.0, 0.0), LVector3f(1.0, 3.0, 2.0))
+    collision = CollisionWorld(
+        aabbs=[box],
+        triangles=None,
+        triangle_collision_mode=False,
+        player_radius=float(tuning.player_radius),
+        player_half_height=float(tuning.player_half_height),
+        render=NodePath(PandaNode("sweep-cache-test")),
+        sweep_cache_size=2,
+    )
+    a, b = LVector3f(0.0, 0.0, 1.0), LVector3f(0.0, 5.0, 1.0)
+    assert collision.sweep_closest(a, b).hasHit()
+    assert collision.sweep_closest(a, b).hasHit()
+    assert collision.sweep_cache_hits == 1
+
+    # Moving the block out of the way must not serve the stale hit.
+    collision.update_graybox_block(index=0, box=AABB(LVector3f(10.0, 2.0, 0.0), LVector3f(12.0, 3.0, 2.0)))
+    assert not collision.sweep_closest(a, b).hasHit()
+
+    collision.sweep_closest(a, LVector3f(0.0, 6.0, 1.0))
+    collision.sweep_closest(a, LVector3f(0.0, 7.0, 1.0))
+    assert len(collision._sweep_cache) <= 2
+    assert collision.sweep_queries == 5
+
+
+def test_tick_metrics_summarises_sweeps() -> None:
+    metrics = ServerTickMetrics(tick_rate_hz=60, window_ticks=4)
+    metrics.record_sweeps(sweeps=40, cache_hits=10)
+    metrics.record_sweeps(sweeps=60, cache_hits=30)
+    summary = metrics.summary()
+    assert summary["sweeps_per_tick"] == 50.0
+    assert summary["sweep_cache_hit_rate"] == 0.4
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import tracemalloc
+
+from controller_world import make_controller
+from panda3d.core import LVector3f
+
+from ivan.physics.motion.intent import MotionIntent
+from ivan.physics.player_controller import PlayerController
+
+
+def _run(ctrl: PlayerController, *, ticks: int, offset: int = 0) -> list[int]:
+    # Intents are built outside the measured window; only the step itself is charged.
+    intents = [
+        MotionIntent(
+            wish_dir=LVector3f(0.3 if ((i + offset) // 40) % 2 else -0.3, 1.0, 0.0),
+            jump_requested=(i + offset) % 50 == 10,
+            slide_requested=80 <= (i + offset) % 200 < 100,
+        )
+        for i in range(ticks)
+    ]
+    peaks: list[int] = []
+    for intent in intents:
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        ctrl.step_with_intent(dt=1.0 / 60.0, intent=intent, yaw_deg=0.0)
+        peaks.append(tracemalloc.get_traced_memory()[1] - before)
+    return peaks
+
+
+def _controller_blocks(snapshot: tracemalloc.Snapshot) -> int:
+    stats = snapshot.filter_traces([tracemalloc.Filter(True, "*player_controller*")]).statistics("filename")
+    return sum(s.count for s in stats)
+
+
+def test_ground_probe_offsets_are_cached_until_hull_change() -> None:
+    ctrl = make_controller()
+    offsets = ctrl._ground_probe_offsets()
+    _run(ctrl, ticks=30)
+    assert ctrl._ground_probe_offsets() is offsets
+
+    ctrl.tuning.player_radius = 0.5
+    ctrl.apply_hull_settings()
+    refreshed = ctrl._ground_probe_offsets()
+    assert refreshed is not offsets
+    assert abs(float(refreshed[1].x) - 0.5 * 0.48) < 1e-6
+
+
+def test_step_with_intent_does_not_retain_or_churn_vectors() -> None:
+    ctrl = make_controller()
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        probe = LVector3f(1.0, 2.0, 3.0)
+        vec_bytes = tracemalloc.get_traced_memory()[0] - base
+        del probe
+
+        _run(ctrl, ticks=60)
+        blocks0 = _controller_blocks(tracemalloc.take_snapshot())
+        peaks = _run(ctrl, ticks=240, offset=60)
+        blocks1 = _controller_blocks(tracemalloc.take_snapshot())
+    finally:
+        tracemalloc.stop()
+
+    assert vec_bytes > 0
+    # Steady-state steps swap state vectors/floats but must not accumulate them (a per-step leak shows up as 240+).
+    assert blocks1 - blocks0 <= 32
+    # Transient high-water mark per step, in vector wrappers; the pre-scratch hot path averaged ~27.
+    assert sum(peaks) / len(peaks) <= 20 * vec_bytes
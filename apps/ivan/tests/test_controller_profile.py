@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+from controller_world import FLOOR, WALL, drive, make_controller
+from panda3d.core import LVector3f
+
+from ivan.console.core import CommandContext
+from ivan.game.feel_diagnostics import RollingFeelDiagnostics
+from ivan.net.protocol import InputCommand
+from ivan.net.rewind import RewindHistory
+from ivan.net.server import MultiplayerServer
+from ivan.physics.controller_profile import (
+    CONTROLLER_PHASES,
+    ControllerProfiler,
+    ControllerProfileWindow,
+    controller_profile_enabled,
+)
+from ivan.physics.player_controller import PlayerController
+
+
+def test_profiler_counts_queries_and_partitions_step_time() -> None:
+    plain = make_controller()
+    profiled = make_controller()
+    profiled.profiler = ControllerProfiler()
+    window = ControllerProfileWindow(window_steps=50)
+    states: set[str] = set()
+
+    def _check(ctrl: PlayerController) -> None:
+        last = ctrl.profiler.last
+        assert last.sweeps == ctrl.last_step_sweeps
+        assert last.motion_state == ctrl.motion_state_name()
+        assert set(last.phase_s) <= set(CONTROLLER_PHASES)
+        assert abs(sum(last.phase_s.values()) - last.total_s) < 1e-9
+        states.add(last.motion_state)
+        window.record(last)
+
+    assert drive(profiled, ticks=120, on_step=_check) == drive(plain, ticks=120)
+    assert {"ground", "air"} <= states
+    summary = window.summary()
+    assert summary["steps"] == 120 and summary["window"] == 50
+    assert summary["sweeps_per_step"] > 0
+    assert {"ground_trace", "move", "ground_snap", "wall_probe"} <= set(summary["phase_mean_ms"])
+    assert set(summary["by_state"]) <= {"ground", "air", "slide", "wallrun"}
+    assert controller_profile_enabled("1") and not controller_profile_enabled("")
+
+
+def test_feel_diagnostics_dump_includes_controller_profile(tmp_path: Path) -> None:
+    ctrl = make_controller()
+    ctrl.profiler = ControllerProfiler()
+    diag = RollingFeelDiagnostics(tick_rate_hz=60, seconds=2.0)
+    zero = LVector3f(0, 0, 0)
+    for _ in range(30):
+        ctrl.step(dt=1.0 / 60.0, wish_dir=LVector3f(0.0, 1.0, 0.0), yaw_deg=0.0)
+        diag.record_tick(
+            t=0.0,
+            state=ctrl.motion_state_name(),
+            pos=ctrl.pos,
+            vel=ctrl.vel,
+            accel=zero,
+            contact_count=0,
+            floor_normal=ctrl.ground_normal(),
+            wall_normal=zero,
+            jump_buffer_left=0.0,
+            coyote_left=0.0,
+            last_input_age=0.0,
+            inp_mf=1,
+            inp_mr=0,
+            inp_jp=False,
+            inp_jh=False,
+            inp_sp=False,
+            controller_profile=ctrl.profiler.last,
+        )
+    out = tmp_path / "feel.json"
+    diag.dump_json(out_path=out)
+    payload = json.loads(out.read_text(encoding="utf-8"))
+
+    assert payload["controller_profile"]["window"] == 30
+    assert payload["samples"][-1]["ctrl_sweeps"] == ctrl.profiler.last.sweeps > 0
+    assert payload["samples"][-1]["ctrl_ms"] > 0.0
+    assert RollingFeelDiagnostics(tick_rate_hz=60).controller_profile_summary() is None
+
+
+@pytest.mark.parametrize("sim_workers", [0, 1])
+def test_server_ctrl_stats_profiles_in_process_player_steps(monkeypatch, tmp_path: Path, sim_workers: int) -> None:
+    import ivan.net.server as server_mod
+
+    map_json = tmp_path / "map.json"
+    map_json.write_text(json.dumps({"triangles": FLOOR + WALL}), encoding="utf-8")
+    monkeypatch.setenv("IRUN_IVAN_SERVER_CONSOLE_PORT", "0")
+    srv = MultiplayerServer(host="127.0.0.1", tcp_port=0, udp_port=0, map_json=str(map_json), sim_workers=sim_workers)
+    ctx = CommandContext(role="server", origin="test")
+    try:
+        assert (srv._sim_shards is not None) == bool(sim_workers)
+        assert srv.controller_profile is None
+        assert srv.console.execute_line(ctx=ctx, line="ctrl_stats") == ["ctrl_stats: profiling off (ctrl_stats on)"]
+        st = server_mod._ClientState(
+            player_id=1,
+            token="t1",
+            name="p1",
+            tcp_sock=None,
+            udp_addr=None,
+            ctrl=srv._make_controller(spawn_point=LVector3f(0.0, 0.0, 1.9)),
+            yaw=0.0,
+            pitch=0.0,
+            hp=100,
+            respawn_seq=0,
+            last_input=None,
+            rewind_history=RewindHistory(capacity=8),
+        )
+        st.input_queue.extend(
+            InputCommand(
+                seq=seq,
+                server_tick_hint=0,
+                look_dx=0,
+                look_dy=0,
+                look_scale=1,
+                move_forward=1,
+                move_right=0,
+                jump_pressed=False,
+                jump_held=False,
+                slide_pressed=False,
+                grapple_pressed=False,
+            )
+            for seq in range(1, 41)
+        )
+        srv._clients_by_token[st.token] = st
+
+        srv.console.execute_line(ctx=ctx, line="ctrl_stats on")
+        for _ in range(30):
+            srv._simulate_tick()
+        out = srv.console.execute_line(ctx=ctx, line="ctrl_stats")
+        assert "window=30" in out[0] and "sweeps_per_step=" in out[0]
+        assert any(line.startswith("phase_ms ") and "ground_trace=" in line for line in out)
+        assert any(line.startswith("state ") for line in out)
+        # Sim workers are not instrumented: profiling pauses them instead of leaving the window empty.
+        assert any(line.startswith("note: sim workers paused") for line in out) == bool(sim_workers)
+
+        srv.console.execute_line(ctx=ctx, line="ctrl_stats off")
+        assert srv.controller_profile is None
+        assert st.ctrl.profiler is None
+        for _ in range(10):
+            srv._simulate_tick()
+        assert not srv._sim_shards_paused
+        assert (srv._sim_shards is not None) == bool(sim_workers)
+    finally:
+        srv.close()
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import json
+import pickle
+from dataclasses import replace
+from pathlib import Path
+
+from controller_world import FLOOR, WALL, drive, make_controller
+from panda3d.core import LVector3f
+
+from ivan.physics.controller_snapshot import (
+    CONTROLLER_SCRATCH_ATTRS,
+    CONTROLLER_SHARED_ATTRS,
+    CONTROLLER_STATE_FIELDS,
+    CONTROLLER_VECTOR_FIELDS,
+)
+from ivan.replays.batch_sim import HeadlessSimulator
+from ivan.replays.demo import load_replay
+
+
+def test_state_fields_cover_every_per_player_attribute() -> None:
+    ctrl = make_controller()
+    attrs = set(vars(ctrl))
+
+    assert set(CONTROLLER_STATE_FIELDS) == attrs - CONTROLLER_SHARED_ATTRS - CONTROLLER_SCRATCH_ATTRS
+    assert len(set(CONTROLLER_STATE_FIELDS)) == len(CONTROLLER_STATE_FIELDS)
+    assert CONTROLLER_VECTOR_FIELDS == {k for k in CONTROLLER_STATE_FIELDS if isinstance(getattr(ctrl, k), LVector3f)}
+
+
+def test_restore_replays_identically_and_shares_nothing() -> None:
+    ctrl = make_controller()
+    drive(ctrl, ticks=50)
+    state = ctrl.capture_state()
+    assert state == ctrl.capture_state()
+    assert state.pos == ctrl.pos and state.vel == ctrl.vel
+
+    first = drive(ctrl, ticks=150, offset=50)
+    assert ctrl.capture_state() != state
+
+    ctrl.restore_state(state)
+    assert ctrl.capture_state() == state
+    assert drive(ctrl, ticks=150, offset=50) == first
+
+    # A fresh controller restored from the (pickled) snapshot follows the same trajectory.
+    other = make_controller()
+    other.restore_state(pickle.loads(pickle.dumps(state)))
+    assert drive(other, ticks=150, offset=50) == first
+
+    # Mutating live vectors after restore must not leak back into the snapshot.
+    ctrl.restore_state(state)
+    ctrl.pos.x += 5.0
+    ctrl._vault_assist_queue.append((LVector3f(1, 2, 3), 0.1))
+    assert ctrl.capture_state() != state
+    assert state.get("_vault_assist_queue") == []
+
+
+def test_headless_run_resumes_from_captured_state(tmp_path: Path) -> None:
+    map_json = tmp_path / "map.json"
+    map_json.write_text(json.dumps({"triangles": FLOOR + WALL}), encoding="utf-8")
+    frames = [
+        {
+            "dx": 3 if (i // 25) % 2 else -3,
+            "dy": 0,
+            "mf": 1,
+            "mr": 0,
+            "jp": i % 45 == 10,
+            "jh": i % 45 == 10,
+            "sp": 50 <= i < 65,
+            "gp": False,
+            "nt": False,
+            "tm": {"x": 0.0, "y": -6.0, "z": 1.2, "yaw": 0.0, "pitch": 0.0} if i == 0 else None,
+        }
+        for i in range(120)
+    ]
+    demo = tmp_path / "resume.ivan_demo.json"
+    demo.write_text(
+        json.dumps(
+            {
+                "format_version": 3,
+                "metadata": {"demo_name": "resume", "tick_rate": 60, "look_scale": 1, "map_json": str(map_json)},
+                "frames": frames,
+            }
+        ),
+        encoding="utf-8",
+    )
+    rec = load_replay(demo)
+    sim = HeadlessSimulator.from_map(str(map_json))
+    full = sim.run(rec)
+
+    head = sim.run(replace(rec, frames=rec.frames[:70]))
+    assert head.tick_hashes == full.tick_hashes[:70]
+    resumed = sim.run(rec, start_frame=70, initial_state=head.final_state, initial_look=head.final_look)
+    assert resumed.tick_hashes == full.tick_hashes[70:]
+    assert resumed.final_state == full.final_state
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+from panda3d.core import LVector3f
+
+from ivan.physics.quantize import HIT_FRACTION_QUANTUM, POSITION_QUANTUM, QuantizedHit, quantize_vec3
+from ivan.physics.tuning import PhysicsTuning
+from ivan.replays.batch_sim import HeadlessSimulator
+from ivan.replays.demo import load_replay
+from ivan.replays.determinism_verify import check_replay_hashes
+
+
+class _Hit:
+    def hasHit(self) -> bool:
+        return True
+
+    def getHitFraction(self) -> float:
+        return 0.123456789
+
+    def getHitNormal(self) -> LVector3f:
+        return LVector3f(0.0001, -0.7071, 0.7071)
+
+    def getHitPos(self) -> LVector3f:
+        return LVector3f(12.3456789, -0.0002, 3.0004)
+
+
+def _write_map(path: Path) -> Path:
+    s = 30.0
+    tris = [
+        [-s, -s, 0.0, s, -s, 0.0, s, s, 0.0],
+        [-s, -s, 0.0, s, s, 0.0, -s, s, 0.0],
+        [-8.0, 6.0, 0.0, 8.0, 6.0, 0.0, 8.0, 14.0, 2.5],
+        [-8.0, 6.0, 0.0, 8.0, 14.0, 2.5, -8.0, 14.0, 2.5],
+    ]
+    path.write_text(json.dumps({"triangles": tris}), encoding="utf-8")
+    return path
+
+
+def _write_demo(path: Path, *, map_json: Path, hashes: list[str] | None = None, x0: float = 0.0) -> Path:
+    frames = []
+    for i in range(120):
+        row = {
+            "dx": 2 if (i // 30) % 2 else -2,
+            "dy": 0,
+            "mf": 1,
+            "mr": 1 if (i // 20) % 3 == 0 else 0,
+            "jp": i % 40 == 15,
+            "jh": i % 40 == 15,
+            "sp": False,
+            "gp": False,
+            "nt": False,
+            "tm": {"x": x0, "y": -10.0, "z": 1.2, "yaw": 0.0, "pitch": 0.0} if i == 0 else None,
+        }
+        if hashes is not None:
+            row["h"] = hashes[i]
+        frames.append(row)
+    payload = {
+        "format_version": 3,
+        "metadata": {
+            "demo_name": "quant",
+            "created_at_unix": 1.0,
+            "tick_rate": 60,
+            "look_scale": 1,
+            "map_id": "quant",
+            "map_json": str(map_json),
+            "tuning": {"deterministic_quantize_enabled": True},
+        },
+        "frames": frames,
+    }
+    path.write_text(json.dumps(payload), encoding="utf-8")
+    return path
+
+
+def test_quantize_snaps_to_float32_exact_grid() -> None:
+    v = quantize_vec3(LVector3f(1234.56789, -0.00031, 7.5), POSITION_QUANTUM)
+
+    for c in v:
+        assert float(c) / POSITION_QUANTUM == round(float(c) / POSITION_QUANTUM)
+    assert LVector3f(float(v.x), float(v.y), float(v.z)) == v
+
+    hit = QuantizedHit(_Hit())
+    assert hit.hasHit()
+    assert hit.getHitFraction() <= 0.123456789
+    assert 0.123456789 - hit.getHitFraction() < HIT_FRACTION_QUANTUM
+    assert hit.getHitPos() == quantize_vec3(LVector3f(12.3456789, -0.0002, 3.0004), POSITION_QUANTUM)
+
+
+def test_quantized_mode_absorbs_sub_quantum_drift(tmp_path: Path) -> None:
+    map_json = _write_map(tmp_path / "map.json")
+    rec = load_replay(_write_demo(tmp_path / "a.ivan_demo.json", map_json=map_json))
+    nudged = load_replay(_write_demo(tmp_path / "b.ivan_demo.json", map_json=map_json, x0=2e-5))
+    sim = HeadlessSimulator.from_map(str(map_json))
+
+    a = sim.run(rec)
+    b = sim.run(nudged)
+    assert a.tick_hashes == b.tick_hashes
+    assert a.summary["metrics"] == b.summary["metrics"]
+    assert PhysicsTuning().deterministic_quantize_enabled is False
+
+
+def test_check_replay_hashes_matches_recorded_and_stops_at_first_mismatch(tmp_path: Path) -> None:
+    map_json = _write_map(tmp_path / "map.json")
+    rec = load_replay(_write_demo(tmp_path / "src.ivan_demo.json", map_json=map_json))
+    hashes = HeadlessSimulator.from_map(str(map_json)).run(rec).tick_hashes
+
+    good = _write_demo(tmp_path / "good.ivan_demo.json", map_json=map_json, hashes=hashes)
+    assert load_replay(good).frames[5].state_hash == hashes[5]
+    check = check_replay_hashes(replay_path=good)
+    assert check.matched is True
+    assert check.checked == 120
+    assert check.collision == "map"
+    assert check.deterministic_mode is True
+
+    tampered = list(hashes)
+    tampered[40] = "0" * 16
+    bad = check_replay_hashes(replay_path=_write_demo(tmp_path / "bad.ivan_demo.json", map_json=map_json, hashes=tampered))
+    assert bad.matched is False
+    assert bad.first_mismatch_tick == 40
+    assert bad.simulated_ticks == 41
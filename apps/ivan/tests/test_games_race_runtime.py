@@ -212,3 +212,25 @@ def test_race_remove_last_player_transitions_finished_to_idle() -> None:
     rt.remove_player(player_id=1)
     assert rt.status == "idle"
     assert rt.participants == set()
+
+
+def test_race_runtime_tick_with_player_index_matches_plain_tick() -> None:
+    from ivan.common.spatial_grid import SpatialGrid
+
+    def _run(use_index: bool) -> list[tuple]:
+        rt = RaceRuntime()
+        rt.set_course(_course_with_two_checkpoints())
+        _advance_to_running(rt)
+        grid = SpatialGrid(cell_size=8.0)
+        events: list[tuple] = []
+        for step in range(90):
+            now = 5.0 + step * 0.1
+            pos = {1: LVector3f(10.0 + step * 0.4, 0.3, 1.0)}
+            grid.rebuild((pid, float(p.x), float(p.y), float(p.z)) for pid, p in pos.items())
+            out = rt.tick(now=now, player_positions=pos, player_index=grid if use_index else None)
+            events.extend((e.kind, e.player_id) for e in out)
+        return events
+
+    plain = _run(False)
+    assert "race_finished" in [kind for kind, _ in plain]
+    assert _run(True) == plain
@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import json
+from contextlib import nullcontext
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from ivan.maps.bundle_io import (
+    GEOMETRY_FORMAT_JSON,
+    open_bundle_geometry,
+    write_bundle_map_json,
+)
+from ivan.maps.geometry_blob import (
+    GEOMETRY_BLOB_FILENAME,
+    GEOMETRY_BLOB_FORMAT,
+    GeometryBlob,
+    GeometryBlobError,
+    write_geometry_blob,
+)
+from ivan.world.scene_layers.loading import close_geometry_blob, try_load_external_map
+
+
+def _tri(m: str, z: float, lmi: int | None = None) -> dict:
+    return {
+        "m": m,
+        "lmi": lmi,
+        "p": [0.0, 0.0, z, 1.0, 0.0, z, 0.0, 1.0, z],
+        "n": [0.0, 0.0, 1.0] * 3,
+        "uv": [0.0, 0.0, 1.0, 0.0, 0.0, 1.0],
+        "lm": [0.25, 0.5, 0.75, 0.5, 0.25, 1.0],
+        "c": [1.0, 0.5, 0.25, 1.0] * 3,
+    }
+
+
+def test_geometry_blob_round_trips_triangle_columns(tmp_path: Path) -> None:
+    tris = [_tri("brick", 0.0, lmi=7), _tri("{fence", 1.0), _tri("brick", 2.0, lmi=9)]
+    coll = [[0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 1.0, 0.0]]
+    desc = write_geometry_blob(tmp_path / GEOMETRY_BLOB_FILENAME, triangles=tris, collision_triangles=coll)
+
+    assert desc["format"] == GEOMETRY_BLOB_FORMAT
+    assert desc["triangle_count"] == 3
+    assert desc["collision_triangle_count"] == 1
+
+    blob = GeometryBlob(tmp_path / GEOMETRY_BLOB_FILENAME)
+    try:
+        assert blob.materials == ("brick", "{fence")
+        assert list(blob.material_ids) == [0, 1, 0]
+        assert [blob.lightmap_id(i) for i in range(3)] == [7, None, 9]
+        out = list(blob.iter_triangle_dicts())
+        assert out == tris
+        rows = blob.collision_rows()
+        assert len(rows) == 1
+        assert list(rows[0]) == coll[0]
+        assert list(blob.render_rows()[2]) == tris[2]["p"]
+    finally:
+        blob.close()
+
+
+def test_geometry_blob_collision_falls_back_to_render_positions(tmp_path: Path) -> None:
+    write_geometry_blob(tmp_path / "g.bin", triangles=[_tri("a", 3.0)], collision_triangles=[])
+    blob = GeometryBlob(tmp_path / "g.bin")
+    try:
+        rows = blob.collision_rows()
+        assert len(rows) == 1
+        assert list(rows[0]) == _tri("a", 3.0)["p"]
+    finally:
+        blob.close()
+
+
+def test_geometry_blob_rejects_truncated_files(tmp_path: Path) -> None:
+    path = tmp_path / "g.bin"
+    write_geometry_blob(path, triangles=[_tri("a", 0.0)])
+    path.write_bytes(path.read_bytes()[:-8])
+    with pytest.raises(GeometryBlobError):
+        GeometryBlob(path)
+
+
+def test_write_bundle_map_json_bin_and_json_formats(tmp_path: Path) -> None:
+    tris = [_tri("brick", 0.0)]
+    coll = [list(tris[0]["p"])]
+
+    bin_dir = tmp_path / "bin"
+    map_json = write_bundle_map_json(
+        bundle_dir=bin_dir, payload={"format_version": 2}, triangles=tris, collision_triangles=coll
+    )
+    payload = json.loads(map_json.read_text(encoding="utf-8"))
+    assert "triangles" not in payload
+    assert payload["geometry"]["path"] == GEOMETRY_BLOB_FILENAME
+    blob = open_bundle_geometry(map_json=map_json, payload=payload)
+    assert blob is not None
+    assert blob.triangle_count == 1
+    blob.close()
+
+    json_dir = tmp_path / "json"
+    map_json = write_bundle_map_json(
+        bundle_dir=json_dir,
+        payload={"format_version": 2},
+        triangles=tris,
+        collision_triangles=coll,
+        geometry_format=GEOMETRY_FORMAT_JSON,
+    )
+    payload = json.loads(map_json.read_text(encoding="utf-8"))
+    assert payload["triangles"] == tris
+    assert payload["collision_triangles"] == coll
+    assert open_bundle_geometry(map_json=map_json, payload=payload) is None
+    assert not (json_dir / GEOMETRY_BLOB_FILENAME).exists()
+
+
+def _fake_scene(attached: dict[str, object]) -> SimpleNamespace:
+    scene = SimpleNamespace()
+    scene._geometry_blob = None
+    scene.triangles = None
+    scene._map_convert_report = {}
+    scene._resolve_map_bundle_path = lambda p: p if p.exists() else None
+    scene._resolve_material_root = lambda **kw: None
+    scene._resolve_lightmaps = lambda **kw: None
+    scene._lights_from_payload = lambda **kw: []
+    scene._resolve_lightstyles = lambda **kw: ({}, "legacy")
+    scene._resolve_visibility = lambda **kw: None
+    scene._attach_triangle_map_geometry_v2_unlit = lambda **kw: attached.setdefault("unlit", kw["triangles"])
+    scene._attach_triangle_map_geometry_v2 = lambda **kw: attached.setdefault("baked", kw["triangles"])
+    scene._setup_skybox = lambda **kw: ("default_horizon", "default-preset")
+    scene._enhance_map_file_lighting = lambda *a, **kw: None
+    scene._time_load_stage = lambda name: nullcontext()
+    return scene
+
+
+def test_try_load_external_map_reads_geometry_blob(tmp_path: Path) -> None:
+    tris = [_tri("brick", 0.0), _tri("brick", 1.0)]
+    coll = [list(tris[0]["p"])]
+    map_json = write_bundle_map_json(
+        bundle_dir=tmp_path, payload={"format_version": 2, "map_id": "blob"}, triangles=tris, collision_triangles=coll
+    )
+
+    attached: dict[str, object] = {}
+    scene = _fake_scene(attached)
+    cfg = SimpleNamespace(map_profile="dev-fast", lighting=None)
+    ok = try_load_external_map(scene, cfg=cfg, map_json=map_json, loader=None, render=None, camera=None)
+
+    assert ok
+    assert scene._map_id == "blob"
+    assert scene._geometry_blob is not None
+    assert len(scene.triangles) == 1
+    assert list(scene.triangles[0]) == coll[0]
+    assert attached["unlit"] is scene._geometry_blob
+    assert list(scene._geometry_blob.iter_triangle_dicts()) == tris
+    scene._geometry_blob.close()
+
+
+def test_scene_geometry_blob_is_closed_on_reload_and_failed_load(tmp_path: Path) -> None:
+    map_json = write_bundle_map_json(
+        bundle_dir=tmp_path / "map", payload={"format_version": 2}, triangles=[_tri("brick", 0.0)], collision_triangles=[]
+    )
+    empty_json = write_bundle_map_json(
+        bundle_dir=tmp_path / "empty", payload={"format_version": 2}, triangles=[], collision_triangles=[]
+    )
+    scene = _fake_scene({})
+    cfg = SimpleNamespace(map_profile="dev-fast", lighting=None)
+
+    assert try_load_external_map(scene, cfg=cfg, map_json=map_json, loader=None, render=None, camera=None)
+    first = scene._geometry_blob
+    assert try_load_external_map(scene, cfg=cfg, map_json=map_json, loader=None, render=None, camera=None)
+    # Reloading releases the previous mapping and its file handle.
+    assert first._file is None
+    second = scene._geometry_blob
+    assert second is not first and second._file is not None
+
+    # A blob without triangles is opened, rejected, and closed again.
+    assert not try_load_external_map(scene, cfg=cfg, map_json=empty_json, loader=None, render=None, camera=None)
+    assert second._file is None
+    assert scene._geometry_blob is None
+    assert scene.triangles is None
+
+    assert try_load_external_map(scene, cfg=cfg, map_json=map_json, loader=None, render=None, camera=None)
+    blob = scene._geometry_blob
+    close_geometry_blob(scene)
+    assert blob._file is None
+    assert scene._geometry_blob is None
+    assert scene.triangles is None
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+from panda3d.core import GeomVertexArrayFormat, GeomVertexFormat, GeomVertexReader, Geom, InternalName
+
+from ivan.maps.geometry_blob import GeometryBlob, write_geometry_blob
+from ivan.world.scene_layers.geometry import (
+    _LIT_COLUMNS,
+    _UNLIT_COLUMNS,
+    _build_geom_bulk,
+    _build_geom_writer,
+    _group_triangles,
+    _packed_float_layout,
+)
+from ivan.world.scene_layers.render_primitives import vformat_v3n3c4t2t2
+
+
+def _quad(material: str, lmi: int | None) -> list[dict]:
+    # Two triangles sharing an edge: 6 corners, 4 unique vertices.
+    n = [0.0, 0.0, 1.0] * 3
+    c = [1.0, 0.5, 0.25, 1.0] * 3
+    return [
+        {
+            "m": material,
+            "lmi": lmi,
+            "p": [0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 1.0, 1.0, 0.0],
+            "n": n,
+            "uv": [0.0, 0.0, 1.0, 0.0, 1.0, 1.0],
+            "lm": [0.0, 0.0, 0.5, 0.0, 0.5, 0.5],
+            "c": c,
+        },
+        {
+            "m": material,
+            "lmi": lmi,
+            "p": [0.0, 0.0, 0.0, 1.0, 1.0, 0.0, 0.0, 1.0, 0.0],
+            "n": n,
+            "uv": [0.0, 0.0, 1.0, 1.0, 0.0, 1.0],
+            "lm": [0.0, 0.0, 0.5, 0.5, 0.0, 0.5],
+            "c": c,
+        },
+    ]
+
+
+def _corners(geom: Geom, columns: tuple[tuple[str, int], ...]) -> list[tuple[float, ...]]:
+    vdata = geom.getVertexData()
+    prim = geom.getPrimitive(0)
+    readers = [(GeomVertexReader(vdata, name), comps) for name, comps in columns]
+    out: list[tuple[float, ...]] = []
+    for i in range(prim.getNumVertices()):
+        row = prim.getVertex(i)
+        vals: list[float] = []
+        for reader, comps in readers:
+            reader.setRow(row)
+            data = reader.getData4f()
+            vals.extend(float(data[k]) for k in range(comps))
+        out.append(tuple(round(float(v), 6) for v in vals))
+    return out
+
+
+def test_bulk_build_matches_writer_and_shares_vertices() -> None:
+    tris = _quad("wall", 3)
+    for lit, fmt, columns in (
+        (True, vformat_v3n3c4t2t2(), _LIT_COLUMNS),
+        (False, GeomVertexFormat.getV3n3t2(), _UNLIT_COLUMNS),
+    ):
+        groups = _group_triangles(tris, lit=lit)
+        assert list(groups.keys()) == [("wall", 3 if lit else None)]
+        recs = groups[next(iter(groups))]
+        bulk, bulk_rows = _build_geom_bulk("t", fmt, recs, lit=lit)
+        ref, ref_rows = _build_geom_writer("t", fmt, recs, lit=lit)
+        assert ref_rows == 6
+        assert bulk_rows == 4
+        assert bulk.getPrimitive(0).getNumPrimitives() == 2
+        assert _corners(bulk, columns) == _corners(ref, columns)
+
+
+def test_group_triangles_reads_blob_columns_like_dicts(tmp_path) -> None:
+    tris = _quad("a", 0) + _quad("b", None) + [{"m": "c", "p": [0.0] * 9, "n": [0.0] * 9, "uv": [0.0] * 6}]
+    write_geometry_blob(tmp_path / "geometry.bin", triangles=tris)
+    blob = GeometryBlob(tmp_path / "geometry.bin")
+    try:
+        from_blob = _group_triangles(blob, lit=True)
+        from_dicts = _group_triangles(tris, lit=True)
+        # Dict triangles without colours are skipped; the blob stores default white.
+        assert set(from_dicts.keys()) == {("a", 0), ("b", None)}
+        assert set(from_blob.keys()) == {("a", 0), ("b", None), ("c", None)}
+        for key, recs in from_dicts.items():
+            assert [tuple(r[0]) for r in from_blob[key]] == [tuple(r[0]) for r in recs]
+        assert set(_group_triangles(blob, lit=False).keys()) == {("a", None), ("b", None), ("c", None)}
+    finally:
+        blob.close()
+
+
+def test_packed_layout_rejects_non_float_or_reordered_formats() -> None:
+    assert _packed_float_layout(vformat_v3n3c4t2t2(), _LIT_COLUMNS)
+    assert _packed_float_layout(GeomVertexFormat.getV3n3t2(), _UNLIT_COLUMNS)
+    assert not _packed_float_layout(GeomVertexFormat.getV3n3t2(), _LIT_COLUMNS)
+
+    arr = GeomVertexArrayFormat()
+    arr.addColumn(InternalName.getVertex(), 3, Geom.NT_float32, Geom.C_point)
+    arr.addColumn(InternalName.getNormal(), 3, Geom.NT_float32, Geom.C_normal)
+    arr.addColumn(InternalName.getTexcoord(), 2, Geom.NT_uint16, Geom.C_texcoord)
+    fmt = GeomVertexFormat()
+    fmt.addArray(arr)
+    assert not _packed_float_layout(GeomVertexFormat.registerFormat(fmt), _UNLIT_COLUMNS)
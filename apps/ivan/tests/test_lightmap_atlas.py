@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+from ivan.maps.lightmap_atlas import LightmapAtlas
+from ivan.world.scene_layers.geometry import _atlas_page_batches
+
+
+def _solid(w: int, h: int, rgb: tuple[int, int, int]) -> bytes:
+    return bytes([rgb[0], rgb[1], rgb[2], 255]) * (w * h)
+
+
+def _pixel(buf: bytearray, *, page_w: int, x: int, y: int) -> tuple[int, int, int]:
+    off = (y * page_w + x) * 4
+    return (buf[off], buf[off + 1], buf[off + 2])
+
+
+def test_atlas_packs_faces_without_overlap_and_remaps_uvs() -> None:
+    atlas = LightmapAtlas(page_size=64, padding=1)
+    atlas.add_face(7, width=4, height=3, slots=[_solid(4, 3, (10, 20, 30)), None, None, None])
+    atlas.add_face(9, width=5, height=2, slots=[_solid(5, 2, (40, 50, 60)), _solid(5, 2, (1, 2, 3)), None, None])
+    atlas.pack()
+
+    assert atlas.pages == [(64, 8)]
+    a = atlas.rect(7)
+    b = atlas.rect(9)
+    assert a is not None and b is not None
+    assert (a.page, b.page) == (0, 0)
+    # Padded rects must not overlap.
+    assert a.x + a.w + 1 <= b.x - 1 or b.x + b.w + 1 <= a.x - 1 or a.y + a.h + 1 <= b.y - 1
+
+    # Face-local (0, 1) is the top-left texel corner; (1, 0) the bottom-right.
+    u, v = atlas.remap_uv(7, 0.0, 1.0)
+    assert (round(u * 64), round((1.0 - v) * 8)) == (a.x, a.y)
+    u, v = atlas.remap_uv(7, 1.0, 0.0)
+    assert (round(u * 64), round((1.0 - v) * 8)) == (a.x + a.w, a.y + a.h)
+
+    layers = atlas.page_layers()[0]
+    assert layers[2] is None and layers[3] is None
+    assert _pixel(layers[0], page_w=64, x=a.x, y=a.y) == (10, 20, 30)
+    # Edge texels are replicated into the padding ring.
+    assert _pixel(layers[0], page_w=64, x=a.x - 1, y=a.y - 1) == (10, 20, 30)
+    assert _pixel(layers[1], page_w=64, x=b.x + b.w, y=b.y + b.h) == (1, 2, 3)
+    # Face 7 has no slot-1 lightmap: its region on the slot-1 layer stays black.
+    assert _pixel(layers[1], page_w=64, x=a.x, y=a.y) == (0, 0, 0)
+
+
+def test_atlas_face_entry_and_oversized_pages(tmp_path) -> None:
+    atlas = LightmapAtlas(page_size=16, padding=1)
+    atlas.add_face(1, width=2, height=2, slots=[_solid(2, 2, (5, 5, 5)), None, None, None])
+    atlas.add_face(2, width=20, height=3, slots=[_solid(20, 3, (9, 9, 9)), None, None, None])
+    atlas.pack()
+    assert atlas.rect(2).page != atlas.rect(1).page
+    assert atlas.pages[atlas.rect(2).page][0] >= 22
+
+    saved: list[tuple[str, int, int]] = []
+    pages = atlas.write_pages(
+        tmp_path, save_rgba=lambda dst, w, h, rgba: saved.append((dst.name, w, h)) or dst.write_bytes(rgba)
+    )
+    assert len(pages) == 2
+    assert all(p["paths"][1] is None for p in pages)
+    entry = atlas.face_entry(1, pages=pages, styles=[0, 3, None, None])
+    assert entry is not None
+    assert entry["page"] == atlas.rect(1).page
+    assert entry["styles"] == [0, None, None, None]
+    assert entry["paths"][0] == pages[entry["page"]]["paths"][0]
+    assert entry["paths"][0].startswith("lightmaps/atlas")
+    assert len(saved) == 2
+
+
+def test_atlas_page_batches_merge_faces_per_pvs_leaf() -> None:
+    faces = {
+        1: {"paths": ["p0", None, None, None], "styles": [0, None, None, None], "page": 0},
+        2: {"paths": ["p0", None, None, None], "styles": [0, None, None, None], "page": 0},
+        3: {"paths": ["p0", "p0b", None, None], "styles": [0, 5, None, None], "page": 0},
+        4: {"paths": ["legacy", None, None, None], "styles": [0, None, None, None]},
+        5: {"paths": ["p0", None, None, None], "styles": [0, None, None, None], "page": 0},
+    }
+    groups = {
+        ("wall", 1): ["a"],
+        ("wall", 2): ["b"],
+        ("wall", 3): ["c"],
+        ("wall", 4): ["d"],
+        ("sky", None): ["e"],
+        ("wall", 5): ["f"],
+    }
+    scene = SimpleNamespace(_lightmap_faces=faces, _vis_goldsrc=None)
+
+    batches = _atlas_page_batches(scene, groups)
+    assert batches == [
+        ("wall", 1, ["a", "b", "f"], 0, [1, 2, 5]),
+        ("wall", 3, ["c"], 0, [3]),
+        ("wall", 4, ["d"], None, [4]),
+        ("sky", None, ["e"], None, []),
+    ]
+    assert groups[("wall", 1)] == ["a"]
+
+    # With PVS, faces 1 and 2 share leaf 7 and still batch; face 5 lives in another leaf.
+    scene._vis_goldsrc = SimpleNamespace(world_face_leaves=lambda: {1: 7, 2: 7, 3: 7, 5: 8})
+    batches = _atlas_page_batches(scene, groups)
+    assert [(tris, members) for _m, _lmi, tris, _page, members in batches] == [
+        (["a", "b"], [1, 2]),
+        (["c"], [3]),
+        (["d"], [4]),
+        (["e"], []),
+        (["f"], [5]),
+    ]
+
+
+def test_world_face_leaves_uses_first_listing_leaf() -> None:
+    from ivan.world.goldsrc_visibility import GoldSrcBspVis
+
+    vis = GoldSrcBspVis(
+        source_bsp="",
+        source_mtime_ns=0,
+        root_node=0,
+        planes=[],
+        nodes=[],
+        leaves=[(-1, 0, 0), (0, 0, 2), (0, 2, 3)],
+        leaf_faces=[10, 11, 11, 12, 99],
+        visdata=b"",
+        world_first_face=10,
+        world_num_faces=3,
+    )
+    assert vis.world_face_leaves() == {10: 1, 11: 1, 12: 2}
+
+
+def test_resolve_lightmaps_keeps_atlas_page(tmp_path) -> None:
+    from ivan.world.scene import WorldScene
+
+    map_json = tmp_path / "map.json"
+    map_json.write_text("{}", encoding="utf-8")
+    (tmp_path / "lightmaps").mkdir()
+    (tmp_path / "lightmaps" / "atlas0_lm0.png").write_bytes(b"")
+    payload = {
+        "lightmaps": {
+            "faces": {
+                "3": {"paths": ["lightmaps/atlas0_lm0.png", None, None, None], "styles": [0, None, None, None], "page": 0}
+            }
+        }
+    }
+    out = WorldScene._resolve_lightmaps(map_json=map_json, payload=payload)
+    assert out is not None
+    assert out[3]["page"] == 0
@@ -29,6 +29,8 @@ def _make_scene_stub(*, use_real_resolve_material_root=False):
     from ivan.world.scene import WorldScene
 
     stub = SimpleNamespace()
+    stub._geometry_blob = None
+    stub.triangles = None
     stub._map_convert_report = {}
     stub._resolve_map_bundle_path = lambda p: p if p.exists() else None
     stub._resolve_material_root = (
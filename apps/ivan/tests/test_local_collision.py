@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import random
+
+from controller_world import triangle_world
+from panda3d.core import LVector3f
+
+from ivan.physics.collision_world import CollisionWorld
+from ivan.physics.local_collision import LocalCollisionWorld, TriangleGrid, collision_world_mode
+from ivan.physics.tuning import PhysicsTuning
+
+
+def _map_triangles() -> list[list[float]]:
+    s = 50.0
+    tris = [
+        [-s, -s, 0.0, s, -s, 0.0, s, s, 0.0],
+        [-s, -s, 0.0, s, s, 0.0, -s, s, 0.0],
+    ]
+    # Scattered ramps: small triangles that land in grid cells.
+    for i in range(-4, 5):
+        x = i * 10.0
+        tris.append([x, 5.0, 0.0, x + 4.0, 5.0, 0.0, x + 4.0, 9.0, 1.5])
+        tris.append([x, 5.0, 0.0, x + 4.0, 9.0, 1.5, x, 9.0, 1.5])
+    return tris
+
+
+def _worlds(**local_kwargs) -> tuple[CollisionWorld, LocalCollisionWorld]:
+    tuning = PhysicsTuning()
+    tris = _map_triangles()
+    full = triangle_world(tris)
+    local = LocalCollisionWorld(
+        source=full,
+        index=TriangleGrid(tris),
+        player_radius=float(tuning.player_radius),
+        player_half_height=float(tuning.player_half_height),
+        sweep_cache_size=0,
+        **local_kwargs,
+    )
+    return full, local
+
+
+def test_triangle_grid_query_matches_brute_force() -> None:
+    rng = random.Random(5)
+    tris = _map_triangles()
+    grid = TriangleGrid(tris, cell_size=4.0)
+    assert len(grid) == len(tris)
+    for _ in range(100):
+        lo = (rng.uniform(-60, 50), rng.uniform(-60, 50), rng.uniform(-2, 2))
+        hi = (lo[0] + rng.uniform(0, 20), lo[1] + rng.uniform(0, 20), lo[2] + rng.uniform(0, 3))
+        expected = [
+            i
+            for i, t in enumerate(tris)
+            if min(t[0::3]) <= hi[0] and max(t[0::3]) >= lo[0]
+            and min(t[1::3]) <= hi[1] and max(t[1::3]) >= lo[1]
+            and min(t[2::3]) <= hi[2] and max(t[2::3]) >= lo[2]
+        ]
+        assert grid.query(lo, hi) == expected
+
+
+def test_local_world_answers_like_full_world_and_rebuilds_only_on_exit() -> None:
+    full, local = _worlds(pad=4.0)
+    rng = random.Random(11)
+    pos = LVector3f(0.0, 0.0, 1.2)
+    for _ in range(300):
+        pos += LVector3f(rng.uniform(-0.3, 0.3), rng.uniform(-0.1, 0.3), 0.0)
+        move = LVector3f(rng.uniform(-1, 1), rng.uniform(-1, 1), rng.uniform(-1.5, 0.2))
+        a = full.sweep_closest(pos, pos + move)
+        b = local.sweep_closest(pos, pos + move)
+        assert a.hasHit() == b.hasHit()
+        if a.hasHit():
+            assert a.getHitFraction() == b.getHitFraction()
+            assert (LVector3f(a.getHitNormal()) - LVector3f(b.getHitNormal())).length() < 1e-4
+    # The region follows the walk in a handful of rebuilds instead of one per query.
+    assert 1 <= local.rebuilds < 40
+    assert 0 < local.region_triangles < len(local.index)
+    assert local.fallback_queries == 0
+
+
+def test_local_world_sends_oversized_queries_to_full_world() -> None:
+    full, local = _worlds(pad=2.0, max_extent=10.0)
+    start, end = LVector3f(-30.0, 7.0, 5.0), LVector3f(30.0, 7.0, -1.0)
+    a = full.sweep_closest(start, end)
+    b = local.sweep_closest(start, end)
+    assert local.fallback_queries == 1
+    assert local.rebuilds == 0
+    assert b.hasHit() and a.getHitFraction() == b.getHitFraction()
+    ray = local.ray_closest(LVector3f(0.0, 0.0, 3.0), LVector3f(0.0, 0.0, -3.0))
+    assert ray.hasHit()
+    assert local.rebuilds == 1
+
+
+def test_collision_world_mode_parsing(monkeypatch) -> None:
+    monkeypatch.delenv("IRUN_IVAN_COLLISION_WORLD", raising=False)
+    assert collision_world_mode() == "full"
+    monkeypatch.setenv("IRUN_IVAN_COLLISION_WORLD", " Local ")
+    assert collision_world_mode() == "local"
+    assert collision_world_mode("bogus") == "full"
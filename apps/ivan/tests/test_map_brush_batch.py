@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import ivan.maps.brush_batch as brush_batch_mod
+import ivan.maps.brush_cache as brush_cache_mod
+from ivan.maps.brush_batch import MAP_WORKERS_ENV, resolve_map_workers
+from ivan.maps.map_converter import convert_map_file
+
+_DEMO_MAP = Path(__file__).resolve().parents[1] / "assets" / "maps" / "demo" / "demo.map"
+
+
+def test_resolve_map_workers_env(monkeypatch) -> None:
+    monkeypatch.delenv(MAP_WORKERS_ENV, raising=False)
+    assert resolve_map_workers(None) == 0
+    monkeypatch.setenv(MAP_WORKERS_ENV, "3")
+    assert resolve_map_workers(None) == 3
+    assert resolve_map_workers(1) == 1
+    monkeypatch.setenv(MAP_WORKERS_ENV, "many")
+    assert resolve_map_workers(None) == 0
+    assert resolve_map_workers(-2) == 0
+
+
+def test_parallel_conversion_matches_serial(monkeypatch, tmp_path: Path) -> None:
+    # Small chunks so even the demo map is spread over several pool tasks.
+    monkeypatch.setattr(brush_batch_mod, "PARALLEL_MIN_BRUSHES", 1)
+    monkeypatch.setattr(brush_batch_mod, "CHUNK_BRUSHES", 3)
+    monkeypatch.setattr(brush_cache_mod, "_OPEN_CACHES", {})
+    serial = convert_map_file(_DEMO_MAP, scale=0.03, texture_cache_dir=tmp_path / "serial", brush_cache=False, workers=0)
+    parallel = convert_map_file(
+        _DEMO_MAP, scale=0.03, texture_cache_dir=tmp_path / "par", brush_cache=False, workers=2
+    )
+    assert serial.perf_counts["brushes_converted_parallel"] == 0
+    assert parallel.perf_counts["brushes_converted_parallel"] > 0
+    assert parallel.triangles == serial.triangles
+    assert parallel.collision_triangles == serial.collision_triangles
+
+    # Pool results fill the brush cache just like serial clipping does.
+    cached = convert_map_file(_DEMO_MAP, scale=0.03, texture_cache_dir=tmp_path / "cache", workers=2)
+    warm = convert_map_file(_DEMO_MAP, scale=0.03, texture_cache_dir=tmp_path / "cache", workers=2)
+    assert warm.perf_counts["brush_cache_misses"] == 0 and warm.perf_counts["brushes_converted_parallel"] == 0
+    for res in (cached, warm):
+        assert res.triangles == serial.triangles
+        assert res.collision_triangles == serial.collision_triangles
+
+
+def test_pool_failure_falls_back_to_in_process_conversion(monkeypatch, tmp_path: Path) -> None:
+    from concurrent.futures.process import BrokenProcessPool
+
+    monkeypatch.setattr(brush_batch_mod, "PARALLEL_MIN_BRUSHES", 1)
+    monkeypatch.setattr(brush_cache_mod, "_OPEN_CACHES", {})
+    serial = convert_map_file(_DEMO_MAP, scale=0.03, texture_cache_dir=tmp_path / "serial", brush_cache=False, workers=0)
+
+    class _CrashingPool:
+        def __init__(self, **_kw) -> None:
+            return
+
+        def map(self, *_a, **_kw):
+            raise BrokenProcessPool("worker died")
+
+        def shutdown(self, **_kw) -> None:
+            return
+
+    def _unspawnable(**_kw):
+        raise OSError("cannot spawn")
+
+    for i, pool_cls in enumerate((_CrashingPool, _unspawnable)):
+        monkeypatch.setattr(brush_batch_mod, "ProcessPoolExecutor", pool_cls)
+        res = convert_map_file(
+            _DEMO_MAP, scale=0.03, texture_cache_dir=tmp_path / f"fallback{i}", brush_cache=False, workers=2
+        )
+        assert res.perf_counts["brushes_converted_parallel"] == 0
+        assert res.triangles == serial.triangles
+        assert res.collision_triangles == serial.collision_triangles
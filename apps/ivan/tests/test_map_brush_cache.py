@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+from pathlib import Path
+from types import SimpleNamespace
+
+from panda3d.core import NodePath, PandaNode, Texture
+
+import ivan.maps.brush_cache as brush_cache_mod
+from ivan.maps.brush_cache import BRUSH_CACHE_FILENAME
+from ivan.maps.map_converter import convert_map_file
+from ivan.world.scene_layers.geometry import (
+    attach_triangle_map_geometry_v2_unlit,
+    reattach_changed_map_geometry_v2_unlit,
+)
+
+_DEMO_MAP = Path(__file__).resolve().parents[1] / "assets" / "maps" / "demo" / "demo.map"
+
+
+def _convert(map_path: Path, cache_dir: Path, *, brush_cache: bool = True):
+    return convert_map_file(map_path, scale=0.03, texture_cache_dir=cache_dir, brush_cache=brush_cache)
+
+
+def test_cached_conversion_matches_cold_conversion(monkeypatch, tmp_path: Path) -> None:
+    monkeypatch.setattr(brush_cache_mod, "_OPEN_CACHES", {})
+    cold = _convert(_DEMO_MAP, tmp_path / "cold", brush_cache=False)
+    first = _convert(_DEMO_MAP, tmp_path / "cache")
+    brushes = first.perf_counts["brushes_total"]
+    assert first.perf_counts["brush_cache_misses"] > 0
+    assert first.perf_counts["brush_cache_hits"] + first.perf_counts["brush_cache_misses"] <= brushes
+    assert (tmp_path / "cache" / BRUSH_CACHE_FILENAME).exists()
+
+    # A new process reads the cache back from disk: nothing is re-clipped and the output is unchanged.
+    monkeypatch.setattr(brush_cache_mod, "_OPEN_CACHES", {})
+    warm = _convert(_DEMO_MAP, tmp_path / "cache")
+    assert warm.perf_counts["brush_cache_misses"] == 0
+    assert warm.perf_counts["brush_cache_hits"] == first.perf_counts["brush_cache_misses"]
+    for res in (first, warm):
+        assert res.triangles == cold.triangles
+        assert res.collision_triangles == cold.collision_triangles
+
+
+def test_editing_one_brush_reclips_only_that_brush(monkeypatch, tmp_path: Path) -> None:
+    monkeypatch.setattr(brush_cache_mod, "_OPEN_CACHES", {})
+    text = _DEMO_MAP.read_text(encoding="utf-8")
+    map_path = tmp_path / "demo.map"
+    map_path.write_text(text, encoding="utf-8")
+    base = _convert(map_path, tmp_path / "cache")
+
+    # Tilt one face plane of the first worldspawn brush (its first point moves one unit along X).
+    lines = text.splitlines()
+    i = next(k for k, ln in enumerate(lines) if ln.lstrip().startswith("( ") and ln.count("(") >= 3)
+    head, rest = lines[i].split(")", 1)
+    x, y, z = head.strip(" (").split()
+    lines[i] = f"( {float(x) + 1.0:g} {y} {z} ){rest}"
+    map_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    edited = _convert(map_path, tmp_path / "cache")
+    assert edited.perf_counts["brush_cache_misses"] == 1
+    assert edited.perf_counts["brush_cache_hits"] == base.perf_counts["brush_cache_misses"] - 1
+    assert edited.triangles != base.triangles
+    assert edited.triangles == _convert(map_path, tmp_path / "cold", brush_cache=False).triangles
+
+
+def test_open_brush_cache_keeps_only_the_current_map(monkeypatch, tmp_path: Path) -> None:
+    monkeypatch.setattr(brush_cache_mod, "_OPEN_CACHES", {})
+    first = brush_cache_mod.open_brush_cache(tmp_path / "a")
+    assert brush_cache_mod.open_brush_cache(tmp_path / "a") is first
+    brush_cache_mod.open_brush_cache(tmp_path / "b")
+    assert len(brush_cache_mod._OPEN_CACHES) == 1
+    assert brush_cache_mod.open_brush_cache(tmp_path / "a") is not first
+
+
+def _quad(material: str, z: float) -> list[dict]:
+    n = [0.0, 0.0, 1.0] * 3
+    return [
+        {"m": material, "p": [0.0, 0.0, z, 1.0, 0.0, z, 1.0, 1.0, z], "n": n, "uv": [0.0, 0.0, 1.0, 0.0, 1.0, 1.0]},
+        {"m": material, "p": [0.0, 0.0, z, 1.0, 1.0, z, 0.0, 1.0, z], "n": n, "uv": [0.0, 0.0, 1.0, 1.0, 0.0, 1.0]},
+    ]
+
+
+def test_reattach_rebuilds_only_changed_material_groups() -> None:
+    render = NodePath(PandaNode("reload-test"))
+    scene = SimpleNamespace(
+        _map_id="reload",
+        _pixelated_textures=True,
+        _map_geometry_groups={},
+        _geometry_build_report={},
+        _resolve_material_texture_path=lambda *, material_name: None,
+        _make_debug_checker_texture=lambda: Texture("checker"),
+    )
+    attach_triangle_map_geometry_v2_unlit(
+        scene,
+        loader=None,
+        render=render,
+        triangles=_quad("floor", 0.0) + _quad("wall", 1.0) + _quad("crate", 2.0),
+        track_groups=True,
+    )
+    floor_np = scene._map_geometry_groups["floor"][1]
+    assert render.getNumChildren() == 3
+
+    report = reattach_changed_map_geometry_v2_unlit(
+        scene,
+        loader=None,
+        render=render,
+        triangles=_quad("floor", 0.0) + _quad("wall", 1.5) + _quad("trim", 3.0),
+    )
+    assert report == {"groups_kept": 1, "groups_rebuilt": 2, "groups_removed": 1, "triangles_rebuilt": 4}
+    assert scene._map_geometry_groups["floor"][1] is floor_np
+    assert sorted(scene._map_geometry_groups) == ["floor", "trim", "wall"]
+    assert render.getNumChildren() == 3
+
+
+def test_reattach_rebuilds_group_when_its_texture_changes(tmp_path: Path) -> None:
+    import os
+
+    render = NodePath(PandaNode("reload-tex-test"))
+    tex_file = tmp_path / "floor.png"
+    tex_file.write_bytes(b"old")
+    scene = SimpleNamespace(
+        _map_id="reload",
+        _pixelated_textures=True,
+        _map_geometry_groups={},
+        _geometry_build_report={},
+        _resolve_material_texture_path=lambda *, material_name: tex_file if material_name == "floor" else None,
+        _make_debug_checker_texture=lambda: Texture("checker"),
+    )
+    loader = SimpleNamespace(loadTexture=lambda *_a, **_kw: None)
+    tris = _quad("floor", 0.0) + _quad("wall", 1.0)
+    attach_triangle_map_geometry_v2_unlit(scene, loader=loader, render=render, triangles=tris, track_groups=True)
+    wall_np = scene._map_geometry_groups["wall"][1]
+
+    tex_file.write_bytes(b"newer")
+    st = tex_file.stat()
+    os.utime(tex_file, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    report = reattach_changed_map_geometry_v2_unlit(scene, loader=loader, render=render, triangles=tris)
+    assert report["groups_kept"] == 1 and report["groups_rebuilt"] == 1
+    assert scene._map_geometry_groups["wall"][1] is wall_np
@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+import ivan.maps.map_parser as map_parser_mod
+from ivan.maps.map_parser import iter_map_entities, parse_map, parse_map_file
+
+_MAPS = sorted((Path(__file__).resolve().parents[1] / "assets" / "maps").rglob("*.map"))
+
+_ODD_MAP = (
+    "// header comment\n"
+    '{\n"classname" "worldspawn"\x0c"wad" "a.wad" // trailing\r\n'
+    "{\n"
+    "( 0 0 0 ) ( 1 0 0 ) ( 0 1 0 ) T [ 1 0 0 0 ] [ 0 1 0 0 ] 0 1 1\n"
+    "( 0 0 0 ) ( 0 1 0 ) ( 0 0 1 ) STD 0 0 0 1 1\n"
+    '"ignored" "inside brush"\n'
+    "garbage line\n"
+    "}\n}\n"
+    '{\n"classname" "func_wall"\n{\n( 0 0 0 ) ( 1 0 0 ) ( 0 1 0 ) T [ 1 0 0 0 ] [ 0 1 0 0 ] 0 1 1\n'
+)
+
+
+@pytest.mark.parametrize("chunk", [3, 64, 1 << 20])
+def test_streamed_file_parse_matches_text_parse(monkeypatch, tmp_path: Path, chunk: int) -> None:
+    monkeypatch.setattr(map_parser_mod, "_READ_CHUNK", chunk)
+    odd = tmp_path / "odd.map"
+    odd.write_text(_ODD_MAP, encoding="utf-8", newline="")
+    for path in [*_MAPS, odd]:
+        expected = parse_map(path.read_text(encoding="utf-8", errors="replace"))
+        assert parse_map_file(path) == expected, path.name
+
+
+def test_odd_map_layout_and_unterminated_entity() -> None:
+    world, wall = parse_map(_ODD_MAP)
+    assert world.properties == {"classname": "worldspawn", "wad": "a.wad"}
+    (brush,) = world.brushes
+    assert [f.texture for f in brush.faces] == ["T", "STD"]
+    # The last entity and its brush are never closed; both are still returned.
+    assert wall.properties["classname"] == "func_wall"
+    assert len(wall.brushes) == 1 and len(wall.brushes[0].faces) == 1
+
+
+def test_entities_are_yielded_before_input_is_exhausted() -> None:
+    def lines():
+        yield from ['{', '"classname" "worldspawn"', '}']
+        raise AssertionError("read past the first entity")
+
+    it = iter_map_entities(lines())
+    assert next(it).properties == {"classname": "worldspawn"}
@@ -1,10 +1,13 @@
 from __future__ import annotations
 
 from pathlib import Path
+from types import SimpleNamespace
 
+from ivan.maps import map_converter
 from ivan.maps.map_converter import (
     _build_wad_fingerprints,
     _clear_texture_cache_dir,
+    _extract_wad_textures,
     _load_texture_cache_manifest,
     _manifest_matches_wads,
     _restore_cached_textures,
@@ -56,3 +59,30 @@ def test_texture_cache_clear_removes_manifest_and_pngs(tmp_path: Path) -> None:
     assert not (cache_dir / ".wad_texture_cache_manifest.json").exists()
     assert not (cache_dir / "a.png").exists()
     assert not (cache_dir / "b.png").exists()
+
+
+def test_texture_failing_to_save_resolves_from_later_wad(monkeypatch, tmp_path: Path) -> None:
+    goldsrc_wad = map_converter._import_goldsrc_wad()
+    first, second = tmp_path / "first.wad", tmp_path / "second.wad"
+    _touch(first, b"first")
+    _touch(second, b"second")
+    textures = {
+        # Truncated RGBA: Pillow refuses to encode it.
+        first: [goldsrc_wad.WadTexture(name="BRICK", width=4, height=4, rgba=b"\x00" * 8)],
+        second: [
+            goldsrc_wad.WadTexture(name="brick", width=2, height=2, rgba=b"\xff" * 16),
+            goldsrc_wad.WadTexture(name="metal", width=1, height=1, rgba=b"\x80" * 4),
+        ],
+    }
+    monkeypatch.setattr(
+        goldsrc_wad.Wad3,
+        "load",
+        staticmethod(lambda path: SimpleNamespace(iter_textures=lambda: textures[path])),
+    )
+
+    mats, sizes, status = _extract_wad_textures([first, second], cache_dir=tmp_path / "cache")
+
+    assert status == "miss"
+    assert set(mats) == {"brick", "metal"}
+    assert mats["brick"].is_file()
+    assert sizes == {"brick": (2, 2), "metal": (1, 1)}
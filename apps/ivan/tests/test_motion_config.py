@@ -116,3 +116,33 @@ def test_distance_based_grace_time_is_backward_safe() -> None:
     assert base >= 0.10
     assert slow >= base
     assert fast >= base
+
+
+def test_tuning_version_bumps_only_on_value_change() -> None:
+    tuning = PhysicsTuning()
+    v0 = tuning.version
+    tuning.run_t90 = float(tuning.run_t90)
+    assert tuning.version == v0
+    tuning.run_t90 = 0.5
+    assert tuning.version == v0 + 1
+    setattr(tuning, "slide_enabled", not tuning.slide_enabled)
+    assert tuning.version == v0 + 2
+    assert "version" not in PhysicsTuning.__annotations__
+
+
+def test_motion_config_is_shared_per_tuning_and_rederived_on_change() -> None:
+    from ivan.physics.motion.config import motion_config_for
+
+    tuning = PhysicsTuning()
+    a = MotionSolver.from_tuning(tuning=tuning)
+    b = MotionSolver.from_tuning(tuning=tuning)
+    a.sync_from_tuning(tuning=tuning)
+    assert a.config is b.config
+    assert motion_config_for(tuning) is a.config
+
+    tuning.jump_height = 2.0
+    tuning.jump_apex_time = 0.5
+    a.sync_from_tuning(tuning=tuning)
+    assert a.config is not b.config
+    assert a.config == derive_motion_config(tuning=tuning)
+    assert math.isclose(a.gravity(), 16.0, rel_tol=1e-6)
@@ -0,0 +1,321 @@
+from __future__ import annotations
+
+import json
+from collections import deque
+from types import SimpleNamespace
+
+from panda3d.core import LVector3f
+
+from ivan.net.client import MultiplayerClient
+from ivan.net.protocol import (
+    PROTOCOL_VERSION,
+    PROTOCOL_VERSION_JSON,
+    InputCommand,
+    decode_input_packet,
+    decode_input_packet_v3,
+    decode_snapshot_packet_v3,
+    encode_input_packet_v3,
+    encode_json,
+    encode_snapshot_packet,
+    encode_snapshot_packet_v3,
+    player_record_to_row,
+    quantize_player_row,
+)
+from ivan.net.rewind import RewindHistory
+from ivan.net.server import MultiplayerServer
+
+
+def _row(pid: int, *, x: float = 1.25, hp: int = 100, name: str = "p") -> dict:
+    return {
+        "id": pid,
+        "n": name,
+        "x": x,
+        "y": -3.5,
+        "z": 0.875,
+        "yaw": 370.25,
+        "pitch": -12.5,
+        "vx": 4.0,
+        "vy": 0.0,
+        "vz": -1.5,
+        "ack": 42,
+        "hp": hp,
+        "rs": 1,
+    }
+
+
+def test_v3_snapshot_round_trip_and_delta_sizes() -> None:
+    rows = [_row(1, name="alpha"), _row(2, x=9.0, name="beta")]
+    records = [quantize_player_row(r) for r in rows]
+    full = encode_snapshot_packet_v3(tick=10, records=records)
+    tick, base_tick, decoded = decode_snapshot_packet_v3(full, baselines={})
+    assert (tick, base_tick) == (10, 0)
+    assert decoded == records
+    for src, rec in zip(rows, decoded):
+        out = player_record_to_row(rec)
+        assert out["n"] == src["n"] and out["ack"] == 42 and out["hp"] == src["hp"]
+        for key in ("x", "y", "z", "yaw", "pitch", "vx", "vy", "vz"):
+            assert abs(out[key] - src[key]) < 0.01
+
+    json_size = len(encode_snapshot_packet(tick=10, players=rows))
+    assert len(full) * 2 < json_size
+
+    # Only player 2 changes hp: player 1 costs an id + empty mask, player 2 adds one int16.
+    baselines = {10: {rec.id: rec for rec in records}}
+    changed = [records[0], quantize_player_row(_row(2, x=9.0, hp=75, name="beta"))]
+    delta = encode_snapshot_packet_v3(tick=12, records=changed, baseline_tick=10, baseline=baselines[10])
+    assert len(delta) == 12 + 5 + 5 + 2
+    tick, base_tick, decoded = decode_snapshot_packet_v3(delta, baselines=baselines)
+    assert (tick, base_tick) == (12, 10)
+    assert decoded == changed
+
+    # A delta against an unknown baseline is dropped instead of guessed.
+    assert decode_snapshot_packet_v3(delta, baselines={}) is None
+    assert decode_snapshot_packet_v3(delta[:-1], baselines=baselines) is None
+
+
+def test_input_packet_carries_snapshot_ack() -> None:
+    payload = json.dumps({"t": "in", "token": "abc", "seq": 3, "sa": 120}).encode("utf-8")
+    parsed = decode_input_packet(payload)
+    assert parsed is not None
+    assert parsed[1].snapshot_ack == 120
+
+
+def _cmd(seq: int, **kw) -> InputCommand:
+    base = dict(
+        seq=seq,
+        server_tick_hint=100 + seq,
+        look_dx=0,
+        look_dy=0,
+        look_scale=256,
+        move_forward=0,
+        move_right=0,
+        jump_pressed=False,
+        jump_held=False,
+        slide_pressed=False,
+        grapple_pressed=False,
+    )
+    base.update(kw)
+    return InputCommand(**base)
+
+
+def test_binary_input_packet_round_trip_with_redundant_history() -> None:
+    cmds = [
+        _cmd(7, look_dx=-70000, move_forward=1),
+        _cmd(8, jump_pressed=True, jump_held=True),
+        _cmd(9, slide_pressed=True, move_right=-1),
+        _cmd(10, grapple_pressed=True, interact_pressed=True, look_dy=12, view_delay_ticks=6.3),
+    ]
+    payload = encode_input_packet_v3(session_id=0xDEADBEEF, snapshot_ack=55, commands=cmds)
+    session_id, decoded = decode_input_packet_v3(payload)
+    assert session_id == 0xDEADBEEF
+    assert [c.seq for c in decoded] == [7, 8, 9, 10]
+    assert all(c.snapshot_ack == 55 and c.server_tick_hint == 110 for c in decoded)
+    # The view delay rides in the header at 1/256-tick resolution.
+    assert all(abs(c.view_delay_ticks - 6.3) <= 1.0 / 512.0 for c in decoded)
+    for src, got in zip(cmds, decoded):
+        assert (got.look_dx, got.look_dy, got.look_scale) == (src.look_dx, src.look_dy, src.look_scale)
+        assert (got.move_forward, got.move_right) == (src.move_forward, src.move_right)
+        assert (got.jump_pressed, got.jump_held) == (src.jump_pressed, src.jump_held)
+        assert got.slide_pressed == src.slide_pressed
+        assert (got.grapple_pressed, got.interact_pressed) == (src.grapple_pressed, src.interact_pressed)
+    # Four commands still fit in well under one JSON command.
+    assert len(payload) < 80
+    assert decode_input_packet_v3(payload[:-1]) is None
+
+
+class _FakeSock:
+    def __init__(self) -> None:
+        self.sent: list[tuple[bytes, tuple[str, int]]] = []
+        self.stream: list[bytes] = []
+
+    def setsockopt(self, *_args) -> None:
+        return
+
+    def bind(self, *_args) -> None:
+        return
+
+    def listen(self, *_args) -> None:
+        return
+
+    def setblocking(self, *_args) -> None:
+        return
+
+    def close(self) -> None:
+        return
+
+    def sendto(self, payload: bytes, addr: tuple[str, int]) -> None:
+        self.sent.append((bytes(payload), (str(addr[0]), int(addr[1]))))
+
+    def send(self, payload: bytes) -> int:
+        self.stream.append(bytes(payload))
+        return len(payload)
+
+
+def _client_state(server_mod, pid: int, *, proto: int):
+    return server_mod._ClientState(
+        player_id=pid,
+        token=f"t{pid}",
+        name=f"p{pid}",
+        tcp_sock=_FakeSock(),
+        udp_addr=("127.0.0.1", 7000 + pid),
+        ctrl=SimpleNamespace(pos=LVector3f(float(pid), 0.0, 1.0), vel=LVector3f(0.0, 0.0, 0.0)),
+        yaw=0.0,
+        pitch=0.0,
+        hp=100,
+        respawn_seq=0,
+        last_input=InputCommand(
+            seq=1,
+            server_tick_hint=0,
+            look_dx=0,
+            look_dy=0,
+            look_scale=1,
+            move_forward=0,
+            move_right=0,
+            jump_pressed=False,
+            jump_held=False,
+            slide_pressed=False,
+            grapple_pressed=False,
+        ),
+        rewind_history=RewindHistory(capacity=8),
+        proto=proto,
+    )
+
+
+def _records_by_id(payload: bytes) -> dict:
+    _tick, _base, records = decode_snapshot_packet_v3(payload, baselines={})
+    return {rec.id: rec for rec in records}
+
+
+def test_server_sends_v3_deltas_and_pushes_reliable_state_once(monkeypatch) -> None:
+    import ivan.net.server as server_mod
+
+    monkeypatch.setattr(server_mod.socket, "socket", lambda *_a, **_kw: _FakeSock())
+    srv = MultiplayerServer(host="127.0.0.1", tcp_port=0, udp_port=0, map_json=None)
+    try:
+        v3 = _client_state(server_mod, 1, proto=PROTOCOL_VERSION)
+        v2 = _client_state(server_mod, 2, proto=PROTOCOL_VERSION_JSON)
+        srv._clients_by_token = {"t1": v3, "t2": v2}
+        srv._tick = 10
+        srv._broadcast_snapshot()
+
+        by_addr = {addr: raw for raw, addr in srv._udp_sock.sent}
+        full = by_addr[v3.udp_addr]
+        assert json.loads(by_addr[v2.udp_addr].decode("utf-8"))["v"] == PROTOCOL_VERSION_JSON
+        assert decode_snapshot_packet_v3(full, baselines={})[1] == 0
+        # The state was built without a welcome: tuning goes out once over TCP, never on UDP.
+        pushed = [json.loads(line) for chunk in v3.tcp_sock.stream for line in chunk.splitlines()]
+        assert [m["t"] for m in pushed] == ["cfg_push"]
+        assert v2.tcp_sock.stream == []
+
+        v3.snapshot_ack = 10
+        srv._tick = 12
+        srv._udp_sock.sent.clear()
+        srv._broadcast_snapshot()
+        delta = {addr: raw for raw, addr in srv._udp_sock.sent}[v3.udp_addr]
+        assert len(delta) < len(full)
+        assert decode_snapshot_packet_v3(delta, baselines={}) is None
+        _tick, base_tick, records = decode_snapshot_packet_v3(delta, baselines={10: _records_by_id(full)})
+        assert base_tick == 10
+        assert sorted(rec.id for rec in records) == [1, 2]
+        assert all(t >= 10 for t in v3.snapshot_history)
+        assert len(v3.tcp_sock.stream) == 1
+    finally:
+        srv.close()
+
+
+class _FakeUdp:
+    def __init__(self, packets: list[bytes]) -> None:
+        self.packets = list(packets)
+
+    def recvfrom(self, _n: int):
+        if not self.packets:
+            raise BlockingIOError()
+        return self.packets.pop(0), ("127.0.0.1", 1)
+
+
+def _bare_client(packets: list[bytes], *, tcp_buf: bytes = b"") -> MultiplayerClient:
+    client = MultiplayerClient.__new__(MultiplayerClient)
+    client.protocol_version = PROTOCOL_VERSION
+    client.server_tuning_version = 1
+    client.server_tuning = {"gravity": 20.0}
+    client.server_games_version = 0
+    client.server_games = None
+    client.server_game_state = None
+    client._tcp = object()  # select() rejects it; buffered lines are still parsed.
+    client._tcp_buf = tcp_buf
+    client._tcp_closed = False
+    client.bytes_sent = 0
+    client.bytes_received = 0
+    client._udp = _FakeUdp(packets)
+    client._latest_snapshot = None
+    client._snapshot_baselines = {}
+    client._snapshot_ack = 0
+    client._snapshot_players = []
+    client._game_events = deque(maxlen=48)
+    return client
+
+
+def test_client_poll_decodes_v3_into_v2_snapshot_shape() -> None:
+    records = [quantize_player_row(_row(1, name="alpha"))]
+    full = encode_snapshot_packet_v3(tick=20, records=records)
+    moved = [quantize_player_row(_row(1, x=2.0, name="alpha"))]
+    delta = encode_snapshot_packet_v3(tick=22, records=moved, baseline_tick=20, baseline={1: records[0]})
+    pushes = (
+        encode_json({"t": "cfg_push", "cfg_v": 3, "tuning": {"gravity": 30.0}})
+        + encode_json({"t": "games_push", "games_v": 2, "games": {"definitions": []}})
+        + encode_json({"t": "events", "events": [{"seq": 1, "kind": "race_intro"}]})
+    )
+    client = _bare_client([full, delta], tcp_buf=pushes)
+
+    snap = client.poll()
+    assert snap is not None
+    assert snap["tick"] == 22
+    assert snap["players"][0]["n"] == "alpha"
+    assert abs(snap["players"][0]["x"] - 2.0) < 1e-3
+    assert (snap["cfg_v"], snap["tuning"]) == (3, {"gravity": 30.0})
+    assert (snap["games_v"], snap["games"]) == (2, {"definitions": []})
+    assert snap["game_events"] == [{"seq": 1, "kind": "race_intro"}]
+    assert client._snapshot_ack == 22
+    # Stale, out-of-order snapshots still become baselines but do not rewind the view.
+    client._udp.packets.append(encode_snapshot_packet_v3(tick=21, records=records))
+    assert client.poll()["tick"] == 22
+    assert 21 in client._snapshot_baselines
+
+
+def test_server_fills_lost_input_packets_from_redundant_history(monkeypatch) -> None:
+    import ivan.net.server as server_mod
+
+    monkeypatch.setattr(server_mod.socket, "socket", lambda *_a, **_kw: _FakeSock())
+    srv = MultiplayerServer(host="127.0.0.1", tcp_port=0, udp_port=0, map_json=None)
+    try:
+        st = _client_state(server_mod, 1, proto=PROTOCOL_VERSION)
+        st.session_id = 4242
+        st.ctrl = srv._make_controller()
+        st.last_input = _cmd(0)
+        srv._clients_by_token = {"t1": st}
+        srv._clients_by_session = {4242: st}
+
+        history = [_cmd(seq, jump_pressed=(seq == 3), jump_held=(seq == 3), look_dx=256) for seq in range(1, 7)]
+        packets = [
+            encode_input_packet_v3(session_id=4242, snapshot_ack=0, commands=history[max(0, i - 3) : i + 1])
+            for i in range(6)
+        ]
+        # Packets whose newest command is seq 2..4 are lost; seq 5 arrives twice.
+        srv._udp_sock = _FakeUdp([packets[0], packets[4], packets[5], packets[4]])
+        srv._process_udp()
+
+        assert [c.seq for c in st.input_queue] == [1, 2, 3, 4, 5, 6]
+        yaw0 = st.yaw
+        jumps = 0
+        for _ in range(6):
+            srv._simulate_tick()
+            jumps += int(st.last_input.jump_pressed)
+        assert jumps == 1
+        assert st.last_input.seq == 6
+        turned = st.yaw - yaw0
+        # A starved queue repeats held input without re-applying look deltas.
+        srv._simulate_tick()
+        assert st.last_input.seq == 6 and st.last_input.look_dx == 0
+        assert abs((st.yaw - yaw0) - turned) < 1e-9
+    finally:
+        srv.close()
@@ -83,3 +83,44 @@ def test_build_goldsrc_relevance_requires_goldsrc_lightmap_encoding(monkeypatch)
     )
     assert rel is not None
     assert abs(float(rel.map_scale) - 0.5) < 1e-9
+
+
+def test_relevant_player_ids_by_viewer_matches_per_viewer_queries() -> None:
+    import random
+
+    from ivan.common.spatial_grid import SpatialGrid
+
+    rng = random.Random(3)
+    rel = GoldSrcPvsRelevance(vis=_test_vis(), map_scale=1.0, distance_fallback=6.0)
+    ordered = [9, 2, 7, 4, 1, 8, 3, 6, 5, 10, 11]
+    positions = {pid: LVector3f(rng.uniform(-20, 20), rng.uniform(-20, 20), rng.uniform(0, 4)) for pid in ordered}
+    positions.pop(11)
+    leaves: dict[int, int | None] = {pid: rel.world_pos_to_leaf(pos=pos) for pid, pos in positions.items()}
+    leaves[5] = None
+    expected = {
+        pid: rel.relevant_player_ids(
+            viewer_player_id=pid,
+            ordered_player_ids=ordered,
+            positions_by_player_id=positions,
+            leaves_by_player_id=leaves,
+        )
+        for pid in ordered
+    }
+    batched = rel.relevant_player_ids_by_viewer(
+        ordered_player_ids=ordered,
+        positions_by_player_id=positions,
+        leaves_by_player_id=leaves,
+    )
+    assert batched == expected
+
+    grid = SpatialGrid(cell_size=2.0)
+    grid.rebuild((pid, float(p.x), float(p.y), float(p.z)) for pid, p in positions.items())
+    assert (
+        rel.relevant_player_ids_by_viewer(
+            ordered_player_ids=ordered,
+            positions_by_player_id=positions,
+            leaves_by_player_id=leaves,
+            grid=grid,
+        )
+        == expected
+    )
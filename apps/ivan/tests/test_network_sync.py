@@ -2,7 +2,6 @@ from __future__ import annotations
 
 import json
 import math
-from collections import deque
 from pathlib import Path
 from types import SimpleNamespace
 
@@ -12,6 +11,7 @@ from ivan.game import netcode as netcode_mod
 from ivan.game import tuning_profiles as profiles_mod
 from ivan.net.protocol import InputCommand, decode_input_packet
 from ivan.net.relevance import GoldSrcPvsRelevance
+from ivan.net.rewind import RewindHistory
 from ivan.physics.tuning import PhysicsTuning
 from ivan.net.server import MultiplayerServer
 from ivan.games import RaceCourse, RaceEvent
@@ -1063,7 +1063,7 @@ def test_server_snapshot_uses_per_client_relevance_filter(monkeypatch) -> None:
                     slide_pressed=False,
                     grapple_pressed=False,
                 ),
-                rewind_history=deque(maxlen=8),
+                rewind_history=RewindHistory(capacity=8),
             )
 
         st1 = _mk_state(pid=1, x=3.0)    # leaf 0
@@ -1176,7 +1176,7 @@ def test_server_snapshot_includes_games_payload_and_event_ring(monkeypatch) -> N
                 slide_pressed=False,
                 grapple_pressed=False,
             ),
-            rewind_history=deque(maxlen=8),
+            rewind_history=RewindHistory(capacity=8),
         )
         srv._clients_by_token = {"t1": st}
         srv._append_race_events([RaceEvent(kind="race_intro")])
@@ -1266,7 +1266,7 @@ def test_server_interact_during_running_race_does_not_enroll_late_player(monkeyp
                 slide_pressed=False,
                 grapple_pressed=False,
             ),
-            rewind_history=deque(maxlen=8),
+            rewind_history=RewindHistory(capacity=8),
         )
         st2 = server_mod._ClientState(
             player_id=2,
@@ -1293,7 +1293,7 @@ def test_server_interact_during_running_race_does_not_enroll_late_player(monkeyp
                 grapple_pressed=False,
                 interact_pressed=True,
             ),
-            rewind_history=deque(maxlen=8),
+            rewind_history=RewindHistory(capacity=8),
         )
         srv._clients_by_token = {"t1": st1, "t2": st2}
 
@@ -1382,7 +1382,7 @@ def test_server_process_tcp_interact_message_joins_race_lobby(monkeypatch) -> No
                 slide_pressed=False,
                 grapple_pressed=False,
             ),
-            rewind_history=deque(maxlen=8),
+            rewind_history=RewindHistory(capacity=8),
         )
         srv._clients_by_token = {"t1": st}
         srv._tcp_clients = {client_sock: b""}
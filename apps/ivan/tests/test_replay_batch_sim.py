@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+
+from ivan.game.autotune import sweep_tuning_variants
+from ivan.replays.batch_sim import HeadlessSimulator, load_map_collision_triangles, simulate_replay_batch
+from ivan.replays.demo import load_replay
+from ivan.replays.determinism_verify import verify_replay_determinism
+
+
+def _write_floor_map(path: Path) -> Path:
+    s = 40.0
+    payload = {
+        "triangles": [
+            [-s, -s, 0.0, s, -s, 0.0, s, s, 0.0],
+            [-s, -s, 0.0, s, s, 0.0, -s, s, 0.0],
+        ],
+        "spawn": {"position": [0.0, 0.0, 1.5], "yaw": 0.0},
+    }
+    path.write_text(json.dumps(payload), encoding="utf-8")
+    return path
+
+
+def _write_demo(path: Path, *, map_json: str | None, ticks: int = 150) -> Path:
+    frames = []
+    for i in range(ticks):
+        frames.append(
+            {
+                "dx": 3 if (i // 30) % 2 else -3,
+                "dy": 0,
+                "mf": 1,
+                "mr": 1 if (i // 20) % 3 == 0 else 0,
+                "jp": i % 45 == 20,
+                "jh": i % 45 == 20,
+                "sp": False,
+                "gp": False,
+                "nt": False,
+                "tm": {"x": 0.0, "y": 0.0, "z": 1.5, "yaw": 0.0, "pitch": 0.0} if i == 0 else None,
+            }
+        )
+    payload = {
+        "format_version": 3,
+        "metadata": {
+            "demo_name": "batch",
+            "created_at_unix": 1.0,
+            "tick_rate": 60,
+            "look_scale": 1,
+            "map_id": "batch-floor",
+            "map_json": map_json,
+            "tuning": {"max_ground_speed": 6.0, "run_t90": 0.2, "autojump_enabled": False},
+        },
+        "frames": frames,
+    }
+    path.write_text(json.dumps(payload), encoding="utf-8")
+    return path
+
+
+def test_headless_simulator_collides_with_map_and_summarises(tmp_path: Path) -> None:
+    map_json = _write_floor_map(tmp_path / "map.json")
+    rec = load_replay(_write_demo(tmp_path / "a.ivan_demo.json", map_json=str(map_json)))
+
+    assert load_map_collision_triangles(str(map_json)) is not None
+    with_map = HeadlessSimulator.from_map(rec.metadata.map_json)
+    without_map = HeadlessSimulator.from_map(None)
+    assert with_map.collision_source == "map"
+    assert without_map.collision_source == "none"
+
+    on_floor = with_map.run(rec)
+    falling = without_map.run(rec)
+
+    assert len(on_floor.tick_hashes) == len(rec.frames)
+    assert on_floor.summary["ticks"]["with_telemetry"] == len(rec.frames)
+    assert on_floor.summary["metrics"]["grounded_ratio"] > 0.0
+    assert on_floor.summary["metrics"]["landing_count"] > 0
+    assert on_floor.summary["metrics"]["horizontal_speed_avg"] > 1.0
+    assert on_floor.summary["metrics"]["jump_takeoff"]["attempts"] > 0
+    assert on_floor.summary["metrics"]["det_hash_last"] == on_floor.tick_hashes[-1]
+    assert falling.summary["metrics"]["grounded_ratio"] == 0.0
+    assert on_floor.tick_hashes != falling.tick_hashes
+    # Runs on a shared simulator stay independent of each other.
+    assert with_map.run(rec).tick_hashes == on_floor.tick_hashes
+
+
+def test_replay_batch_matches_in_process_when_run_in_worker_pool(tmp_path: Path) -> None:
+    map_json = _write_floor_map(tmp_path / "map.json")
+    rec = load_replay(_write_demo(tmp_path / "b.ivan_demo.json", map_json=str(map_json), ticks=90))
+    variants = [{}, {"max_ground_speed": 9.0}, {"jump_height": 2.0}]
+
+    local = simulate_replay_batch(rec=rec, variants=variants, workers=0)
+    pooled = simulate_replay_batch(rec=rec, variants=variants, workers=2)
+
+    assert [r.label for r in pooled] == ["variant-0", "variant-1", "variant-2"]
+    assert [r.tick_hashes for r in pooled] == [r.tick_hashes for r in local]
+    assert [r.summary for r in pooled] == [r.summary for r in local]
+    assert local[1].tick_hashes != local[0].tick_hashes
+    assert local[1].tuning_overrides == {"max_ground_speed": 9.0}
+    assert local[1].summary["demo"]["tuning"]["max_ground_speed"] == 9.0
+
+
+def test_determinism_verify_uses_map_collision(tmp_path: Path) -> None:
+    map_json = _write_floor_map(tmp_path / "map.json")
+    replay = _write_demo(tmp_path / "c.ivan_demo.json", map_json=str(map_json), ticks=60)
+
+    with_map = verify_replay_determinism(replay_path=replay, runs=2, out_dir=tmp_path / "out")
+    without_map = verify_replay_determinism(replay_path=replay, runs=2, out_dir=tmp_path / "out", map_collision=False)
+
+    assert with_map.stable is True
+    assert with_map.collision == "map"
+    assert without_map.collision == "none"
+    assert with_map.baseline_trace_hash != without_map.baseline_trace_hash
+    report = json.loads(with_map.report_path.read_text(encoding="utf-8"))
+    assert report["collision"] == "none"  # Same stem: the later run overwrote the report.
+
+
+def test_sweep_tuning_variants_scores_and_clamps_invariants(tmp_path: Path) -> None:
+    map_json = _write_floor_map(tmp_path / "map.json")
+    replay = _write_demo(tmp_path / "d.ivan_demo.json", map_json=str(map_json), ticks=90)
+
+    candidates = sweep_tuning_variants(
+        replay_path=replay,
+        variants=[{"max_ground_speed": 8.0}, {"max_ground_speed": 4.0}, {"max_ground_speed": 500.0}],
+    )
+
+    assert len(candidates) == 3
+    assert candidates == sorted(candidates, key=lambda c: (not c.passed, -c.score))
+    by_label = {c.label: c for c in candidates}
+    assert by_label["variant-2"].tuning_overrides == {"max_ground_speed": 40.0}
+    assert by_label["variant-0"].score > by_label["variant-1"].score
+    with pytest.raises(ValueError):
+        sweep_tuning_variants(replay_path=replay, variants=[{"gravity": 1.0}])
@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+import json
+from dataclasses import replace
+from pathlib import Path
+from types import SimpleNamespace
+
+from controller_world import FLOOR, WALL, make_controller
+from panda3d.core import LVector3f
+
+import ivan.replays.demo as demo_mod
+from ivan.game import replay_playback as replay
+from ivan.games.race_runtime import RaceRuntime
+from ivan.physics.controller_snapshot import CONTROLLER_STATE_FIELDS, ControllerState
+from ivan.replays.batch_sim import HeadlessSimulator
+from ivan.replays.demo import (
+    DemoFrame,
+    DemoKeyframe,
+    DemoMetadata,
+    DemoRecording,
+    append_keyframe,
+    keyframe_due,
+    load_replay,
+    nearest_keyframe,
+    save_recording,
+)
+
+
+def _frames(n: int) -> list[DemoFrame]:
+    return [
+        DemoFrame(
+            look_dx=3 if (i // 25) % 2 else -3,
+            look_dy=0,
+            move_forward=1,
+            move_right=1 if (i // 40) % 2 else 0,
+            jump_pressed=i % 45 == 10,
+            jump_held=i % 45 == 10,
+            slide_pressed=50 <= i % 150 < 65,
+            grapple_pressed=False,
+            noclip_toggle_pressed=False,
+            telemetry={"x": 0.0, "y": -6.0, "z": 1.2, "yaw": 0.0, "pitch": 0.0} if i == 0 else None,
+        )
+        for i in range(n)
+    ]
+
+
+def _recording(map_json: str | None, *, n: int = 200) -> DemoRecording:
+    meta = DemoMetadata(
+        demo_name="kf",
+        created_at_unix=1.0,
+        tick_rate=60,
+        look_scale=1,
+        map_id="kf",
+        map_json=map_json,
+        tuning={},
+    )
+    return DemoRecording(metadata=meta, frames=_frames(n))
+
+
+def _with_keyframes(sim: HeadlessSimulator, rec: DemoRecording, *, interval: int) -> DemoRecording:
+    # Keyframes as the recorder would place them: state after every `interval` frames.
+    out = replace(rec, keyframes=[])
+    for tick in range(0, len(rec.frames) + 1, interval):
+        res = sim.run(rec, stop_frame=tick)
+        yaw, pitch = res.final_look
+        append_keyframe(out, DemoKeyframe(tick=tick, yaw=yaw, pitch=pitch, controller=res.final_state, extra={"hp": 90}))
+    return out
+
+
+def _physics(state: ControllerState) -> tuple:
+    # Sweep counters depend on how warm the sweep cache is, not on the simulated trajectory.
+    return tuple(v for k, v in zip(CONTROLLER_STATE_FIELDS, state.values) if not k.startswith("last_step_sweep"))
+
+
+def test_keyframe_schedule_and_lookup() -> None:
+    rec = _recording(None, n=0)
+    assert keyframe_due(rec, interval_ticks=50)
+    kf0 = DemoKeyframe(tick=0, yaw=0.0, pitch=0.0, controller=HeadlessSimulator().run(rec).final_state)
+    append_keyframe(rec, kf0)
+    assert not keyframe_due(rec, interval_ticks=50)
+    rec.frames.extend(_frames(50))
+    assert keyframe_due(rec, interval_ticks=50) and not keyframe_due(rec, interval_ticks=0)
+    kf50 = replace(kf0, tick=50)
+    append_keyframe(rec, kf50)
+
+    assert nearest_keyframe(rec.keyframes, 0) is kf0
+    assert nearest_keyframe(rec.keyframes, 49) is kf0
+    assert nearest_keyframe(rec.keyframes, 500) is kf50
+    assert nearest_keyframe(rec.keyframes[1:], 10) is None
+    try:
+        append_keyframe(rec, kf0)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("out-of-order keyframe accepted")
+
+
+def test_keyframes_round_trip_through_demo_file(monkeypatch, tmp_path: Path) -> None:
+    monkeypatch.setattr(demo_mod, "demo_dir", lambda: tmp_path)
+    sim = HeadlessSimulator(triangles=FLOOR + WALL)
+    rec = _with_keyframes(sim, _recording(None), interval=60)
+    path = save_recording(rec)
+
+    loaded = load_replay(path)
+    assert [k.tick for k in loaded.keyframes] == [0, 60, 120, 180]
+    assert loaded.keyframes == rec.keyframes
+    assert loaded.keyframes[2].extra == {"hp": 90}
+
+    # Keyframes with a stale field set or an out-of-range tick are dropped, not fatal.
+    raw = json.loads(path.read_text(encoding="utf-8"))
+    del raw["keyframes"][1]["ctrl"]["pos"]
+    raw["keyframes"][3]["t"] = 10_000
+    path.write_text(json.dumps(raw), encoding="utf-8")
+    assert [k.tick for k in load_replay(path).keyframes] == [0, 120]
+
+
+def test_headless_state_at_matches_full_simulation(tmp_path: Path) -> None:
+    map_json = tmp_path / "map.json"
+    map_json.write_text(json.dumps({"triangles": FLOOR + WALL}), encoding="utf-8")
+    sim = HeadlessSimulator.from_map(str(map_json))
+    plain = _recording(str(map_json))
+    keyed = _with_keyframes(sim, plain, interval=50)
+
+    for tick in (0, 37, 50, 133, 200):
+        expected = sim.run(plain, stop_frame=tick)
+        state, look = sim.state_at(keyed, tick=tick)
+        assert _physics(state) == _physics(expected.final_state)
+        assert look == expected.final_look
+        plain_state, plain_look = sim.state_at(plain, tick=tick)
+        assert _physics(plain_state) == _physics(state) and plain_look == look
+
+
+class _Observer:
+    def reset(self) -> None:
+        pass
+
+
+class _PlaybackHost:
+    """Just enough of the client for `replay_playback.seek`: frames drive a real controller."""
+
+    def __init__(self, rec: DemoRecording) -> None:
+        self.player = make_controller()
+        self.tuning = self.player.tuning
+        self._yaw = 0.0
+        self._pitch = 0.0
+        self._local_hp = 100
+        self._race_runtime = RaceRuntime()
+        self._camera_tilt_observer = self._camera_height_observer = self._camera_feedback_observer = _Observer()
+        self._sim_tick_rate_hz = 60
+        self._playback_active = True
+        self._playback_frames = list(rec.frames)
+        self._playback_keyframes = list(rec.keyframes)
+        self._playback_index = 0
+        self._playback_speed = 1.0
+        self._playback_seeking = False
+        self.replay_input_ui = SimpleNamespace(set_timeline=lambda text: setattr(self, "timeline", text))
+        self.simulated = 0
+
+    def _do_respawn(self, *, from_mode: bool) -> None:
+        self.player.respawn()
+        self._yaw = 0.0
+        self._pitch = 0.0
+
+    def _sample_replay_input_command(self) -> DemoFrame:
+        frame = self._playback_frames[self._playback_index]
+        self._playback_index += 1
+        return frame
+
+    def _simulate_input_tick(self, *, cmd: DemoFrame, **_kw) -> None:
+        self.simulated += 1
+        self._yaw -= float(cmd.look_dx) * float(self.tuning.mouse_sensitivity)
+        self.player.step(dt=1.0 / 60.0, wish_dir=LVector3f(0.0, float(cmd.move_forward), 0.0), yaw_deg=self._yaw)
+
+    def _push_sim_snapshot(self) -> None:
+        pass
+
+    def _render_interpolated_state(self, *, alpha: float) -> None:
+        pass
+
+    def _sync_race_markers(self) -> None:
+        pass
+
+
+def test_seek_restores_nearest_keyframe_and_resimulates_the_gap() -> None:
+    rec = _recording(None, n=400)
+    linear = _PlaybackHost(rec)
+    keyed = replace(rec, keyframes=[])
+    while linear._playback_index < 400:
+        if linear._playback_index % 100 == 0:
+            append_keyframe(keyed, replay.capture_keyframe(linear, tick=linear._playback_index))
+        linear._simulate_input_tick(cmd=linear._sample_replay_input_command())
+    expected = linear.player.capture_state()
+
+    host = _PlaybackHost(keyed)
+    assert replay.seek(host, tick=400) == 400
+    assert host.player.capture_state() == expected
+    assert host.simulated == 100
+
+    host.simulated = 0
+    replay.seek(host, tick=250)
+    assert host.simulated == 50 and host._playback_index == 250
+    while host._playback_index < 400:
+        host._simulate_input_tick(cmd=host._sample_replay_input_command())
+    assert host.player.capture_state() == expected
+
+    replay.change_speed(host, step=1)
+    assert host._playback_speed == 2.0
+    assert "x2" in host.timeline and "06.7" in host.timeline
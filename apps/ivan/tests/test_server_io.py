@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+from ivan.console.core import CommandContext
+from ivan.net.server import MultiplayerServer
+from ivan.net.tick_metrics import ServerTickMetrics
+
+
+class _FakeSock:
+    def setsockopt(self, *_args) -> None:
+        return
+
+    def bind(self, *_args) -> None:
+        return
+
+    def listen(self, *_args) -> None:
+        return
+
+    def setblocking(self, *_args) -> None:
+        return
+
+    def close(self) -> None:
+        return
+
+
+class _SlowPeer:
+    """Client socket whose kernel buffer accepts at most `window` bytes per send()."""
+
+    def __init__(self, window: int) -> None:
+        self.window = int(window)
+        self.received = bytearray()
+
+    def send(self, data) -> int:
+        if self.window <= 0:
+            raise BlockingIOError()
+        n = min(self.window, len(data))
+        self.received += bytes(data[:n])
+        return n
+
+    def close(self) -> None:
+        return
+
+
+def _server(monkeypatch) -> MultiplayerServer:
+    import ivan.net.server as server_mod
+
+    monkeypatch.setattr(server_mod.socket, "socket", lambda *_a, **_kw: _FakeSock())
+    return MultiplayerServer(host="127.0.0.1", tcp_port=0, udp_port=0, map_json=None)
+
+
+def test_tcp_writes_are_buffered_and_flushed_in_order(monkeypatch) -> None:
+    srv = _server(monkeypatch)
+    try:
+        peer = _SlowPeer(window=4)
+        srv._tcp_clients[peer] = b""
+        assert srv._send_tcp(peer, b"hello-")
+        assert srv._send_tcp(peer, b"world\n")
+        assert bytes(peer.received) == b"hell"
+        assert bytes(srv._tcp_out[peer]) == b"o-world\n"
+
+        peer.window = 0
+        srv._flush_tcp(peer)
+        assert bytes(srv._tcp_out[peer]) == b"o-world\n"
+        peer.window = 64
+        srv._flush_tcp(peer)
+        assert bytes(peer.received) == b"hello-world\n"
+        assert peer not in srv._tcp_out
+    finally:
+        srv.close()
+
+
+def test_stuck_tcp_client_is_dropped_instead_of_blocking(monkeypatch) -> None:
+    import ivan.net.server as server_mod
+
+    srv = _server(monkeypatch)
+    try:
+        peer = _SlowPeer(window=0)
+        srv._tcp_clients[peer] = b""
+        chunk = b"x" * (server_mod._TCP_OUT_MAX_BYTES // 2 + 1)
+        assert srv._send_tcp(peer, chunk)
+        assert not srv._send_tcp(peer, chunk)
+        srv._drop_pending_tcp()
+        assert peer not in srv._tcp_clients
+        assert peer not in srv._tcp_out
+    finally:
+        srv.close()
+
+
+def test_tick_metrics_track_overruns_and_p99() -> None:
+    metrics = ServerTickMetrics(tick_rate_hz=60, window_ticks=200)
+    for _ in range(98):
+        metrics.record_tick(duration_s=0.002)
+    metrics.record_tick(duration_s=0.030, late_s=0.040)
+    metrics.record_tick(duration_s=0.025)
+    summary = metrics.summary()
+    assert summary["ticks"] == 100
+    assert summary["overruns"] == 2
+    assert summary["late_ticks"] == 1
+    assert summary["p50_ms"] == 2.0
+    assert summary["p99_ms"] == 25.0
+    assert summary["max_ms"] == 30.0
+
+
+def test_tick_metrics_track_snapshot_cost_and_reset() -> None:
+    metrics = ServerTickMetrics(tick_rate_hz=60, window_ticks=50)
+    metrics.record_tick(duration_s=0.004)
+    metrics.record_snapshot(encode_s=0.001, bytes_sent=300, packets=3)
+    metrics.record_snapshot(encode_s=0.003, bytes_sent=100, packets=1)
+    summary = metrics.summary()
+    assert (summary["snapshots"], summary["snapshot_bytes"], summary["snapshot_packets"]) == (2, 400, 4)
+    assert summary["snapshot_p99_ms"] == 3.0
+
+    metrics.reset(window_ticks=10)
+    assert metrics.summary()["ticks"] == 0
+    assert metrics.summary()["snapshots"] == 0
+    metrics.record_tick(duration_s=0.001)
+    assert metrics.summary()["max_ms"] == 1.0
+
+
+def test_server_console_reports_tick_stats(monkeypatch) -> None:
+    srv = _server(monkeypatch)
+    try:
+        srv.tick_metrics.record_tick(duration_s=0.001)
+        out = srv.console.execute_line(ctx=CommandContext(role="server", origin="test"), line="tick_stats")
+        assert any("p99_ms=1.0" in line and "overruns=0" in line for line in out)
+        out = srv.console.execute_line(ctx=CommandContext(role="server", origin="test"), line="tick_stats reset")
+        assert srv.tick_metrics.ticks == 0
+    finally:
+        srv.close()
@@ -0,0 +1,36 @@
+"""Smoke test for the headless server load benchmark (localhost only, no GPU)."""
+
+from __future__ import annotations
+
+import json
+import sys
+from pathlib import Path
+
+# Ensure tools/ is on path when running tests from apps/ivan.
+_TOOLS = Path(__file__).resolve().parent.parent / "tools"
+if str(_TOOLS) not in sys.path:
+    sys.path.insert(0, str(_TOOLS))
+
+
+def test_load_benchmark_reports_server_and_client_metrics(tmp_path) -> None:
+    from server_load_benchmark import run_benchmark
+
+    demo = tmp_path / "bots.ivan_demo.json"
+    demo.write_text(
+        json.dumps(
+            {
+                "format_version": 1,
+                "metadata": {"demo_name": "bots", "tick_rate": 60, "look_scale": 1, "map_id": "arena", "tuning": {}},
+                "frames": [{"mf": 1, "dx": 2, "jp": i % 20 == 0} for i in range(60)],
+            }
+        ),
+        encoding="utf-8",
+    )
+    report = run_benchmark(map_json=None, clients=2, duration_s=0.6, warmup_s=0.3, demo_path=str(demo), embedded=True)
+
+    assert report["input_source"] == "demo"
+    assert report["protocol"] == 3
+    assert report["tick_ms"]["ticks"] > 0
+    assert report["snapshot_encode_ms"]["snapshots"] > 0
+    assert report["bytes_per_client_per_s"]["down_mean"] > 0
+    assert report["input_ack_latency_ms"]["samples"] > 0
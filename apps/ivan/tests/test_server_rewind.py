@@ -0,0 +1,195 @@
+from __future__ import annotations
+
+from dataclasses import replace
+
+from panda3d.core import LVector3f
+
+from ivan.net.protocol import InputCommand
+from ivan.net.rewind import RewindHistory
+from ivan.net.server import MultiplayerServer
+
+
+class _FakeSock:
+    def setsockopt(self, *_args) -> None:
+        return
+
+    def bind(self, *_args) -> None:
+        return
+
+    def listen(self, *_args) -> None:
+        return
+
+    def setblocking(self, *_args) -> None:
+        return
+
+    def close(self) -> None:
+        return
+
+
+def test_rewind_history_indexes_ticks_and_interpolates() -> None:
+    hist = RewindHistory(capacity=8)
+    assert hist.position_at(5) is None
+    for tick in range(1, 13):
+        hist.record(tick, float(tick), 0.0, -float(tick))
+    assert len(hist) == 8
+    assert hist.latest_tick == 12
+    # Ticks 1..4 were overwritten by 9..12.
+    assert hist.sample(4) is None
+    assert hist.sample(10) == (10.0, 0.0, -10.0)
+    assert hist.position_at(10.25) == (10.25, 0.0, -10.25)
+    # Clamped to the newest sample, to the ring and to the max rewind window.
+    assert hist.position_at(40) == (12.0, 0.0, -12.0)
+    assert hist.position_at(1) == (5.0, 0.0, -5.0)
+    assert hist.position_at(1, max_rewind_ticks=3) == (9.0, 0.0, -9.0)
+
+
+def test_rewind_history_falls_back_across_gaps() -> None:
+    hist = RewindHistory(capacity=16)
+    hist.record(3, 3.0, 0.0, 0.0)
+    hist.record(6, 6.0, 0.0, 0.0)
+    assert hist.position_at(3.5) == (3.0, 0.0, 0.0)
+    assert hist.position_at(5) == (6.0, 0.0, 0.0)
+    hist.clear()
+    assert len(hist) == 0 and hist.position_at(3) is None
+
+
+def test_rewind_history_does_not_interpolate_across_discontinuities() -> None:
+    hist = RewindHistory(capacity=16)
+    hist.record(4, 4.0, 0.0, 0.0)
+    hist.record(5, 5.0, 0.0, 0.0)
+    hist.mark_discontinuity()
+    hist.record(6, 60.0, 0.0, 0.0)
+    hist.record(7, 61.0, 0.0, 0.0)
+    assert hist.position_at(4.5) == (4.5, 0.0, 0.0)
+    # Between the last pre-respawn sample and the first one after it: nearer sample, never a blend.
+    assert hist.position_at(5.25) == (5.0, 0.0, 0.0)
+    assert hist.position_at(5.5) == (60.0, 0.0, 0.0)
+    assert hist.position_at(6.5) == (60.5, 0.0, 0.0)
+    # The marker belongs to the sample slot, so a later lap of the ring interpolates normally again.
+    for tick in range(8, 24):
+        hist.record(tick, float(tick), 0.0, 0.0)
+    assert hist.position_at(21.5) == (21.5, 0.0, 0.0)
+
+
+def _server(monkeypatch) -> MultiplayerServer:
+    import ivan.net.server as server_mod
+
+    monkeypatch.setattr(server_mod.socket, "socket", lambda *_a, **_kw: _FakeSock())
+    monkeypatch.setenv("IRUN_IVAN_SERVER_MAX_REWIND_MS", "500")
+    return MultiplayerServer(host="127.0.0.1", tcp_port=0, udp_port=0, map_json=None)
+
+
+def _player(server_mod, srv: MultiplayerServer, pid: int, pos: LVector3f):
+    return server_mod._ClientState(
+        player_id=pid,
+        token=f"t{pid}",
+        name=f"p{pid}",
+        tcp_sock=None,
+        udp_addr=None,
+        ctrl=srv._make_controller(spawn_point=pos),
+        yaw=0.0,
+        pitch=0.0,
+        hp=100,
+        respawn_seq=0,
+        last_input=InputCommand(
+            seq=1,
+            server_tick_hint=0,
+            look_dx=0,
+            look_dy=0,
+            look_scale=1,
+            move_forward=0,
+            move_right=0,
+            jump_pressed=False,
+            jump_held=False,
+            slide_pressed=False,
+            grapple_pressed=True,
+        ),
+        rewind_history=RewindHistory(capacity=srv._rewind_capacity),
+    )
+
+
+def test_shots_hit_rewound_positions_within_max_window(monkeypatch) -> None:
+    import ivan.net.server as server_mod
+
+    srv = _server(monkeypatch)
+    try:
+        assert srv.max_rewind_ticks == 30
+        shooter = _player(server_mod, srv, 1, LVector3f(0.0, 0.0, 0.0))
+        target = _player(server_mod, srv, 2, LVector3f(6.0, 5.0, 0.0))
+        bystander = _player(server_mod, srv, 3, LVector3f(-40.0, 0.0, 0.0))
+        srv._clients_by_token = {"t1": shooter, "t2": target, "t3": bystander}
+        eye = float(srv.tuning.player_eye_height) - float(srv.tuning.player_half_height) * 0.5
+        srv._tick = 100
+        for tick in range(40, 101):
+            # The target crossed the shooter's line of fire (+Y, yaw 0) around tick 90, then moved away.
+            x = 6.0 if tick < 88 or tick > 92 else 0.0
+            target.rewind_history.record(tick, x, 5.0, eye)
+            bystander.rewind_history.record(tick, -40.0, 0.0, 0.0)
+
+        shooter.last_input = replace(shooter.last_input, server_tick_hint=100)
+        srv._grapple_or_damage(shooter)
+        assert target.hp == 100
+
+        shooter.last_input = replace(shooter.last_input, server_tick_hint=90)
+        srv._grapple_or_damage(shooter)
+        assert target.hp == 80
+        assert bystander.hp == 100
+
+        # Aim ticks older than the rewind window are clamped to tick 100, where the target was out of the way.
+        srv._tick = 130
+        for tick in range(101, 131):
+            target.rewind_history.record(tick, 6.0, 5.0, eye)
+        srv._grapple_or_damage(shooter)
+        assert target.hp == 80
+    finally:
+        srv.close()
+
+
+def test_shots_rewind_to_fractional_view_tick(monkeypatch) -> None:
+    import ivan.net.server as server_mod
+
+    srv = _server(monkeypatch)
+    try:
+        shooter = _player(server_mod, srv, 1, LVector3f(0.0, 0.0, 0.0))
+        target = _player(server_mod, srv, 2, LVector3f(6.0, 5.0, 0.0))
+        srv._clients_by_token = {"t1": shooter, "t2": target}
+        eye = float(srv.tuning.player_eye_height) - float(srv.tuning.player_half_height) * 0.5
+        srv._tick = 100
+        for tick in range(70, 101):
+            # The target slides across the line of fire: x = 2 at tick 90, x = -2 at tick 91.
+            x = 2.0 - 4.0 * float(tick - 90) if 90 <= tick <= 91 else 6.0
+            target.rewind_history.record(tick, x, 5.0, eye)
+
+        # Both bracketing samples miss; only the interpolated view tick 90.5 (x = 0) hits.
+        shooter.last_input = replace(shooter.last_input, server_tick_hint=92, view_delay_ticks=1.0)
+        srv._grapple_or_damage(shooter)
+        assert target.hp == 100
+        shooter.last_input = replace(shooter.last_input, server_tick_hint=92, view_delay_ticks=1.5)
+        srv._grapple_or_damage(shooter)
+        assert target.hp == 80
+    finally:
+        srv.close()
+
+
+def test_shots_do_not_hit_between_death_and_respawn_positions(monkeypatch) -> None:
+    import ivan.net.server as server_mod
+
+    srv = _server(monkeypatch)
+    try:
+        shooter = _player(server_mod, srv, 1, LVector3f(0.0, 0.0, 0.0))
+        target = _player(server_mod, srv, 2, LVector3f(6.0, 5.0, 0.0))
+        srv._clients_by_token = {"t1": shooter, "t2": target}
+        eye = float(srv.tuning.player_eye_height) - float(srv.tuning.player_half_height) * 0.5
+        srv._tick = 100
+        for tick in range(70, 91):
+            target.rewind_history.record(tick, 6.0, 5.0, eye)
+        # Died at x = 6 on tick 90, respawned at x = -6: the midpoint x = 0 (in the line of fire) never existed.
+        srv._respawn_player(st=target)
+        for tick in range(91, 101):
+            target.rewind_history.record(tick, -6.0, 5.0, eye)
+
+        shooter.last_input = replace(shooter.last_input, server_tick_hint=92, view_delay_ticks=1.5)
+        srv._grapple_or_damage(shooter)
+        assert target.hp == 100
+    finally:
+        srv.close()
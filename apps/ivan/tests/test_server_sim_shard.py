@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import json
+
+from panda3d.core import LVector3f
+
+from ivan.maps.bundle_io import write_bundle_map_json
+from ivan.net.protocol import InputCommand
+from ivan.net.rewind import RewindHistory
+from ivan.net.server import MultiplayerServer
+
+
+def _cmd(seq: int, pid: int) -> InputCommand:
+    return InputCommand(
+        seq=seq,
+        server_tick_hint=0,
+        look_dx=(pid * 7 + seq) % 5 - 2,
+        look_dy=0,
+        look_scale=1,
+        move_forward=1 if (seq // 10 + pid) % 3 else 0,
+        move_right=(pid + seq // 15) % 3 - 1,
+        jump_pressed=(seq + pid) % 17 == 0,
+        jump_held=False,
+        slide_pressed=pid == 2 and 20 <= seq < 35,
+        grapple_pressed=False,
+    )
+
+
+def _map_triangles() -> list[list[float]]:
+    floor = [
+        [-40.0, -40.0, 0.0, 40.0, -40.0, 0.0, 40.0, 40.0, 0.0],
+        [-40.0, -40.0, 0.0, 40.0, 40.0, 0.0, -40.0, 40.0, 0.0],
+    ]
+    wall = [[-40.0, 45.0, 0.0, 40.0, 45.0, 0.0, 40.0, 45.0, 6.0], [-40.0, 45.0, 0.0, 40.0, 45.0, 6.0, -40.0, 45.0, 6.0]]
+    ramp = [[-10.0, 38.0, 0.0, 10.0, 38.0, 0.0, 10.0, 44.0, 2.0], [-10.0, 38.0, 0.0, 10.0, 44.0, 2.0, -10.0, 44.0, 2.0]]
+    return floor + wall + ramp
+
+
+def _write_map(tmp_path) -> str:
+    map_json = tmp_path / "map.json"
+    map_json.write_text(json.dumps({"triangles": _map_triangles()}), encoding="utf-8")
+    return str(map_json)
+
+
+def _write_bin_bundle(tmp_path) -> str:
+    tris = _map_triangles()
+    map_json = write_bundle_map_json(
+        bundle_dir=tmp_path / "bundle",
+        payload={"format_version": 2},
+        triangles=[{"m": "", "p": t} for t in tris],
+        collision_triangles=tris,
+    )
+    return str(map_json)
+
+
+def _run(monkeypatch, map_json: str, *, sim_workers: int, ticks: int, collision_world: str = "full") -> list[tuple]:
+    import ivan.net.server as server_mod
+
+    # Real loopback sockets: worker pipes are socket pairs, so the socket module cannot be faked here.
+    monkeypatch.setenv("IRUN_IVAN_SERVER_CONSOLE_PORT", "0")
+    srv = MultiplayerServer(
+        host="127.0.0.1",
+        tcp_port=0,
+        udp_port=0,
+        map_json=map_json,
+        sim_workers=sim_workers,
+        collision_world=collision_world,
+    )
+    try:
+        if sim_workers:
+            assert srv._sim_shards is not None
+        for pid in (1, 2, 3):
+            st = server_mod._ClientState(
+                player_id=pid,
+                token=f"t{pid}",
+                name=f"p{pid}",
+                tcp_sock=None,
+                udp_addr=None,
+                ctrl=srv._make_controller(spawn_point=LVector3f(float(pid) * 2.0, 35.0, 1.9)),
+                yaw=0.0,
+                pitch=0.0,
+                hp=100,
+                respawn_seq=0,
+                last_input=_cmd(0, pid),
+                rewind_history=RewindHistory(capacity=8),
+            )
+            st.input_queue.extend(_cmd(seq, pid) for seq in range(1, ticks + 1))
+            srv._clients_by_token[st.token] = st
+        trace: list[tuple] = []
+        for _ in range(ticks):
+            srv._simulate_tick()
+            for st in srv._clients_by_token.values():
+                c = st.ctrl
+                trace.append((st.player_id, tuple(c.pos), tuple(c.vel), c.grounded, float(c.player_half.z)))
+        return trace
+    finally:
+        srv.close()
+
+
+def test_sharded_simulation_matches_in_process(monkeypatch, tmp_path) -> None:
+    map_json = _write_map(tmp_path)
+    local = _run(monkeypatch, map_json, sim_workers=0, ticks=90)
+    sharded = _run(monkeypatch, map_json, sim_workers=2, ticks=90)
+    assert len(local) == 270
+    # Players landed and ran around, and both modes produced bit-identical state every tick.
+    assert any(row[3] for row in local)
+    assert local[-1][1] != local[2][1]
+    assert sharded == local
+
+
+def test_local_collision_worlds_match_full_world_in_process_and_sharded(monkeypatch, tmp_path) -> None:
+    from ivan.physics.local_collision import LocalCollisionWorld
+
+    map_json = _write_map(tmp_path)
+    full = _run(monkeypatch, map_json, sim_workers=0, ticks=90)
+    monkeypatch.setenv("IRUN_IVAN_COLLISION_WORLD", "local")
+    srv = MultiplayerServer(host="127.0.0.1", tcp_port=0, udp_port=0, map_json=map_json)
+    try:
+        assert srv.collision_world_mode == "local"
+        a = srv._make_controller()
+        b = srv._make_controller()
+        assert isinstance(a.collision, LocalCollisionWorld)
+        assert a.collision is not b.collision
+    finally:
+        srv.close()
+    # No shared-edge ties on this map, so per-player neighbourhoods give the same answers as the full mesh.
+    assert _run(monkeypatch, map_json, sim_workers=0, ticks=90, collision_world="local") == full
+    assert _run(monkeypatch, map_json, sim_workers=2, ticks=90, collision_world="local") == full
+
+
+def test_sharded_simulation_runs_on_geometry_bin_bundles(monkeypatch, tmp_path) -> None:
+    # Blob-backed collision rows are memoryviews; the shard pool must still start and match in-process stepping.
+    map_json = _write_bin_bundle(tmp_path)
+    local = _run(monkeypatch, map_json, sim_workers=0, ticks=30)
+    assert _run(monkeypatch, map_json, sim_workers=2, ticks=30) == local
+    assert local == _run(monkeypatch, _write_map(tmp_path), sim_workers=0, ticks=30)
+
+
+def test_server_close_releases_geometry_blob(monkeypatch, tmp_path) -> None:
+    monkeypatch.setenv("IRUN_IVAN_SERVER_CONSOLE_PORT", "0")
+    srv = MultiplayerServer(host="127.0.0.1", tcp_port=0, udp_port=0, map_json=_write_bin_bundle(tmp_path))
+    blob = srv._geometry_blob
+    assert blob is not None
+    assert len(srv.collision_triangles) == len(_map_triangles())
+    srv.close()
+    assert srv._geometry_blob is None
+    assert srv.collision_triangles is None
+    assert blob._file is None
@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+import random
+
+from ivan.common.spatial_grid import SpatialGrid
+
+
+def _brute_box(points: list[tuple[int, float, float, float]], lo, hi) -> list[int]:
+    return [
+        pid
+        for pid, x, y, z in points
+        if lo[0] <= x <= hi[0] and lo[1] <= y <= hi[1] and lo[2] <= z <= hi[2]
+    ]
+
+
+def test_spatial_grid_query_box_matches_brute_force_in_insertion_order() -> None:
+    rng = random.Random(7)
+    points = [(pid, rng.uniform(-60, 60), rng.uniform(-60, 60), rng.uniform(-4, 12)) for pid in range(40, 0, -1)]
+    grid = SpatialGrid(cell_size=8.0)
+    grid.rebuild(points)
+    assert len(grid) == 40
+    assert 17 in grid and 99 not in grid
+    for _ in range(200):
+        cx, cy, cz = rng.uniform(-70, 70), rng.uniform(-70, 70), rng.uniform(-5, 13)
+        ext = rng.choice((0.5, 3.0, 12.0, 200.0))
+        lo = (cx - ext, cy - ext, cz - ext)
+        hi = (cx + ext, cy + ext, cz + ext)
+        assert grid.query_box(lo, hi) == _brute_box(points, lo, hi)
+
+
+def test_spatial_grid_rebuild_replaces_points_and_handles_boundaries() -> None:
+    grid = SpatialGrid(cell_size=4.0)
+    grid.rebuild([(1, 0.0, 0.0, 0.0), (2, 4.0, 0.0, 0.0), (3, -0.01, 0.0, 0.0)])
+    assert grid.cell_of(2) == (1, 0, 0)
+    assert grid.cell_of(3) == (-1, 0, 0)
+    assert grid.query_box((0.0, 0.0, 0.0), (4.0, 0.0, 0.0)) == [1, 2]
+    assert grid.query_box((1.0, 1.0, 1.0), (0.0, 0.0, 0.0)) == []
+
+    grid.rebuild([(5, 1.0, 2.0, 3.0)])
+    assert 1 not in grid
+    assert grid.point(5) == (1.0, 2.0, 3.0)
+    assert grid.query_box((-10.0, -10.0, -10.0), (10.0, 10.0, 10.0)) == [5]
@@ -96,3 +96,73 @@ def test_wad3_transparent_texture_uses_bright_blue_as_colorkey_alpha0() -> None:
     lump = _build_miptex_lump(name="{TRN", width=width, height=height, indices=indices, palette=palette)
     tex = decode_wad3_miptex(name="{TRN", data=lump)
     assert tex.rgba[0:4] == bytes([0, 0, 255, 0])
+
+
+def test_wad3_decode_matches_per_pixel_palette_lookup() -> None:
+    _add_tools_to_syspath()
+    from goldsrc_wad import WadError, decode_wad3_miptex  # noqa: E402
+
+    width, height = 16, 8
+    indices = bytes((i * 37) % 256 for i in range(width * height))
+    pal = bytearray((i * 7) % 251 for i in range(256 * 3))
+    pal[40 * 3 : 40 * 3 + 3] = b"\x00\x00\xff"
+    for name in ("WALL", "{FENCE"):
+        lump = _build_miptex_lump(name=name, width=width, height=height, indices=indices, palette=bytes(pal))
+        tex = decode_wad3_miptex(name=name, data=lump)
+        for i, idx in enumerate(indices):
+            rgb = bytes(pal[idx * 3 : idx * 3 + 3])
+            masked = name.startswith("{") and (idx == 255 or rgb == b"\x00\x00\xff")
+            assert tex.rgba[i * 4 : i * 4 + 4] == rgb + (b"\x00" if masked else b"\xff")
+
+    # Indices past a short palette are a decode error, not a crash.
+    lump = _build_miptex_lump(name="SHORT", width=2, height=2, indices=bytes([0, 1, 2, 3]), palette=bytes(pal))
+    short = lump.replace(struct.pack("<H", 256) + bytes(pal), struct.pack("<H", 3) + bytes(pal[:9]))
+    with pytest.raises(WadError):
+        decode_wad3_miptex(name="SHORT", data=short)
+
+
+def test_save_textures_png_on_worker_pool_matches_serial(monkeypatch, tmp_path: Path) -> None:
+    _add_tools_to_syspath()
+    import goldsrc_wad  # noqa: E402
+    from PIL import Image
+
+    monkeypatch.setattr(goldsrc_wad, "PARALLEL_MIN_TEXTURES", 2)
+    pal = bytes(range(256)) * 3
+    items = []
+    for k in range(4):
+        indices = bytes((i + k) % 256 for i in range(8 * 4))
+        lump = _build_miptex_lump(name=f"T{k}", width=8, height=4, indices=indices, palette=pal)
+        items.append(goldsrc_wad.decode_wad3_miptex(name=f"T{k}", data=lump))
+
+    serial = goldsrc_wad.save_textures_png([(t, tmp_path / "s" / f"{t.name}.png") for t in items], workers=0)
+    pooled = goldsrc_wad.save_textures_png([(t, tmp_path / "p" / f"{t.name}.png") for t in items], workers=2)
+    assert serial == pooled == [None] * 4
+    for t in items:
+        with Image.open(tmp_path / "p" / f"{t.name}.png") as img:
+            assert img.tobytes() == t.rgba
+        assert (tmp_path / "p" / f"{t.name}.png").read_bytes() == (tmp_path / "s" / f"{t.name}.png").read_bytes()
+
+
+def test_save_textures_png_finishes_in_process_when_pool_fails(monkeypatch, tmp_path: Path) -> None:
+    _add_tools_to_syspath()
+    import concurrent.futures
+
+    import goldsrc_wad
+    from PIL import Image
+
+    def _unspawnable(*_args, **_kwargs):
+        raise OSError("cannot spawn workers")
+
+    monkeypatch.setattr(goldsrc_wad, "PARALLEL_MIN_TEXTURES", 2)
+    monkeypatch.setattr(concurrent.futures, "ProcessPoolExecutor", _unspawnable)
+    pal = bytes(range(256)) * 3
+    items = []
+    for k in range(4):
+        lump = _build_miptex_lump(name=f"T{k}", width=8, height=4, indices=bytes([k]) * 32, palette=pal)
+        items.append(goldsrc_wad.decode_wad3_miptex(name=f"T{k}", data=lump))
+
+    errors = goldsrc_wad.save_textures_png([(t, tmp_path / f"{t.name}.png") for t in items], workers=2)
+    assert errors == [None] * 4
+    for t in items:
+        with Image.open(tmp_path / f"{t.name}.png") as img:
+            assert img.tobytes() == t.rgba
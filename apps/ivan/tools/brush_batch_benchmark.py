@@ -0,0 +1,136 @@
+"""Scaling benchmark for parallel brush conversion (`BrushBatchConverter`).
+
+Tiles the brushes of a `.map` (default: the demo map) on a grid of translated copies until there are at least
+`--brushes` brushes, then times an uncached `BrushBatchConverter.convert` for each worker count (0 = serial). Pool
+start-up is timed separately from the conversion itself, so the report shows both warm scaling and the one-off
+cost a single map load pays.
+
+Usage::
+
+    python tools/brush_batch_benchmark.py [--map path.map] [--brushes 4000] [--workers 0,2,4,8] [--output report.json]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+_APPS_SRC = Path(__file__).resolve().parent.parent / "src"
+if str(_APPS_SRC) not in sys.path:
+    sys.path.insert(0, str(_APPS_SRC))
+
+from ivan.maps.brush_batch import BrushBatchConverter  # noqa: E402
+from ivan.maps.map_parser import Brush, BrushFace, Vec3, parse_map_file  # noqa: E402
+
+_DEMO_MAP = Path(__file__).resolve().parent.parent / "assets" / "maps" / "demo" / "demo.map"
+
+
+def _shifted(brush: Brush, dx: float, dy: float) -> Brush:
+    faces: list[BrushFace] = []
+    for f in brush.faces:
+        p0, p1, p2 = (Vec3(p.x + dx, p.y + dy, p.z) for p in f.plane_points)
+        faces.append(
+            BrushFace(
+                plane_points=(p0, p1, p2),
+                texture=f.texture,
+                u_axis=f.u_axis,
+                u_offset=f.u_offset,
+                v_axis=f.v_axis,
+                v_offset=f.v_offset,
+                rotation=f.rotation,
+                scale_x=f.scale_x,
+                scale_y=f.scale_y,
+            )
+        )
+    return Brush(faces=faces)
+
+
+def tiled_brushes(map_path: Path, *, count: int) -> list[Brush]:
+    base = [b for ent in parse_map_file(map_path) for b in ent.brushes]
+    if not base:
+        raise SystemExit(f"no brushes in {map_path}")
+    xs = [p.x for b in base for f in b.faces for p in f.plane_points]
+    ys = [p.y for b in base for f in b.faces for p in f.plane_points]
+    step = max(max(xs) - min(xs), max(ys) - min(ys)) + 256.0
+    out: list[Brush] = []
+    tile = 0
+    while len(out) < count:
+        dx = float(tile % 16) * step
+        dy = float(tile // 16) * step
+        out.extend(_shifted(b, dx, dy) for b in base)
+        tile += 1
+    return out
+
+
+def _time_workers(brushes: list[Brush], *, workers: int) -> dict:
+    # Threshold 1 so the pool is always used when workers > 1; chunking stays at the module default.
+    with BrushBatchConverter(workers=workers, min_parallel_brushes=1) as conv:
+        warm_s = 0.0
+        if workers > 1:
+            # Start the pool (spawned interpreters + imports) on a tiny batch so it is timed on its own.
+            t0 = time.perf_counter()
+            conv.convert(brushes[: conv.chunk_brushes])
+            warm_s = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        conv.convert(brushes)
+        convert_s = time.perf_counter() - t0
+    return {
+        "workers": int(workers),
+        "pool_start_ms": round(warm_s * 1000.0, 1),
+        "convert_ms": round(convert_s * 1000.0, 1),
+        "parallel": workers > 1,
+    }
+
+
+def run_benchmark(*, map_path: Path, brushes: int, workers: list[int]) -> dict:
+    tiled = tiled_brushes(map_path, count=brushes)
+    rows = [_time_workers(tiled, workers=w) for w in workers]
+    serial = next((r["convert_ms"] for r in rows if not r["parallel"]), None)
+    for r in rows:
+        r["speedup_vs_serial"] = round(serial / r["convert_ms"], 2) if serial and r["convert_ms"] > 0 else None
+    return {
+        "map": str(map_path),
+        "brushes": len(tiled),
+        "cpu_count": os.cpu_count(),
+        "runs": rows,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Brush conversion scaling across process-pool worker counts.")
+    parser.add_argument("--map", default=str(_DEMO_MAP), help="Source .map whose brushes are tiled.")
+    parser.add_argument("--brushes", type=int, default=4000, help="Minimum number of brushes to convert.")
+    parser.add_argument(
+        "--workers",
+        default=None,
+        help="Comma-separated worker counts (default: 0, then powers of two up to the CPU count).",
+    )
+    parser.add_argument("--output", default=None, help="Optional JSON report path (report is always printed).")
+    args = parser.parse_args()
+    if args.workers:
+        counts = [max(0, int(x)) for x in str(args.workers).split(",") if x.strip()]
+    else:
+        cpus = max(1, int(os.cpu_count() or 1))
+        counts = [0]
+        w = 2
+        while w <= cpus:
+            counts.append(w)
+            w *= 2
+        if cpus > 1 and counts[-1] != cpus:
+            counts.append(cpus)
+    report = run_benchmark(map_path=Path(args.map), brushes=max(1, int(args.brushes)), workers=counts)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        out = Path(args.output)
+        out.parent.mkdir(parents=True, exist_ok=True)
+        out.write_text(text + "\n", encoding="utf-8")
+    print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -7,6 +7,7 @@ from pathlib import Path
 import bsp_tool
 from PIL import Image
 
+from ivan.maps.lightmap_atlas import DEFAULT_ATLAS_PAGE_SIZE, LightmapAtlas
 from vtf_decode import decode_vtf_highres_rgba
 
 
@@ -303,6 +304,12 @@ def main() -> None:
         default=None,
         help="Output folder for extracted lightmap PNGs. Default: <map-bundle-dir>/lightmaps",
     )
+    parser.add_argument(
+        "--lightmap-atlas-size",
+        type=int,
+        default=DEFAULT_ATLAS_PAGE_SIZE,
+        help="Pack face lightmaps into atlas pages of this size. 0 = one PNG per face.",
+    )
     args = parser.parse_args()
 
     bsp_path = Path(args.input)
@@ -328,8 +335,9 @@ def main() -> None:
     resolved_vmt_cache: dict[str, dict[str, str]] = {}
     materials_meta: dict[str, dict] = {}
 
-    # Per-face lightmap textures (kept small and simple; batching/atlasing can come later).
-    face_lightmaps: dict[str, str] = {}
+    # Face lightmaps: packed into atlas pages by default, or one PNG per face (--lightmap-atlas-size 0).
+    face_lightmaps: dict[str, str | dict] = {}
+    atlas = LightmapAtlas(page_size=int(args.lightmap_atlas_size)) if int(args.lightmap_atlas_size) > 0 else None
 
     for face_idx in range(face_count):
         try:
@@ -374,7 +382,13 @@ def main() -> None:
                         if w > 0 and h > 0:
                             need = w * h * 4
                             raw = bytes(lighting_lump[light_off : light_off + need])
-                            if len(raw) == need:
+                            if len(raw) == need and atlas is not None:
+                                atlas.add_face(
+                                    face_idx, width=w, height=h, slots=[_decode_rgbexp32_to_rgba(raw), None, None, None]
+                                )
+                                # Placeholder until the atlas is packed after all faces are read.
+                                face_lightmaps[str(face_idx)] = {}
+                            elif len(raw) == need:
                                 rgba = _decode_rgbexp32_to_rgba(raw)
                                 img = Image.frombytes("RGBA", (w, h), rgba)
                                 dst = lightmaps_out / f"f{face_idx}.png"
@@ -440,6 +454,33 @@ def main() -> None:
                     max_v[1] = max(max_v[1], py)
                     max_v[2] = max(max_v[2], pz)
 
+    lightmaps_meta: dict = {"faces": face_lightmaps}
+    if atlas is not None and len(atlas):
+        atlas.pack()
+        try:
+            lm_rel_root = str(lightmaps_out.resolve().relative_to(out_path.parent.resolve())).replace("\\", "/")
+        except Exception:
+            lm_rel_root = str(lightmaps_out)
+
+        def _save_rgba(dst: Path, pw: int, ph: int, rgba: bytes) -> None:
+            Image.frombytes("RGBA", (pw, ph), rgba).save(dst)
+
+        pages = atlas.write_pages(lightmaps_out, save_rgba=_save_rgba, rel_root=lm_rel_root)
+        for key in list(face_lightmaps.keys()):
+            entry = atlas.face_entry(int(key), pages=pages, styles=[0, None, None, None])
+            if entry is None:
+                face_lightmaps.pop(key, None)
+            else:
+                face_lightmaps[key] = entry
+        for tri in triangles:
+            lmi = tri.get("lmi")
+            if isinstance(lmi, int):
+                if str(lmi) in face_lightmaps:
+                    tri["lm"] = atlas.remap_uvs(lmi, tri["lm"])
+                else:
+                    tri["lmi"] = None
+        lightmaps_meta["atlas"] = atlas.descriptor(pages=pages)
+
     spawn_pos, spawn_yaw = pick_spawn(bsp.ENTITIES, args.scale)
     skyname = skyname_from_entities(bsp.ENTITIES)
 
@@ -467,7 +508,7 @@ def main() -> None:
             "converted": converted,
         },
         "materials_meta": materials_meta,
-        "lightmaps": {"faces": face_lightmaps},
+        "lightmaps": lightmaps_meta,
         "triangles": triangles,
     }
 
@@ -0,0 +1,87 @@
+"""Micro-benchmark for per-step `PlayerController` overhead.
+
+Times a graybox controller running on a flat floor (no Bullet, so the movement code itself dominates) with the
+motion config memoised per tuning version versus re-derived every step (the previous behaviour), plus the raw
+cost of `derive_motion_config` and of a cached `MotionSolver.sync_from_tuning`.
+
+Usage::
+
+    python tools/controller_step_benchmark.py [--steps 20000] [--output report.json]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+_APPS_SRC = Path(__file__).resolve().parent.parent / "src"
+if str(_APPS_SRC) not in sys.path:
+    sys.path.insert(0, str(_APPS_SRC))
+
+from panda3d.core import LVector3f  # noqa: E402
+
+from ivan.common.aabb import AABB  # noqa: E402
+from ivan.physics.motion.config import derive_motion_config  # noqa: E402
+from ivan.physics.motion.solver import MotionSolver  # noqa: E402
+from ivan.physics.player_controller import PlayerController  # noqa: E402
+from ivan.physics.tuning import PhysicsTuning  # noqa: E402
+
+
+def _per_call_us(fn, calls: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    return (time.perf_counter() - t0) / float(max(1, calls)) * 1e6
+
+
+def _step_us(*, steps: int, rederive: bool) -> float:
+    tuning = PhysicsTuning()
+    floor = [AABB(LVector3f(-500.0, -500.0, -1.0), LVector3f(500.0, 500.0, 0.0))]
+    ctrl = PlayerController(tuning=tuning, spawn_point=LVector3f(0.0, 0.0, 1.05), aabbs=floor, collision=None)
+    solver = ctrl._motion_solver
+    if rederive:
+        # Previous behaviour: rebuild the derived config on every sync.
+        solver.sync_from_tuning = lambda *, tuning: setattr(solver, "_config", derive_motion_config(tuning=tuning))
+    wish = LVector3f(0.0, 1.0, 0.0)
+    t0 = time.perf_counter()
+    for i in range(int(steps)):
+        ctrl.step(dt=1.0 / 60.0, wish_dir=wish, yaw_deg=float(i % 360))
+    return (time.perf_counter() - t0) / float(max(1, steps)) * 1e6
+
+
+def run_benchmark(*, steps: int) -> dict:
+    tuning = PhysicsTuning()
+    solver = MotionSolver.from_tuning(tuning=tuning)
+    calls = max(1000, int(steps))
+    derive_us = _per_call_us(lambda: derive_motion_config(tuning=tuning), calls)
+    sync_us = _per_call_us(lambda: solver.sync_from_tuning(tuning=tuning), calls)
+    before = _step_us(steps=steps, rederive=True)
+    after = _step_us(steps=steps, rederive=False)
+    return {
+        "steps": int(steps),
+        "derive_motion_config_us": round(derive_us, 3),
+        "sync_from_tuning_cached_us": round(sync_us, 3),
+        "step_us_rederive_each_step": round(before, 3),
+        "step_us_cached_config": round(after, 3),
+        "step_saving_us": round(before - after, 3),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="PlayerController per-step overhead micro-benchmark.")
+    parser.add_argument("--steps", type=int, default=20000, help="Controller steps per timed run.")
+    parser.add_argument("--output", default=None, help="Optional JSON report path (report is always printed).")
+    args = parser.parse_args()
+    report = run_benchmark(steps=max(1, int(args.steps)))
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text, encoding="utf-8")
+    print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,9 +1,12 @@
 from __future__ import annotations
 
+import logging
 import struct
 from dataclasses import dataclass
 from pathlib import Path
 
+logger = logging.getLogger(__name__)
+
 
 class WadError(RuntimeError):
     pass
@@ -66,30 +69,82 @@ def decode_wad3_miptex(*, name: str, data: bytes) -> WadTexture:
         raise WadError("palette out of bounds")
     palette = data[pal_start:pal_end]
 
+    # Palette lookup as per-channel byte tables: `bytes.translate` gathers every pixel in C.
+    entries = min(palette_size, 256)
+    if mip0 and max(mip0) >= entries:
+        raise WadError("palette index out of range")
+    table = palette[: entries * 3].ljust(768, b"\x00")
+
     # GoldSrc/Xash3D convention: textures prefixed with "{" are masked (1-bit) transparent.
     # The "transparent color" is usually palette index 255, which is commonly bright blue (0,0,255).
     transparent = tex_name.startswith("{")
     out = bytearray(width * height * 4)
-    for i, idx in enumerate(mip0):
-        pi = int(idx) * 3
-        r = palette[pi + 0]
-        g = palette[pi + 1]
-        b = palette[pi + 2]
+    out[0::4] = mip0.translate(table[0::3])
+    out[1::4] = mip0.translate(table[1::3])
+    out[2::4] = mip0.translate(table[2::3])
+    if transparent:
         # Prefer the canonical index-255 rule, but also support the practical "bright blue" colorkey.
         # Some mods/tools may not preserve the exact palette index when generating WADs.
-        if transparent and (idx == 255 or (r == 0 and g == 0 and b == 255)):
-            a = 0
-        else:
-            a = 255
-        o = i * 4
-        out[o + 0] = r
-        out[o + 1] = g
-        out[o + 2] = b
-        out[o + 3] = a
+        alpha = bytearray(b"\xff" * 256)
+        alpha[255] = 0
+        for i in range(entries):
+            if table[i * 3 : i * 3 + 3] == b"\x00\x00\xff":
+                alpha[i] = 0
+        out[3::4] = mip0.translate(alpha)
+    else:
+        out[3::4] = b"\xff" * mip0_len
 
     return WadTexture(name=tex_name, width=int(width), height=int(height), rgba=bytes(out))
 
 
+# Below this many textures, worker start-up costs more than parallel PNG encoding saves.
+PARALLEL_MIN_TEXTURES = 32
+
+
+def _save_png_job(job: tuple[Path, int, int, bytes]) -> str | None:
+    from PIL import Image
+
+    dst, width, height, rgba = job
+    try:
+        dst.parent.mkdir(parents=True, exist_ok=True)
+        Image.frombytes("RGBA", (width, height), rgba).save(dst)
+    except Exception as exc:
+        return str(exc) or type(exc).__name__
+    return None
+
+
+def save_textures_png(items: list[tuple[WadTexture, Path]], *, workers: int = 0) -> list[str | None]:
+    """
+    PNG-encode decoded textures (requires Pillow); returns an error message or None per item, in order.
+
+    With `workers` > 1 and at least `PARALLEL_MIN_TEXTURES` items, encoding runs on a spawn-context process pool;
+    if the pool breaks or cannot start, the remaining textures are encoded in-process.
+    """
+    jobs = [(Path(dst), tex.width, tex.height, tex.rgba) for tex, dst in items]
+    if int(workers) <= 1 or len(jobs) < PARALLEL_MIN_TEXTURES:
+        return [_save_png_job(job) for job in jobs]
+
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+    from concurrent.futures.process import BrokenProcessPool
+
+    chunk = max(1, len(jobs) // (int(workers) * 4))
+    results: list[str | None] = []
+    pool = None
+    try:
+        pool = ProcessPoolExecutor(max_workers=int(workers), mp_context=multiprocessing.get_context("spawn"))
+        # extend() keeps the results already received if the pool breaks part-way.
+        results.extend(pool.map(_save_png_job, jobs, chunksize=chunk))
+    except (BrokenProcessPool, OSError) as e:
+        # A crashed or unspawnable worker must not fail texture extraction: finish in-process.
+        logger.warning("Texture PNG pool failed (%s); encoding in-process", e)
+        results.extend(_save_png_job(job) for job in jobs[len(results) :])
+    finally:
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+    return results
+
+
 @dataclass(frozen=True)
 class WadDirEntry:
     offset: int
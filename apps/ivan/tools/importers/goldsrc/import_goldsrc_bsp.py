@@ -3,6 +3,7 @@ from __future__ import annotations
 import argparse
 import json
 import math
+import os
 import re
 import shutil
 import tempfile
@@ -11,9 +12,16 @@ from pathlib import Path
 import bsp_tool
 from PIL import Image
 
-from ivan.maps.bundle_io import PACKED_BUNDLE_EXT, pack_bundle_dir_to_irunmap
+from ivan.maps.bundle_io import (
+    GEOMETRY_FORMAT_BIN,
+    GEOMETRY_FORMATS,
+    PACKED_BUNDLE_EXT,
+    pack_bundle_dir_to_irunmap,
+    write_bundle_map_json,
+)
+from ivan.maps.lightmap_atlas import DEFAULT_ATLAS_PAGE_SIZE, LightmapAtlas
 from goldsrc_wad import Wad3
-from goldsrc_wad import WadError, decode_wad3_miptex
+from goldsrc_wad import WadError, decode_wad3_miptex, save_textures_png
 
 NO_RENDER_TEXTURES = {
     "aaatrigger",
@@ -677,6 +685,7 @@ def _extract_embedded_textures(
     materials_dir: Path,
     used_textures_cf: set[str],
     extract_all: bool,
+    workers: int = 0,
 ) -> int:
     """
     Extract textures embedded in the BSP texture lump (MIPTEXTURES).
@@ -685,10 +694,11 @@ def _extract_embedded_textures(
     this avoids needing external WADs.
     """
 
-    extracted = 0
     mip = getattr(bsp, "MIP_TEXTURES", None)
     if mip is None:
         return 0
+    pending: list = []
+    planned: set[Path] = set()
 
     for entry in mip:
         if not (isinstance(entry, tuple) and len(entry) == 2):
@@ -709,7 +719,7 @@ def _extract_embedded_textures(
                 continue
 
         dst = materials_dir / f"{name}.png"
-        if dst.exists():
+        if dst in planned or dst.exists():
             continue
 
         # Reconstruct a WAD3-style MIPTEX lump and reuse the existing decoder.
@@ -776,14 +786,14 @@ def _extract_embedded_textures(
             buf += pal
 
             tex = decode_wad3_miptex(name=name, data=bytes(buf))
-            _save_png(dst, width=tex.width, height=tex.height, rgba=tex.rgba)
-            extracted += 1
         except (WadError, ValueError, OverflowError):
             continue
         except Exception:
             continue
+        planned.add(dst)
+        pending.append((tex, dst))
 
-    return extracted
+    return sum(1 for err in save_textures_png(pending, workers=workers) if err is None)
 
 
 def main() -> None:
@@ -814,6 +824,18 @@ def main() -> None:
         default="auto",
         help="Output format (default: auto).",
     )
+    parser.add_argument(
+        "--geometry-format",
+        choices=GEOMETRY_FORMATS,
+        default=GEOMETRY_FORMAT_BIN,
+        help="Triangle payload encoding: columnar geometry.bin (default) or legacy inline map.json lists.",
+    )
+    parser.add_argument(
+        "--lightmap-atlas-size",
+        type=int,
+        default=DEFAULT_ATLAS_PAGE_SIZE,
+        help="Pack face lightmaps into atlas pages of this size (one layer per style slot). 0 = per-face PNGs.",
+    )
     parser.add_argument("--map-id", default=None, help="Optional map id for debugging/node naming.")
     parser.add_argument("--scale", type=float, default=0.03, help="GoldSrc-to-game unit scale.")
     parser.add_argument(
@@ -821,6 +843,12 @@ def main() -> None:
         action="store_true",
         help="Extract all textures from referenced WADs (default extracts only the textures referenced by the BSP).",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Processes for texture PNG encoding (default: CPU count; 0 or 1 = in-process).",
+    )
     parser.add_argument(
         "--copy-resources",
         action="store_true",
@@ -906,6 +934,7 @@ def main() -> None:
         # Precompute per-face lightmap metadata (used for extraction and UV mapping).
         face_lm_meta: dict[int, dict] = {}
         face_lm_bundle: dict[str, dict] = {}
+        lightmap_atlas: dict | None = None
         lighting = getattr(bsp, "LIGHTING", None)
         if lighting is not None:
             for face_idx in range(len(getattr(bsp, "FACES", []))):
@@ -1194,7 +1223,11 @@ def main() -> None:
             materials_dir=materials_dir,
             used_textures_cf=used_cf,
             extract_all=bool(args.extract_all_wad_textures),
+            workers=int(args.workers),
         )
+        # WAD textures are PNG-encoded in one batch (first WAD wins, embedded textures win over WADs).
+        wad_pending: list = []
+        wad_planned: set[Path] = set()
         for wad_name in wad_names:
             wad_src = None
             # WAD paths in worldspawn are often absolute; treat as filename.
@@ -1219,20 +1252,26 @@ def main() -> None:
                     if not _should_render_texture(tex.name):
                         continue
                 dst = materials_dir / f"{tex.name}.png"
-                if dst.exists():
-                    continue
-                try:
-                    _save_png(dst, width=tex.width, height=tex.height, rgba=tex.rgba)
-                    extracted_textures += 1
-                except Exception:
+                if dst in wad_planned or dst.exists():
                     continue
+                wad_planned.add(dst)
+                wad_pending.append((tex, dst))
+        extracted_textures += sum(
+            1 for err in save_textures_png(wad_pending, workers=int(args.workers)) if err is None
+        )
 
         # Extract baked GoldSrc lightmaps (RGB) into bundle lightmaps/ and reference them from map.json.
         if lighting is not None and face_lm_meta:
             lightmaps_dir = out_dir / "lightmaps"
             lightmaps_dir.mkdir(parents=True, exist_ok=True)
 
+            atlas = LightmapAtlas(page_size=int(args.lightmap_atlas_size)) if int(args.lightmap_atlas_size) > 0 else None
+            face_styles: dict[int, list[int | None]] = {}
+            # Only faces that end up in render triangles take atlas space (skip triggers, sky, ...).
+            rendered_faces = {int(t["lmi"]) for t in render_triangles if isinstance(t.get("lmi"), int)}
             for face_idx, meta in sorted(face_lm_meta.items(), key=lambda it: int(it[0])):
+                if atlas is not None and int(face_idx) not in rendered_faces:
+                    continue
                 off = int(meta["offset"])
                 w = int(meta["w"])
                 h = int(meta["h"])
@@ -1241,6 +1280,7 @@ def main() -> None:
 
                 # GoldSrc stores one block per non-255 style, in slot order.
                 paths: list[str | None] = [None, None, None, None]
+                slot_rgba: list[bytes | None] = [None, None, None, None]
                 style_slots: list[int | None] = [None, None, None, None]
                 block_idx = 0
                 for slot in range(4):
@@ -1253,17 +1293,23 @@ def main() -> None:
                     if len(raw) != block_bytes:
                         break
                     rgba = _decode_goldsrc_lightmap_rgb_to_rgba(raw)
-                    img = Image.frombytes("RGBA", (w, h), rgba)
-                    dst = lightmaps_dir / f"f{face_idx}_lm{slot}.png"
-                    try:
-                        img.save(dst)
-                    except Exception:
-                        break
-                    paths[slot] = str(Path("lightmaps") / dst.name).replace("\\", "/")
+                    if atlas is not None:
+                        slot_rgba[slot] = rgba
+                    else:
+                        img = Image.frombytes("RGBA", (w, h), rgba)
+                        dst = lightmaps_dir / f"f{face_idx}_lm{slot}.png"
+                        try:
+                            img.save(dst)
+                        except Exception:
+                            break
+                        paths[slot] = str(Path("lightmaps") / dst.name).replace("\\", "/")
                     style_slots[slot] = style
                     block_idx += 1
 
-                if any(p is not None for p in paths):
+                if atlas is not None:
+                    atlas.add_face(int(face_idx), width=w, height=h, slots=slot_rgba)
+                    face_styles[int(face_idx)] = style_slots
+                elif any(p is not None for p in paths):
                     face_lm_bundle[str(int(face_idx))] = {
                         "styles": style_slots,
                         "paths": paths,
@@ -1271,6 +1317,23 @@ def main() -> None:
                         "h": int(h),
                     }
 
+            if atlas is not None and len(atlas):
+                # Atlas pages replace per-face PNGs; rewrite triangle lightmap UVs into page space.
+                atlas.pack()
+                pages = atlas.write_pages(
+                    lightmaps_dir,
+                    save_rgba=lambda dst, pw, ph, rgba: _save_png(dst, width=pw, height=ph, rgba=rgba),
+                )
+                for face_idx, style_slots in face_styles.items():
+                    entry = atlas.face_entry(face_idx, pages=pages, styles=style_slots)
+                    if entry is not None:
+                        face_lm_bundle[str(int(face_idx))] = entry
+                for tri in render_triangles:
+                    lmi = tri.get("lmi")
+                    if isinstance(lmi, int) and str(lmi) in face_lm_bundle:
+                        tri["lm"] = atlas.remap_uvs(lmi, tri["lm"])
+                lightmap_atlas = atlas.descriptor(pages=pages)
+
         payload = {
             "format_version": 2,
             "map_id": map_id,
@@ -1297,13 +1360,19 @@ def main() -> None:
                 "copied_enabled": bool(args.copy_resources),
                 "skip_policy": {"dirs": sorted(SKIP_RESOURCE_DIRS), "exts": sorted(SKIP_RESOURCE_EXTS)},
             },
-            "collision_triangles": collision_triangles,
-            "triangles": render_triangles,
             "brush_models": brush_model_report,
         }
         if payload_fog is not None:
             payload["fog"] = payload_fog
-        map_json.write_text(json.dumps(payload, separators=(",", ":")), encoding="utf-8")
+        if lightmap_atlas is not None:
+            payload["lightmaps"]["atlas"] = lightmap_atlas
+        write_bundle_map_json(
+            bundle_dir=out_dir,
+            payload=payload,
+            triangles=render_triangles,
+            collision_triangles=collision_triangles,
+            geometry_format=args.geometry_format,
+        )
         if packed_out is not None:
             pack_bundle_dir_to_irunmap(bundle_dir=out_dir, out_path=packed_out, compresslevel=1)
             print(
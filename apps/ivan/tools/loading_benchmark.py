@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import argparse
 import json
+import os
 import subprocess
 import sys
 import time
@@ -30,8 +31,18 @@ def _default_output_path() -> Path:
     return root / ".tmp" / "loading" / f"load-benchmark-{_utc_stamp()}.json"
 
 
-def run_case(*, repo_root: Path, python_exe: str, map_ref: str, map_profile: str, repeats: int) -> list[dict]:
+def run_case(
+    *,
+    repo_root: Path,
+    python_exe: str,
+    map_ref: str,
+    map_profile: str,
+    repeats: int,
+    env_overrides: dict[str, str] | None = None,
+) -> list[dict]:
     out: list[dict] = []
+    env = dict(os.environ)
+    env.update(env_overrides or {})
     for i in range(max(1, int(repeats))):
         cmd = [
             python_exe,
@@ -51,6 +62,7 @@ def run_case(*, repo_root: Path, python_exe: str, map_ref: str, map_profile: str
             stderr=subprocess.PIPE,
             text=True,
             check=False,
+            env=env,
         )
         elapsed_ms = (time.perf_counter() - t0) * 1000.0
         report = None
@@ -68,6 +80,7 @@ def run_case(*, repo_root: Path, python_exe: str, map_ref: str, map_profile: str
                 "map_ref": str(map_ref),
                 "repeat_index": int(i),
                 "cmd": cmd,
+                "env_overrides": dict(env_overrides or {}),
                 "returncode": int(proc.returncode),
                 "wall_ms": float(elapsed_ms),
                 "load_report": report,
@@ -98,6 +111,28 @@ def _map_available(*, repo_root: Path, map_ref: str) -> bool:
     return False
 
 
+def _geometry_stage_summary(rows: list[dict]) -> dict[str, dict[str, float | None]]:
+    """Mean geometry_build_attach per map and geometry-build mode (bulk vs writer)."""
+    acc: dict[str, dict[str, list[float]]] = {}
+    for row in rows:
+        report = row.get("load_report")
+        if not isinstance(report, dict):
+            continue
+        stages = report.get("stages_ms")
+        if not isinstance(stages, dict):
+            continue
+        mode = "bulk" if (report.get("optimizations") or {}).get("geometry_bulk_vertex_upload") else "writer"
+        ms = stages.get("geometry_build_attach")
+        if isinstance(ms, (int, float)):
+            acc.setdefault(str(row.get("map_ref")), {}).setdefault(mode, []).append(float(ms))
+    out: dict[str, dict[str, float | None]] = {}
+    for map_ref, modes in acc.items():
+        out[map_ref] = {
+            mode: (sum(vals) / len(vals) if vals else None) for mode, vals in sorted(modes.items())
+        }
+    return out
+
+
 def main() -> int:
     parser = argparse.ArgumentParser(description="Run smoke map-load benchmark and collect structured load reports.")
     parser.add_argument(
@@ -127,7 +162,15 @@ def main() -> int:
         default=2,
         help="Runs per map (default: 2 to capture cold/warm behavior).",
     )
+    parser.add_argument(
+        "--compare-geometry-writer",
+        action="store_true",
+        help="Also run each map with IRUN_IVAN_GEOMETRY_BULK=0 (per-vertex writer) to compare geometry_build_attach.",
+    )
     args = parser.parse_args()
+    variants: list[dict[str, str]] = [{}]
+    if args.compare_geometry_writer:
+        variants = [{"IRUN_IVAN_GEOMETRY_BULK": "0"}, {"IRUN_IVAN_GEOMETRY_BULK": "1"}]
 
     repo_root = _resolve_repo_root()
     maps = tuple(args.map) if args.map else DEFAULT_MAPS
@@ -149,15 +192,17 @@ def main() -> int:
                 }
             )
             continue
-        rows.extend(
-            run_case(
-                repo_root=repo_root,
-                python_exe=str(args.python),
-                map_ref=str(m),
-                map_profile=str(args.map_profile),
-                repeats=int(args.repeats),
+        for env_overrides in variants:
+            rows.extend(
+                run_case(
+                    repo_root=repo_root,
+                    python_exe=str(args.python),
+                    map_ref=str(m),
+                    map_profile=str(args.map_profile),
+                    repeats=int(args.repeats),
+                    env_overrides=env_overrides,
+                )
             )
-        )
 
     payload = {
         "schema": "ivan.loading.benchmark.v1",
@@ -168,6 +213,7 @@ def main() -> int:
         "repeats": int(args.repeats),
         "maps": [str(m) for m in maps],
         "runs": rows,
+        "geometry_build_attach_ms": _geometry_stage_summary(rows),
     }
     out = Path(args.output).expanduser()
     out.parent.mkdir(parents=True, exist_ok=True)
@@ -14,13 +14,14 @@ Usage::
         --scale 0.03 \\
         --wad-dirs path/to/wad/directory \\
         [--profile dev-fast|prod-baked] \\
+        [--geometry-format bin|json] \\
         [--dir-bundle]
 """
 
 from __future__ import annotations
 
 import argparse
-import json
+import os
 import sys
 import tempfile
 import time
@@ -37,8 +38,13 @@ _APPS_SRC = Path(__file__).resolve().parent.parent / "src"
 if str(_APPS_SRC) not in sys.path:
     sys.path.insert(0, str(_APPS_SRC))
 
-from ivan.maps.map_parser import parse_map, MapEntity  # noqa: E402
-from ivan.maps.bundle_io import pack_bundle_dir_to_irunmap  # noqa: E402
+from ivan.maps.map_parser import parse_map_file, MapEntity  # noqa: E402
+from ivan.maps.bundle_io import (  # noqa: E402
+    GEOMETRY_FORMAT_BIN,
+    GEOMETRY_FORMATS,
+    pack_bundle_dir_to_irunmap,
+    write_bundle_map_json,
+)
 
 # These modules do not exist yet.  Importing them will fail until they are
 # implemented.  We guard with a try/except so the rest of the script can be
@@ -49,10 +55,12 @@ try:
         brush_to_triangles,
         apply_phong_normals,
     )
+    from ivan.maps.brush_batch import BrushBatchConverter
 except ImportError:
     _Triangle = None  # type: ignore[assignment]
     brush_to_triangles = None  # type: ignore[assignment]
     apply_phong_normals = None  # type: ignore[assignment]
+    BrushBatchConverter = None  # type: ignore[assignment,misc]
 
 try:
     from ivan.maps.material_defs import MaterialResolver  # type: ignore[import-not-found]
@@ -73,9 +81,10 @@ if str(_GOLDSRC_DIR) not in sys.path:
     sys.path.insert(0, str(_GOLDSRC_DIR))
 
 try:
-    from goldsrc_wad import Wad3  # noqa: E402
+    from goldsrc_wad import Wad3, save_textures_png  # noqa: E402
 except ImportError:
     Wad3 = None  # type: ignore[assignment,misc]
+    save_textures_png = None  # type: ignore[assignment]
 
 try:
     from PIL import Image  # noqa: E402
@@ -123,8 +132,12 @@ def _extract_wad_textures(
     wad_paths: list[Path],
     used_names: set[str],
     materials_dir: Path,
+    workers: int = 0,
 ) -> int:
-    """Extract matching textures from WAD files into *materials_dir* as PNG."""
+    """Extract matching textures from WAD files into *materials_dir* as PNG.
+
+    PNG encoding runs on *workers* processes for larger texture sets.
+    """
     if Wad3 is None:
         print("[pack] WARNING: goldsrc_wad not available; skipping WAD texture extraction.")
         return 0
@@ -133,7 +146,8 @@ def _extract_wad_textures(
         return 0
 
     used_cf = {n.casefold() for n in used_names}
-    extracted = 0
+    pending: list = []
+    planned: set[Path] = set()
     for wad_path in wad_paths:
         try:
             wad = Wad3.load(wad_path)
@@ -146,15 +160,17 @@ def _extract_wad_textures(
             if not _should_render_texture(tex.name):
                 continue
             dst = materials_dir / f"{tex.name}.png"
-            if dst.exists():
+            if dst in planned or dst.exists():
                 continue
-            try:
-                dst.parent.mkdir(parents=True, exist_ok=True)
-                img = Image.frombytes("RGBA", (tex.width, tex.height), tex.rgba)
-                img.save(dst)
-                extracted += 1
-            except Exception as exc:
-                print(f"[pack] WARNING: failed to save texture {tex.name}: {exc}")
+            planned.add(dst)
+            pending.append((tex, dst))
+
+    extracted = 0
+    for (tex, _dst), err in zip(pending, save_textures_png(pending, workers=workers)):
+        if err is None:
+            extracted += 1
+        else:
+            print(f"[pack] WARNING: failed to save texture {tex.name}: {err}")
     return extracted
 
 
@@ -326,9 +342,13 @@ def _collect_texture_names(entities: list[MapEntity]) -> set[str]:
 def _convert_geometry(
     entities: list[MapEntity],
     scale: float,
+    workers: int = 0,
 ) -> tuple[list[dict], list[list[float]], list[float], list[float]]:
     """Convert parsed brushes to render and collision triangles.
 
+    Brush clipping runs on *workers* processes (``<= 1``: in-process); the
+    output is identical for every worker count.
+
     Returns (render_triangles, collision_triangles, bounds_min, bounds_max).
     """
     if brush_to_triangles is None:
@@ -344,14 +364,20 @@ def _convert_geometry(
     min_v = [float("inf"), float("inf"), float("inf")]
     max_v = [float("-inf"), float("-inf"), float("-inf")]
 
+    # Collision comes from worldspawn render triangles below; skip clipping it twice.
+    with BrushBatchConverter(scale=scale, workers=workers, collision=False) as converter:
+        brush_outputs = converter.convert([b for ent in entities for b in ent.brushes])
+    next_brush = 0
+
     for ent in entities:
         cname = ent.properties.get("classname", "worldspawn")
         is_world = cname == "worldspawn"
 
-        for brush in ent.brushes:
-            # brush_to_triangles returns a list of Triangle dataclass instances
+        for _brush in ent.brushes:
+            # Per-brush Triangle dataclass instances
             # with attributes: positions, normals, uvs, material.
-            triangles = brush_to_triangles(brush, scale=scale)
+            triangles = brush_outputs[next_brush][0]
+            next_brush += 1
 
             if apply_phong_normals is not None:
                 triangles = apply_phong_normals(triangles)
@@ -453,11 +479,26 @@ def _build_parser() -> argparse.ArgumentParser:
         default=[],
         help="Directories to search for .wad files (for texture extraction).",
     )
+    parser.add_argument(
+        "--geometry-format",
+        choices=GEOMETRY_FORMATS,
+        default=GEOMETRY_FORMAT_BIN,
+        help=(
+            "Triangle payload encoding: 'bin' writes a columnar geometry.bin next to map.json "
+            "(default); 'json' keeps legacy inline triangle lists."
+        ),
+    )
     parser.add_argument(
         "--dir-bundle",
         action="store_true",
         help="Output as a directory bundle instead of a packed .irunmap archive.",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Brush conversion worker processes (default: CPU count; 0 or 1 = in-process).",
+    )
     return parser
 
 
@@ -487,14 +528,14 @@ def main() -> None:
     print(f"[pack] Scale   : {args.scale}")
     print(f"[pack] WAD dirs: {wad_dirs if wad_dirs else '(none)'}")
     print(f"[pack] Format  : {'directory' if args.dir_bundle else '.irunmap'}")
+    print(f"[pack] Geometry: {args.geometry_format}")
 
     # ------------------------------------------------------------------
     # 2. Parse .map
     # ------------------------------------------------------------------
     t0 = time.perf_counter()
     print("\n[pack] Parsing .map file...")
-    map_text = map_file.read_text(encoding="utf-8", errors="replace")
-    entities = parse_map(map_text)
+    entities = parse_map_file(map_file)
     elapsed = time.perf_counter() - t0
     total_brushes = sum(len(e.brushes) for e in entities)
     print(f"[pack] Parsed {len(entities)} entities, {total_brushes} brushes ({elapsed:.2f}s)")
@@ -533,7 +574,7 @@ def main() -> None:
         wad_paths = _discover_wads(wad_dirs)
         if wad_paths:
             print(f"\n[pack] Found {len(wad_paths)} WAD file(s), extracting textures...")
-            extracted = _extract_wad_textures(wad_paths, texture_names, materials_dir)
+            extracted = _extract_wad_textures(wad_paths, texture_names, materials_dir, workers=args.workers)
             elapsed = time.perf_counter() - t0
             print(f"[pack] Extracted {extracted} textures ({elapsed:.2f}s)")
         else:
@@ -549,7 +590,7 @@ def main() -> None:
         # ----------------------------------------------------------
         t0 = time.perf_counter()
         print("\n[pack] Converting brushes to triangles...")
-        render_tris, collision_tris, min_v, max_v = _convert_geometry(entities, args.scale)
+        render_tris, collision_tris, min_v, max_v = _convert_geometry(entities, args.scale, workers=args.workers)
         elapsed = time.perf_counter() - t0
         print(
             f"[pack] {len(render_tris)} render triangles, "
@@ -602,15 +643,18 @@ def main() -> None:
                 "skipped": [],
                 "copied_enabled": False,
             },
-            "collision_triangles": collision_tris,
-            "triangles": render_tris,
             "brush_models": [],
         }
         if payload_fog is not None:
             payload["fog"] = payload_fog
 
-        map_json = out_dir / "map.json"
-        map_json.write_text(json.dumps(payload, separators=(",", ":")), encoding="utf-8")
+        write_bundle_map_json(
+            bundle_dir=out_dir,
+            payload=payload,
+            triangles=render_tris,
+            collision_triangles=collision_tris,
+            geometry_format=args.geometry_format,
+        )
 
         # ----------------------------------------------------------
         # 10. Pack into .irunmap if needed
@@ -0,0 +1,126 @@
+"""Time a headless tuning sweep: one replay re-simulated with N tuning variants, in-process and in a worker pool.
+
+Without `--replay` a scripted demo (strafing, turning, periodic jumps) is generated on the benchmark arena from
+`server_sim_benchmark.py`. Variants scale `max_ground_speed` and `jump_height` across a small grid. Pooled
+results are checked against the in-process ones (per-tick hashes must match).
+
+Usage::
+
+    python tools/replay_sweep_benchmark.py [--replay demo.ivan_demo.json] [--variants 50] [--workers 4] \\
+        [--seconds 20] [--output report.json]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+_APPS_SRC = Path(__file__).resolve().parent.parent / "src"
+if str(_APPS_SRC) not in sys.path:
+    sys.path.insert(0, str(_APPS_SRC))
+
+from ivan.physics.tuning import PhysicsTuning  # noqa: E402
+from ivan.replays.batch_sim import simulate_replay_batch  # noqa: E402
+from ivan.replays.demo import DemoFrame, DemoMetadata, DemoRecording, load_replay  # noqa: E402
+from server_sim_benchmark import write_arena  # noqa: E402
+
+
+def scripted_demo(*, map_json: str, seconds: float, tick_rate: int = 60) -> DemoRecording:
+    frames: list[DemoFrame] = []
+    for i in range(max(1, int(seconds * tick_rate))):
+        frames.append(
+            DemoFrame(
+                look_dx=3 if (i // 40) % 2 else -3,
+                look_dy=0,
+                move_forward=1,
+                move_right=((i // 25) % 3) - 1,
+                jump_pressed=i % 50 == 10,
+                jump_held=i % 50 == 10,
+                slide_pressed=i % 120 > 100,
+                grapple_pressed=False,
+                noclip_toggle_pressed=False,
+                telemetry={"x": 0.0, "y": -30.0, "z": 1.5, "yaw": 0.0, "pitch": 0.0} if i == 0 else None,
+            )
+        )
+    return DemoRecording(
+        metadata=DemoMetadata(
+            demo_name="sweep-bench",
+            created_at_unix=0.0,
+            tick_rate=int(tick_rate),
+            look_scale=1,
+            map_id="sweep-bench",
+            map_json=map_json,
+            tuning={},
+        ),
+        frames=frames,
+    )
+
+
+def variant_grid(count: int) -> list[dict[str, float]]:
+    base = PhysicsTuning()
+    out: list[dict[str, float]] = []
+    for i in range(max(1, int(count))):
+        out.append(
+            {
+                "max_ground_speed": round(float(base.max_ground_speed) * (0.8 + 0.05 * (i % 9)), 4),
+                "jump_height": round(float(base.jump_height) * (0.85 + 0.05 * ((i // 9) % 7)), 4),
+            }
+        )
+    return out
+
+
+def run_benchmark(*, rec: DemoRecording, variants: int, workers: int) -> dict:
+    grid = variant_grid(variants)
+    t0 = time.perf_counter()
+    local = simulate_replay_batch(rec=rec, variants=grid, workers=0)
+    local_s = time.perf_counter() - t0
+    report = {
+        "ticks": len(rec.frames),
+        "variants": len(grid),
+        "in_process_s": round(local_s, 3),
+        "in_process_ticks_per_s": round(len(rec.frames) * len(grid) / max(local_s, 1e-9), 1),
+    }
+    if int(workers) > 1:
+        t0 = time.perf_counter()
+        pooled = simulate_replay_batch(rec=rec, variants=grid, workers=int(workers))
+        pooled_s = time.perf_counter() - t0
+        report.update(
+            {
+                "workers": int(workers),
+                "pool_s": round(pooled_s, 3),
+                "pool_identical": [r.tick_hashes for r in pooled] == [r.tick_hashes for r in local],
+            }
+        )
+    return report
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Headless replay tuning sweep benchmark.")
+    parser.add_argument("--replay", default=None, help="Replay to sweep (default: generated scripted demo).")
+    parser.add_argument("--variants", type=int, default=50, help="Number of tuning variants.")
+    parser.add_argument("--workers", type=int, default=min(4, os.cpu_count() or 1), help="Pool size (<=1: none).")
+    parser.add_argument("--seconds", type=float, default=20.0, help="Generated demo length in seconds.")
+    parser.add_argument("--output", default=None, help="Optional JSON report path (report is always printed).")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="ivan-sweep-bench-") as tmp:
+        if args.replay:
+            rec = load_replay(Path(args.replay).expanduser().resolve())
+        else:
+            rec = scripted_demo(map_json=write_arena(Path(tmp), detail=24), seconds=float(args.seconds))
+        report = run_benchmark(rec=rec, variants=int(args.variants), workers=int(args.workers))
+    report["cpu_count"] = os.cpu_count()
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text, encoding="utf-8")
+    print(text)
+    return 0 if report.get("pool_identical", True) else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
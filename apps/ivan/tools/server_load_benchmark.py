@@ -0,0 +1,327 @@
+"""Headless multiplayer server load benchmark with synthetic bot clients.
+
+Starts a dedicated server (a separate `python -m ivan --server` process by default, or an in-process
+`EmbeddedHostServer`) on a map and connects N bots over localhost. Bots are real `MultiplayerClient`
+instances (TCP hello + UDP input/snapshots), driven by a recorded `.ivan_demo.json` or by scripted movement.
+No window or GPU is needed.
+
+Reported as JSON:
+- server tick duration percentiles and budget overruns (`ServerTickMetrics`, read via the console `tick_stats`)
+- snapshot encode time per broadcast
+- bytes per client per second (down/up, measured by the bots)
+- input-to-ack latency: time from sending input seq N until a snapshot acks seq >= N
+
+Usage::
+
+    python tools/server_load_benchmark.py --clients 16 --duration 10 \\
+        [--map path/to/map.json] [--demo path/to/run.ivan_demo.json] [--embedded] [--output report.json]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+_APPS_SRC = Path(__file__).resolve().parent.parent / "src"
+if str(_APPS_SRC) not in sys.path:
+    sys.path.insert(0, str(_APPS_SRC))
+_TOOLS_DIR = Path(__file__).resolve().parent
+if str(_TOOLS_DIR) not in sys.path:
+    sys.path.insert(0, str(_TOOLS_DIR))
+
+from ivan.net.client import MultiplayerClient  # noqa: E402
+from ivan.net.server import EmbeddedHostServer  # noqa: E402
+from ivan.replays.demo import DemoRecording, load_replay  # noqa: E402
+from server_sim_benchmark import write_arena  # noqa: E402
+
+
+def _free_port_pair(host: str) -> int:
+    """TCP port P with UDP P+1 also free (the server's fixed layout)."""
+    for _ in range(64):
+        probe = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        try:
+            probe.bind((host, 0))
+            port = int(probe.getsockname()[1])
+        finally:
+            probe.close()
+        if port >= 65535:
+            continue
+        udp = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            udp.bind((host, port + 1))
+            return port
+        except OSError:
+            continue
+        finally:
+            udp.close()
+    raise RuntimeError("No free TCP/UDP port pair")
+
+
+def _percentiles_ms(samples: list[float]) -> dict[str, float | int]:
+    vals = sorted(samples)
+    if not vals:
+        return {"samples": 0, "p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+
+    def q(f: float) -> float:
+        return round(vals[max(0, min(len(vals) - 1, int(round(f * (len(vals) - 1)))))] * 1000.0, 3)
+
+    return {"samples": len(vals), "p50": q(0.50), "p95": q(0.95), "p99": q(0.99), "max": round(vals[-1] * 1000.0, 3)}
+
+
+class _Bot:
+    def __init__(self, *, index: int, host: str, port: int, demo: DemoRecording | None) -> None:
+        self.index = int(index)
+        self.client = MultiplayerClient(host=host, tcp_port=port, name=f"bot{index}")
+        self.demo = demo
+        self.seq = 0
+        self.sent_at: dict[int, float] = {}
+        self.acked_seq = 0
+        self.latencies_s: list[float] = []
+        self.snapshots = 0
+
+    def _cmd(self) -> dict:
+        seq = self.seq
+        if self.demo is not None and self.demo.frames:
+            # Bots start at staggered offsets so they do not move in lockstep.
+            fr = self.demo.frames[(seq + self.index * 37) % len(self.demo.frames)]
+            return {
+                "dx": fr.look_dx,
+                "dy": fr.look_dy,
+                "ls": self.demo.metadata.look_scale,
+                "mf": fr.move_forward,
+                "mr": fr.move_right,
+                "jp": fr.jump_pressed,
+                "jh": fr.jump_held,
+                "sp": fr.slide_pressed,
+                "gp": False,
+            }
+        phase = (seq // 60 + self.index) % 4
+        return {
+            "dx": ((self.index * 13 + seq // 7) % 9) - 4,
+            "dy": 0,
+            "ls": 1,
+            "mf": 1 if phase != 3 else -1,
+            "mr": (phase % 3) - 1,
+            "jp": (seq + self.index * 5) % 47 == 0,
+            "jh": False,
+            "sp": (seq + self.index) % 120 > 100,
+            "gp": False,
+        }
+
+    def send(self, now: float) -> None:
+        self.seq += 1
+        self.sent_at[self.seq] = now
+        self.client.send_input(seq=self.seq, server_tick_hint=0, cmd=self._cmd())
+
+    def poll(self, now: float, *, record: bool) -> None:
+        snap = self.client.poll()
+        if not isinstance(snap, dict):
+            return
+        ack = 0
+        for row in snap.get("players") or ():
+            if isinstance(row, dict) and int(row.get("id") or 0) == int(self.client.player_id):
+                ack = int(row.get("ack") or 0)
+                break
+        if ack <= self.acked_seq:
+            return
+        self.snapshots += 1
+        for seq in range(self.acked_seq + 1, ack + 1):
+            t_sent = self.sent_at.pop(seq, None)
+            if record and t_sent is not None:
+                self.latencies_s.append(now - t_sent)
+        self.acked_seq = ack
+
+    def close(self) -> None:
+        self.client.close()
+
+
+def _control_line(port: int, line: str) -> list[str]:
+    with socket.create_connection(("127.0.0.1", int(port)), timeout=2.0) as cs:
+        cs.sendall((json.dumps({"line": line, "role": "server", "origin": "benchmark"}) + "\n").encode("utf-8"))
+        buf = b""
+        while b"\n" not in buf:
+            chunk = cs.recv(65536)
+            if not chunk:
+                break
+            buf += chunk
+    resp = json.loads(buf.split(b"\n", 1)[0].decode("utf-8"))
+    return [str(x) for x in resp.get("out") or []]
+
+
+def _parse_stats_line(line: str) -> dict[str, float]:
+    out: dict[str, float] = {}
+    for part in line.split():
+        k, _, v = part.partition("=")
+        try:
+            out[k] = float(v)
+        except ValueError:
+            continue
+    return out
+
+
+def _wait_for_port(host: str, port: int, timeout_s: float) -> None:
+    deadline = time.monotonic() + float(timeout_s)
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection((host, int(port)), timeout=0.25):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"Server did not open {host}:{port}")
+
+
+def run_benchmark(
+    *,
+    map_json: str | None,
+    clients: int,
+    duration_s: float,
+    warmup_s: float = 1.0,
+    demo_path: str | None = None,
+    embedded: bool = False,
+    sim_workers: int = 0,
+) -> dict:
+    host = "127.0.0.1"
+    demo = load_replay(Path(demo_path)) if demo_path else None
+    with tempfile.TemporaryDirectory(prefix="ivan-load-bench-") as tmp:
+        map_ref = str(map_json) if map_json else write_arena(Path(tmp))
+        port = _free_port_pair(host)
+        console_port = _free_port_pair(host)
+        env = dict(os.environ)
+        env["IRUN_IVAN_SERVER_CONSOLE_PORT"] = str(console_port)
+        embedded_host: EmbeddedHostServer | None = None
+        proc: subprocess.Popen | None = None
+        if embedded:
+            # The server reads its console port from the environment at construction time.
+            prev_console_port = os.environ.get("IRUN_IVAN_SERVER_CONSOLE_PORT")
+            os.environ["IRUN_IVAN_SERVER_CONSOLE_PORT"] = str(console_port)
+            try:
+                embedded_host = EmbeddedHostServer(
+                    host=host, tcp_port=port, udp_port=port + 1, map_json=map_ref, sim_workers=sim_workers
+                )
+            finally:
+                if prev_console_port is None:
+                    os.environ.pop("IRUN_IVAN_SERVER_CONSOLE_PORT", None)
+                else:
+                    os.environ["IRUN_IVAN_SERVER_CONSOLE_PORT"] = prev_console_port
+            embedded_host.start()
+        else:
+            env["PYTHONPATH"] = os.pathsep.join(p for p in (str(_APPS_SRC), env.get("PYTHONPATH", "")) if p)
+            cmd = [sys.executable, "-m", "ivan", "--server", "--host", host, "--port", str(port), "--map", map_ref]
+            cmd += ["--server-sim-workers", str(int(sim_workers))]
+            proc = subprocess.Popen(cmd, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        bots: list[_Bot] = []
+        try:
+            _wait_for_port(host, port, timeout_s=30.0)
+            bots = [_Bot(index=i, host=host, port=port, demo=demo) for i in range(int(clients))]
+            tick_dt = 1.0 / float(bots[0].client.tick_rate if bots else 60)
+            t_start = time.perf_counter()
+            t_measure = t_start + max(0.0, float(warmup_s))
+            t_end = t_measure + max(0.1, float(duration_s))
+            measuring = False
+            bytes_at_start: list[tuple[int, int]] = []
+            next_send = t_start
+            while True:
+                now = time.perf_counter()
+                if now >= t_end:
+                    break
+                if not measuring and now >= t_measure:
+                    measuring = True
+                    bytes_at_start = [(b.client.bytes_received, b.client.bytes_sent) for b in bots]
+                    _control_line(console_port, "tick_stats reset 100000")
+                if now >= next_send:
+                    for bot in bots:
+                        bot.send(now)
+                    next_send += tick_dt
+                for bot in bots:
+                    bot.poll(now, record=measuring)
+                time.sleep(min(0.002, max(0.0, next_send - time.perf_counter())))
+            elapsed = max(1e-6, time.perf_counter() - t_measure)
+            stats_lines = _control_line(console_port, "tick_stats")
+            server_stats = _parse_stats_line(stats_lines[0]) if stats_lines else {}
+            down = [(b.client.bytes_received - b0) / elapsed for b, (b0, _u0) in zip(bots, bytes_at_start)]
+            up = [(b.client.bytes_sent - u0) / elapsed for b, (_b0, u0) in zip(bots, bytes_at_start)]
+            latencies = [lat for b in bots for lat in b.latencies_s]
+            snapshots = float(server_stats.get("snapshots") or 0.0)
+            return {
+                "map": str(map_json) if map_json else "generated-arena",
+                "clients": int(clients),
+                "duration_s": round(elapsed, 3),
+                "server_mode": "embedded" if embedded else "process",
+                "sim_workers": int(sim_workers),
+                "input_source": "demo" if demo is not None else "scripted",
+                "protocol": int(bots[0].client.protocol_version) if bots else 0,
+                "tick_ms": {
+                    "ticks": int(server_stats.get("ticks") or 0),
+                    "budget": server_stats.get("budget_ms", 0.0),
+                    "mean": server_stats.get("mean_ms", 0.0),
+                    "p50": server_stats.get("p50_ms", 0.0),
+                    "p99": server_stats.get("p99_ms", 0.0),
+                    "max": server_stats.get("max_ms", 0.0),
+                    "overruns": int(server_stats.get("overruns") or 0),
+                    "late_ticks": int(server_stats.get("late_ticks") or 0),
+                },
+                "snapshot_encode_ms": {
+                    "snapshots": int(snapshots),
+                    "p50": server_stats.get("snapshot_p50_ms", 0.0),
+                    "p99": server_stats.get("snapshot_p99_ms", 0.0),
+                    "bytes_per_snapshot": round(
+                        float(server_stats.get("snapshot_bytes") or 0.0) / max(1.0, snapshots), 1
+                    ),
+                },
+                "bytes_per_client_per_s": {
+                    "down_mean": round(sum(down) / max(1, len(down)), 1),
+                    "down_max": round(max(down, default=0.0), 1),
+                    "up_mean": round(sum(up) / max(1, len(up)), 1),
+                },
+                "input_ack_latency_ms": _percentiles_ms(latencies),
+            }
+        finally:
+            for bot in bots:
+                bot.close()
+            if embedded_host is not None:
+                embedded_host.stop()
+            if proc is not None:
+                proc.terminate()
+                try:
+                    proc.wait(timeout=5.0)
+                except subprocess.TimeoutExpired:
+                    proc.kill()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Headless multiplayer server load benchmark (localhost bots).")
+    parser.add_argument("--map", default=None, help="Map reference for the server (default: generated arena).")
+    parser.add_argument("--clients", type=int, default=8, help="Number of synthetic bot clients.")
+    parser.add_argument("--duration", type=float, default=10.0, help="Measured seconds (after warmup).")
+    parser.add_argument("--warmup", type=float, default=1.0, help="Unmeasured seconds after all bots joined.")
+    parser.add_argument("--demo", default=None, help="Replay .ivan_demo.json inputs instead of scripted movement.")
+    parser.add_argument("--embedded", action="store_true", help="Run EmbeddedHostServer in this process.")
+    parser.add_argument("--sim-workers", type=int, default=0, help="Server sharded simulation workers.")
+    parser.add_argument("--output", default=None, help="Optional JSON report path (report is always printed).")
+    args = parser.parse_args()
+
+    report = run_benchmark(
+        map_json=args.map,
+        clients=max(1, int(args.clients)),
+        duration_s=float(args.duration),
+        warmup_s=float(args.warmup),
+        demo_path=args.demo,
+        embedded=bool(args.embedded),
+        sim_workers=max(0, int(args.sim_workers)),
+    )
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text, encoding="utf-8")
+    print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,217 @@
+"""Benchmark server tick time versus player count for in-process and sharded simulation.
+
+Runs the real `MultiplayerServer._simulate_tick` with scripted bot inputs (no network traffic) for every
+combination of player count, collision world (`full` map mesh vs. per-player `local` neighbourhoods) and worker
+count. Every run's final player state is compared with the in-process run of the first collision world listed:
+sharded runs must match exactly; `local` runs can differ slightly (Bullet breaks closest-hit ties on shared
+triangle edges by BVH traversal order), so the report also gives the largest final position difference.
+
+Usage::
+
+    python tools/server_sim_benchmark.py --players 8,32,64 --max-workers 4 --ticks 300 \\
+        [--collision full,local] [--detail 24] [--map path/to/map.json] [--output report.json]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+_APPS_SRC = Path(__file__).resolve().parent.parent / "src"
+if str(_APPS_SRC) not in sys.path:
+    sys.path.insert(0, str(_APPS_SRC))
+
+from panda3d.core import LVector3f  # noqa: E402
+
+from ivan.net.protocol import InputCommand  # noqa: E402
+from ivan.net.rewind import RewindHistory  # noqa: E402
+from ivan.net.server import MultiplayerServer, _ClientState  # noqa: E402
+from ivan.net.tick_metrics import ServerTickMetrics  # noqa: E402
+
+
+def write_arena(out_dir: Path, *, detail: int = 0) -> str:
+    """
+    Flat floor with walls and a ramp; enough contact variety to exercise sweeps. `detail` adds a detail x detail
+    field of low blocks across the floor (12 triangles each) to stand in for large, dense maps.
+    """
+    s = 60.0
+    tris: list[list[float]] = [
+        [-s, -s, 0.0, s, -s, 0.0, s, s, 0.0],
+        [-s, -s, 0.0, s, s, 0.0, -s, s, 0.0],
+        [-20.0, 10.0, 0.0, 20.0, 10.0, 0.0, 20.0, 22.0, 3.0],
+        [-20.0, 10.0, 0.0, 20.0, 22.0, 3.0, -20.0, 22.0, 3.0],
+    ]
+    for x0, y0, x1, y1 in ((-s, -s, s, -s), (s, -s, s, s), (s, s, -s, s), (-s, s, -s, -s)):
+        tris.append([x0, y0, 0.0, x1, y1, 0.0, x1, y1, 8.0])
+        tris.append([x0, y0, 0.0, x1, y1, 8.0, x0, y0, 8.0])
+    n = max(0, int(detail))
+    for i in range(n):
+        for j in range(n):
+            cx = -s + (i + 0.5) * (2.0 * s / n)
+            cy = -s + (j + 0.5) * (2.0 * s / n)
+            tris.extend(_box_triangles(cx - 0.4, cy - 0.4, 0.0, cx + 0.4, cy + 0.4, 0.3 + 0.1 * ((i + j) % 4)))
+    path = out_dir / "map.json"
+    path.write_text(json.dumps({"triangles": tris, "spawn": {"position": [0.0, -30.0, 1.5], "yaw": 0.0}}))
+    return str(path)
+
+
+def _box_triangles(x0: float, y0: float, z0: float, x1: float, y1: float, z1: float) -> list[list[float]]:
+    c = [(x, y, z) for z in (z0, z1) for y in (y0, y1) for x in (x0, x1)]
+    quads = ((0, 1, 3, 2), (4, 6, 7, 5), (0, 4, 5, 1), (2, 3, 7, 6), (0, 2, 6, 4), (1, 5, 7, 3))
+    out: list[list[float]] = []
+    for a, b, cc, d in quads:
+        out.append([*c[a], *c[b], *c[cc]])
+        out.append([*c[a], *c[cc], *c[d]])
+    return out
+
+
+def _bot_input(seq: int, pid: int) -> InputCommand:
+    phase = (seq // 45 + pid) % 4
+    return InputCommand(
+        seq=seq,
+        server_tick_hint=0,
+        look_dx=((pid * 13 + seq // 7) % 9) - 4,
+        look_dy=0,
+        look_scale=1,
+        move_forward=1 if phase != 3 else -1,
+        move_right=(phase % 3) - 1,
+        jump_pressed=(seq + pid * 5) % 37 == 0,
+        jump_held=False,
+        slide_pressed=(seq + pid) % 90 > 70,
+        grapple_pressed=False,
+    )
+
+
+def run_case(
+    *,
+    map_json: str,
+    players: int,
+    workers: int,
+    ticks: int,
+    warmup: int,
+    collision_world: str = "full",
+) -> dict:
+    srv = MultiplayerServer(
+        host="127.0.0.1",
+        tcp_port=0,
+        udp_port=0,
+        map_json=map_json,
+        sim_workers=workers,
+        collision_world=collision_world,
+    )
+    try:
+        total = int(warmup) + int(ticks)
+        for i in range(int(players)):
+            pid = i + 1
+            spawn = LVector3f(float((i % 10) - 5) * 3.0, float(i // 10) * 3.0 - 40.0, 1.5)
+            st = _ClientState(
+                player_id=pid,
+                token=f"bench{pid}",
+                name=f"bot{pid}",
+                tcp_sock=None,
+                udp_addr=None,
+                ctrl=srv._make_controller(spawn_point=spawn),
+                yaw=0.0,
+                pitch=0.0,
+                hp=100,
+                respawn_seq=0,
+                last_input=_bot_input(0, pid),
+                rewind_history=RewindHistory(capacity=240),
+            )
+            st.input_queue.extend(_bot_input(seq, pid) for seq in range(1, total + 1))
+            srv._clients_by_token[st.token] = st
+        metrics = ServerTickMetrics(tick_rate_hz=srv.tick_rate_hz, window_ticks=max(1, int(ticks)))
+        for i in range(total):
+            t0 = time.perf_counter()
+            srv._simulate_tick()
+            if i >= int(warmup):
+                metrics.record_tick(duration_s=time.perf_counter() - t0)
+        final = {
+            int(st.player_id): (tuple(st.ctrl.pos), tuple(st.ctrl.vel))
+            for st in srv._clients_by_token.values()
+        }
+        return {
+            "players": int(players),
+            "collision": srv.collision_world_mode,
+            "workers": int(workers),
+            "sharded": srv._sim_shards is not None,
+            "tick": metrics.summary(),
+            "_final": final,
+        }
+    finally:
+        srv.close()
+
+
+def _max_pos_delta(final: dict, baseline: dict) -> float:
+    out = 0.0
+    for pid, (pos, _vel) in final.items():
+        ref = baseline.get(pid)
+        if ref is not None:
+            out = max(out, max(abs(float(a) - float(b)) for a, b in zip(pos, ref[0])))
+    return round(out, 6)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Server simulation tick time vs player count for 0..N workers.")
+    parser.add_argument("--map", default=None, help="Map reference (default: generated flat arena).")
+    parser.add_argument("--players", default="1,8,32,64", help="Comma-separated player counts.")
+    parser.add_argument("--max-workers", type=int, default=4, help="Benchmark worker counts 0 (in-process)..N.")
+    parser.add_argument("--collision", default="full,local", help="Comma-separated collision worlds (full, local).")
+    parser.add_argument("--detail", type=int, default=24, help="Generated arena: NxN block field (0 = bare arena).")
+    parser.add_argument("--ticks", type=int, default=300, help="Measured ticks per case.")
+    parser.add_argument("--warmup", type=int, default=30, help="Unmeasured ticks per case.")
+    parser.add_argument("--output", default=None, help="Optional JSON report path (report is always printed).")
+    args = parser.parse_args()
+
+    # Keep the benchmark servers off the default console control port.
+    os.environ.setdefault("IRUN_IVAN_SERVER_CONSOLE_PORT", "0")
+    player_counts = [max(1, int(p)) for p in str(args.players).split(",") if p.strip()]
+    modes = [m.strip() for m in str(args.collision).split(",") if m.strip()] or ["full"]
+    with tempfile.TemporaryDirectory(prefix="ivan-sim-bench-") as tmp:
+        map_json = str(args.map) if args.map else write_arena(Path(tmp), detail=int(args.detail))
+        cases: list[dict] = []
+        for players in player_counts:
+            baseline = None
+            for mode in modes:
+                for workers in range(0, max(0, int(args.max_workers)) + 1):
+                    case = run_case(
+                        map_json=map_json,
+                        players=players,
+                        workers=workers,
+                        ticks=int(args.ticks),
+                        warmup=int(args.warmup),
+                        collision_world=mode,
+                    )
+                    final = case.pop("_final")
+                    if baseline is None:
+                        baseline = final
+                    case["identical_to_in_process"] = final == baseline
+                    case["max_pos_delta"] = _max_pos_delta(final, baseline)
+                    cases.append(case)
+                    print(
+                        f"players={players:4d} collision={case['collision']:5s} workers={workers} "
+                        f"mean_ms={case['tick']['mean_ms']:.3f} p99_ms={case['tick']['p99_ms']:.3f} "
+                        f"identical={case['identical_to_in_process']} max_pos_delta={case['max_pos_delta']}",
+                        file=sys.stderr,
+                    )
+    report = {
+        "map": str(args.map) if args.map else f"generated-arena(detail={int(args.detail)})",
+        "ticks": int(args.ticks),
+        "cpu_count": os.cpu_count(),
+        "cases": cases,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text, encoding="utf-8")
+    print(text)
+    baseline_mode = modes[0]
+    return 0 if all(c["identical_to_in_process"] for c in cases if c["collision"] == baseline_mode) else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
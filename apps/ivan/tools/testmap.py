@@ -2,9 +2,9 @@
 """Quick-test script for IVAN .map files with auto-reload on save.
 
 Launches ``python -m ivan --map <path>`` as a subprocess, watches the .map
-file for changes (mtime polling), and restarts the game on save.  Optionally
-talks to the in-game console bridge to request a hot-reload instead of a full
-restart (once the ``map_reload`` console command is implemented).
+file for changes (mtime polling), and on save asks the in-game console bridge
+for a ``map_reload`` hot-reload (only changed brushes are re-converted and only
+changed geometry groups rebuilt), falling back to a full restart.
 
 Usage::
 
@@ -39,9 +39,12 @@ _PREFIX = "[testmap]"
 _DEFAULT_CONSOLE_PORT = 7779
 _CONSOLE_PORT_ENV = "IRUN_IVAN_CONSOLE_PORT"
 
-# Reload command to send via the console bridge.
-# NOTE: ``map_reload`` does not exist in the game yet.  The console bridge
-# attempt will therefore fail and the script falls back to kill + restart.
+# Brush conversion worker processes for the launched game (matches ivan.maps.brush_batch.MAP_WORKERS_ENV).
+_MAP_WORKERS_ENV = "IRUN_IVAN_MAP_WORKERS"
+
+# Reload command to send via the console bridge.  When the bridge is not
+# reachable (or the game is not running a direct .map) the script falls back
+# to kill + restart.
 _RELOAD_PAYLOAD = json.dumps(
     {"line": "map_reload", "role": "client", "origin": "testmap"},
     ensure_ascii=True,
@@ -75,8 +78,8 @@ def _console_port() -> int:
 def _try_console_reload() -> bool:
     """Attempt to send a ``map_reload`` command via the console bridge.
 
-    Returns ``True`` if the bridge accepted the command, ``False`` otherwise
-    (connection refused, timeout, unknown command, etc.).
+    Returns ``True`` if the game applied the reload, ``False`` otherwise
+    (connection refused, timeout, unknown command, reload error, etc.).
     """
     port = _console_port()
     try:
@@ -97,7 +100,8 @@ def _try_console_reload() -> bool:
                 # Check if the command actually produced an error message.
                 out = resp.get("out", [])
                 for line in out:
-                    if "unknown" in str(line).lower():
+                    text = str(line).lower()
+                    if "unknown" in text or text.startswith("error"):
                         return False
                 return True
             return False
@@ -114,6 +118,7 @@ def _launch_game(
     map_path: Path,
     *,
     scale: float,
+    workers: int | None = None,
     extra_args: list[str] | None = None,
 ) -> subprocess.Popen[bytes]:
     """Start ``python -m ivan --map <map_path>`` and return the Popen handle."""
@@ -123,8 +128,11 @@ def _launch_game(
     ]
     if extra_args:
         cmd.extend(extra_args)
+    env = dict(os.environ)
+    if workers is not None:
+        env[_MAP_WORKERS_ENV] = str(int(workers))
     print(f"{_PREFIX} Launching: {' '.join(cmd)}")
-    return subprocess.Popen(cmd, cwd=str(_IVAN_DIR))
+    return subprocess.Popen(cmd, cwd=str(_IVAN_DIR), env=env)
 
 
 def _terminate(proc: subprocess.Popen[bytes], *, timeout: float = 5.0) -> None:
@@ -151,6 +159,7 @@ def _convert_and_exit(
     scale: float,
     bake: bool,
     ericw_tools: str | None,
+    workers: int | None,
 ) -> None:
     """Convert the .map file to .irunmap (via pack_map or bake_map) and exit."""
     if output is None:
@@ -184,6 +193,8 @@ def _convert_and_exit(
             "--output", output,
             "--scale", str(scale),
         ]
+        if workers is not None:
+            cmd.extend(["--workers", str(int(workers))])
 
     print(f"{_PREFIX} Converting: {' '.join(cmd)}")
     result = subprocess.run(cmd)
@@ -203,6 +214,7 @@ def _run_with_watch(
     poll_interval: float,
     bake: bool,
     ericw_tools: str | None,
+    workers: int | None = None,
 ) -> None:
     """Launch IVAN and optionally watch for .map changes."""
     # When --bake is specified, convert first, then launch the baked bundle.
@@ -232,7 +244,7 @@ def _run_with_watch(
             sys.exit(result.returncode)
         launch_path = baked
 
-    proc = _launch_game(launch_path, scale=scale)
+    proc = _launch_game(launch_path, scale=scale, workers=workers)
     last_mtime = map_path.stat().st_mtime
 
     if not watch:
@@ -283,7 +295,7 @@ def _run_with_watch(
             print(f"{_PREFIX} Restarting game process ...")
             _terminate(proc)
             time.sleep(0.5)  # Brief pause to release resources.
-            proc = _launch_game(launch_path, scale=scale)
+            proc = _launch_game(launch_path, scale=scale, workers=workers)
 
     except KeyboardInterrupt:
         print(f"\n{_PREFIX} Shutting down ...")
@@ -341,6 +353,12 @@ def _build_parser() -> argparse.ArgumentParser:
         default=1.0,
         help="File change poll interval in seconds (default: 1.0).",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Brush conversion worker processes (default: CPU count; 0 = in-process).",
+    )
     return parser
 
 
@@ -362,6 +380,7 @@ def main() -> None:
             scale=args.scale,
             bake=args.bake,
             ericw_tools=args.ericw_tools,
+            workers=args.workers,
         )
         return
 
@@ -372,6 +391,7 @@ def main() -> None:
         poll_interval=args.poll_interval,
         bake=args.bake,
         ericw_tools=args.ericw_tools,
+        workers=args.workers,
     )
 
 